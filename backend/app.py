@@ -16,6 +16,14 @@
 #
 # 本轮改动（基础数据任务稳定状态）：
 #   - 新增 /api/system/basic-data-status 路由
+#
+# 本轮改动（SQLite 单写线程）：
+#   - 启动时拉起 writer_thread，关闭时排空并停止
+#   - runtime.metrics / health 增加 db_writer_queue_size
+#
+# 本轮改动（数据库后台维护）：
+#   - 启动/关闭数据库维护调度器（checkpoint / incremental_vacuum / optimize）
+#   - runtime.metrics 增加 db_maintenance（WAL 大小、页数、最近一次维护耗时）
 # ==============================
 
 from __future__ import annotations
@@ -43,6 +51,8 @@ from backend.routers.basic_data_status import router as basic_data_status_router
 
 from backend.services.unified_sync_executor import get_sync_executor
 from backend.db.async_writer import get_async_writer
+from backend.db.writer_thread import get_db_writer, stop_db_writer
+from backend.db.maintenance import get_db_maintenance
 from backend.services.local_import.recovery import recover_interrupted_local_import_batches
 from backend.utils.logger import get_logger
 from backend.utils.events import (
@@ -108,7 +118,10 @@ async def _runtime_metrics_loop() -> None:
                     "thread_count": thread_count,
                     "executor_running": bool(executor.running),
                     "queue_size": int(executor.queue.size()),
-                    "writer_queue_size": int(writer.queue.qsize()),
+                    "writer_queue_size": int(writer.queue_size),
+                    "db_writer_queue_size": int(get_db_writer().queue_size),
+                    "db_maintenance": get_db_maintenance().metrics_snapshot(),
+                    "async_writer": writer.metrics_snapshot(),
                 },
             }
 
@@ -132,6 +145,7 @@ async def on_startup() -> None:
     _LOG.info("应用启动：开始初始化")
 
     ensure_initialized()
+    get_db_writer().start()
 
     # local-import 启动恢复链路
     try:
@@ -144,6 +158,8 @@ async def on_startup() -> None:
     await writer.start()
     asyncio.create_task(executor.start())
 
+    await get_db_maintenance().start()
+
     global _RUNTIME_METRICS_TASK
     _RUNTIME_METRICS_TASK = asyncio.create_task(_runtime_metrics_loop())
 
@@ -167,8 +183,10 @@ async def on_shutdown() -> None:
             pass
         _RUNTIME_METRICS_TASK = None
 
+    await get_db_maintenance().stop()
     await writer.stop()
     await executor.stop()
+    await asyncio.to_thread(stop_db_writer)
 
 
 @app.get("/api/ping")
@@ -184,7 +202,8 @@ def health() -> Dict[str, Any]:
         "timezone": settings.timezone,
         "executor_running": executor.running,
         "queue_size": executor.queue.size(),
-        "writer_queue_size": writer.queue.qsize(),
+        "writer_queue_size": writer.queue_size,
+        "db_writer_queue_size": get_db_writer().queue_size,
         "thread_count": int(threading.active_count()),
     }
 
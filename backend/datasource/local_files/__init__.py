@@ -28,8 +28,8 @@ from .tdxhy_cfg import load_tdxhy_cfg_df
 from .tdxzs3_cfg import load_tdxzs3_cfg_df
 from .infoharbor_block_dat import load_infoharbor_block_df
 from .needini_dat import load_needini_holidays_df, get_needini_latest_year
-from .tdx_day import load_tdx_day_df
-from .tdx_minute import load_tdx_minute_df
+from .tdx_day import load_tdx_day_df, load_tdx_day_arrays, decode_tdx_day_bytes
+from .tdx_minute import load_tdx_minute_df, load_tdx_minute_arrays, decode_tdx_minute_bytes
 from .tdx_gbbq import load_tdx_gbbq_df
 
 __all__ = [
@@ -42,6 +42,10 @@ __all__ = [
     "load_needini_holidays_df",
     "get_needini_latest_year",
     "load_tdx_day_df",
+    "load_tdx_day_arrays",
+    "decode_tdx_day_bytes",
     "load_tdx_minute_df",
+    "load_tdx_minute_arrays",
+    "decode_tdx_minute_bytes",
     "load_tdx_gbbq_df",
 ]
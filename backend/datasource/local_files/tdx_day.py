@@ -31,14 +31,26 @@
 #   6. amount       4字节 float，成交额
 #   7. volume       4字节 int，成交量（股）
 #   8. reserved     4字节 int，保留
+#
+# 本轮改动（向量化解析）：
+#   - load_tdx_day_df 改为 np.frombuffer 结构化 dtype 一次性解析整个文件
+#     日期校验、价格 /100 缩放、按 date 去重（后者胜）+ 排序全部向量化
+#   - 新增 load_tdx_day_arrays：直接返回列数组，供不需要 DataFrame 的调用方使用
+#   - 原逐条 struct.unpack 实现保留为 load_tdx_day_df_reference，仅作等价性对照
+#     （backend/dev_tests/local_files/test_tdx_day_vectorized.py）
+#
+# 本轮改动（导入流水线）：
+#   - 新增 decode_tdx_day_bytes：只解码已读入内存的字节，读文件与解码可分属流水线不同阶段
+#   - load_tdx_day_arrays 改为“读文件 + decode_tdx_day_bytes”，行为不变
 # ==============================
 
 from __future__ import annotations
 
 import struct
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backend.utils.logger import get_logger
@@ -47,6 +59,19 @@ _LOG = get_logger("local_files.tdx_day")
 
 _DAY_RECORD_SIZE = 32
 
+_DAY_COLUMNS = ["date", "open", "high", "low", "close", "amount", "volume"]
+
+_DAY_DTYPE = np.dtype([
+    ("date", "<u4"),
+    ("open", "<u4"),
+    ("high", "<u4"),
+    ("low", "<u4"),
+    ("close", "<u4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("reserved", "<u4"),
+])
+
 
 def _safe_price_from_int(value: Any) -> float:
     try:
@@ -55,9 +80,118 @@ def _safe_price_from_int(value: Any) -> float:
         return 0.0
 
 
+def _read_day_bytes(file_path: Path | str) -> Tuple[Path, bytes]:
+    path = Path(file_path).resolve()
+
+    if not path.exists():
+        raise FileNotFoundError(f".day file not found: {path}")
+
+    raw = path.read_bytes()
+    if len(raw) % _DAY_RECORD_SIZE != 0:
+        raise ValueError(
+            f"invalid .day file size: {path}, bytes={len(raw)}, "
+            f"not divisible by {_DAY_RECORD_SIZE}"
+        )
+    return path, raw
+
+
+def _empty_day_arrays() -> Dict[str, np.ndarray]:
+    out = {"date": np.empty(0, dtype=np.int64)}
+    for col in _DAY_COLUMNS[1:]:
+        out[col] = np.empty(0, dtype=np.float64)
+    return out
+
+
+def decode_tdx_day_bytes(raw: bytes, *, source: str = "") -> Dict[str, np.ndarray]:
+    """
+    向量化解码一段 .day 32字节记录（已按 date 去重、升序）。
+
+    Returns:
+        {'date': int64, 'open'/'high'/'low'/'close'/'amount'/'volume': float64}
+
+    Raises:
+        ValueError: 长度非法 / 日期非法（报首条非法记录）
+    """
+    if not raw:
+        return _empty_day_arrays()
+
+    if len(raw) % _DAY_RECORD_SIZE != 0:
+        raise ValueError(
+            f"invalid .day file size: {source}, bytes={len(raw)}, "
+            f"not divisible by {_DAY_RECORD_SIZE}"
+        )
+
+    rec = np.frombuffer(raw, dtype=_DAY_DTYPE)
+
+    dates = rec["date"].astype(np.int64)
+    bad = (dates < 19000101) | (dates > 21001231)
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        # 日期明显非法，直接视为文件损坏
+        raise ValueError(f"invalid trade date in .day file: idx={i} date={int(dates[i])} file={source}")
+
+    # 常见情况：文件内日期严格递增，直接整列使用
+    # 否则同日多条保留最后一条：在逆序数组上取首次出现位置，np.unique 顺带完成升序
+    if bool(np.all(dates[1:] > dates[:-1])):
+        idx = slice(None)
+    else:
+        _, first_in_rev = np.unique(dates[::-1], return_index=True)
+        idx = (len(dates) - 1) - first_in_rev
+
+    return {
+        "date": dates[idx],
+        "open": rec["open"][idx].astype(np.float64) / 100.0,
+        "high": rec["high"][idx].astype(np.float64) / 100.0,
+        "low": rec["low"][idx].astype(np.float64) / 100.0,
+        "close": rec["close"][idx].astype(np.float64) / 100.0,
+        "amount": rec["amount"][idx].astype(np.float64),
+        "volume": rec["volume"][idx].astype(np.float64),
+    }
+
+
+def load_tdx_day_arrays(file_path: Path | str) -> Dict[str, np.ndarray]:
+    """
+    解析单个 .day 文件并返回列数组（已按 date 去重、升序）。
+
+    Returns:
+        {'date': int64, 'open'/'high'/'low'/'close'/'amount'/'volume': float64}
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件格式非法
+    """
+    path, raw = _read_day_bytes(file_path)
+    return decode_tdx_day_bytes(raw, source=str(path))
+
+
 def load_tdx_day_df(file_path: Path | str) -> pd.DataFrame:
     """
-    解析单个 .day 文件并返回原始日线 DataFrame。
+    解析单个 .day 文件并返回原始日线 DataFrame（向量化实现）。
+
+    Args:
+        file_path: .day 文件路径
+
+    Returns:
+        DataFrame(columns=[
+            'date', 'open', 'high', 'low', 'close', 'amount', 'volume'
+        ])
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件格式非法
+    """
+    arrays = load_tdx_day_arrays(file_path)
+    if len(arrays["date"]) == 0:
+        return pd.DataFrame(columns=_DAY_COLUMNS)
+
+    df = pd.DataFrame(arrays, columns=_DAY_COLUMNS)
+    _LOG.info("[TDX][DAY] parsed rows=%s file=%s", len(df), str(Path(file_path).resolve()))
+    return df
+
+
+def load_tdx_day_df_reference(file_path: Path | str) -> pd.DataFrame:
+    """
+    逐条 struct 解析的原实现（仅作向量化版本的等价性对照，业务路径不使用）。
 
     Args:
         file_path: .day 文件路径
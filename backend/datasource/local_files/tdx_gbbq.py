@@ -30,14 +30,26 @@
 #       * 后 5 字节 ：明文
 #   - 解密后整体按：
 #       struct.unpack("<B7sIBffff", data29)
+#
+# 本轮改动（向量化解密）：
+#   - 新增 numpy 版 Blowfish：全部记录的 3 个加密块一次性组成 uint32 数组，
+#     16 轮 Feistel 每轮以向量化 S 盒 gather 完成，不再逐块逐轮 Python 循环
+#   - 解密后的 29 字节记录以结构化 dtype 一次性拆字段
+#   - load_tdx_gbbq_df 改走向量化路径；原逐条实现保留为 load_tdx_gbbq_df_reference，
+#     字节级等价性验证见 backend/dev_tests/local_files/test_tdx_gbbq_vectorized.py
+#
+# 本轮改动（文件指纹）：
+#   - 新增 get_gbbq_file_fingerprint：size / mtime_ns（可选 content_hash），供快照任务判断是否需要重做
 # ==============================
 
 from __future__ import annotations
 
+import hashlib
 import struct
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backend.settings import settings
@@ -58,6 +70,28 @@ def _gbbq_file_path() -> Path:
     return _hq_cache_dir() / "gbbq"
 
 
+def get_gbbq_file_fingerprint(*, with_hash: bool = False) -> Dict[str, Any]:
+    """
+    gbbq 文件指纹：{path, size, mtime_ns[, content_hash]}。
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    path = _gbbq_file_path()
+    if not path.exists():
+        raise FileNotFoundError(f"gbbq file not found: {path}")
+
+    st = path.stat()
+    out: Dict[str, Any] = {
+        "path": str(path),
+        "size": int(st.st_size),
+        "mtime_ns": int(st.st_mtime_ns),
+    }
+    if with_hash:
+        out["content_hash"] = hashlib.blake2b(path.read_bytes(), digest_size=20).hexdigest()
+    return out
+
+
 # ==========================================================
 # 二、Blowfish 最小解密实现（仅服务 gbbq）
 # ==========================================================
@@ -290,6 +324,52 @@ def _blowfish_decrypt_block(block8: bytes) -> bytes:
     return struct.pack("<II", left, right)
 
 
+_P_NP = np.array(_P_ARRAY, dtype=np.uint32)
+_S_NP = np.array([_S1, _S2, _S3, _S4], dtype=np.uint32)
+
+
+def _bf_f_np(x: np.ndarray) -> np.ndarray:
+    # uint32 数组运算天然按 2^32 回绕，与 _u32 掩码等价
+    y = _S_NP[0][x >> 24] + _S_NP[1][(x >> 16) & 0xFF]
+    y ^= _S_NP[2][(x >> 8) & 0xFF]
+    y += _S_NP[3][x & 0xFF]
+    return y
+
+
+def blowfish_decrypt_blocks_np(blocks: np.ndarray) -> np.ndarray:
+    """
+    向量化 ECB 解密：blocks 为 (N, 2) 的 uint32 数组（每行一个 8 字节块的小端左右半），
+    返回同形状的解密结果。轮序与 _blowfish_decrypt_block 完全一致。
+    """
+    left = np.ascontiguousarray(blocks[:, 0], dtype=np.uint32)
+    right = np.ascontiguousarray(blocks[:, 1], dtype=np.uint32)
+
+    for i in range(17, 1, -1):
+        left ^= _P_NP[i]
+        right ^= _bf_f_np(left)
+        left, right = right, left
+
+    left, right = right, left
+    right ^= _P_NP[1]
+    left ^= _P_NP[0]
+
+    return np.stack([left, right], axis=1)
+
+
+def decrypt_gbbq_records_np(payload: bytes, total: int) -> np.ndarray:
+    """
+    一次性解密 total 条 29 字节记录，返回 (total, 29) 的 uint8 明文数组
+    （前 24 字节为解密结果，后 5 字节原样保留）。
+    """
+    rec = np.frombuffer(payload, dtype=np.uint8, count=total * _RECORD_SIZE).reshape(total, _RECORD_SIZE)
+    blocks = np.ascontiguousarray(rec[:, :24]).view("<u4").reshape(total * 3, 2)
+
+    out = np.empty((total, _RECORD_SIZE), dtype=np.uint8)
+    out[:, :24] = blowfish_decrypt_blocks_np(blocks).astype("<u4").view(np.uint8).reshape(total, 24)
+    out[:, 24:] = rec[:, 24:]
+    return out
+
+
 def _decrypt_gbbq_record_body(enc24: bytes, plain5: bytes) -> bytes:
     if len(enc24) != 24:
         raise ValueError("gbbq encrypted part length must be 24")
@@ -330,20 +410,23 @@ def _decode_symbol(raw7: bytes) -> str:
         return ""
 
 
-def load_tdx_gbbq_df() -> pd.DataFrame:
-    """
-    解析 gbbq 文件，返回原始 DataFrame。
+_GBBQ_COLUMNS = ["market", "symbol", "date", "category", "field1", "field2", "field3", "field4"]
 
-    输出字段：
-      - market
-      - symbol
-      - date
-      - category
-      - field1
-      - field2
-      - field3
-      - field4
-    """
+_GBBQ_PLAIN_DTYPE = np.dtype([
+    ("market_id", "u1"),
+    ("code", "S7"),
+    ("date", "<u4"),
+    ("category", "u1"),
+    ("field1", "<f4"),
+    ("field2", "<f4"),
+    ("field3", "<f4"),
+    ("field4", "<f4"),
+])
+
+_MARKET_ID_TEXT = np.array(["SZ", "SH", "BJ"], dtype=object)
+
+
+def _read_gbbq_payload() -> Tuple[Path, int, bytes]:
     path = _gbbq_file_path()
     if not path.exists():
         raise FileNotFoundError(f"gbbq file not found: {path}")
@@ -361,6 +444,78 @@ def load_tdx_gbbq_df() -> pd.DataFrame:
             f"invalid gbbq file size: path={path}, declared_records={total}, "
             f"expected_payload={expected_size}, actual_payload={len(payload)}"
         )
+    return path, total, payload
+
+
+def _finalize_gbbq_df(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop_duplicates(
+        subset=["market", "symbol", "date", "category"],
+        keep="last",
+    ).sort_values(["market", "symbol", "date", "category"]).reset_index(drop=True)
+
+
+def parse_gbbq_plain_records(plain: np.ndarray) -> pd.DataFrame:
+    """(N, 29) 明文记录 -> 原始 DataFrame（过滤口径与逐条实现一致，未去重排序）。"""
+    if len(plain) == 0:
+        return pd.DataFrame(columns=_GBBQ_COLUMNS)
+
+    rec = np.ascontiguousarray(plain).view(_GBBQ_PLAIN_DTYPE).reshape(-1)
+
+    market_id = rec["market_id"]
+    dates = rec["date"].astype(np.int64)
+    keep = (market_id <= 2) & (dates >= 19000101) & (dates <= 21001231)
+
+    # 代码字段仍逐条解码（与 _decode_symbol 同口径）；只处理通过数值过滤的记录
+    idx = np.flatnonzero(keep)
+    symbols = [_decode_symbol(c) for c in rec["code"][idx].tolist()]
+    ok = np.fromiter((bool(sym) and sym.isdigit() for sym in symbols), dtype=bool, count=len(symbols))
+    idx = idx[ok]
+    if len(idx) == 0:
+        return pd.DataFrame(columns=_GBBQ_COLUMNS)
+
+    sel = rec[idx]
+    return pd.DataFrame({
+        "market": _MARKET_ID_TEXT[sel["market_id"].astype(np.int64)],
+        "symbol": np.array(symbols, dtype=object)[ok],
+        "date": dates[idx],
+        "category": sel["category"].astype(np.int64),
+        "field1": sel["field1"].astype(np.float64),
+        "field2": sel["field2"].astype(np.float64),
+        "field3": sel["field3"].astype(np.float64),
+        "field4": sel["field4"].astype(np.float64),
+    }, columns=_GBBQ_COLUMNS)
+
+
+def load_tdx_gbbq_df() -> pd.DataFrame:
+    """
+    解析 gbbq 文件，返回原始 DataFrame（向量化解密）。
+
+    输出字段：
+      - market
+      - symbol
+      - date
+      - category
+      - field1
+      - field2
+      - field3
+      - field4
+    """
+    path, total, payload = _read_gbbq_payload()
+
+    df = parse_gbbq_plain_records(decrypt_gbbq_records_np(payload, total))
+    if df.empty:
+        return pd.DataFrame(columns=_GBBQ_COLUMNS)
+
+    df = _finalize_gbbq_df(df)
+    _LOG.info("[TDX][GBBQ] parsed rows=%s file=%s", len(df), str(path))
+    return df
+
+
+def load_tdx_gbbq_df_reference() -> pd.DataFrame:
+    """
+    逐条纯 Python 解密的原实现（仅作向量化版本的等价性对照，业务路径不使用）。
+    """
+    path, total, payload = _read_gbbq_payload()
 
     rows: List[Dict[str, Any]] = []
 
@@ -406,15 +561,9 @@ def load_tdx_gbbq_df() -> pd.DataFrame:
         })
 
     if not rows:
-        return pd.DataFrame(columns=[
-            "market", "symbol", "date", "category", "field1", "field2", "field3", "field4"
-        ])
+        return pd.DataFrame(columns=_GBBQ_COLUMNS)
 
-    df = pd.DataFrame(rows)
-    df = df.drop_duplicates(
-        subset=["market", "symbol", "date", "category"],
-        keep="last",
-    ).sort_values(["market", "symbol", "date", "category"]).reset_index(drop=True)
+    df = _finalize_gbbq_df(pd.DataFrame(rows))
 
     _LOG.info("[TDX][GBBQ] parsed rows=%s file=%s", len(df), str(path))
     return df
@@ -41,14 +41,29 @@
 #   year  = encoded // 2048 + 2004
 #   month = (encoded % 2048) // 100
 #   day   = (encoded % 2048) % 100
+#
+# 本轮改动（向量化解析）：
+#   - 新增 decode_tdx_minute_bytes / load_tdx_minute_arrays：np.frombuffer 结构化 dtype 一次性解析，
+#     日期 / 时间编码以整数运算解码，按整数复合键 date * 1441 + minute 去重（后者胜）+ 排序
+#   - time 字符串只在需要时经查表生成（minute_codes_to_time_text），不再逐行格式化
+#   - load_tdx_minute_df 改为基于数组实现；原逐条实现保留为 load_tdx_minute_df_reference 作等价性对照
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 新增 plan_tdx_minute_chunks：按块扫描文件只读日期 / 时间编码，检查记录键是否非递减，
+#     并给出对齐到交易日边界的分块区间；非升序时返回 None（调用方回退整文件解析）
+#   - 新增 read_tdx_minute_range：读取 [start, end) 字节区间并向量化解码
+#
+# 本轮改动（清单回退到占位日）：
+#   - 新增 find_tdx_minute_day_start：自区间末尾向前只读日期编码，返回末尾连续不早于指定日期的记录段起点
 # ==============================
 
 from __future__ import annotations
 
 import struct
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backend.utils.logger import get_logger
@@ -61,6 +76,44 @@ _SUPPORTED_EXT_TO_FREQ = {
     ".lc5": "5m",
 }
 
+_MINUTE_COLUMNS = ["date", "time", "open", "high", "low", "close", "amount", "volume"]
+_MINUTE_VALUE_COLUMNS = ["open", "high", "low", "close", "amount", "volume"]
+
+_MINUTE_DTYPE = np.dtype([
+    ("date_code", "<u2"),
+    ("time_code", "<u2"),
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("reserved", "<u4"),
+])
+
+# 复合排序键的分钟基数：time_code 合法范围 0..1440（含 24:00），取 1441 保证相邻日期不碰撞
+_MINUTES_PER_KEY_DAY = 24 * 60 + 1
+
+
+def _build_date_code_table() -> np.ndarray:
+    """date_code（uint16 全域）-> YYYYMMDD 查表；非法编码为 -1。规则同 _decode_date_code。"""
+    codes = np.arange(1 << 16, dtype=np.int64)
+    year = codes // 2048 + 2004
+    remain = codes % 2048
+    month = remain // 100
+    day = remain % 100
+    ok = (year <= 2035) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    return np.where(ok, year * 10000 + month * 100 + day, -1)
+
+
+_DATE_CODE_TABLE = _build_date_code_table()
+
+# time_code -> "HH:MM" 查表（0..1440）
+_TIME_TEXT_TABLE = np.array(
+    [f"{v // 60:02d}:{v % 60:02d}" for v in range(24 * 60)] + ["24:00"],
+    dtype=object,
+)
+
 
 def _decode_date_code(encoded: int) -> Optional[int]:
     """
@@ -118,9 +171,244 @@ def _detect_freq_from_suffix(path: Path) -> str:
     return freq
 
 
+def minute_codes_to_time_text(minutes: np.ndarray) -> np.ndarray:
+    """将 time_code（从 00:00 起的分钟数）数组查表转换为 "HH:MM" 字符串数组（object dtype）。"""
+    return _TIME_TEXT_TABLE[np.asarray(minutes, dtype=np.int64)]
+
+
+def _empty_minute_arrays() -> Dict[str, np.ndarray]:
+    out = {
+        "date": np.empty(0, dtype=np.int64),
+        "minute": np.empty(0, dtype=np.int64),
+    }
+    for col in _MINUTE_VALUE_COLUMNS:
+        out[col] = np.empty(0, dtype=np.float64)
+    return out
+
+
+def decode_tdx_minute_bytes(raw: bytes, *, source: str = "") -> Dict[str, np.ndarray]:
+    """
+    向量化解码一段 TDX 32字节分钟记录（.lc1 / .lc5 / 分钟归档通用）。
+
+    Returns:
+        {
+          'date':   int64 YYYYMMDD,
+          'minute': int64 time_code（从 00:00 起的分钟数，K线区间结束时刻），
+          'open'/'high'/'low'/'close'/'amount'/'volume': float64
+        }
+        已按 (date, minute) 去重（后者胜）并升序
+
+    Raises:
+        ValueError: 长度非法 / 日期或时间编码非法（报首条非法记录）
+    """
+    if not raw:
+        return _empty_minute_arrays()
+
+    if len(raw) % _MINUTE_RECORD_SIZE != 0:
+        raise ValueError(
+            f"invalid minute file size: {source}, bytes={len(raw)}, "
+            f"not divisible by {_MINUTE_RECORD_SIZE}"
+        )
+
+    rec = np.frombuffer(raw, dtype=_MINUTE_DTYPE)
+
+    date_code = rec["date_code"]
+    dates = _DATE_CODE_TABLE[date_code]
+    bad_date = dates < 0
+
+    minutes = rec["time_code"].astype(np.int64)
+    bad_time = minutes > 24 * 60
+
+    bad = bad_date | bad_time
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        if bad_date[i]:
+            raise ValueError(f"invalid minute trade date code idx={i} code={int(date_code[i])} file={source}")
+        raise ValueError(f"invalid minute trade time code idx={i} code={int(minutes[i])} file={source}")
+
+    key = dates * _MINUTES_PER_KEY_DAY + minutes
+
+    # open..amount 五列为连续 float32，整体转置转换后每列都是连续数组
+    prices = np.frombuffer(raw, dtype="<f4").reshape(-1, 8)[:, 1:6].T.astype(np.float64)
+    volume = rec["volume"].astype(np.float64)
+
+    # 常见情况：记录严格递增，直接整列使用；否则逆序取首次出现位置实现“后者胜”，np.unique 顺带升序
+    if bool(np.all(key[1:] > key[:-1])):
+        idx = slice(None)
+    else:
+        _, first_in_rev = np.unique(key[::-1], return_index=True)
+        idx = (len(key) - 1) - first_in_rev
+
+    out = {
+        "date": dates[idx],
+        "minute": minutes[idx],
+    }
+    for j, col in enumerate(_MINUTE_VALUE_COLUMNS[:5]):
+        out[col] = prices[j][idx]
+    out["volume"] = volume[idx]
+    return out
+
+
+def load_tdx_minute_arrays(file_path: Path | str) -> Dict[str, np.ndarray]:
+    """
+    解析单个 .lc1 / .lc5 文件并返回列数组（不生成 time 字符串）。
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件格式非法
+    """
+    path = Path(file_path).resolve()
+
+    if not path.exists():
+        raise FileNotFoundError(f"minute file not found: {path}")
+
+    _detect_freq_from_suffix(path)
+    return decode_tdx_minute_bytes(path.read_bytes(), source=str(path))
+
+
+def plan_tdx_minute_chunks(
+    file_path: Path | str,
+    *,
+    start_offset: int = 0,
+    chunk_records: int = 65536,
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    规划 [start_offset, 文件末尾) 的分块读取区间（字节偏移，左闭右开）。
+
+    规则：
+      - 每块至少 chunk_records 条记录，切分点落在交易日第一条记录处（同一交易日不跨块）
+      - 逐块读取，峰值内存只与 chunk_records 有关
+
+    Returns:
+        [(start, end), ...]；记录键 (date_code, time_code) 出现逆序时返回 None
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件长度或 start_offset 非 32 字节整数倍
+    """
+    path = Path(file_path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"minute file not found: {path}")
+
+    size = int(path.stat().st_size)
+    start = int(start_offset)
+    if size % _MINUTE_RECORD_SIZE != 0:
+        raise ValueError(
+            f"invalid minute file size: {path}, bytes={size}, not divisible by {_MINUTE_RECORD_SIZE}"
+        )
+    if start < 0 or start > size or start % _MINUTE_RECORD_SIZE != 0:
+        raise ValueError(f"invalid minute chunk start offset: {path}, offset={start_offset}")
+
+    chunk_bytes = max(1, int(chunk_records)) * _MINUTE_RECORD_SIZE
+    key_dtype = np.dtype({"names": ["date_code", "time_code"], "formats": ["<u2", "<u2"], "itemsize": _MINUTE_RECORD_SIZE})
+
+    plan: List[Tuple[int, int]] = []
+    chunk_start = start
+    prev_key = -1
+    prev_date = -1
+    pos = start
+    with path.open("rb") as fh:
+        fh.seek(start)
+        while pos < size:
+            raw = fh.read(min(chunk_bytes, size - pos))
+            if not raw:
+                break
+            rec = np.frombuffer(raw, dtype=key_dtype)
+            dates = rec["date_code"].astype(np.int64)
+            key = dates * _MINUTES_PER_KEY_DAY + rec["time_code"].astype(np.int64)
+
+            if key[0] < prev_key or bool(np.any(key[1:] < key[:-1])):
+                return None
+            prev_key = int(key[-1])
+
+            # 本段内各交易日第一条记录的下标
+            starts = np.flatnonzero(np.diff(dates, prepend=prev_date) != 0)
+            prev_date = int(dates[-1])
+            for i in starts.tolist():
+                day_offset = pos + i * _MINUTE_RECORD_SIZE
+                if day_offset - chunk_start >= chunk_bytes:
+                    plan.append((chunk_start, day_offset))
+                    chunk_start = day_offset
+            pos += len(raw)
+
+    if chunk_start < size:
+        plan.append((chunk_start, size))
+    return plan
+
+
+def read_tdx_minute_range(file_path: Path | str, start: int, end: int) -> Dict[str, np.ndarray]:
+    """读取 [start, end) 字节区间并解码为列数组（同 decode_tdx_minute_bytes）。"""
+    path = Path(file_path).resolve()
+    with path.open("rb") as fh:
+        fh.seek(int(start))
+        raw = fh.read(int(end) - int(start))
+    return decode_tdx_minute_bytes(raw, source=f"{path}@{int(start)}")
+
+
+def find_tdx_minute_day_start(file_path: Path | str, *, start: int, end: int, date: int) -> int:
+    """
+    [start, end) 区间内，自 end 向前连续 date >= 指定日期的记录段起始字节偏移（只读日期编码）。
+
+    整个区间都不早于该日期时返回 start；非法日期编码视为更早的记录（在此停止）。
+    """
+    path = Path(file_path).resolve()
+    lo_bound = int(start)
+    pos = int(end)
+    window = 4096 * _MINUTE_RECORD_SIZE
+    with path.open("rb") as fh:
+        while pos > lo_bound:
+            lo = max(lo_bound, pos - window)
+            fh.seek(lo)
+            raw = fh.read(pos - lo)
+            if len(raw) != pos - lo or len(raw) % _MINUTE_RECORD_SIZE != 0:
+                raise ValueError(f"minute file range not readable: {path} [{lo}, {pos})")
+            dates = _DATE_CODE_TABLE[np.frombuffer(raw, dtype=_MINUTE_DTYPE)["date_code"]]
+            earlier = np.flatnonzero(dates < int(date))
+            if earlier.size:
+                return lo + (int(earlier[-1]) + 1) * _MINUTE_RECORD_SIZE
+            pos = lo
+    return lo_bound
+
+
+def minute_arrays_to_df(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """列数组 -> 原始分钟K线 DataFrame（此处才查表生成 time 字符串）。"""
+    if len(arrays["date"]) == 0:
+        return pd.DataFrame(columns=_MINUTE_COLUMNS)
+
+    data = {
+        "date": arrays["date"],
+        "time": minute_codes_to_time_text(arrays["minute"]),
+    }
+    for col in _MINUTE_VALUE_COLUMNS:
+        data[col] = arrays[col]
+    return pd.DataFrame(data, columns=_MINUTE_COLUMNS)
+
+
 def load_tdx_minute_df(file_path: Path | str) -> pd.DataFrame:
     """
-    解析单个 .lc1 / .lc5 文件并返回原始分钟K线 DataFrame。
+    解析单个 .lc1 / .lc5 文件并返回原始分钟K线 DataFrame（向量化实现）。
+
+    Args:
+        file_path: .lc1 / .lc5 文件路径
+
+    Returns:
+        DataFrame(columns=[
+            'date', 'time', 'open', 'high', 'low', 'close', 'amount', 'volume'
+        ])
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件格式非法
+    """
+    df = minute_arrays_to_df(load_tdx_minute_arrays(file_path))
+    if not df.empty:
+        _LOG.info("[TDX][MINUTE] parsed rows=%s file=%s", len(df), str(Path(file_path).resolve()))
+    return df
+
+
+def load_tdx_minute_df_reference(file_path: Path | str) -> pd.DataFrame:
+    """
+    逐条 struct 解析的原实现（仅作向量化版本的等价性对照，业务路径不使用）。
 
     Args:
         file_path: .lc1 / .lc5 文件路径
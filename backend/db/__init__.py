@@ -5,25 +5,65 @@
 # 本轮改动：
 #   - 新增 gbbq_events_raw 原始事件表操作导出
 #   - watchlist 正式升级为 (symbol, market) 双主键语义
+#   - 新增 get_read_conn（线程本地只读连接）导出
+#   - 新增 candles_day_packed（日线列式打包存储）读取/回填导出
+#   - 新增 candles_day_compact（日线紧凑整数存储）在线迁移导出
+#   - 新增日线批量装载 bulk_upsert_day_tuples 导出
+#   - 新增 select_candles_day_arrays（列数组读取）导出
+#   - 新增 series_summary（序列摘要）查询导出
+#   - 新增 gbbq 差异落库 / 因子失效标记 / 源文件指纹导出
+#   - 新增 select_candles_day_close_arrays / replace_factors_batch（全市场因子批量物化）导出
+#   - 新增 local_import_file_manifest（盘后导入增量读取清单）导出
+#   - 新增 get_symbol_index_version（symbol_index 进程内版本号）导出
+#   - 新增 local_import_scan_meta / local_import_scan_files（候选扫描快照）导出
 # ==============================
 
-from backend.db.connection import get_conn, close_all_connections
+from backend.db.connection import get_conn, get_read_conn, close_all_connections
 from backend.db.schema import init_schema, ensure_initialized
 
 from backend.db.candles import (
     upsert_candles_day_raw,
     select_candles_day_raw,
+    select_candles_day_arrays,
+    select_candles_day_close_arrays,
     get_latest_ts_from_day_raw,
 )
 
+from backend.db.candles_compact import migrate_day_bars_to_compact
+from backend.db.candles_bulk import bulk_upsert_day_tuples
+from backend.db.series_summary import (
+    get_series_summary,
+    get_series_version,
+    select_stale_series,
+)
+
+from backend.db.candles_packed import (
+    select_packed_day_arrays,
+    iter_packed_day_series,
+    rebuild_candles_day_packed,
+)
+
 from backend.db.factors import (
     upsert_factors,
+    replace_symbol_factors,
+    replace_factors_batch,
     select_factors,
     get_latest_factor_date,
+    is_factors_stale,
+    select_stale_factor_series,
+)
+from backend.db.file_fingerprints import get_file_fingerprint
+from backend.db.import_manifest import get_import_manifest, upsert_import_manifests
+from backend.db.import_scan_snapshot import (
+    select_import_scan_meta,
+    select_import_scan_files,
+    replace_import_scan_snapshot,
+    clear_import_scan_snapshot,
 )
 
 from backend.db.gbbq_events import (
     upsert_gbbq_events_raw,
+    apply_gbbq_events_diff,
     select_gbbq_events_raw,
     get_gbbq_events_row_count,
 )
@@ -31,6 +71,7 @@ from backend.db.gbbq_events import (
 from backend.db.symbols import (
     upsert_symbol_index,
     select_symbol_index,
+    get_symbol_index_version,
     get_listing_date,
     upsert_symbol_profile,
     select_symbol_profile,
@@ -61,24 +102,51 @@ from backend.db.data_task_status import (
 
 __all__ = [
     "get_conn",
+    "get_read_conn",
     "close_all_connections",
     "init_schema",
     "ensure_initialized",
 
     "upsert_candles_day_raw",
     "select_candles_day_raw",
+    "select_candles_day_arrays",
+    "select_candles_day_close_arrays",
     "get_latest_ts_from_day_raw",
 
+    "migrate_day_bars_to_compact",
+    "bulk_upsert_day_tuples",
+
+    "get_series_summary",
+    "get_series_version",
+    "select_stale_series",
+
+    "select_packed_day_arrays",
+    "iter_packed_day_series",
+    "rebuild_candles_day_packed",
+
     "upsert_factors",
+    "replace_symbol_factors",
+    "replace_factors_batch",
     "select_factors",
     "get_latest_factor_date",
+    "is_factors_stale",
+    "select_stale_factor_series",
+    "get_file_fingerprint",
+    "get_import_manifest",
+    "upsert_import_manifests",
+    "select_import_scan_meta",
+    "select_import_scan_files",
+    "replace_import_scan_snapshot",
+    "clear_import_scan_snapshot",
 
     "upsert_gbbq_events_raw",
+    "apply_gbbq_events_diff",
     "select_gbbq_events_raw",
     "get_gbbq_events_row_count",
 
     "upsert_symbol_index",
     "select_symbol_index",
+    "get_symbol_index_version",
     "get_listing_date",
     "upsert_symbol_profile",
     "select_symbol_profile",
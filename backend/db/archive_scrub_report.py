@@ -0,0 +1,183 @@
+# backend/db/archive_scrub_report.py
+# ==============================
+# 说明：分钟归档巡检报告表（minute_archive_scrub_report）
+#
+# 职责：
+#   - 每个 (market, symbol, freq) 归档文件保留最近一次巡检结果：
+#       * 结构：size / records / tail_fragment_bytes（尾部不足 32 字节的残片）
+#       * 记录：invalid_records（违反记录合法性规则）/ first_invalid_offset
+#       * 顺序：non_monotonic（相邻合法记录键不严格递增的次数）
+#       * 分钟桶：off_bucket（时间不在交易时段合法桶上）/ calendar_unknown（日期不在交易日历中）
+#       * 缺口：gap_count / gap_bars / gap_days 与前若干条缺口明细 gaps_json
+#       * status：ok / issues / error
+#   - 整轮巡检按范围（市场 × 频率）整体替换，已删除的归档不会残留旧结果
+#
+# 口径：
+#   - 本表只是巡检结果快照，不参与任何读写路径判断
+# ==============================
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+
+_COLUMNS = (
+    "market",
+    "symbol",
+    "freq",
+    "run_id",
+    "path",
+    "size",
+    "records",
+    "tail_fragment_bytes",
+    "invalid_records",
+    "first_invalid_offset",
+    "non_monotonic",
+    "off_bucket",
+    "calendar_unknown",
+    "gap_count",
+    "gap_bars",
+    "gap_days",
+    "first_date",
+    "first_time",
+    "last_date",
+    "last_time",
+    "gaps_json",
+    "status",
+    "error",
+    "elapsed_ms",
+    "scanned_at",
+)
+
+
+def ensure_archive_scrub_report_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS minute_archive_scrub_report (
+      market               TEXT NOT NULL,
+      symbol               TEXT NOT NULL,
+      freq                 TEXT NOT NULL,
+      run_id               TEXT NOT NULL,
+      path                 TEXT NOT NULL,
+      size                 INTEGER NOT NULL DEFAULT 0,
+      records              INTEGER NOT NULL DEFAULT 0,
+      tail_fragment_bytes  INTEGER NOT NULL DEFAULT 0,
+      invalid_records      INTEGER NOT NULL DEFAULT 0,
+      first_invalid_offset INTEGER,
+      non_monotonic        INTEGER NOT NULL DEFAULT 0,
+      off_bucket           INTEGER NOT NULL DEFAULT 0,
+      calendar_unknown     INTEGER NOT NULL DEFAULT 0,
+      gap_count            INTEGER NOT NULL DEFAULT 0,
+      gap_bars             INTEGER NOT NULL DEFAULT 0,
+      gap_days             INTEGER NOT NULL DEFAULT 0,
+      first_date           INTEGER,
+      first_time           TEXT,
+      last_date            INTEGER,
+      last_time            TEXT,
+      gaps_json            TEXT,
+      status               TEXT NOT NULL,
+      error                TEXT,
+      elapsed_ms           INTEGER NOT NULL DEFAULT 0,
+      scanned_at           TEXT NOT NULL,
+      PRIMARY KEY (market, symbol, freq)
+    ) WITHOUT ROWID;
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_minute_archive_scrub_report_status
+      ON minute_archive_scrub_report(status);
+    """)
+
+
+def _row_params(row: Dict[str, Any]) -> tuple:
+    out = []
+    for c in _COLUMNS:
+        v = row.get(c)
+        if c == "gaps_json" and v is not None and not isinstance(v, str):
+            v = json.dumps(v, ensure_ascii=False)
+        out.append(v)
+    return tuple(out)
+
+
+_INSERT_SQL = f"""
+INSERT OR REPLACE INTO minute_archive_scrub_report ({", ".join(_COLUMNS)})
+VALUES ({", ".join("?" for _ in _COLUMNS)});
+"""
+
+
+def replace_archive_scrub_report(
+    rows: List[Dict[str, Any]],
+    *,
+    markets: Iterable[str],
+    freqs: Iterable[str],
+) -> int:
+    """整轮巡检结果落库：先清空 markets × freqs 范围内的旧结果，再写入本轮全部行（单事务）。"""
+    ms = [str(m).upper() for m in markets]
+    fs = [str(f) for f in freqs]
+    params = [_row_params(r) for r in rows]
+
+    def _apply(cur) -> int:
+        cur.execute(
+            f"""
+            DELETE FROM minute_archive_scrub_report
+            WHERE market IN ({",".join("?" for _ in ms)}) AND freq IN ({",".join("?" for _ in fs)});
+            """,
+            (*ms, *fs),
+        )
+        if params:
+            cur.executemany(_INSERT_SQL, params)
+        return len(params)
+
+    return int(run_write(WriteFunc(_apply, label="minute_archive_scrub_report.replace")))
+
+
+def upsert_archive_scrub_report(rows: List[Dict[str, Any]]) -> int:
+    """单文件重扫（例如补缺后）覆盖对应行。"""
+    params = [_row_params(r) for r in rows]
+    if not params:
+        return 0
+
+    def _apply(cur) -> int:
+        cur.executemany(_INSERT_SQL, params)
+        return len(params)
+
+    return int(run_write(WriteFunc(_apply, label="minute_archive_scrub_report.upsert")))
+
+
+def select_archive_scrub_report(
+    *,
+    status: Optional[str] = None,
+    market: Optional[str] = None,
+    freq: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    where: List[str] = []
+    params: List[Any] = []
+    if status:
+        where.append("status=?")
+        params.append(str(status))
+    if market:
+        where.append("market=?")
+        params.append(str(market).upper())
+    if freq:
+        where.append("freq=?")
+        params.append(str(freq))
+
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT {", ".join(_COLUMNS)}
+        FROM minute_archive_scrub_report
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY market, symbol, freq;
+        """,
+        params,
+    )
+    out: List[Dict[str, Any]] = []
+    for row in cur.fetchall():
+        item = dict(row)
+        item["gaps"] = json.loads(item.pop("gaps_json") or "[]")
+        out.append(item)
+    return out
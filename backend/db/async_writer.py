@@ -5,44 +5,303 @@
 # 本轮改动：
 #   - symbol_profile 批量写入去除逐行 updated_at
 #   - 批量快照表同步时间统一由 data_task_status 承担
+#
+# 本轮改动（单写线程）：
+#   - 批量写入整体作为一条 WriteFunc 命令交给 writer_thread 提交
+#   - 本模块不再直接持有连接 commit/rollback
+#   - 日线写入复用 candles.apply_day_upsert（按存储模式写入并同步派生层）
+#
+# 本轮改动（类型化批次 + 字节预算背压 + 失败落盘）：
+#   - 生产者入口把记录一次性转换为固定列序元组，按主键去重（后写者胜），
+#     不再逐条 dict(rec) 深拷贝，也不再经过 asyncio.Queue 中转
+#   - 背压按“待写字节预算”计算：超出 settings.async_writer_max_queue_bytes 时生产者挂起等待
+#   - 提交失败不再清空丢弃：按指数退避重试，仍失败则整批落盘到 spill 目录；
+#     下次 start() 时先回放落盘批次，成功后删除文件
+#   - 日线改走 candles_bulk 暂存表合并路径
+#   - 新增 metrics_snapshot()：待写字节 / 行数、最近提交耗时、行/秒、重试与落盘计数
+#   - start() 之前的提交先暂存在内存批次中，启动后统一提交（与旧队列一样接受早到的写入）
+#   - 落盘本身失败的批次放回内存队列下轮重试（不丢弃），待写字节保持高位使生产者经背压挂起
+#
+# 本轮改动（因子批次按市场去重）：
+#   - 因子元组为 (market, symbol, date, qfq, hfq)，批次主键 (market, symbol, date)：
+#     同一标的多个日期不再互相覆盖
+#   - 回放旧版 4 字段因子落盘文件 (symbol, date, qfq, hfq)：按 factors 表迁移同一规则补 market
+#     （symbol_index 中唯一市场迁入；多市场丢弃并标记失效；查不到丢弃）
+#   - 落盘行宽度与批次定义不符时整文件保留待人工处理，不再在写入时才失败
 # ==============================
 
 from __future__ import annotations
 
 import asyncio
-from typing import Dict, List, Any
+import json
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
-
-from backend.db.connection import get_conn
-from backend.db.factors import compress_factor_records
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.db.candles_bulk import merge_day_tuples
+from backend.db.connection import get_read_conn
+from backend.db.factors import mark_factors_stale_rows
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.settings import settings
+from backend.utils.fileio import atomic_write_json
 from backend.utils.logger import get_logger
 
 _LOG = get_logger("async_writer")
 
+# 每个字段的估算内存字节（元组槽位 + 装箱对象），只用于背压预算
+_BYTES_PER_FIELD = 40
+
+
+# ==============================================================================
+# 类型化批次定义
+# ==============================================================================
+
+def _candle_row(rec: Dict[str, Any]) -> Tuple[Any, ...]:
+    amount = rec.get("amount")
+    volume = rec.get("volume")
+    return (
+        str(rec.get("market") or "").strip().upper(),
+        str(rec.get("symbol") or "").strip(),
+        int(rec["ts"]),
+        float(rec["open"]),
+        float(rec["high"]),
+        float(rec["low"]),
+        float(rec["close"]),
+        float(volume) if volume is not None else 0.0,
+        None if amount is None else float(amount),
+    )
+
+
+def _factor_row(rec: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        str(rec["market"]).strip().upper(),
+        rec["symbol"],
+        rec["date"],
+        rec.get("qfq_factor"),
+        rec.get("hfq_factor"),
+    )
+
+
+def _upgrade_legacy_factor_rows(rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """
+    旧版落盘因子行 (symbol, date, qfq, hfq) 补 market；已是 5 字段的行原样返回。
+
+    归属规则与 factors 表迁移一致：symbol_index 中唯一市场则迁入，多市场丢弃并标记失效，查不到丢弃。
+    """
+    legacy = [r for r in rows if len(r) == 4]
+    if not legacy:
+        return rows
+
+    symbols = sorted({str(r[0]) for r in legacy})
+    cur = get_read_conn().cursor()
+    markets_by_symbol: Dict[str, List[str]] = {}
+    for i in range(0, len(symbols), 500):
+        chunk = symbols[i:i + 500]
+        cur.execute(
+            f"SELECT DISTINCT symbol, market FROM symbol_index WHERE symbol IN ({','.join('?' * len(chunk))});",
+            chunk,
+        )
+        for sym, market in cur.fetchall():
+            markets_by_symbol.setdefault(str(sym), []).append(str(market).strip().upper())
+
+    out = [r for r in rows if len(r) != 4]
+    dropped = 0
+    for sym, date, q, h in legacy:
+        markets = markets_by_symbol.get(str(sym)) or []
+        if len(markets) == 1:
+            out.append((markets[0], sym, date, q, h))
+        else:
+            dropped += 1
+
+    ambiguous = [(m, sym) for sym, markets in markets_by_symbol.items() if len(markets) > 1 for m in markets]
+    if ambiguous:
+        run_write(WriteFunc(
+            lambda c: mark_factors_stale_rows(c, ambiguous, "market_migration"),
+            label="async_writer.factors_spill_upgrade",
+        ))
+    _LOG.warning(
+        f"[异步写入] 旧版因子落盘行已补 market: rows={len(legacy)} dropped={dropped} marked_stale={len(ambiguous)}"
+    )
+    return out
+
+
+def _profile_row(rec: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        rec.get("symbol"),
+        str(rec.get("market") or "").strip().upper(),
+        rec.get("float_shares"),
+        rec.get("float_value"),
+        rec.get("industry"),
+        rec.get("region"),
+        rec.get("concepts"),
+    )
+
+
+def _write_candles(cur, rows: List[Tuple[Any, ...]]) -> None:
+    merge_day_tuples(cur, rows)
+
+
+def _compress_factor_rows(rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """
+    与 factors.compress_factor_records 同规则（元组版）：
+      - 按 (market, symbol) 分组、date 升序
+      - 每组第一条保留，之后仅当 (qfq, hfq) 变化时保留
+    """
+    out: List[Tuple[Any, ...]] = []
+    last_key: Any = object()
+    last_q: Any = object()
+    last_h: Any = object()
+    for row in sorted(rows, key=lambda r: (str(r[0]), str(r[1]), r[2])):
+        market, sym, _, q, h = row
+        if (market, sym) != last_key:
+            last_key, last_q, last_h = (market, sym), object(), object()
+        if q != last_q or h != last_h:
+            out.append(row)
+            last_q, last_h = q, h
+    return out
+
+
+_UPSERT_FACTORS_SQL = """
+INSERT INTO adj_factors (market, symbol, date, qfq_factor, hfq_factor, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(market, symbol, date) DO UPDATE SET
+    qfq_factor=excluded.qfq_factor,
+    hfq_factor=excluded.hfq_factor,
+    updated_at=excluded.updated_at;
+"""
+
+
+def _write_factors(cur, rows: List[Tuple[Any, ...]]) -> None:
+    compressed = _compress_factor_rows(rows)
+    if not compressed:
+        _LOG.debug("[批量写入] 因子：压缩后无有效记录，跳过写入")
+        return
+    now = datetime.now().isoformat()
+    cur.executemany(_UPSERT_FACTORS_SQL, [r + (now,) for r in compressed])
+
+
+_UPSERT_PROFILE_SQL = """
+INSERT INTO symbol_profile (
+    symbol,
+    market,
+    float_shares,
+    float_value,
+    industry,
+    region,
+    concepts
+)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol, market) DO UPDATE SET
+    float_shares=COALESCE(excluded.float_shares, symbol_profile.float_shares),
+    float_value=COALESCE(excluded.float_value, symbol_profile.float_value),
+    industry=COALESCE(excluded.industry, symbol_profile.industry),
+    region=COALESCE(excluded.region, symbol_profile.region),
+    concepts=COALESCE(excluded.concepts, symbol_profile.concepts);
+"""
+
+
+def _write_profiles(cur, rows: List[Tuple[Any, ...]]) -> None:
+    cur.executemany(_UPSERT_PROFILE_SQL, rows)
+
+
+@dataclass(frozen=True)
+class _BatchSpec:
+    kind: str
+    width: int
+    key_len: int
+    to_row: Callable[[Dict[str, Any]], Tuple[Any, ...]]
+    write: Callable[[Any, List[Tuple[Any, ...]]], None]
+
+
+# 写入顺序即提交内的执行顺序；key_len 为元组前缀主键长度
+_SPECS: Tuple[_BatchSpec, ...] = (
+    _BatchSpec("candles", 9, 3, _candle_row, _write_candles),
+    _BatchSpec("factors", 5, 3, _factor_row, _write_factors),
+    _BatchSpec("profile", 7, 2, _profile_row, _write_profiles),
+)
+_SPEC_BY_KIND: Dict[str, _BatchSpec] = {s.kind: s for s in _SPECS}
+
+
+class _TypedBatch:
+    """单类表的待写批次：主键 -> 固定列序元组（后写者胜）。"""
+
+    __slots__ = ("spec", "rows", "nbytes")
+
+    def __init__(self, spec: _BatchSpec):
+        self.spec = spec
+        self.rows: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+        self.nbytes = 0
+
+    def add_rows(self, rows: Iterable[Tuple[Any, ...]]) -> int:
+        """返回新增的估算字节（覆盖已有主键不重复计费）。"""
+        added = 0
+        per_row = self.spec.width * _BYTES_PER_FIELD
+        k = self.spec.key_len
+        for row in rows:
+            key = row[:k]
+            if key not in self.rows:
+                added += per_row
+            self.rows[key] = row
+        self.nbytes += added
+        return added
+
+    def add_missing(self, rows: Dict[Tuple[Any, ...], Tuple[Any, ...]]) -> int:
+        """回填失败批次：只补当前批次中还没有的主键（期间新写入的同主键记录更新，保留新值）。"""
+        return self.add_rows(row for key, row in rows.items() if key not in self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+# ==============================================================================
+# 写入器
+# ==============================================================================
 
 class AsyncDBWriter:
-    """异步数据库写入队列"""
+    """异步数据库写入队列（类型化批次 + 字节预算背压 + 重试/落盘）"""
 
     def __init__(self):
-        self.queue = asyncio.Queue(maxsize=1000)
         self.running = False
-        self._task = None
-
-        self.candles_buffer: List[Dict[str, Any]] = []
-        self.factors_buffer: List[Dict[str, Any]] = []
-        self.profiles_buffer: List[Dict[str, Any]] = []
-
-        self.BATCH_SIZE = 500
-        self.FLUSH_INTERVAL = 0.5
-
-        self.last_flush_time = 0
-
+        self._task: Optional[asyncio.Task] = None
+        self._cond: Optional[asyncio.Condition] = None
+
+        self._batches: Dict[str, _TypedBatch] = {s.kind: _TypedBatch(s) for s in _SPECS}
+        self._queued_bytes = 0
+        self._inflight_bytes = 0
+        self._flush_waiters: List[asyncio.Future] = []
+
+        self.last_flush_time = 0.0
+
+        # 指标
+        self.flushes_total = 0
+        self.rows_written_total = 0
+        self.retries_total = 0
+        self.spilled_batches_total = 0
+        self.spilled_rows_total = 0
+        self.spill_failures_total = 0
+        self.replayed_rows_total = 0
+        self.last_flush_latency_ms: Optional[int] = None
+        self.rows_per_second: float = 0.0
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
     async def start(self):
         if self.running:
             _LOG.warning("[异步写入] 队列已在运行")
             return
 
+        self._cond = asyncio.Condition()
         self.running = True
+
+        try:
+            await asyncio.to_thread(self._replay_spills)
+        except Exception as e:
+            _LOG.error(f"[异步写入] 落盘批次回放失败: {e}", exc_info=True)
+
         self._task = asyncio.create_task(self._write_loop())
         _LOG.info("[异步写入] 队列已启动")
 
@@ -53,11 +312,7 @@ class AsyncDBWriter:
         _LOG.info("[异步写入] 正在关闭，刷新剩余数据...")
 
         self.running = False
-
-        try:
-            await self._flush_all()
-        except Exception as e:
-            _LOG.error(f"[异步写入] 关闭时刷新失败: {e}")
+        await self._notify()
 
         if self._task:
             try:
@@ -65,264 +320,300 @@ class AsyncDBWriter:
             except asyncio.TimeoutError:
                 _LOG.warning("[异步写入] 关闭超时，强制终止")
 
+        # 兜底：循环退出后仍有残留（含超时场景）直接落盘，保证不丢
+        if self._has_pending():
+            batches = self._take_batches()
+            failed = await asyncio.to_thread(self._spill, batches, "shutdown")
+            if failed:
+                self._requeue(failed)
+                _LOG.error(
+                    f"[异步写入] 关闭时落盘失败，数据仅保留在内存中 rows={sum(len(b) for b in failed)} "
+                    f"kinds={[b.spec.kind for b in failed]}"
+                )
+
         _LOG.info("[异步写入] 已安全关闭")
 
+    # ------------------------------------------------------------------
+    # 生产者入口
+    # ------------------------------------------------------------------
     async def write_candles(self, records: List[Dict[str, Any]]):
-        if not records:
-            return
+        await self._enqueue("candles", records)
 
-        if self.queue.qsize() > 900:
-            _LOG.warning(
-                f"[异步写入] 队列接近饱和 ({self.queue.qsize()}/1000)，等待刷新..."
-            )
-            await asyncio.sleep(0.1)
+    async def write_factors(self, records: List[Dict[str, Any]]):
+        await self._enqueue("factors", records)
 
-        await self.queue.put(('candles', records))
+    async def write_profile(self, records: List[Dict[str, Any]] | Dict[str, Any]):
+        if isinstance(records, dict):
+            records = [records]
+        await self._enqueue("profile", records)
 
-    async def write_factors(self, records: List[Dict[str, Any]]):
-        if not records:
+    async def flush(self):
+        """等待当前全部待写数据提交（或落盘）完成。"""
+        if not self.running or not self._has_pending():
             return
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._flush_waiters.append(fut)
+        await self._notify()
+        await fut
 
-        await self.queue.put(("factors", records))
-
-    async def write_profile(self, records: List[Dict[str, Any]] | Dict[str, Any]):
+    async def _enqueue(self, kind: str, records: Iterable[Dict[str, Any]]) -> None:
         if not records:
             return
+        spec = _SPEC_BY_KIND[kind]
+        rows = [spec.to_row(r) for r in records]
+        if not rows:
+            return
 
-        if isinstance(records, dict):
-            payload = [records]
-        else:
-            payload = list(records or [])
+        need = len(rows) * spec.width * _BYTES_PER_FIELD
+        budget = int(settings.async_writer_max_queue_bytes)
 
-        if not payload:
+        cond = self._cond
+        if cond is None:
+            # start() 之前的提交先暂存，启动后由写循环统一提交（启动前没有消费者，不做预算等待）
+            self._queued_bytes += self._batches[kind].add_rows(rows)
             return
 
-        await self.queue.put(("profile", payload))
+        async with cond:
+            # 预算不足时挂起；单次超大写入在队列清空后放行，避免永久阻塞
+            while (
+                self.running
+                and self._queued_bytes + self._inflight_bytes > 0
+                and self._queued_bytes + self._inflight_bytes + need > budget
+            ):
+                await cond.wait()
+
+            self._queued_bytes += self._batches[kind].add_rows(rows)
+            cond.notify_all()
+
+    async def _notify(self) -> None:
+        cond = self._cond
+        if cond is None:
+            return
+        async with cond:
+            cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # 主循环
+    # ------------------------------------------------------------------
+    def _has_pending(self) -> bool:
+        return any(len(b) for b in self._batches.values())
+
+    def _pending_rows(self) -> int:
+        return sum(len(b) for b in self._batches.values())
+
+    def _take_batches(self) -> List[_TypedBatch]:
+        taken = [b for b in self._batches.values() if len(b)]
+        self._batches = {s.kind: _TypedBatch(s) for s in _SPECS}
+        moved = sum(b.nbytes for b in taken)
+        self._queued_bytes -= moved
+        self._inflight_bytes += moved
+        return taken
 
     async def _write_loop(self):
-        loop = asyncio.get_event_loop()
-        while self.running:
-            try:
-                try:
-                    table, payload = await asyncio.wait_for(
-                        self.queue.get(),
-                        timeout=0.1
-                    )
+        loop = asyncio.get_running_loop()
+        interval = float(settings.async_writer_flush_interval_ms) / 1000.0
+        batch_rows = int(settings.async_writer_batch_rows)
+        cond = self._cond
 
-                    if table == '__flush__':
-                        future = payload
+        while self.running or self._has_pending():
+            try:
+                async with cond:
+                    if self.running and not self._flush_waiters and self._pending_rows() < batch_rows:
                         try:
-                            await self._flush_all()
-                        finally:
-                            if future is not None and not future.done():
-                                future.set_result(True)
-                        continue
-
-                    records = payload
-
-                    if table == 'candles':
-                        self.candles_buffer.extend(records)
-                    elif table == 'factors':
-                        self.factors_buffer.extend(records)
-                    elif table == 'profile':
-                        self.profiles_buffer.extend(records)
-
-                except asyncio.TimeoutError:
-                    pass
+                            await asyncio.wait_for(cond.wait(), timeout=interval)
+                        except asyncio.TimeoutError:
+                            pass
 
                 now = loop.time()
-                should_flush = (
-                    len(self.candles_buffer) >= self.BATCH_SIZE or
-                    len(self.factors_buffer) >= self.BATCH_SIZE or
-                    len(self.profiles_buffer) >= self.BATCH_SIZE or
-                    (now - self.last_flush_time) >= self.FLUSH_INTERVAL
+                should_flush = self._has_pending() and (
+                    not self.running
+                    or bool(self._flush_waiters)
+                    or self._pending_rows() >= batch_rows
+                    or (now - self.last_flush_time) >= interval
                 )
 
-                if should_flush and (
-                    self.candles_buffer or self.factors_buffer or self.profiles_buffer
-                ):
+                if should_flush:
                     await self._flush_all()
                     self.last_flush_time = now
 
+                if self._flush_waiters and not self._has_pending():
+                    waiters, self._flush_waiters = self._flush_waiters, []
+                    for fut in waiters:
+                        if not fut.done():
+                            fut.set_result(True)
+
             except Exception as e:
                 _LOG.error(f"[异步写入] 循环异常: {e}", exc_info=True)
                 await asyncio.sleep(0.1)
 
     async def _flush_all(self):
-        if not (self.candles_buffer or self.factors_buffer or self.profiles_buffer):
+        batches = self._take_batches()
+        if not batches:
             return
 
-        candles_count = len(self.candles_buffer)
-        factors_count = len(self.factors_buffer)
-        profiles_count = len(self.profiles_buffer)
+        nbytes = sum(b.nbytes for b in batches)
+        counts = {b.spec.kind: len(b) for b in batches}
 
         try:
-            await asyncio.to_thread(self._do_batch_write)
-
-            _LOG.info(
-                f"[批量写入] 成功: "
-                f"日线={candles_count}, "
-                f"因子={factors_count}, "
-                f"档案={profiles_count}"
-            )
-
-        except Exception as e:
-            _LOG.error(f"[批量写入] 失败: {e}", exc_info=True)
-            self.candles_buffer.clear()
-            self.factors_buffer.clear()
-            self.profiles_buffer.clear()
-
-    async def flush(self):
-        if not self.running:
-            return
-
-        loop = asyncio.get_running_loop()
-        fut: asyncio.Future = loop.create_future()
-        await self.queue.put(('__flush__', fut))
-        await fut
-
-    def _do_batch_write(self):
-        conn = get_conn()
-        cur = conn.cursor()
-
-        try:
-            if self.candles_buffer:
-                unique_candles: Dict[tuple, Dict[str, Any]] = {}
-                for rec in self.candles_buffer:
-                    r = dict(rec)
-
-                    market = str(r.get("market") or "").strip().upper()
-                    symbol = str(r.get("symbol") or "").strip()
-                    ts = r.get("ts")
-
-                    key = (market, symbol, ts)
-                    r["market"] = market
-                    r["symbol"] = symbol
-                    unique_candles[key] = r
-
-                candles_list = list(unique_candles.values())
-
-                sql_k = """
-                INSERT INTO candles_day_raw (
-                    market, symbol, ts,
-                    open, high, low, close,
-                    volume, amount
-                )
-                VALUES (
-                    :market, :symbol, :ts,
-                    :open, :high, :low, :close,
-                    :volume, :amount
-                )
-                ON CONFLICT(market, symbol, ts) DO UPDATE SET
-                    open=excluded.open,
-                    high=excluded.high,
-                    low=excluded.low,
-                    close=excluded.close,
-                    volume=excluded.volume,
-                    amount=excluded.amount;
-                """
-
-                cur.executemany(sql_k, candles_list)
-
-                _LOG.debug(
-                    f"[批量写入] 日线: {len(candles_list)} 条 "
-                    f"(去重前={len(self.candles_buffer)})"
-                )
-
-            if self.factors_buffer:
-                unique_factors: Dict[tuple, Dict[str, Any]] = {}
-                for rec in self.factors_buffer:
-                    key = (rec['symbol'], rec['date'])
-                    unique_factors[key] = rec
-
-                factor_list = list(unique_factors.values())
-                compressed_list = compress_factor_records(factor_list)
-
-                if compressed_list:
-                    now = datetime.now().isoformat()
-                    for rec in compressed_list:
-                        rec["updated_at"] = now
-
-                    sql_f = """
-                    INSERT INTO adj_factors (symbol, date, qfq_factor, hfq_factor, updated_at)
-                    VALUES (:symbol, :date, :qfq_factor, :hfq_factor, :updated_at)
-                    ON CONFLICT(symbol, date) DO UPDATE SET
-                        qfq_factor=excluded.qfq_factor,
-                        hfq_factor=excluded.hfq_factor,
-                        updated_at=excluded.updated_at;
-                    """
-
-                    cur.executemany(sql_f, compressed_list)
-
-                    _LOG.debug(
-                        f"[批量写入] 因子: {len(compressed_list)} 条 "
-                        f"(原始={len(self.factors_buffer)}, 去重后={len(factor_list)})"
+            ok = await asyncio.to_thread(self._write_with_retry, batches)
+            if ok:
+                _LOG.info(f"[批量写入] 成功: {counts}")
+            else:
+                # 合并提交重试耗尽：按表拆开单独提交一次，只落盘仍失败的那一类，
+                # 避免一类坏数据连带其它表一起滞留
+                failed = []
+                for b in batches:
+                    if len(batches) == 1 or not await asyncio.to_thread(self._write_with_retry, [b], 0):
+                        failed.append(b)
+                if failed:
+                    unspilled = await asyncio.to_thread(self._spill, failed, "write_failed")
+                    _LOG.error(
+                        f"[批量写入] 重试耗尽，已落盘 rows={sum(len(b) for b in failed) - sum(len(b) for b in unspilled)} "
+                        f"kinds={[b.spec.kind for b in failed]} batch={counts}"
                     )
-                else:
-                    _LOG.debug("[批量写入] 因子：压缩后无有效记录，跳过写入")
-
-            if self.profiles_buffer:
-                unique_profiles: Dict[tuple, Dict[str, Any]] = {}
-
-                for rec in self.profiles_buffer:
-                    r = dict(rec)
-                    market = str(r.get("market") or "").strip().upper()
-                    key = (r.get("symbol"), market)
-                    r["market"] = market
-                    unique_profiles[key] = r
-
-                profiles_list = list(unique_profiles.values())
-
-                sql_p = """
-                INSERT INTO symbol_profile (
-                    symbol,
-                    market,
-                    float_shares,
-                    float_value,
-                    industry,
-                    region,
-                    concepts
-                )
-                VALUES (
-                    :symbol,
-                    :market,
-                    :float_shares,
-                    :float_value,
-                    :industry,
-                    :region,
-                    :concepts
-                )
-                ON CONFLICT(symbol, market) DO UPDATE SET
-                    float_shares=COALESCE(excluded.float_shares, symbol_profile.float_shares),
-                    float_value=COALESCE(excluded.float_value, symbol_profile.float_value),
-                    industry=COALESCE(excluded.industry, symbol_profile.industry),
-                    region=COALESCE(excluded.region, symbol_profile.region),
-                    concepts=COALESCE(excluded.concepts, symbol_profile.concepts);
-                """
-
-                cur.executemany(sql_p, profiles_list)
-
-                _LOG.debug(
-                    f"[批量写入] 档案: {len(profiles_list)} 条 "
-                    f"(去重前={len(self.profiles_buffer)})"
+                    if unspilled:
+                        # 落盘也失败：放回内存队列下轮重试；待写字节随之保持高位，生产者经预算背压挂起
+                        self._requeue(unspilled)
+                        _LOG.error(
+                            f"[批量写入] 落盘失败，批次已放回内存队列 rows={sum(len(b) for b in unspilled)} "
+                            f"kinds={[b.spec.kind for b in unspilled]}"
+                        )
+        finally:
+            self._inflight_bytes -= nbytes
+            await self._notify()
+
+    # ------------------------------------------------------------------
+    # 同步写入（线程中执行）
+    # ------------------------------------------------------------------
+    def _apply_batches(self, batches: List[_TypedBatch]) -> int:
+        payload = [(b.spec, list(b.rows.values())) for b in batches]
+
+        def _apply(cur) -> int:
+            n = 0
+            for spec, rows in payload:
+                spec.write(cur, rows)
+                n += len(rows)
+            return n
+
+        return int(run_write(WriteFunc(_apply, label="async_writer.batch")) or 0)
+
+    def _write_with_retry(self, batches: List[_TypedBatch], max_retries: Optional[int] = None) -> bool:
+        retries = settings.async_writer_max_retries if max_retries is None else max_retries
+        attempts = 1 + int(retries)
+        delay = 0.1
+        for attempt in range(1, attempts + 1):
+            t0 = time.perf_counter()
+            try:
+                n = self._apply_batches(batches)
+            except Exception as e:
+                _LOG.error(f"[批量写入] 事务失败 attempt={attempt}/{attempts}: {e}")
+                if attempt < attempts:
+                    self.retries_total += 1
+                    time.sleep(delay)
+                    delay = min(delay * 4, 5.0)
+                continue
+
+            elapsed = max(time.perf_counter() - t0, 1e-6)
+            self.flushes_total += 1
+            self.rows_written_total += n
+            self.last_flush_latency_ms = int(elapsed * 1000)
+            rate = n / elapsed
+            self.rows_per_second = rate if self.rows_per_second <= 0 else 0.8 * self.rows_per_second + 0.2 * rate
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # 落盘与回放
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _spill_dir() -> Path:
+        return Path(settings.async_writer_spill_dir).resolve()
+
+    def _requeue(self, batches: List[_TypedBatch]) -> None:
+        for b in batches:
+            self._queued_bytes += self._batches[b.spec.kind].add_missing(b.rows)
+
+    def _spill(self, batches: List[_TypedBatch], reason: str) -> List[_TypedBatch]:
+        """逐批落盘；返回落盘失败的批次（调用方负责放回内存，不得丢弃）。"""
+        d = self._spill_dir()
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        failed: List[_TypedBatch] = []
+        for b in batches:
+            path = d / f"{stamp}-{b.spec.kind}-{uuid.uuid4().hex[:8]}.json"
+            try:
+                atomic_write_json(
+                    path,
+                    {
+                        "kind": b.spec.kind,
+                        "reason": reason,
+                        "created_at": datetime.now().isoformat(),
+                        "rows": [list(r) for r in b.rows.values()],
+                    },
+                    indent=0,
+                    rotate_backup=False,
                 )
-
-            conn.commit()
-
-            self.candles_buffer.clear()
-            self.factors_buffer.clear()
-            self.profiles_buffer.clear()
-
-        except Exception as e:
-            conn.rollback()
-
-            _LOG.error(f"[批量写入] 事务失败: {e}", exc_info=True)
-
-            self.candles_buffer.clear()
-            self.factors_buffer.clear()
-            self.profiles_buffer.clear()
-
-            raise
+            except Exception as e:
+                self.spill_failures_total += 1
+                failed.append(b)
+                _LOG.error(f"[异步写入] 批次落盘失败 kind={b.spec.kind} rows={len(b)} path={path} err={e}")
+                continue
+            self.spilled_batches_total += 1
+            self.spilled_rows_total += len(b)
+            _LOG.warning(f"[异步写入] 批次已落盘 kind={b.spec.kind} rows={len(b)} path={path}")
+        return failed
+
+    def _replay_spills(self) -> None:
+        d = self._spill_dir()
+        if not d.is_dir():
+            return
+        for path in sorted(d.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    obj = json.load(f)
+                spec = _SPEC_BY_KIND[str(obj.get("kind"))]
+                rows = [tuple(r) for r in (obj.get("rows") or [])]
+                if spec.kind == "factors":
+                    rows = _upgrade_legacy_factor_rows(rows)
+                bad = sum(1 for r in rows if len(r) != spec.width)
+                if bad:
+                    raise ValueError(f"{bad} rows do not match width={spec.width}")
+                batch = _TypedBatch(spec)
+                batch.add_rows(rows)
+            except Exception as e:
+                _LOG.error(f"[异步写入] 落盘文件无法解析，保留待人工处理 path={path} err={e}")
+                continue
+
+            if len(batch) and not self._write_with_retry([batch]):
+                _LOG.error(f"[异步写入] 落盘批次回放失败，保留 path={path}")
+                continue
+
+            self.replayed_rows_total += len(batch)
+            path.unlink(missing_ok=True)
+            _LOG.info(f"[异步写入] 落盘批次回放成功 kind={spec.kind} rows={len(batch)} path={path}")
+
+    # ------------------------------------------------------------------
+    # 指标
+    # ------------------------------------------------------------------
+    @property
+    def queue_size(self) -> int:
+        """待写行数（兼容旧 queue.qsize() 指标位）。"""
+        return self._pending_rows()
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        return {
+            "queued_rows": self._pending_rows(),
+            "queued_bytes": self._queued_bytes,
+            "inflight_bytes": self._inflight_bytes,
+            "flushes_total": self.flushes_total,
+            "rows_written_total": self.rows_written_total,
+            "last_flush_latency_ms": self.last_flush_latency_ms,
+            "rows_per_second": int(self.rows_per_second),
+            "retries_total": self.retries_total,
+            "spilled_batches_total": self.spilled_batches_total,
+            "spilled_rows_total": self.spilled_rows_total,
+            "spill_failures_total": self.spill_failures_total,
+            "replayed_rows_total": self.replayed_rows_total,
+        }
 
 
 _writer: AsyncDBWriter = None
@@ -1,16 +1,20 @@
 # backend/db/calendar.py
 # ==============================
 # 交易日历表操作模块（完整自然日历语义版）
+#
+# 本轮改动：
+#   - 写入经由 writer_thread 单写线程提交
 # ==============================
 
 from __future__ import annotations
 from typing import List, Dict, Any
 
-from backend.db.connection import get_conn, get_write_lock
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecuteMany, run_write
 
 
 def upsert_trade_calendar(records: List[Dict[str, Any]]) -> int:
-    """批量插入或更新完整自然日历（串行写锁保护）"""
+    """批量插入或更新完整自然日历（单写线程串行提交）"""
     if not records:
         return 0
 
@@ -26,17 +30,12 @@ def upsert_trade_calendar(records: List[Dict[str, Any]]) -> int:
         is_trading_day=excluded.is_trading_day;
     """
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.executemany(sql, records)
-        conn.commit()
-        return cur.rowcount
+    return run_write(SqlExecuteMany(sql, records, label="trade_calendar.upsert"))
 
 
 def is_trading_day(date_ymd: int, market: str = 'CN') -> bool:
     """判断指定日期是否为交易日"""
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT is_trading_day FROM trade_calendar WHERE date=? AND market=?;",
@@ -48,7 +47,7 @@ def is_trading_day(date_ymd: int, market: str = 'CN') -> bool:
 
 def get_recent_trading_days(n: int = 10, market: str = 'CN') -> List[int]:
     """获取最近N个交易日"""
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -65,7 +64,7 @@ def get_recent_trading_days(n: int = 10, market: str = 'CN') -> List[int]:
 
 def select_trading_days_in_range(start_ymd: int, end_ymd: int, market: str = 'CN') -> List[int]:
     """查询指定日期范围内的所有交易日"""
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
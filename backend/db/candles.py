@@ -13,12 +13,123 @@
 # 设计原则：
 #   - 该表只存原始不复权日线真相源
 #   - 分钟线后续不再进入该表
+#
+# 本轮改动（单写线程）：
+#   - 写入不再直接提交，统一经由 writer_thread 合并事务
+#
+# 本轮改动（日线列式打包存储）：
+#   - 新增 apply_day_rows_written 同步钩子：
+#       * 开启 day_bars_packed_store_enabled 时，同一事务内重建受影响年份的打包行
+#   - 所有写 candles_day_raw 的路径（含 AsyncDBWriter）都必须调用该钩子
+#
+# 本轮改动（紧凑整数存储）：
+#   - 读写按 settings.day_bars_storage_schema 分派到 candles_day_raw / candles_day_compact
+#   - 新增 apply_day_upsert：writer 事务内的统一日线写入入口（AsyncDBWriter 复用）
+#   - 对外函数名与返回形状保持不变
+#
+# 本轮改动（数组化读取）：
+#   - 新增 select_candles_day_arrays：直接返回 numpy 列数组，供整段历史加载使用
+#
+# 本轮改动（序列摘要）：
+#   - apply_day_rows_written 在同一事务内刷新受影响标的的 series_summary（1d）：
+#     写入前 count_new_day_rows 点查本批键，写入后增量更新，不再对整段历史 COUNT/MIN/MAX
+#   - get_latest_ts_from_day_raw 优先读摘要（O(1)），无摘要再回退 MAX(ts)
+#
+# 本轮改动（批量复权因子）：
+#   - 新增 select_candles_day_close_arrays：一批标的收盘价列数组（全市场因子批量计算使用）
 # ==============================
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+import sqlite3
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from backend.db.connection import get_read_conn
+from backend.db.candles_compact import (
+    is_compact_schema_active,
+    mirror_raw_keys_to_compact,
+    select_day_arrays,
+    select_day_close_arrays,
+    select_day_latest_ts,
+    select_day_rows,
+    upsert_compact_records,
+)
+from backend.db.candles_packed import is_packed_store_enabled, sync_packed_for_keys
+from backend.db.series_summary import (
+    DaySummaryDelta,
+    apply_day_summary_deltas,
+    count_new_day_rows,
+    get_series_summary,
+    refresh_day_series_summary,
+)
+from backend.db.writer_thread import WriteFunc, run_write
+
+
+UPSERT_CANDLES_DAY_RAW_SQL = """
+INSERT INTO candles_day_raw (
+    market, symbol, ts,
+    open, high, low, close,
+    volume, amount
+)
+VALUES (
+    :market, :symbol, :ts,
+    :open, :high, :low, :close,
+    :volume, :amount
+)
+ON CONFLICT(market, symbol, ts) DO UPDATE SET
+    open=excluded.open,
+    high=excluded.high,
+    low=excluded.low,
+    close=excluded.close,
+    volume=excluded.volume,
+    amount=excluded.amount;
+"""
+
 
-from backend.db.connection import get_conn
+def apply_day_rows_written(
+    cur: sqlite3.Cursor,
+    keys: Iterable[Tuple[str, str, int]],
+    summary_deltas: Optional[Dict[Tuple[str, str], DaySummaryDelta]] = None,
+) -> None:
+    """
+    candles_day_raw 写入后的派生层同步钩子（必须在同一写事务内调用）。
+
+    Args:
+        cur: writer_thread 事务内游标
+        keys: 本次写入涉及的 (market, symbol, ts)
+        summary_deltas: 写入前 count_new_day_rows 的结果；缺省时按生效表重算受影响标的的摘要
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    mirror_raw_keys_to_compact(cur, keys)
+    if is_packed_store_enabled():
+        sync_packed_for_keys(cur, keys)
+    if summary_deltas is not None:
+        apply_day_summary_deltas(cur, summary_deltas)
+    else:
+        refresh_day_series_summary(cur, sorted({(m, s) for m, s, _ in keys}))
+
+
+def apply_day_upsert(cur: sqlite3.Cursor, prepared: List[Dict[str, Any]]) -> int:
+    """
+    writer 事务内的统一日线写入：按存储模式写入生效表，并同步派生层。
+
+    Args:
+        prepared: 已校验的 candles_day_raw 形状记录（market/symbol 已规范化）
+    """
+    if not prepared:
+        return 0
+    keys = [(r["market"], r["symbol"], int(r["ts"])) for r in prepared]
+    deltas = count_new_day_rows(cur, keys)
+    if is_compact_schema_active():
+        affected = upsert_compact_records(cur, prepared)
+    else:
+        cur.executemany(UPSERT_CANDLES_DAY_RAW_SQL, prepared)
+        affected = int(cur.rowcount or 0)
+    apply_day_rows_written(cur, keys, summary_deltas=deltas)
+    return affected
 
 
 def upsert_candles_day_raw(records: List[Dict[str, Any]]) -> int:
@@ -38,9 +149,6 @@ def upsert_candles_day_raw(records: List[Dict[str, Any]]) -> int:
     if not records:
         return 0
 
-    conn = get_conn()
-    cur = conn.cursor()
-
     prepared: List[Dict[str, Any]] = []
     for rec in records:
         r = dict(rec)
@@ -59,29 +167,7 @@ def upsert_candles_day_raw(records: List[Dict[str, Any]]) -> int:
 
         prepared.append(r)
 
-    sql = """
-    INSERT INTO candles_day_raw (
-        market, symbol, ts,
-        open, high, low, close,
-        volume, amount
-    )
-    VALUES (
-        :market, :symbol, :ts,
-        :open, :high, :low, :close,
-        :volume, :amount
-    )
-    ON CONFLICT(market, symbol, ts) DO UPDATE SET
-        open=excluded.open,
-        high=excluded.high,
-        low=excluded.low,
-        close=excluded.close,
-        volume=excluded.volume,
-        amount=excluded.amount;
-    """
-
-    cur.executemany(sql, prepared)
-    conn.commit()
-    return cur.rowcount
+    return run_write(WriteFunc(lambda cur: apply_day_upsert(cur, prepared), label="candles_day_raw.upsert"))
 
 
 def select_candles_day_raw(
@@ -106,36 +192,75 @@ def select_candles_day_raw(
     Returns:
         List[Dict]: 日线记录列表
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     market_u = str(market or "").strip().upper()
+    rows = select_day_rows(
+        cur,
+        market_u,
+        symbol,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        limit=limit,
+        offset=offset,
+    )
+    return [
+        {
+            "market": market_u,
+            "symbol": symbol,
+            "ts": r[0],
+            "open": r[1],
+            "high": r[2],
+            "low": r[3],
+            "close": r[4],
+            "volume": r[5],
+            "amount": r[6],
+        }
+        for r in rows
+    ]
 
-    where_clauses = ["market=?", "symbol=?"]
-    params: List[Any] = [market_u, symbol]
 
-    if start_ts is not None:
-        where_clauses.append("ts>=?")
-        params.append(start_ts)
+def select_candles_day_arrays(
+    market: str,
+    symbol: str,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    查询原始日线数据（列数组形态）。
 
-    if end_ts is not None:
-        where_clauses.append("ts<=?")
-        params.append(end_ts)
+    Returns:
+        Dict[str, np.ndarray]: ts(int64) / open / high / low / close / volume / amount(float64)，
+        按 ts 升序；无数据时各列为空数组
+    """
+    conn = get_read_conn()
+    cur = conn.cursor()
+    try:
+        return select_day_arrays(
+            cur,
+            str(market or "").strip().upper(),
+            symbol,
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+    finally:
+        cur.close()
 
-    where_sql = " AND ".join(where_clauses)
-    limit_sql = f"LIMIT {int(limit)}" if limit else ""
-    offset_sql = f"OFFSET {int(offset)}" if offset > 0 else ""
 
-    sql = f"""
-    SELECT * FROM candles_day_raw
-    WHERE {where_sql}
-    ORDER BY ts ASC
-    {limit_sql} {offset_sql};
+def select_candles_day_close_arrays(market: str, symbols: Iterable[str]) -> Dict[str, np.ndarray]:
     """
+    查询一个市场下一批标的的日线收盘价（列数组形态）。
 
-    cur.execute(sql, params)
-    rows = cur.fetchall()
-    return [dict(r) for r in rows]
+    Returns:
+        Dict[str, np.ndarray]: symbol(object) / date(int64, YYYYMMDD) / close(float64)，按 symbol, date 升序
+    """
+    conn = get_read_conn()
+    cur = conn.cursor()
+    try:
+        return select_day_close_arrays(cur, str(market or "").strip().upper(), list(symbols))
+    finally:
+        cur.close()
 
 
 def get_latest_ts_from_day_raw(
@@ -148,14 +273,11 @@ def get_latest_ts_from_day_raw(
     Returns:
         Optional[int]: 最新日线收盘时刻（毫秒时间戳）
     """
-    conn = get_conn()
-    cur = conn.cursor()
-
     market_u = str(market or "").strip().upper()
-    cur.execute(
-        "SELECT MAX(ts) FROM candles_day_raw WHERE market=? AND symbol=?;",
-        (market_u, symbol),
-    )
+    summary = get_series_summary(market_u, symbol, "1d")
+    if summary is not None:
+        return int(summary["last_ts"])
 
-    result = cur.fetchone()
-    return result[0] if result and result[0] else None
+    conn = get_read_conn()
+    cur = conn.cursor()
+    return select_day_latest_ts(cur, market_u, symbol)
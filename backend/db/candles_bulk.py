@@ -0,0 +1,240 @@
+# backend/db/candles_bulk.py
+# ==============================
+# 说明：日线批量装载（全市场 .day 重导的快路径）
+#
+# 职责：
+#   - 接收类型化元组 (market, symbol, ts, open, high, low, close, volume, amount)
+#   - 先 executemany 写入写连接上的临时暂存表 temp.candles_day_stage
+#   - 再用一条 INSERT ... SELECT ... ON CONFLICT 合并进当前生效日线表
+#     （raw / compact 均在 SQL 侧完成，compact 的编码与镜像 SQL 同口径）
+#   - 合并后调用 apply_day_rows_written，派生层（compact 镜像 / 打包表）与逐行写入路径一致
+#   - 提供批量窗口的会话 PRAGMA 开关（事务外执行）
+#
+# 说明：
+#   - 暂存表是写连接上的 TEMP 表，只有写线程可见；每次合并后清空
+#   - 合并函数只能在 writer_thread 事务内调用（WriteFunc）
+#
+# 本轮改动（向量化标准化直出）：
+#   - 新增 day_arrays_to_tuples：标准化列数组（normalize_tdx_day_arrays 输出）直接转批量装载元组，
+#     不再经过逐行 dict；amount 的 NaN 转为 None
+# ==============================
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from backend.db.candles import apply_day_rows_written
+from backend.db.candles_compact import PRICE_SCALE, is_compact_schema_active
+from backend.db.connection import apply_bulk_session_pragmas, get_conn, restore_session_pragmas
+from backend.db.series_summary import count_new_day_rows
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.candles_bulk")
+
+DayTuple = Tuple[str, str, int, float, float, float, float, float, Any]
+
+_CREATE_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS candles_day_stage (
+  market TEXT NOT NULL,
+  symbol TEXT NOT NULL,
+  ts     INTEGER NOT NULL,
+  open   REAL NOT NULL,
+  high   REAL NOT NULL,
+  low    REAL NOT NULL,
+  close  REAL NOT NULL,
+  volume REAL NOT NULL,
+  amount REAL
+);
+"""
+
+_INSERT_STAGE_SQL = """
+INSERT INTO temp.candles_day_stage (
+    market, symbol, ts, open, high, low, close, volume, amount
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+# 说明：
+#   - WHERE true 消除 “INSERT ... SELECT ... ON CONFLICT” 的语法歧义
+#   - ORDER BY rowid 保证暂存表内同键重复时“后写者胜”，与逐行 upsert 一致
+_MERGE_STAGE_TO_RAW_SQL = """
+INSERT INTO candles_day_raw (
+    market, symbol, ts,
+    open, high, low, close,
+    volume, amount
+)
+SELECT market, symbol, ts, open, high, low, close, volume, amount
+FROM temp.candles_day_stage
+WHERE true
+ORDER BY rowid
+ON CONFLICT(market, symbol, ts) DO UPDATE SET
+    open=excluded.open,
+    high=excluded.high,
+    low=excluded.low,
+    close=excluded.close,
+    volume=excluded.volume,
+    amount=excluded.amount;
+"""
+
+_MERGE_STAGE_TO_COMPACT_SQL = f"""
+INSERT INTO candles_day_compact (
+    market, symbol, date,
+    open_tick, high_tick, low_tick, close_tick,
+    volume, amount
+)
+SELECT
+    market, symbol,
+    CAST(strftime('%Y%m%d', ts / 1000, 'unixepoch', '+8 hours') AS INTEGER),
+    CAST(ROUND(open * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(high * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(low * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(close * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(volume) AS INTEGER),
+    amount
+FROM temp.candles_day_stage
+WHERE true
+ORDER BY rowid
+ON CONFLICT(market, symbol, date) DO UPDATE SET
+    open_tick=excluded.open_tick,
+    high_tick=excluded.high_tick,
+    low_tick=excluded.low_tick,
+    close_tick=excluded.close_tick,
+    volume=excluded.volume,
+    amount=excluded.amount;
+"""
+
+
+def day_records_to_tuples(records: Iterable[Mapping[str, Any]], market: str, symbol: str) -> List[DayTuple]:
+    """
+    标准化日线记录（dict）-> 批量装载元组。
+
+    market / symbol 由调用方一次性校验后传入，不再逐行规范化。
+    """
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    if m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"day_records_to_tuples: invalid market={market!r}")
+    if not s:
+        raise ValueError("day_records_to_tuples: symbol is required")
+
+    return [
+        (
+            m,
+            s,
+            int(r["ts"]),
+            float(r["open"]),
+            float(r["high"]),
+            float(r["low"]),
+            float(r["close"]),
+            float(r["volume"]),
+            r.get("amount"),
+        )
+        for r in records
+    ]
+
+
+def day_arrays_to_tuples(arrays: Mapping[str, np.ndarray], market: str, symbol: str) -> List[DayTuple]:
+    """
+    标准化日线列数组 -> 批量装载元组（列 tolist 后 zip，避免逐行 dict）。
+
+    arrays 需含 ts / open / high / low / close / volume / amount。
+    """
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    if m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"day_arrays_to_tuples: invalid market={market!r}")
+    if not s:
+        raise ValueError("day_arrays_to_tuples: symbol is required")
+
+    n = len(arrays["ts"])
+    amount = np.asarray(arrays["amount"], dtype=np.float64)
+    amount_list: List[Any] = amount.tolist()
+    if np.isnan(amount).any():
+        amount_list = [None if a != a else a for a in amount_list]
+
+    return list(zip(
+        [m] * n,
+        [s] * n,
+        np.asarray(arrays["ts"], dtype=np.int64).tolist(),
+        np.asarray(arrays["open"], dtype=np.float64).tolist(),
+        np.asarray(arrays["high"], dtype=np.float64).tolist(),
+        np.asarray(arrays["low"], dtype=np.float64).tolist(),
+        np.asarray(arrays["close"], dtype=np.float64).tolist(),
+        np.asarray(arrays["volume"], dtype=np.float64).tolist(),
+        amount_list,
+    ))
+
+
+def merge_day_tuples(cur: sqlite3.Cursor, rows: Sequence[DayTuple]) -> int:
+    """
+    writer 事务内：暂存表 executemany + 一条合并语句写入当前生效日线表。
+
+    Returns:
+        int: 合并写入的行数
+    """
+    if not rows:
+        return 0
+
+    keys = [(r[0], r[1], r[2]) for r in rows]
+    deltas = count_new_day_rows(cur, keys)
+
+    cur.execute(_CREATE_STAGE_SQL)
+    cur.execute("DELETE FROM temp.candles_day_stage;")
+    cur.executemany(_INSERT_STAGE_SQL, rows)
+
+    if is_compact_schema_active():
+        cur.execute(_MERGE_STAGE_TO_COMPACT_SQL)
+    else:
+        cur.execute(_MERGE_STAGE_TO_RAW_SQL)
+    affected = int(cur.rowcount or 0)
+
+    cur.execute("DELETE FROM temp.candles_day_stage;")
+    apply_day_rows_written(cur, keys, summary_deltas=deltas)
+    return affected
+
+
+def bulk_upsert_day_tuples(rows: Sequence[DayTuple]) -> int:
+    """同步入口：一次合并提交（阻塞至写线程提交完成）。"""
+    if not rows:
+        return 0
+    return run_write(WriteFunc(lambda cur: merge_day_tuples(cur, rows), label="candles_day.bulk_merge"))
+
+
+def begin_day_bulk_window() -> None:
+    """
+    进入批量窗口：按配置设置写连接的 synchronous 并放大页缓存（事务外执行）。
+
+    说明：
+      - PRAGMA 作用于全进程共享的写连接，窗口内其它来源的写入同样受影响；
+        synchronous 默认 NORMAL，OFF 需显式配置（断电可能损坏数据库）
+    """
+
+    def _apply(cur: sqlite3.Cursor) -> None:
+        apply_bulk_session_pragmas(
+            get_conn(),
+            synchronous=settings.local_import_day_bulk_synchronous,
+            cache_size_kib=settings.local_import_day_bulk_cache_size_kib,
+        )
+
+    run_write(WriteFunc(_apply, label="candles_day.bulk_window_begin", transactional=False))
+    _LOG.info(
+        "[BULK][DAY] window begin synchronous=%s cache_size_kib=%s",
+        settings.local_import_day_bulk_synchronous,
+        settings.local_import_day_bulk_cache_size_kib,
+    )
+
+
+def end_day_bulk_window() -> None:
+    """退出批量窗口：恢复常规运行期 PRAGMA，并释放暂存表（事务外执行）。"""
+
+    def _apply(cur: sqlite3.Cursor) -> None:
+        cur.execute("DROP TABLE IF EXISTS temp.candles_day_stage;")
+        restore_session_pragmas(get_conn())
+
+    run_write(WriteFunc(_apply, label="candles_day.bulk_window_end", transactional=False))
+    _LOG.info("[BULK][DAY] window end")
@@ -0,0 +1,646 @@
+# backend/db/candles_compact.py
+# ==============================
+# 说明：日线紧凑整数存储（candles_day_compact）与在线迁移工具
+#
+# 表结构（WITHOUT ROWID，与 candles_day_raw 一致）：
+#   - date        INTEGER  YYYYMMDD（北京时间交易日）
+#   - open/high/low/close_tick INTEGER  价格 × PRICE_SCALE
+#   - volume      INTEGER
+#   - amount      REAL（可空）
+#
+# 编码约定：
+#   - PRICE_SCALE = 1000：
+#       * TDX .day 价格本身是 int×100，×1000 可无损覆盖股票与 ETF/基金的三位小数
+#       * 小整数在 SQLite 中按 1~4 字节变长存储，远小于 REAL 的 8 字节
+#   - ts 不落盘，读取时统一还原为 ms_at_market_close(date)
+#
+# 存储模式：
+#   - settings.day_bars_storage_schema = "raw"（默认）| "compact"
+#   - compact 模式下 db/candles.py 的读写统一走本表，对外仍返回 candles_day_raw 形状
+#   - raw 模式下若本表已存在（迁移进行中/已完成），日线写入会同步镜像到本表，
+#     保证在线迁移期间新写入不丢
+#
+# 在线迁移：
+#   python -m backend.db.candles_compact --migrate [--batch-series 50] [--canonicalize-ts]
+#   - 按标的分批经 writer_thread 重写，每批一个事务，服务可照常运行
+#   - 每个标的写入后立即回读解码，与原表逐行比对；不一致则该标的整体回滚并记入报告
+#   - 全部通过后，把 settings.day_bars_storage_schema 改为 "compact" 并重启即可切换
+#
+# 本轮改动（数组化读取）：
+#   - 新增 select_day_arrays：游标不挂 sqlite3.Row，按固定列序取元组后一次性转成 numpy 列数组
+#     compact 模式下价格刻度 / 日期在数组层面整体解码，不再逐行构造元组
+#
+# 本轮改动（批量复权因子）：
+#   - 新增 select_day_close_arrays：一个市场下一批标的的 (symbol, date, close) 列数组，
+#     供全市场复权因子批量计算使用（raw 模式 date 在 SQL 侧由收盘 ts 换算，口径同镜像 SQL）
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.settings import settings
+from backend.utils.logger import get_logger
+from backend.utils.time import ms_at_market_close
+
+_LOG = get_logger("db.candles_compact")
+
+PRICE_SCALE = 1000
+
+_CN_OFFSET_S = 8 * 3600
+
+DayRow = Tuple[int, float, float, float, float, float, Optional[float]]
+
+DAY_ARRAY_COLUMNS: Tuple[str, ...] = ("ts", "open", "high", "low", "close", "volume", "amount")
+
+UPSERT_CANDLES_DAY_COMPACT_SQL = """
+INSERT INTO candles_day_compact (
+    market, symbol, date,
+    open_tick, high_tick, low_tick, close_tick,
+    volume, amount
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(market, symbol, date) DO UPDATE SET
+    open_tick=excluded.open_tick,
+    high_tick=excluded.high_tick,
+    low_tick=excluded.low_tick,
+    close_tick=excluded.close_tick,
+    volume=excluded.volume,
+    amount=excluded.amount;
+"""
+
+# raw -> compact 的 SQL 侧镜像（raw 模式迁移期间使用）
+# 说明：收盘时刻 +8h 后必落在同一自然日内（1986~1991 夏令时收盘为 06:00 UTC 亦成立）
+_MIRROR_RAW_TO_COMPACT_SQL = f"""
+INSERT INTO candles_day_compact (
+    market, symbol, date,
+    open_tick, high_tick, low_tick, close_tick,
+    volume, amount
+)
+SELECT
+    market, symbol,
+    CAST(strftime('%Y%m%d', ts / 1000, 'unixepoch', '+8 hours') AS INTEGER),
+    CAST(ROUND(open * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(high * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(low * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(close * {PRICE_SCALE}) AS INTEGER),
+    CAST(ROUND(volume) AS INTEGER),
+    amount
+FROM candles_day_raw
+WHERE market=? AND symbol=? AND ts=?
+ON CONFLICT(market, symbol, date) DO UPDATE SET
+    open_tick=excluded.open_tick,
+    high_tick=excluded.high_tick,
+    low_tick=excluded.low_tick,
+    close_tick=excluded.close_tick,
+    volume=excluded.volume,
+    amount=excluded.amount;
+"""
+
+
+def is_compact_schema_active() -> bool:
+    return str(getattr(settings, "day_bars_storage_schema", "raw") or "raw").strip().lower() == "compact"
+
+
+def active_day_table() -> str:
+    return "candles_day_compact" if is_compact_schema_active() else "candles_day_raw"
+
+
+def ensure_compact_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS candles_day_compact (
+      market     TEXT NOT NULL,
+      symbol     TEXT NOT NULL,
+      date       INTEGER NOT NULL,
+      open_tick  INTEGER NOT NULL,
+      high_tick  INTEGER NOT NULL,
+      low_tick   INTEGER NOT NULL,
+      close_tick INTEGER NOT NULL,
+      volume     INTEGER NOT NULL,
+      amount     REAL,
+      PRIMARY KEY (market, symbol, date)
+    ) WITHOUT ROWID;
+    """)
+
+
+def compact_table_exists(cur: sqlite3.Cursor) -> bool:
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='candles_day_compact' LIMIT 1;"
+    )
+    return cur.fetchone() is not None
+
+
+# ==============================================================================
+# 编解码
+# ==============================================================================
+
+@lru_cache(maxsize=65536)
+def close_ts_of_date(ymd: int) -> int:
+    """date -> 收盘毫秒时间戳（带缓存；全部历史交易日不足 1 万个）。"""
+    return ms_at_market_close(int(ymd))
+
+
+def date_of_ts(ts_ms: int) -> int:
+    """收盘毫秒时间戳 -> 北京时间 YYYYMMDD（算术换算，收盘时刻不跨日）。"""
+    t = time.gmtime(int(ts_ms) // 1000 + _CN_OFFSET_S)
+    return t.tm_year * 10000 + t.tm_mon * 100 + t.tm_mday
+
+
+def _to_tick(v: Any) -> int:
+    return int(round(float(v) * PRICE_SCALE))
+
+
+def encode_day_record(r: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """candles_day_raw 形状记录 -> compact 行元组（按 UPSERT_CANDLES_DAY_COMPACT_SQL 顺序）。"""
+    amount = r.get("amount")
+    if amount is not None and isinstance(amount, float) and math.isnan(amount):
+        amount = None
+    volume = r.get("volume")
+    return (
+        r["market"],
+        r["symbol"],
+        date_of_ts(int(r["ts"])),
+        _to_tick(r["open"]),
+        _to_tick(r["high"]),
+        _to_tick(r["low"]),
+        _to_tick(r["close"]),
+        int(round(float(volume))) if volume is not None else 0,
+        None if amount is None else float(amount),
+    )
+
+
+def decode_compact_row(row: Sequence[Any]) -> DayRow:
+    """(date, open_tick, high_tick, low_tick, close_tick, volume, amount) -> 日线元组。"""
+    date, o, h, l, c, v, a = row
+    return (
+        close_ts_of_date(date),
+        o / PRICE_SCALE,
+        h / PRICE_SCALE,
+        l / PRICE_SCALE,
+        c / PRICE_SCALE,
+        float(v),
+        a,
+    )
+
+
+# ==============================================================================
+# 存储模式无关的读取（返回类型化元组）
+# ==============================================================================
+
+def select_day_rows(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbol: str,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[DayRow]:
+    """
+    从当前生效的日线表读取 (ts, open, high, low, close, volume, amount) 元组，按 ts 升序。
+    """
+    if not is_compact_schema_active():
+        where = ["market=?", "symbol=?"]
+        params: List[Any] = [market, symbol]
+        if start_ts is not None:
+            where.append("ts>=?")
+            params.append(int(start_ts))
+        if end_ts is not None:
+            where.append("ts<=?")
+            params.append(int(end_ts))
+        limit_sql = f"LIMIT {int(limit)}" if limit else ""
+        offset_sql = f"OFFSET {int(offset)}" if offset > 0 else ""
+        if offset_sql and not limit_sql:
+            limit_sql = "LIMIT -1"
+        cur.execute(
+            f"""
+            SELECT ts, open, high, low, close, volume, amount
+            FROM candles_day_raw
+            WHERE {' AND '.join(where)}
+            ORDER BY ts ASC
+            {limit_sql} {offset_sql};
+            """,
+            params,
+        )
+        return [tuple(r) for r in cur.fetchall()]
+
+    where = ["market=?", "symbol=?"]
+    params = [market, symbol]
+    if start_ts is not None:
+        where.append("date>=?")
+        params.append(date_of_ts(int(start_ts)) - 1)
+    if end_ts is not None:
+        where.append("date<=?")
+        params.append(date_of_ts(int(end_ts)) + 1)
+    cur.execute(
+        f"""
+        SELECT date, open_tick, high_tick, low_tick, close_tick, volume, amount
+        FROM candles_day_compact
+        WHERE {' AND '.join(where)}
+        ORDER BY date ASC;
+        """,
+        params,
+    )
+    rows = [decode_compact_row(tuple(r)) for r in cur.fetchall()]
+    if start_ts is not None:
+        rows = [r for r in rows if r[0] >= int(start_ts)]
+    if end_ts is not None:
+        rows = [r for r in rows if r[0] <= int(end_ts)]
+    if offset > 0:
+        rows = rows[int(offset):]
+    if limit:
+        rows = rows[: int(limit)]
+    return rows
+
+
+def _empty_day_arrays() -> Dict[str, np.ndarray]:
+    return {c: np.empty(0, dtype=np.int64 if c == "ts" else np.float64) for c in DAY_ARRAY_COLUMNS}
+
+
+def select_day_arrays(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbol: str,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    从当前生效的日线表读取列数组（按 ts 升序）：ts(int64) + 其余 float64，amount 缺失为 NaN。
+
+    说明：
+      - 游标 row_factory 置空，fetchall 直接得到普通元组，避免 sqlite3.Row / dict 中间层
+      - 毫秒 ts < 2^53，经 float64 矩阵中转后转回 int64 无损
+    """
+    compact = is_compact_schema_active()
+    where = ["market=?", "symbol=?"]
+    params: List[Any] = [market, symbol]
+    if compact:
+        if start_ts is not None:
+            where.append("date>=?")
+            params.append(date_of_ts(int(start_ts)) - 1)
+        if end_ts is not None:
+            where.append("date<=?")
+            params.append(date_of_ts(int(end_ts)) + 1)
+        sql = f"""
+        SELECT date, open_tick, high_tick, low_tick, close_tick, volume, amount
+        FROM candles_day_compact
+        WHERE {' AND '.join(where)}
+        ORDER BY date ASC;
+        """
+    else:
+        if start_ts is not None:
+            where.append("ts>=?")
+            params.append(int(start_ts))
+        if end_ts is not None:
+            where.append("ts<=?")
+            params.append(int(end_ts))
+        sql = f"""
+        SELECT ts, open, high, low, close, volume, amount
+        FROM candles_day_raw
+        WHERE {' AND '.join(where)}
+        ORDER BY ts ASC;
+        """
+
+    cur.row_factory = None
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    if not rows:
+        return _empty_day_arrays()
+
+    # None（amount 缺失）在 float64 转换中自然变为 NaN
+    mat = np.array(rows, dtype=np.float64).reshape(len(rows), len(DAY_ARRAY_COLUMNS))
+    del rows
+
+    if compact:
+        dates = mat[:, 0].astype(np.int64)
+        uniq, inv = np.unique(dates, return_inverse=True)
+        ts = np.fromiter((close_ts_of_date(int(d)) for d in uniq), dtype=np.int64, count=len(uniq))[inv]
+        out = {"ts": ts}
+        for j, col in enumerate(("open", "high", "low", "close"), start=1):
+            out[col] = mat[:, j] / PRICE_SCALE
+        out["volume"] = np.ascontiguousarray(mat[:, 5])
+        out["amount"] = np.ascontiguousarray(mat[:, 6])
+    else:
+        out = {"ts": mat[:, 0].astype(np.int64)}
+        for j, col in enumerate(DAY_ARRAY_COLUMNS[1:], start=1):
+            out[col] = np.ascontiguousarray(mat[:, j])
+
+    if compact and (start_ts is not None or end_ts is not None):
+        mask = np.ones(len(out["ts"]), dtype=bool)
+        if start_ts is not None:
+            mask &= out["ts"] >= int(start_ts)
+        if end_ts is not None:
+            mask &= out["ts"] <= int(end_ts)
+        out = {k: v[mask] for k, v in out.items()}
+    return out
+
+
+def select_day_close_arrays(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbols: Sequence[str],
+) -> Dict[str, np.ndarray]:
+    """
+    从当前生效的日线表读取一批标的的收盘价列数组（按 symbol, date 升序）。
+
+    Returns:
+        {'symbol': object, 'date': int64（北京时间 YYYYMMDD）, 'close': float64}
+    """
+    empty = {
+        "symbol": np.empty(0, dtype=object),
+        "date": np.empty(0, dtype=np.int64),
+        "close": np.empty(0, dtype=np.float64),
+    }
+    syms = [str(s).strip() for s in symbols]
+    if not syms:
+        return empty
+
+    placeholders = ",".join("?" * len(syms))
+    if is_compact_schema_active():
+        sql = f"""
+        SELECT symbol, date, close_tick
+        FROM candles_day_compact
+        WHERE market=? AND symbol IN ({placeholders})
+        ORDER BY symbol ASC, date ASC;
+        """
+    else:
+        sql = f"""
+        SELECT symbol,
+               CAST(strftime('%Y%m%d', ts / 1000, 'unixepoch', '+8 hours') AS INTEGER),
+               close
+        FROM candles_day_raw
+        WHERE market=? AND symbol IN ({placeholders})
+        ORDER BY symbol ASC, ts ASC;
+        """
+
+    cur.row_factory = None
+    cur.execute(sql, [market, *syms])
+    rows = cur.fetchall()
+    if not rows:
+        return empty
+
+    sym_col, date_col, close_col = zip(*rows)
+    del rows
+    close = np.array(close_col, dtype=np.float64)
+    if is_compact_schema_active():
+        close = close / PRICE_SCALE
+    return {
+        "symbol": np.array(sym_col, dtype=object),
+        "date": np.array(date_col, dtype=np.int64),
+        "close": close,
+    }
+
+
+def select_day_latest_ts(cur: sqlite3.Cursor, market: str, symbol: str) -> Optional[int]:
+    if not is_compact_schema_active():
+        cur.execute(
+            "SELECT MAX(ts) FROM candles_day_raw WHERE market=? AND symbol=?;",
+            (market, symbol),
+        )
+        r = cur.fetchone()
+        return r[0] if r and r[0] else None
+
+    cur.execute(
+        "SELECT MAX(date) FROM candles_day_compact WHERE market=? AND symbol=?;",
+        (market, symbol),
+    )
+    r = cur.fetchone()
+    return close_ts_of_date(r[0]) if r and r[0] else None
+
+
+def select_day_ts_bounds(cur: sqlite3.Cursor, market: str, symbol: str) -> Tuple[Optional[int], Optional[int]]:
+    if not is_compact_schema_active():
+        cur.execute(
+            "SELECT MIN(ts), MAX(ts) FROM candles_day_raw WHERE market=? AND symbol=?;",
+            (market, symbol),
+        )
+        lo, hi = cur.fetchone()
+        return lo, hi
+
+    cur.execute(
+        "SELECT MIN(date), MAX(date) FROM candles_day_compact WHERE market=? AND symbol=?;",
+        (market, symbol),
+    )
+    lo, hi = cur.fetchone()
+    if lo is None:
+        return None, None
+    return close_ts_of_date(lo), close_ts_of_date(hi)
+
+
+def select_day_series_keys(
+    cur: sqlite3.Cursor,
+    market: Optional[str] = None,
+    symbol: Optional[str] = None,
+    table: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    tbl = table or active_day_table()
+    where: List[str] = []
+    params: List[Any] = []
+    if market:
+        where.append("market=?")
+        params.append(str(market).strip().upper())
+    if symbol:
+        where.append("symbol=?")
+        params.append(str(symbol).strip())
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    cur.execute(
+        f"SELECT DISTINCT market, symbol FROM {tbl} {where_sql} ORDER BY market, symbol;",
+        params,
+    )
+    return [(r[0], r[1]) for r in cur.fetchall()]
+
+
+# ==============================================================================
+# 写入侧（仅在 writer_thread 事务内调用）
+# ==============================================================================
+
+def upsert_compact_records(cur: sqlite3.Cursor, records: Iterable[Mapping[str, Any]]) -> int:
+    rows = [encode_day_record(r) for r in records]
+    if not rows:
+        return 0
+    cur.executemany(UPSERT_CANDLES_DAY_COMPACT_SQL, rows)
+    return int(cur.rowcount or 0)
+
+
+def mirror_raw_keys_to_compact(cur: sqlite3.Cursor, keys: Iterable[Tuple[str, str, int]]) -> None:
+    """raw 模式下，若 compact 表已存在（迁移中/迁移后待切换），同步镜像本次写入。"""
+    if is_compact_schema_active() or not compact_table_exists(cur):
+        return
+    cur.executemany(_MIRROR_RAW_TO_COMPACT_SQL, [(m, s, int(ts)) for m, s, ts in keys])
+
+
+# ==============================================================================
+# 在线迁移
+# ==============================================================================
+
+def _rows_equal(expected: DayRow, actual: DayRow) -> bool:
+    for i in range(6):
+        if expected[i] != actual[i]:
+            return False
+    ea, aa = expected[6], actual[6]
+    if ea is None or (isinstance(ea, float) and math.isnan(ea)):
+        return aa is None
+    return aa is not None and float(ea) == float(aa)
+
+
+def _migrate_one_series(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbol: str,
+    canonicalize_ts: bool,
+) -> int:
+    cur.execute(
+        """
+        SELECT ts, open, high, low, close, volume, amount
+        FROM candles_day_raw
+        WHERE market=? AND symbol=?
+        ORDER BY ts ASC;
+        """,
+        (market, symbol),
+    )
+    raw_rows: List[DayRow] = [tuple(r) for r in cur.fetchall()]
+
+    records = [
+        {
+            "market": market, "symbol": symbol, "ts": r[0],
+            "open": r[1], "high": r[2], "low": r[3], "close": r[4],
+            "volume": r[5], "amount": r[6],
+        }
+        for r in raw_rows
+    ]
+    cur.execute("DELETE FROM candles_day_compact WHERE market=? AND symbol=?;", (market, symbol))
+    upsert_compact_records(cur, records)
+
+    # 回读校验
+    cur.execute(
+        """
+        SELECT date, open_tick, high_tick, low_tick, close_tick, volume, amount
+        FROM candles_day_compact
+        WHERE market=? AND symbol=?
+        ORDER BY date ASC;
+        """,
+        (market, symbol),
+    )
+    decoded = [decode_compact_row(tuple(r)) for r in cur.fetchall()]
+
+    if len(decoded) != len(raw_rows):
+        raise ValueError(
+            f"row count mismatch raw={len(raw_rows)} compact={len(decoded)}（同一交易日存在多个 ts）"
+        )
+
+    for exp, act in zip(raw_rows, decoded):
+        if canonicalize_ts:
+            exp = (close_ts_of_date(date_of_ts(exp[0])),) + tuple(exp[1:])
+        if not _rows_equal(exp, act):
+            raise ValueError(f"round-trip mismatch raw={exp!r} compact={act!r}")
+
+    return len(raw_rows)
+
+
+def migrate_day_bars_to_compact(
+    *,
+    batch_series: int = 50,
+    canonicalize_ts: bool = False,
+    market: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    在线把 candles_day_raw 迁移到 candles_day_compact（可重复执行，幂等）。
+
+    Args:
+        batch_series: 每个写事务处理的标的数
+        canonicalize_ts: True 时允许把非收盘时刻的 ts 规范化为 ms_at_market_close(date)
+                         （远程补缺写入的历史行可能不是标准收盘时刻）
+        market: 仅迁移指定市场
+
+    Returns:
+        迁移报告 dict
+    """
+    started = time.monotonic()
+    run_write(WriteFunc(ensure_compact_table, label="candles_day_compact.ensure"))
+
+    series = select_day_series_keys(get_read_conn().cursor(), market=market, table="candles_day_raw")
+    batch = max(1, int(batch_series))
+
+    migrated_series = 0
+    migrated_rows = 0
+    failures: List[Dict[str, Any]] = []
+
+    for i in range(0, len(series), batch):
+        chunk = series[i:i + batch]
+
+        def _apply(cur: sqlite3.Cursor, chunk=chunk) -> Tuple[int, int, List[Dict[str, Any]]]:
+            ok_series = 0
+            rows = 0
+            bad: List[Dict[str, Any]] = []
+            for m, s in chunk:
+                cur.execute("SAVEPOINT compact_series;")
+                try:
+                    rows += _migrate_one_series(cur, m, s, canonicalize_ts)
+                    cur.execute("RELEASE compact_series;")
+                    ok_series += 1
+                except Exception as e:
+                    cur.execute("ROLLBACK TO compact_series;")
+                    cur.execute("RELEASE compact_series;")
+                    bad.append({"market": m, "symbol": s, "error": str(e)})
+            return ok_series, rows, bad
+
+        ok_series, rows, bad = run_write(WriteFunc(_apply, label="candles_day_compact.migrate"))
+        migrated_series += ok_series
+        migrated_rows += rows
+        failures.extend(bad)
+
+        _LOG.info(
+            f"[COMPACT][MIGRATE] progress={min(i + batch, len(series))}/{len(series)} "
+            f"rows={migrated_rows} failures={len(failures)}"
+        )
+
+    report = {
+        "series_total": len(series),
+        "series_migrated": migrated_series,
+        "rows_migrated": migrated_rows,
+        "failures": failures,
+        "verified": not failures,
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="candles_day_compact 在线迁移工具")
+    parser.add_argument("--migrate", action="store_true", help="把 candles_day_raw 迁移到紧凑整数表")
+    parser.add_argument("--batch-series", type=int, default=50, help="每个事务处理的标的数")
+    parser.add_argument("--market", default=None)
+    parser.add_argument(
+        "--canonicalize-ts",
+        action="store_true",
+        help="允许把非收盘时刻 ts 规范化为当日收盘时刻后再校验",
+    )
+    args = parser.parse_args()
+
+    from backend.db.schema import ensure_initialized
+    from backend.db.writer_thread import stop_db_writer
+    ensure_initialized()
+
+    if args.migrate:
+        report = migrate_day_bars_to_compact(
+            batch_series=args.batch_series,
+            canonicalize_ts=args.canonicalize_ts,
+            market=args.market,
+        )
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    stop_db_writer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# backend/db/candles_packed.py
+# ==============================
+# 说明：日线列式打包存储（candles_day_packed，可选）
+#
+# 职责：
+#   - 以 (market, symbol, year) 为一行，把该年全部日线按列打包为 BLOB：
+#       ts(int64) / open / high / low / close / volume / amount(float64，小端)
+#   - 日线生效表（candles_day_raw / candles_day_compact）仍是唯一真相源；本表只是派生读取加速层
+#   - 写入：日线 upsert 时在同一事务内按“受影响年份”重建对应打包行
+#   - 读取：整段历史 = 少量 BLOB 读取 + np.frombuffer，不再逐行构造 dict
+#
+# 开关：
+#   - settings.day_bars_packed_store_enabled
+#   - 关闭时本表不再维护也不参与读取；重新开启前应先执行
+#       python -m backend.db.candles_packed --rebuild
+#     做一次全量回填
+#   - 未回填时的兜底：
+#       * 写入钩子遇到尚无打包行的标的，重建其全部年份（而不只是本次写入涉及的年份）
+#       * 读取侧只在打包行数与 series_summary.rows 一致时采用打包结果，否则回退日线生效表
+#
+# 年份口径：
+#   - 按北京时间自然年切分（ts + 8h 后取 UTC 年份）
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.db.candles_compact import select_day_rows, select_day_series_keys, select_day_ts_bounds
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.candles_packed")
+
+PACKED_COLUMNS: Tuple[str, ...] = ("ts", "open", "high", "low", "close", "volume", "amount")
+
+_TS_DTYPE = np.dtype("<i8")
+_VAL_DTYPE = np.dtype("<f8")
+
+_CN_OFFSET_MS = 8 * 3600 * 1000
+
+
+def is_packed_store_enabled() -> bool:
+    return bool(getattr(settings, "day_bars_packed_store_enabled", False))
+
+
+def _year_of_ts(ts_ms: int) -> int:
+    """北京时间自然年。"""
+    return int(np.datetime64(int(ts_ms) + _CN_OFFSET_MS, "ms").astype("datetime64[Y]").astype(np.int64)) + 1970
+
+
+def _year_bounds_ms(year: int) -> Tuple[int, int]:
+    """返回 [start, end) 毫秒区间（北京时间自然年）。"""
+    start = int(np.datetime64(f"{int(year):04d}-01-01", "ms").astype(np.int64)) - _CN_OFFSET_MS
+    end = int(np.datetime64(f"{int(year) + 1:04d}-01-01", "ms").astype(np.int64)) - _CN_OFFSET_MS
+    return start, end
+
+
+# ==============================================================================
+# 写入侧（仅在 writer_thread 事务内调用）
+# ==============================================================================
+
+def _pack_rows(rows: List[Tuple[Any, ...]]) -> Dict[str, bytes]:
+    ts = np.fromiter((r[0] for r in rows), dtype=_TS_DTYPE, count=len(rows))
+    # None（amount 缺失）在 float64 转换中自然变为 NaN
+    vals = np.array([tuple(r)[1:] for r in rows], dtype=_VAL_DTYPE).reshape(len(rows), 6)
+
+    out: Dict[str, bytes] = {"ts": ts.tobytes()}
+    for j, col in enumerate(PACKED_COLUMNS[1:]):
+        out[col] = np.ascontiguousarray(vals[:, j]).tobytes()
+    return out
+
+
+def rebuild_packed_years(cur: sqlite3.Cursor, market: str, symbol: str, years: Iterable[int]) -> int:
+    """
+    从日线生效表重建指定 (market, symbol) 若干年份的打包行。
+    返回重建（或删除）的年份数。
+    """
+    count = 0
+    for year in sorted(set(int(y) for y in years)):
+        start, end = _year_bounds_ms(year)
+        rows = select_day_rows(cur, market, symbol, start_ts=start, end_ts=end - 1)
+
+        if not rows:
+            cur.execute(
+                "DELETE FROM candles_day_packed WHERE market=? AND symbol=? AND year=?;",
+                (market, symbol, year),
+            )
+            count += 1
+            continue
+
+        packed = _pack_rows(rows)
+        cur.execute(
+            """
+            INSERT INTO candles_day_packed (
+                market, symbol, year, n,
+                ts, open, high, low, close, volume, amount
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(market, symbol, year) DO UPDATE SET
+                n=excluded.n,
+                ts=excluded.ts,
+                open=excluded.open,
+                high=excluded.high,
+                low=excluded.low,
+                close=excluded.close,
+                volume=excluded.volume,
+                amount=excluded.amount;
+            """,
+            (
+                market, symbol, year, len(rows),
+                packed["ts"], packed["open"], packed["high"], packed["low"],
+                packed["close"], packed["volume"], packed["amount"],
+            ),
+        )
+        count += 1
+    return count
+
+
+def touched_years_by_series(keys: Iterable[Tuple[str, str, int]]) -> Dict[Tuple[str, str], Set[int]]:
+    """把 (market, symbol, ts) 序列归并为 {(market, symbol): {year, ...}}。"""
+    out: Dict[Tuple[str, str], Set[int]] = {}
+    for market, symbol, ts in keys:
+        out.setdefault((market, symbol), set()).add(_year_of_ts(ts))
+    return out
+
+
+def _has_packed_rows(cur: sqlite3.Cursor, market: str, symbol: str) -> bool:
+    cur.execute(
+        "SELECT 1 FROM candles_day_packed WHERE market=? AND symbol=? LIMIT 1;",
+        (market, symbol),
+    )
+    return cur.fetchone() is not None
+
+
+def sync_packed_for_keys(cur: sqlite3.Cursor, keys: Iterable[Tuple[str, str, int]]) -> int:
+    """
+    日线写入后的同步钩子：按受影响年份重建打包行。
+
+    说明：
+      - 标的尚无任何打包行时（例如开关打开后未做 --rebuild 回填）重建其全部年份，
+        避免只留下最近几年的打包行被当成完整历史读取
+    """
+    total = 0
+    for (market, symbol), years in touched_years_by_series(keys).items():
+        if not _has_packed_rows(cur, market, symbol):
+            lo, hi = select_day_ts_bounds(cur, market, symbol)
+            if lo is not None:
+                years = set(years) | set(range(_year_of_ts(lo), _year_of_ts(hi) + 1))
+        total += rebuild_packed_years(cur, market, symbol, years)
+    return total
+
+
+# ==============================================================================
+# 读取侧
+# ==============================================================================
+
+def _unpack_rows(rows: List[sqlite3.Row]) -> Dict[str, np.ndarray]:
+    if not rows:
+        return {c: np.empty(0, dtype=_TS_DTYPE if c == "ts" else _VAL_DTYPE) for c in PACKED_COLUMNS}
+
+    out: Dict[str, np.ndarray] = {}
+    for col in PACKED_COLUMNS:
+        dt = _TS_DTYPE if col == "ts" else _VAL_DTYPE
+        parts = [np.frombuffer(r[col], dtype=dt) for r in rows]
+        out[col] = parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+    return out
+
+
+def select_packed_day_arrays(
+    market: str,
+    symbol: str,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    读取某标的日线列数组（按 ts 升序）。
+
+    Returns:
+      - None：打包表中没有该标的（调用方应回退到日线生效表）
+      - Dict[str, np.ndarray]：ts(int64) + 其余 float64 列
+    """
+    market_u = str(market or "").strip().upper()
+    where = ["market=?", "symbol=?"]
+    params: List[Any] = [market_u, symbol]
+    if start_ts is not None:
+        where.append("year>=?")
+        params.append(_year_of_ts(start_ts))
+    if end_ts is not None:
+        where.append("year<=?")
+        params.append(_year_of_ts(end_ts))
+
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT year, ts, open, high, low, close, volume, amount
+        FROM candles_day_packed
+        WHERE {' AND '.join(where)}
+        ORDER BY year ASC;
+        """,
+        params,
+    )
+    rows = cur.fetchall()
+    if not rows:
+        return None
+
+    arrays = _unpack_rows(rows)
+    if start_ts is not None or end_ts is not None:
+        ts = arrays["ts"]
+        mask = np.ones(len(ts), dtype=bool)
+        if start_ts is not None:
+            mask &= ts >= int(start_ts)
+        if end_ts is not None:
+            mask &= ts <= int(end_ts)
+        arrays = {k: v[mask] for k, v in arrays.items()}
+    return arrays
+
+
+def iter_packed_day_series(
+    market: Optional[str] = None,
+) -> Iterator[Tuple[str, str, Dict[str, np.ndarray]]]:
+    """
+    横截面扫描：按 (market, symbol) 顺序逐标的产出完整日线列数组。
+
+    说明：
+      - 单条 SQL 顺序读取，按标的分组拼接，内存中同一时刻只持有一个标的
+    """
+    conn = get_read_conn()
+    cur = conn.cursor()
+    if market:
+        cur.execute(
+            """
+            SELECT market, symbol, year, ts, open, high, low, close, volume, amount
+            FROM candles_day_packed
+            WHERE market=?
+            ORDER BY market ASC, symbol ASC, year ASC;
+            """,
+            (str(market).strip().upper(),),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT market, symbol, year, ts, open, high, low, close, volume, amount
+            FROM candles_day_packed
+            ORDER BY market ASC, symbol ASC, year ASC;
+            """
+        )
+
+    cur_key: Optional[Tuple[str, str]] = None
+    bucket: List[sqlite3.Row] = []
+    for row in cur:
+        key = (row["market"], row["symbol"])
+        if cur_key is not None and key != cur_key:
+            yield cur_key[0], cur_key[1], _unpack_rows(bucket)
+            bucket = []
+        cur_key = key
+        bucket.append(row)
+
+    if cur_key is not None and bucket:
+        yield cur_key[0], cur_key[1], _unpack_rows(bucket)
+
+
+# ==============================================================================
+# 全量回填
+# ==============================================================================
+
+def rebuild_candles_day_packed(market: Optional[str] = None, symbol: Optional[str] = None) -> int:
+    """
+    从日线生效表全量回填打包表（按标的逐个提交，可在服务运行中执行）。
+    返回处理的标的数。
+    """
+    series = select_day_series_keys(get_read_conn().cursor(), market=market, symbol=symbol)
+
+    for m, s in series:
+        def _apply(wcur: sqlite3.Cursor, m: str = m, s: str = s) -> int:
+            lo, hi = select_day_ts_bounds(wcur, m, s)
+            wcur.execute(
+                "SELECT year FROM candles_day_packed WHERE market=? AND symbol=?;",
+                (m, s),
+            )
+            years = {int(r[0]) for r in wcur.fetchall()}
+            if lo is not None:
+                years.update(range(_year_of_ts(lo), _year_of_ts(hi) + 1))
+            return rebuild_packed_years(wcur, m, s, years)
+
+        run_write(WriteFunc(_apply, label="candles_day_packed.rebuild"))
+
+    _LOG.info(f"[PACKED] rebuild done series={len(series)}")
+    return len(series)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="candles_day_packed 维护工具")
+    parser.add_argument("--rebuild", action="store_true", help="从日线生效表全量回填")
+    parser.add_argument("--market", default=None)
+    parser.add_argument("--symbol", default=None)
+    args = parser.parse_args()
+
+    from backend.db.schema import ensure_initialized
+    ensure_initialized()
+
+    if args.rebuild:
+        n = rebuild_candles_day_packed(market=args.market, symbol=args.symbol)
+        print(f"rebuilt series={n}")
+
+
+if __name__ == "__main__":
+    main()
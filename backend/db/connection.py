@@ -1,18 +1,34 @@
 # backend/db/connection.py
 # ==============================
-# 说明：数据库连接管理模块（V3.0 - 日线专用库优化版）
+# 说明：数据库连接管理模块（V3.1 - 读写连接分离版）
 #
 # 改动：
 #   - 继续保留全局写锁
 #   - SQLite PRAGMA 按“新库重建”策略优化
 #   - 目标服务于新的日线专用表结构：
 #       * candles_day_raw
+#
+# 本轮改动：
+#   - get_conn() 明确定位为“唯一写连接”（所有写入仍只经过它）
+#   - 新增 get_read_conn()：
+#       * 每个工作线程一条只读连接（threading.local）
+#       * 以 mode=ro 打开，应用与写连接相同的运行期 PRAGMA
+#       * WAL 模式下多个读线程可与写连接并行，互不串行
+#   - close_all_connections() 同时关闭全部只读连接
+#
+# 本轮改动（单写线程）：
+#   - 写连接只由 writer_thread 使用；get_write_lock() 仅为兼容保留
+#
+# 本轮改动（日线批量装载）：
+#   - 新增 apply_bulk_session_pragmas / restore_session_pragmas：
+#       * 批量窗口内临时放宽写连接的 synchronous、放大 cache_size
+#       * 窗口结束后恢复常规运行期 PRAGMA
 # ==============================
 
 from __future__ import annotations
 import sqlite3
 import threading
-from typing import Optional
+from typing import List, Optional
 
 from backend.settings import settings
 
@@ -22,14 +38,23 @@ _lock = threading.Lock()
 # 全局写锁
 _db_write_lock = threading.Lock()
 
+# 线程本地只读连接
+_read_local = threading.local()
+_read_conns: List[sqlite3.Connection] = []
+_read_lock = threading.Lock()
+
+# 只读连接代际：close_all_connections() 后递增，线程内旧连接随之失效
+_read_generation = 0
+
 
 def get_conn() -> sqlite3.Connection:
     """
-    获取全局单例的 SQLite 数据库连接。
+    获取全局单例的 SQLite 数据库连接（写连接）。
 
     特性：
     - 线程安全的单例模式
     - 自动应用性能优化配置（PRAGMA）
+    - 所有写入只走这条连接；纯查询请使用 get_read_conn()
 
     Returns:
         sqlite3.Connection: 数据库连接对象
@@ -48,6 +73,47 @@ def get_conn() -> sqlite3.Connection:
         return _conn
 
 
+def get_read_conn() -> sqlite3.Connection:
+    """
+    获取当前线程专属的只读 SQLite 连接。
+
+    特性：
+    - 每个线程首次调用时创建，之后复用（threading.local）
+    - 以 URI mode=ro 打开，任何写语句都会直接报错
+    - 与写连接同库；WAL 模式下读不阻塞写、写不阻塞读
+
+    说明：
+    - 数据库文件与 WAL 模式由写连接负责创建/固化，
+      因此这里会先确保写连接已初始化。
+
+    Returns:
+        sqlite3.Connection: 当前线程的只读连接
+    """
+    conn = getattr(_read_local, "conn", None)
+    if conn is not None and getattr(_read_local, "generation", -1) == _read_generation:
+        return conn
+
+    # 确保库文件已存在且已切换 WAL
+    get_conn()
+
+    uri = f"{settings.db_path.resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        check_same_thread=False,
+        timeout=30.0,
+    )
+    conn.row_factory = sqlite3.Row
+    _apply_session_pragmas(conn)
+
+    with _read_lock:
+        _read_conns.append(conn)
+        _read_local.conn = conn
+        _read_local.generation = _read_generation
+
+    return conn
+
+
 def get_write_lock() -> threading.Lock:
     """
     获取全局写锁（用于需要原子性的写操作）
@@ -87,17 +153,66 @@ def _apply_pragmas(conn: sqlite3.Connection):
 
     # 再设置运行期参数
     cur.execute("PRAGMA journal_mode=WAL;")
+    cur.close()
+
+    _apply_session_pragmas(conn)
+
+
+def _apply_session_pragmas(conn: sqlite3.Connection):
+    """
+    应用“连接级”运行期 PRAGMA（读写连接共用）。
+
+    说明：
+    - 这些参数只对当前连接生效，每条连接都要单独设置；
+    - page_size / auto_vacuum / journal_mode 属于库级持久参数，
+      由写连接负责，只读连接无需（也无法）设置。
+    """
+    cur = conn.cursor()
     cur.execute("PRAGMA synchronous=NORMAL;")
     cur.execute("PRAGMA foreign_keys=ON;")
     cur.execute("PRAGMA temp_store=MEMORY;")
     cur.execute("PRAGMA cache_size=10000;")
+    cur.close()
 
+
+def apply_bulk_session_pragmas(
+    conn: sqlite3.Connection,
+    synchronous: str = "NORMAL",
+    cache_size_kib: int = 262144,
+):
+    """
+    批量装载窗口专用的连接级 PRAGMA（只应作用于写连接，且须在事务外执行）。
+
+    说明：
+    - synchronous=OFF：提交不再等待 fsync，断电可能损坏数据库；写连接共享，窗口内所有写入都受影响
+    - cache_size 取负值表示按 KiB 计
+    """
+    sync = str(synchronous or "NORMAL").strip().upper()
+    if sync not in ("OFF", "NORMAL", "FULL"):
+        raise ValueError(f"apply_bulk_session_pragmas: invalid synchronous={synchronous!r}")
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA synchronous={sync};")
+    cur.execute(f"PRAGMA cache_size=-{max(2048, int(cache_size_kib))};")
     cur.close()
 
 
+def restore_session_pragmas(conn: sqlite3.Connection):
+    """恢复常规运行期 PRAGMA（批量窗口结束时调用）。"""
+    _apply_session_pragmas(conn)
+
+
 def close_all_connections():
     """关闭所有数据库连接（用于应用关闭时的清理）。"""
-    global _conn
+    global _conn, _read_generation
+    with _read_lock:
+        for rc in _read_conns:
+            try:
+                rc.close()
+            except Exception:
+                pass
+        _read_conns.clear()
+        _read_generation += 1
+
     with _lock:
         if _conn:
             _conn.close()
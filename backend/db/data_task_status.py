@@ -16,6 +16,9 @@
 # idle 内部细分（仅后端内部保留）：
 #   - never_executed
 #   - has_existing_data
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再自行 commit
 # ==============================
 
 from __future__ import annotations
@@ -23,7 +26,8 @@ from __future__ import annotations
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from backend.db.connection import get_conn, get_write_lock
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecute, run_write
 
 _ALLOWED_TASK_TYPES = {
     "symbol_index",
@@ -83,52 +87,47 @@ def upsert_data_task_status(
 
     now = datetime.now().isoformat()
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-
-        sql = """
-        INSERT INTO data_task_status (
-            task_type,
-            task_status,
-            idle_reason,
-            last_success_at,
-            last_failure_at,
-            last_error_message,
-            updated_at
-        )
-        VALUES (
-            :task_type,
-            :task_status,
-            :idle_reason,
-            :last_success_at,
-            :last_failure_at,
-            :last_error_message,
-            :updated_at
-        )
-        ON CONFLICT(task_type) DO UPDATE SET
-            task_status=excluded.task_status,
-            idle_reason=excluded.idle_reason,
-            last_success_at=COALESCE(excluded.last_success_at, data_task_status.last_success_at),
-            last_failure_at=COALESCE(excluded.last_failure_at, data_task_status.last_failure_at),
-            last_error_message=excluded.last_error_message,
-            updated_at=excluded.updated_at;
-        """
-
-        cur.execute(
-            sql,
-            {
-                "task_type": t,
-                "task_status": s,
-                "idle_reason": r,
-                "last_success_at": last_success_at,
-                "last_failure_at": last_failure_at,
-                "last_error_message": last_error_message,
-                "updated_at": now,
-            },
-        )
-        conn.commit()
-        return int(cur.rowcount or 0)
+    sql = """
+    INSERT INTO data_task_status (
+        task_type,
+        task_status,
+        idle_reason,
+        last_success_at,
+        last_failure_at,
+        last_error_message,
+        updated_at
+    )
+    VALUES (
+        :task_type,
+        :task_status,
+        :idle_reason,
+        :last_success_at,
+        :last_failure_at,
+        :last_error_message,
+        :updated_at
+    )
+    ON CONFLICT(task_type) DO UPDATE SET
+        task_status=excluded.task_status,
+        idle_reason=excluded.idle_reason,
+        last_success_at=COALESCE(excluded.last_success_at, data_task_status.last_success_at),
+        last_failure_at=COALESCE(excluded.last_failure_at, data_task_status.last_failure_at),
+        last_error_message=excluded.last_error_message,
+        updated_at=excluded.updated_at;
+    """
+
+    return int(run_write(SqlExecute(
+        sql,
+        {
+            "task_type": t,
+            "task_status": s,
+            "idle_reason": r,
+            "last_success_at": last_success_at,
+            "last_failure_at": last_failure_at,
+            "last_error_message": last_error_message,
+            "updated_at": now,
+        },
+        label="data_task_status.upsert",
+    )) or 0)
 
 
 def mark_data_task_running(task_type: str) -> int:
@@ -173,7 +172,7 @@ def mark_data_task_idle(task_type: str, idle_reason: str) -> int:
 
 def select_data_task_status(task_type: str) -> Optional[Dict[str, Any]]:
     t = _normalize_task_type(task_type)
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -196,7 +195,7 @@ def select_data_task_status(task_type: str) -> Optional[Dict[str, Any]]:
 
 
 def select_all_data_task_status() -> List[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -4,20 +4,46 @@
 # 改动：
 #   - 新增：compress_factor_records，按 symbol+date 压缩因子记录，仅保留数值变化的日期
 #   - upsert_factors：写库前统一调用压缩函数，避免存储冗余
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再自行 commit
+#
+# 本轮改动（因子失效标记）：
+#   - 新增 adj_factors_stale：gbbq 事件差异落库时，同事务标记受影响标的的因子已失效
+#   - 失效标的无论 updated_at 是否为今日，都需要重算；重算走 replace_symbol_factors
+#     （整标的删除旧因子 + 写入新因子 + 清除失效标记，同一事务）
+#
+# 本轮改动（全市场因子物化）：
+#   - 新增 replace_factors_batch：多个标的的整标的替换合并为一个写事务（快照后批量物化使用）
+#   - 单标的替换与批量替换共用 _replace_symbol_factors_rows
+#
+# 本轮改动（因子按市场区分）：
+#   - adj_factors 主键由 (symbol, date) 升级为 (market, symbol, date)：
+#     SH / SZ 同代码标的各自保存因子，批量物化时整标的替换不再互相删除
+#   - 读取接口（select_factors / get_latest_factor_date / get_factors_latest_updated_at）均需 market
+#   - 旧库迁移（ensure_adj_factors_table）：
+#       * symbol 在 symbol_index 中只对应一个市场：旧因子原样迁入该市场
+#       * 对应多个市场：旧因子无法归属，丢弃并标记这些 (market, symbol) 因子失效，等待重算
+#       * symbol_index 中查不到：丢弃（无 updated_at 即视为未就绪，按需重算）
 # ==============================
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+import sqlite3
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
 
-from backend.db.connection import get_conn
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecuteMany, WriteFunc, run_write
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.factors")
 
 
 def compress_factor_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     压缩因子记录：
 
-    规则（按 symbol 独立处理）：
+    规则（按 market + symbol 独立处理）：
       - 按 date 升序排序
       - 第一条记录总是保留
       - 之后仅当 (qfq_factor, hfq_factor) 相对上一条发生变化时才保留
@@ -28,12 +54,12 @@ def compress_factor_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any
 
     grouped: Dict[Any, List[Dict[str, Any]]] = {}
     for rec in records:
-        sym = rec.get('symbol')
-        grouped.setdefault(sym, []).append(rec)
+        key = (rec.get('market'), rec.get('symbol'))
+        grouped.setdefault(key, []).append(rec)
 
     compressed: List[Dict[str, Any]] = []
 
-    for sym, recs in grouped.items():
+    for key, recs in grouped.items():
         try:
             recs_sorted = sorted(recs, key=lambda r: r.get('date', 0))
         except Exception:
@@ -53,9 +79,145 @@ def compress_factor_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any
     return compressed
 
 
+_ADJ_FACTORS_DDL = """
+CREATE TABLE IF NOT EXISTS adj_factors (
+  market     TEXT NOT NULL,
+  symbol     TEXT NOT NULL,
+  date       INTEGER NOT NULL,
+  qfq_factor REAL NOT NULL,
+  hfq_factor REAL NOT NULL,
+  updated_at TEXT,
+  PRIMARY KEY (market, symbol, date)
+);
+"""
+
+
+def _table_columns(cur: sqlite3.Cursor, table: str) -> List[str]:
+    return [str(r[1]) for r in cur.execute(f"PRAGMA table_info({table});").fetchall()]
+
+
+def _migrate_legacy_adj_factors(cur: sqlite3.Cursor) -> None:
+    """旧表 (symbol, date) 主键 -> (market, symbol, date)；见模块头部迁移规则。"""
+    cur.execute("ALTER TABLE adj_factors RENAME TO adj_factors_legacy;")
+    cur.execute("DROP INDEX IF EXISTS idx_adj_factors_symdate;")
+    cur.execute(_ADJ_FACTORS_DDL)
+
+    markets_by_symbol: Dict[str, List[str]] = {}
+    has_index = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='symbol_index';"
+    ).fetchone()
+    if has_index:
+        cur.execute(
+            """
+            SELECT DISTINCT l.symbol, i.market
+            FROM (SELECT DISTINCT symbol FROM adj_factors_legacy) AS l
+            JOIN symbol_index AS i ON i.symbol = l.symbol;
+            """
+        )
+        for sym, market in cur.fetchall():
+            markets_by_symbol.setdefault(str(sym), []).append(str(market).strip().upper())
+
+    unique = [(markets[0], sym) for sym, markets in markets_by_symbol.items() if len(markets) == 1]
+    ambiguous = [(m, sym) for sym, markets in markets_by_symbol.items() if len(markets) > 1 for m in markets]
+
+    cur.execute("CREATE TEMP TABLE adj_factors_market_map (symbol TEXT PRIMARY KEY, market TEXT NOT NULL);")
+    cur.executemany(
+        "INSERT INTO adj_factors_market_map (market, symbol) VALUES (?, ?);",
+        unique,
+    )
+    cur.execute(
+        """
+        INSERT INTO adj_factors (market, symbol, date, qfq_factor, hfq_factor, updated_at)
+        SELECT m.market, l.symbol, l.date, l.qfq_factor, l.hfq_factor, l.updated_at
+        FROM adj_factors_legacy AS l
+        JOIN temp.adj_factors_market_map AS m ON m.symbol = l.symbol;
+        """
+    )
+    migrated = cur.rowcount
+    cur.execute("DROP TABLE temp.adj_factors_market_map;")
+
+    dropped = cur.execute("SELECT COUNT(*) FROM adj_factors_legacy;").fetchone()[0] - max(int(migrated or 0), 0)
+    mark_factors_stale_rows(cur, ambiguous, "market_migration")
+    cur.execute("DROP TABLE adj_factors_legacy;")
+    _LOG.warning(
+        f"[ADJ_FACTORS] migrated to (market, symbol, date) key: "
+        f"series={len(unique)} rows={migrated} dropped_rows={dropped} marked_stale={len(ambiguous)}"
+    )
+
+
+def ensure_adj_factors_table(cur: sqlite3.Cursor) -> None:
+    """复权因子表（含旧库迁移）；依赖 adj_factors_stale，调用前先确保其存在。"""
+    ensure_adj_factors_stale_table(cur)
+    cols = _table_columns(cur, "adj_factors")
+    if cols and "market" not in cols:
+        _migrate_legacy_adj_factors(cur)
+    else:
+        cur.execute(_ADJ_FACTORS_DDL)
+
+
+def ensure_adj_factors_stale_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS adj_factors_stale (
+      market    TEXT NOT NULL,
+      symbol    TEXT NOT NULL,
+      reason    TEXT,
+      marked_at TEXT NOT NULL,
+      PRIMARY KEY (market, symbol)
+    ) WITHOUT ROWID;
+    """)
+
+
+def mark_factors_stale_rows(
+    cur: sqlite3.Cursor,
+    series: Iterable[Tuple[str, str]],
+    reason: str,
+) -> int:
+    """标记若干 (market, symbol) 因子失效（仅在 writer_thread 事务内调用）。返回标记数。"""
+    now = datetime.now().isoformat()
+    rows = [(str(m).strip().upper(), str(s).strip(), reason, now) for m, s in series]
+    if not rows:
+        return 0
+    cur.executemany(
+        """
+        INSERT INTO adj_factors_stale (market, symbol, reason, marked_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(market, symbol) DO UPDATE SET
+            reason=excluded.reason,
+            marked_at=excluded.marked_at;
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def is_factors_stale(market: str, symbol: str) -> bool:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT 1 FROM adj_factors_stale WHERE market=? AND symbol=?;",
+        (str(market or "").strip().upper(), str(symbol or "").strip()),
+    )
+    return cur.fetchone() is not None
+
+
+def select_stale_factor_series(market: Optional[str] = None) -> List[Dict[str, Any]]:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    if market:
+        cur.execute(
+            "SELECT market, symbol, reason, marked_at FROM adj_factors_stale WHERE market=? ORDER BY market, symbol;",
+            (str(market).strip().upper(),),
+        )
+    else:
+        cur.execute("SELECT market, symbol, reason, marked_at FROM adj_factors_stale ORDER BY market, symbol;")
+    return [dict(r) for r in cur.fetchall()]
+
+
 def upsert_factors(records: List[Dict[str, Any]]) -> int:
     """
     批量插入或更新复权因子数据（V2.0 - 稀疏压缩版）。
+
+    每条记录需带 market / symbol / date / qfq_factor / hfq_factor。
     """
     if not records:
         return 0
@@ -64,28 +226,94 @@ def upsert_factors(records: List[Dict[str, Any]]) -> int:
     if not clean_records:
         return 0
 
-    conn = get_conn()
-    cur = conn.cursor()
     now = datetime.now().isoformat()
 
     for rec in clean_records:
+        rec["market"] = str(rec.get("market") or "").strip().upper()
         rec["updated_at"] = now
 
     sql = """
-    INSERT INTO adj_factors (symbol, date, qfq_factor, hfq_factor, updated_at)
-    VALUES (:symbol, :date, :qfq_factor, :hfq_factor, :updated_at)
-    ON CONFLICT(symbol, date) DO UPDATE SET
+    INSERT INTO adj_factors (market, symbol, date, qfq_factor, hfq_factor, updated_at)
+    VALUES (:market, :symbol, :date, :qfq_factor, :hfq_factor, :updated_at)
+    ON CONFLICT(market, symbol, date) DO UPDATE SET
         qfq_factor=excluded.qfq_factor,
         hfq_factor=excluded.hfq_factor,
         updated_at=excluded.updated_at;
     """
 
-    cur.executemany(sql, clean_records)
-    conn.commit()
-    return cur.rowcount
+    return run_write(SqlExecuteMany(sql, clean_records, label="adj_factors.upsert"))
+
+
+def _factor_rows(market: str, symbol: str, records: Iterable[Dict[str, Any]], now: str) -> List[Tuple[Any, ...]]:
+    # 整标的替换只针对一个 (market, symbol)：压缩前统一键，避免记录自带的 market/symbol 拆组
+    recs = [{**r, "market": market, "symbol": symbol} for r in (records or [])]
+    return [
+        (market, symbol, int(r["date"]), float(r["qfq_factor"]), float(r["hfq_factor"]), now)
+        for r in compress_factor_records(recs)
+    ]
+
+
+def _replace_symbol_factors_rows(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbol: str,
+    rows: List[Tuple[Any, ...]],
+) -> int:
+    cur.execute("DELETE FROM adj_factors WHERE market=? AND symbol=?;", (market, symbol))
+    if rows:
+        cur.executemany(
+            "INSERT INTO adj_factors (market, symbol, date, qfq_factor, hfq_factor, updated_at) VALUES (?, ?, ?, ?, ?, ?);",
+            rows,
+        )
+    cur.execute("DELETE FROM adj_factors_stale WHERE market=? AND symbol=?;", (market, symbol))
+    return len(rows)
+
+
+def replace_symbol_factors(market: str, symbol: str, records: List[Dict[str, Any]]) -> int:
+    """
+    整标的替换复权因子：删除旧因子 -> 写入新因子（压缩后）-> 清除失效标记，同一事务。
+
+    说明：
+      - 只删除同一 (market, symbol) 的旧因子；另一市场的同代码标的不受影响
+      - 事件被删除/修订时，旧日期的因子行不会残留
+    """
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    rows = _factor_rows(m, s, records, datetime.now().isoformat())
+
+    def _apply(cur: sqlite3.Cursor) -> int:
+        return _replace_symbol_factors_rows(cur, m, s, rows)
+
+    return int(run_write(WriteFunc(_apply, label="adj_factors.replace_symbol")) or 0)
+
+
+def replace_factors_batch(items: Iterable[Tuple[str, str, List[Dict[str, Any]]]]) -> int:
+    """
+    多标的整标的替换（语义同 replace_symbol_factors），全部在一个写事务内完成。
+
+    Args:
+        items: (market, symbol, records) 序列
+
+    Returns:
+        写入的因子行数（压缩后）
+    """
+    now = datetime.now().isoformat()
+    prepared = []
+    for market, symbol, records in items:
+        m = str(market or "").strip().upper()
+        s = str(symbol or "").strip()
+        prepared.append((m, s, _factor_rows(m, s, records, now)))
+    if not prepared:
+        return 0
+
+    def _apply(cur: sqlite3.Cursor) -> int:
+        return sum(_replace_symbol_factors_rows(cur, m, s, rows) for m, s, rows in prepared)
+
+    return int(run_write(WriteFunc(_apply, label="adj_factors.replace_batch")) or 0)
 
 
 def select_factors(
+    market: str,
     symbol: str,
     start_date: Optional[int] = None,
     end_date: Optional[int] = None
@@ -93,11 +321,11 @@ def select_factors(
     """
     查询复权因子数据（返回稀疏序列）。
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
-    where_clauses = ["symbol=?"]
-    params = [symbol]
+    where_clauses = ["market=?", "symbol=?"]
+    params = [str(market or "").strip().upper(), symbol]
 
     if start_date is not None:
         where_clauses.append("date>=?")
@@ -116,26 +344,29 @@ def select_factors(
     return [dict(r) for r in rows]
 
 
-def get_latest_factor_date(symbol: str) -> Optional[int]:
+def get_latest_factor_date(market: str, symbol: str) -> Optional[int]:
     """
     获取指定标的的最新复权因子日期。
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
-    cur.execute("SELECT MAX(date) FROM adj_factors WHERE symbol=?;", (symbol,))
+    cur.execute(
+        "SELECT MAX(date) FROM adj_factors WHERE market=? AND symbol=?;",
+        (str(market or "").strip().upper(), symbol),
+    )
     result = cur.fetchone()
     return result[0] if result and result[0] else None
 
 
-def get_factors_latest_updated_at(symbol: str) -> Optional[str]:
+def get_factors_latest_updated_at(market: str, symbol: str) -> Optional[str]:
     """
     获取因子的最后更新时间
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
-        "SELECT MAX(updated_at) FROM adj_factors WHERE symbol=?;",
-        (symbol,)
+        "SELECT MAX(updated_at) FROM adj_factors WHERE market=? AND symbol=?;",
+        (str(market or "").strip().upper(), symbol)
     )
     result = cur.fetchone()
     return result[0] if result and result[0] else None
@@ -0,0 +1,112 @@
+# backend/db/file_fingerprints.py
+# ==============================
+# 说明：源文件指纹表（source_file_fingerprints）
+#
+# 职责：
+#   - 记录“最近一次成功导入”的源文件指纹：size / mtime_ns / content_hash / rows
+#   - 供快照类任务判断源文件是否变化：
+#       * size + mtime_ns 一致：视为未变化，不读文件
+#       * 否则比较 content_hash：一致则只刷新 mtime，不重做导入
+#
+# 口径：
+#   - source 为逻辑源名（如 "gbbq"），一个源一行
+#   - 指纹必须与数据在同一写事务内落库（upsert_file_fingerprint_row），
+#     保证“指纹已更新但数据未写入”不会发生
+# ==============================
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+
+
+def ensure_file_fingerprints_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS source_file_fingerprints (
+      source       TEXT PRIMARY KEY,
+      path         TEXT NOT NULL,
+      size         INTEGER NOT NULL,
+      mtime_ns     INTEGER NOT NULL,
+      content_hash TEXT NOT NULL,
+      rows         INTEGER NOT NULL DEFAULT 0,
+      updated_at   TEXT NOT NULL
+    );
+    """)
+
+
+def upsert_file_fingerprint_row(
+    cur: sqlite3.Cursor,
+    source: str,
+    *,
+    path: str,
+    size: int,
+    mtime_ns: int,
+    content_hash: str,
+    rows: int,
+) -> None:
+    """写入一条指纹（仅在 writer_thread 事务内调用）。"""
+    cur.execute(
+        """
+        INSERT INTO source_file_fingerprints (source, path, size, mtime_ns, content_hash, rows, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+            path=excluded.path,
+            size=excluded.size,
+            mtime_ns=excluded.mtime_ns,
+            content_hash=excluded.content_hash,
+            rows=excluded.rows,
+            updated_at=excluded.updated_at;
+        """,
+        (
+            str(source),
+            str(path),
+            int(size),
+            int(mtime_ns),
+            str(content_hash),
+            int(rows),
+            datetime.now().isoformat(),
+        ),
+    )
+
+
+def record_file_fingerprint(
+    source: str,
+    *,
+    path: str,
+    size: int,
+    mtime_ns: int,
+    content_hash: str,
+    rows: int,
+) -> None:
+    """同步入口：单独刷新一条指纹（内容未变、仅 mtime 变化时使用）。"""
+    run_write(WriteFunc(
+        lambda cur: upsert_file_fingerprint_row(
+            cur,
+            source,
+            path=path,
+            size=size,
+            mtime_ns=mtime_ns,
+            content_hash=content_hash,
+            rows=rows,
+        ),
+        label="source_file_fingerprints.record",
+    ))
+
+
+def get_file_fingerprint(source: str) -> Optional[Dict[str, Any]]:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT source, path, size, mtime_ns, content_hash, rows, updated_at
+        FROM source_file_fingerprints
+        WHERE source=?;
+        """,
+        (str(source),),
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
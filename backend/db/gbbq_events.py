@@ -9,13 +9,39 @@
 #   - 该表只存 TDX gbbq 原始事件真相源
 #   - 保持字段尽量原始、稳定、可复用
 #   - 不提前做业务裁剪
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再自行 commit
+#
+# 本轮改动（差异落库）：
+#   - 新增 apply_gbbq_events_diff：只写变化 / 删除消失的事件行，
+#     同一事务内标记受影响标的因子失效、刷新 gbbq 文件指纹
 # ==============================
 
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+import sqlite3
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from backend.db.connection import get_read_conn
+from backend.db.factors import mark_factors_stale_rows
+from backend.db.file_fingerprints import upsert_file_fingerprint_row
+from backend.db.writer_thread import SqlExecuteMany, WriteFunc, run_write
 
-from backend.db.connection import get_conn, get_write_lock
+# (market, symbol, date, category, field1, field2, field3, field4)
+GbbqEventTuple = Tuple[str, str, int, int, Any, Any, Any, Any]
+# (market, symbol, date, category)
+GbbqEventKey = Tuple[str, str, int, int]
+
+_UPSERT_GBBQ_EVENT_TUPLE_SQL = """
+INSERT INTO gbbq_events_raw (market, symbol, date, category, field1, field2, field3, field4)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(market, symbol, date, category) DO UPDATE SET
+    field1=excluded.field1,
+    field2=excluded.field2,
+    field3=excluded.field3,
+    field4=excluded.field4;
+"""
 
 
 def upsert_gbbq_events_raw(records: List[Dict[str, Any]]) -> int:
@@ -96,12 +122,42 @@ def upsert_gbbq_events_raw(records: List[Dict[str, Any]]) -> int:
         field4=excluded.field4;
     """
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.executemany(sql, prepared)
-        conn.commit()
-        return int(cur.rowcount or 0)
+    return int(run_write(SqlExecuteMany(sql, prepared, label="gbbq_events_raw.upsert")) or 0)
+
+
+def apply_gbbq_events_diff(
+    upserts: Sequence[GbbqEventTuple],
+    deletes: Sequence[GbbqEventKey],
+    *,
+    stale_series: Sequence[Tuple[str, str]],
+    fingerprint: Dict[str, Any],
+) -> Dict[str, int]:
+    """
+    差异落库（单事务）：
+      - upserts：新增或字段变化的事件行
+      - deletes：新文件中已不存在的事件键
+      - stale_series：需要重算因子的 (market, symbol)
+      - fingerprint：本次源文件指纹（source / path / size / mtime_ns / content_hash / rows）
+    """
+
+    def _apply(cur: sqlite3.Cursor) -> Dict[str, int]:
+        if upserts:
+            cur.executemany(_UPSERT_GBBQ_EVENT_TUPLE_SQL, list(upserts))
+        if deletes:
+            cur.executemany(
+                "DELETE FROM gbbq_events_raw WHERE market=? AND symbol=? AND date=? AND category=?;",
+                list(deletes),
+            )
+        stale = mark_factors_stale_rows(cur, stale_series, reason="gbbq_changed")
+        fp = dict(fingerprint)
+        upsert_file_fingerprint_row(cur, fp.pop("source"), **fp)
+        return {
+            "upserted": len(upserts),
+            "deleted": len(deletes),
+            "stale_series": stale,
+        }
+
+    return run_write(WriteFunc(_apply, label="gbbq_events_raw.apply_diff"))
 
 
 def select_gbbq_events_raw(
@@ -117,7 +173,7 @@ def select_gbbq_events_raw(
       - market
       - category
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     where = ["1=1"]
@@ -158,7 +214,7 @@ def select_gbbq_events_raw(
 
 
 def get_gbbq_events_row_count() -> int:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute("SELECT COUNT(*) FROM gbbq_events_raw;")
     row = cur.fetchone()
@@ -0,0 +1,99 @@
+# backend/db/import_manifest.py
+# ==============================
+# 说明：盘后导入文件清单表（local_import_file_manifest）
+#
+# 职责：
+#   - 每个 (market, symbol, freq) 记录“最近一次成功导入”时源文件的位置信息：
+#       * path / size / mtime_ns
+#       * offset   ：已导入的字节数（下次从此处继续读）
+#       * tail_hash：offset 之前最后一条 32 字节记录的摘要
+#       * rows     ：最近一次导入解析出的记录数
+#   - 供盘后导入判断能否只读文件尾部新增记录（TDX .day / .lc1 / .lc5 只在末尾追加）
+#
+# 口径：
+#   - 只在数据已成功落库 / 写入归档之后写入；两者之间进程退出只会让下次多读一段，
+#     重复部分由日线 upsert / 分钟归档“只追加超出旧尾部的记录”吸收
+# ==============================
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecuteMany, run_write
+from backend.utils.time import now_iso
+
+
+def ensure_import_manifest_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS local_import_file_manifest (
+      market     TEXT NOT NULL,
+      symbol     TEXT NOT NULL,
+      freq       TEXT NOT NULL,
+      path       TEXT NOT NULL,
+      size       INTEGER NOT NULL,
+      mtime_ns   INTEGER NOT NULL,
+      offset     INTEGER NOT NULL,
+      tail_hash  TEXT NOT NULL,
+      rows       INTEGER NOT NULL DEFAULT 0,
+      updated_at TEXT NOT NULL,
+      PRIMARY KEY (market, symbol, freq)
+    ) WITHOUT ROWID;
+    """)
+
+
+def get_import_manifest(market: str, symbol: str, freq: str) -> Optional[Dict[str, Any]]:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT market, symbol, freq, path, size, mtime_ns, offset, tail_hash, rows, updated_at
+        FROM local_import_file_manifest
+        WHERE market=? AND symbol=? AND freq=?;
+        """,
+        (str(market).upper(), str(symbol), str(freq)),
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def upsert_import_manifests(entries: List[Dict[str, Any]]) -> int:
+    """批量写入清单（entries 字段：market/symbol/freq/path/size/mtime_ns/offset/tail_hash/rows）。"""
+    if not entries:
+        return 0
+
+    now = now_iso()
+    params = [
+        (
+            str(e["market"]).upper(),
+            str(e["symbol"]),
+            str(e["freq"]),
+            str(e["path"]),
+            int(e["size"]),
+            int(e["mtime_ns"]),
+            int(e["offset"]),
+            str(e["tail_hash"]),
+            int(e.get("rows") or 0),
+            now,
+        )
+        for e in entries
+    ]
+    run_write(SqlExecuteMany(
+        """
+        INSERT INTO local_import_file_manifest
+            (market, symbol, freq, path, size, mtime_ns, offset, tail_hash, rows, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(market, symbol, freq) DO UPDATE SET
+            path=excluded.path,
+            size=excluded.size,
+            mtime_ns=excluded.mtime_ns,
+            offset=excluded.offset,
+            tail_hash=excluded.tail_hash,
+            rows=excluded.rows,
+            updated_at=excluded.updated_at;
+        """,
+        params,
+        label="local_import_file_manifest.upsert",
+    ))
+    return len(params)
@@ -0,0 +1,207 @@
+# backend/db/import_scan_snapshot.py
+# ==============================
+# 说明：盘后导入候选扫描快照表（local_import_scan_meta / local_import_scan_files）
+#
+# 职责：
+#   - local_import_scan_meta ：单行（id=1），记录当前快照 version / 是否存在 / generated_at / root_dir
+#   - local_import_scan_files：每个 (market, symbol, freq) 一行，记录扫描到的文件
+#       * ext / file_path / file_name / file_datetime
+#       * size / mtime_ns：扫描时的文件大小与修改时间
+#       * changed_version：该行最近一次新增 / 变化时的快照 version
+#
+# 口径：
+#   - 每次保存快照 version + 1；只写入新增 / 变化的行，删除本次未扫描到的行，未变化的行不动
+#   - “自某次扫描以来变化的文件” = changed_version > since_version
+#   - 清空快照时 version 同样 + 1（不回退），保证依赖 version 的进程内缓存必然失效
+#   - 写线程内缓存上次写入后的文件行（按 version 校验）；表内 version 与缓存一致时差异比较不再整表读取
+# ==============================
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.utils.time import now_iso
+
+# 上次 replace 写入后的完整文件行（仅在写线程内读写）
+_FILES_CACHE: Dict[str, Any] = {"version": None, "files": None}
+
+def ensure_import_scan_snapshot_tables(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS local_import_scan_meta (
+      id           INTEGER PRIMARY KEY CHECK (id = 1),
+      version      INTEGER NOT NULL DEFAULT 0,
+      present      INTEGER NOT NULL DEFAULT 0,
+      generated_at TEXT,
+      root_dir     TEXT,
+      saved_at     TEXT
+    );
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS local_import_scan_files (
+      market          TEXT NOT NULL,
+      symbol          TEXT NOT NULL,
+      freq            TEXT NOT NULL,
+      ext             TEXT NOT NULL,
+      file_path       TEXT NOT NULL,
+      file_name       TEXT NOT NULL,
+      file_datetime   TEXT,
+      size            INTEGER NOT NULL DEFAULT 0,
+      mtime_ns        INTEGER NOT NULL DEFAULT 0,
+      changed_version INTEGER NOT NULL,
+      PRIMARY KEY (market, symbol, freq)
+    ) WITHOUT ROWID;
+    """)
+
+
+def select_import_scan_meta() -> Optional[Dict[str, Any]]:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT version, present, generated_at, root_dir, saved_at
+        FROM local_import_scan_meta
+        WHERE id=1;
+        """
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def select_import_scan_files() -> List[Dict[str, Any]]:
+    """按 (market, symbol, freq) 排序返回全部快照文件。"""
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT market, symbol, freq, ext, file_path, file_name, file_datetime, size, mtime_ns, changed_version
+        FROM local_import_scan_files
+        ORDER BY market ASC, symbol ASC, freq ASC;
+        """
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def replace_import_scan_snapshot(
+    *,
+    generated_at: str,
+    root_dir: str,
+    items: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    以本次扫描结果覆盖快照（增量写入）。
+
+    Args:
+        items: 字段 market/symbol/freq/ext/file_path/file_name/file_datetime/size/mtime_ns
+
+    Returns:
+        {"version", "saved_at", "added", "changed", "removed", "unchanged"}
+    """
+    incoming = {
+        (x["market"], x["symbol"], x["freq"]): (
+            x["ext"], x["file_path"], x["file_name"], x.get("file_datetime"), int(x["size"]), int(x["mtime_ns"])
+        )
+        for x in items
+    }
+    saved_at = now_iso()
+
+    def _apply(cur: sqlite3.Cursor) -> Dict[str, Any]:
+        cur.execute("SELECT version FROM local_import_scan_meta WHERE id=1;")
+        row = cur.fetchone()
+        version = (int(row[0]) if row else 0) + 1
+
+        if row is not None and _FILES_CACHE["version"] == int(row[0]):
+            existing = _FILES_CACHE["files"]
+        else:
+            cur.execute(
+                """
+                SELECT market, symbol, freq, ext, file_path, file_name, file_datetime, size, mtime_ns
+                FROM local_import_scan_files;
+                """
+            )
+            existing = {tuple(r[:3]): tuple(r[3:]) for r in map(tuple, cur.fetchall())}
+        _FILES_CACHE["version"] = None
+
+        upserts = []
+        added = 0
+        for key, values in incoming.items():
+            old = existing.get(key)
+            if old == values:
+                continue
+            if old is None:
+                added += 1
+            upserts.append((*key, *values, version))
+        removed = [key for key in existing if key not in incoming]
+
+        if upserts:
+            cur.executemany(
+                """
+                INSERT INTO local_import_scan_files
+                    (market, symbol, freq, ext, file_path, file_name, file_datetime, size, mtime_ns, changed_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(market, symbol, freq) DO UPDATE SET
+                    ext=excluded.ext,
+                    file_path=excluded.file_path,
+                    file_name=excluded.file_name,
+                    file_datetime=excluded.file_datetime,
+                    size=excluded.size,
+                    mtime_ns=excluded.mtime_ns,
+                    changed_version=excluded.changed_version;
+                """,
+                upserts,
+            )
+        if removed:
+            cur.executemany(
+                "DELETE FROM local_import_scan_files WHERE market=? AND symbol=? AND freq=?;",
+                removed,
+            )
+
+        cur.execute(
+            """
+            INSERT INTO local_import_scan_meta (id, version, present, generated_at, root_dir, saved_at)
+            VALUES (1, ?, 1, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                version=excluded.version,
+                present=1,
+                generated_at=excluded.generated_at,
+                root_dir=excluded.root_dir,
+                saved_at=excluded.saved_at;
+            """,
+            (version, generated_at, root_dir, saved_at),
+        )
+        # 事务若在此之后回滚，表内 version 不变，下次与缓存 version 不一致即回退为整表读取
+        _FILES_CACHE["version"] = version
+        _FILES_CACHE["files"] = incoming
+
+        return {
+            "version": version,
+            "saved_at": saved_at,
+            "added": added,
+            "changed": len(upserts) - added,
+            "removed": len(removed),
+            "unchanged": len(incoming) - len(upserts),
+        }
+
+    return run_write(WriteFunc(_apply, label="local_import_scan_snapshot.replace"))
+
+
+def clear_import_scan_snapshot() -> bool:
+    """清空快照；返回清空前是否存在快照。"""
+
+    def _apply(cur: sqlite3.Cursor) -> bool:
+        cur.execute("SELECT present FROM local_import_scan_meta WHERE id=1;")
+        row = cur.fetchone()
+        cur.execute("DELETE FROM local_import_scan_files;")
+        cur.execute(
+            """
+            UPDATE local_import_scan_meta
+            SET version=version + 1, present=0, generated_at=NULL, root_dir=NULL, saved_at=?
+            WHERE id=1;
+            """,
+            (now_iso(),),
+        )
+        return bool(row and row[0])
+
+    return bool(run_write(WriteFunc(_apply, label="local_import_scan_snapshot.clear")))
@@ -0,0 +1,350 @@
+# backend/db/maintenance.py
+# ==============================
+# 说明：数据库后台维护（WAL 收缩 / 空闲页回收 / 查询统计信息）
+#
+# 背景：
+#   - 写连接已设置 journal_mode=WAL + auto_vacuum=INCREMENTAL，
+#     但若从不执行 checkpoint / incremental_vacuum，大批量导入后 WAL 会膨胀到 GB 级，
+#     读请求需要回溯更长的 WAL，延迟随之上升
+#
+# 维护动作（全部作为 transactional=False 命令经 writer_thread 执行，不与写事务交错）：
+#   - PRAGMA wal_checkpoint(TRUNCATE)：WAL 回写主库并截断为 0
+#   - PRAGMA incremental_vacuum(N)：回收 freelist 空闲页
+#   - PRAGMA optimize：按需刷新查询规划统计
+#   - ANALYZE（仅收盘后完整维护，analysis_limit 限制采样量）
+#
+# 触发时机：
+#   - idle：写线程连续 db_maintenance_idle_seconds 无提交，且 WAL / freelist 超过阈值
+#   - local_import：盘后导入批次结束后（request_db_maintenance 置位，下一轮巡检执行）
+#   - after_close：交易日 db_maintenance_after_close_time 之后执行一次完整维护，
+#     并按 series_summary 统计当日收盘仍未更新的日线标的（stale_day_series 指标）
+#
+# 指标：
+#   - 每轮巡检刷新 WAL 大小 / 页数 / 空闲页；每次维护记录耗时与前后 WAL 大小
+#   - 由 app 的 runtime.metrics 推送读取 metrics_snapshot()
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.db.candles_compact import close_ts_of_date
+from backend.db.connection import get_read_conn
+from backend.db.series_summary import select_stale_series
+from backend.db.writer_thread import WriteFunc, get_db_writer, run_write
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.maintenance")
+
+_ANALYSIS_LIMIT = 1000
+
+
+# ==============================================================================
+# 统计与维护动作（同步）
+# ==============================================================================
+
+def _wal_path() -> str:
+    return f"{settings.db_path}-wal"
+
+
+def _file_size(path: str) -> int:
+    try:
+        return int(os.path.getsize(path))
+    except OSError:
+        return 0
+
+
+def collect_db_stats() -> Dict[str, Any]:
+    """读取库文件 / WAL 大小与页统计（只读连接，不占写线程）。"""
+    cur = get_read_conn().cursor()
+    page_size = int(cur.execute("PRAGMA page_size;").fetchone()[0])
+    page_count = int(cur.execute("PRAGMA page_count;").fetchone()[0])
+    freelist_count = int(cur.execute("PRAGMA freelist_count;").fetchone()[0])
+    cur.close()
+    return {
+        "db_bytes": _file_size(str(settings.db_path)),
+        "wal_bytes": _file_size(_wal_path()),
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+    }
+
+
+def _checkpoint_truncate(cur: sqlite3.Cursor) -> Dict[str, int]:
+    busy, log_frames, checkpointed = cur.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+    return {
+        "busy": int(busy),
+        "log_frames": int(log_frames),
+        "checkpointed_frames": int(checkpointed),
+    }
+
+
+def _incremental_vacuum(cur: sqlite3.Cursor, max_pages: int) -> int:
+    before = int(cur.execute("PRAGMA freelist_count;").fetchone()[0])
+    # 该 PRAGMA 每 step 只回收一页且不返回行，cursor.execute 只会 step 一次；
+    # executescript 走 sqlite3_exec，会一直 step 到执行完毕（仅限事务外调用）
+    cur.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+    after = int(cur.execute("PRAGMA freelist_count;").fetchone()[0])
+    return max(0, before - after)
+
+
+def run_db_maintenance(
+    *,
+    reason: str,
+    checkpoint: bool = True,
+    vacuum: bool = False,
+    optimize: bool = False,
+    analyze: bool = False,
+) -> Dict[str, Any]:
+    """
+    执行一次维护（同步，阻塞至写线程执行完毕）。
+
+    Returns:
+        维护报告：reason / steps / duration_ms / 前后统计
+    """
+    started = time.perf_counter()
+    before = collect_db_stats()
+    steps: Dict[str, Any] = {}
+
+    def _apply(cur: sqlite3.Cursor) -> None:
+        if vacuum:
+            t0 = time.perf_counter()
+            steps["incremental_vacuum"] = {
+                "freed_pages": _incremental_vacuum(cur, settings.db_maintenance_vacuum_max_pages),
+                "duration_ms": int((time.perf_counter() - t0) * 1000),
+            }
+        if analyze:
+            t0 = time.perf_counter()
+            cur.execute(f"PRAGMA analysis_limit={_ANALYSIS_LIMIT};")
+            cur.execute("ANALYZE;")
+            steps["analyze"] = {"duration_ms": int((time.perf_counter() - t0) * 1000)}
+        if optimize:
+            t0 = time.perf_counter()
+            cur.execute("PRAGMA optimize;")
+            steps["optimize"] = {"duration_ms": int((time.perf_counter() - t0) * 1000)}
+        if checkpoint:
+            t0 = time.perf_counter()
+            res = _checkpoint_truncate(cur)
+            res["duration_ms"] = int((time.perf_counter() - t0) * 1000)
+            steps["wal_checkpoint"] = res
+
+    run_write(WriteFunc(_apply, label=f"db_maintenance.{reason}", transactional=False))
+
+    after = collect_db_stats()
+    report = {
+        "reason": reason,
+        "finished_at": datetime.now().isoformat(),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+        "steps": steps,
+        "wal_bytes_before": before["wal_bytes"],
+        "wal_bytes_after": after["wal_bytes"],
+        "freelist_before": before["freelist_count"],
+        "freelist_after": after["freelist_count"],
+        "page_count_after": after["page_count"],
+    }
+    _LOG.info(f"[DB_MAINT] done reason={reason} report={report}")
+    return report
+
+
+def collect_stale_day_series(as_of_ymd: int, sample: int = 20) -> Dict[str, Any]:
+    """
+    收盘后巡检：日线最新时间戳早于 as_of_ymd 收盘的标的（读 series_summary 的 (freq, last_ts) 索引，不扫日线表）。
+    停牌标的同样会列出，结果只用于指标与日志。
+    """
+    rows = select_stale_series("1d", close_ts_of_date(int(as_of_ymd)))
+    return {
+        "as_of": int(as_of_ymd),
+        "count": len(rows),
+        "sample": [f"{r['market']}{r['symbol']}" for r in rows[:sample]],
+    }
+
+
+# ==============================================================================
+# 后台调度
+# ==============================================================================
+
+class DBMaintenanceScheduler:
+    """数据库后台维护调度器（asyncio 循环，维护动作在线程中执行）。"""
+
+    def __init__(self):
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._requested: List[str] = []
+
+        self._last_commit_count = -1
+        self._last_commit_change_at = time.monotonic()
+        self._last_after_close_ymd: Optional[int] = None
+
+        self._stats: Dict[str, Any] = {}
+        self._last_report: Optional[Dict[str, Any]] = None
+        self._stale_day_series: Dict[str, Any] = {}
+        self.runs_total = 0
+        self.failures_total = 0
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    async def start(self) -> None:
+        if self.running or not settings.db_maintenance_enabled:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._loop())
+        _LOG.info("[DB_MAINT] scheduler started")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        _LOG.info("[DB_MAINT] scheduler stopped")
+
+    # ------------------------------------------------------------------
+    # 外部触发
+    # ------------------------------------------------------------------
+    def request(self, reason: str) -> None:
+        """线程安全：请求在下一轮巡检执行一次完整维护（不含 ANALYZE）。"""
+        with self._lock:
+            if reason not in self._requested:
+                self._requested.append(reason)
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        last = self._last_report or {}
+        return {
+            "wal_bytes": self._stats.get("wal_bytes"),
+            "db_bytes": self._stats.get("db_bytes"),
+            "page_count": self._stats.get("page_count"),
+            "freelist_count": self._stats.get("freelist_count"),
+            "runs_total": self.runs_total,
+            "failures_total": self.failures_total,
+            "last_reason": last.get("reason"),
+            "last_duration_ms": last.get("duration_ms"),
+            "last_finished_at": last.get("finished_at"),
+            "stale_day_series": self._stale_day_series.get("count"),
+            "stale_day_as_of": self._stale_day_series.get("as_of"),
+        }
+
+    # ------------------------------------------------------------------
+    # 主循环
+    # ------------------------------------------------------------------
+    async def _loop(self) -> None:
+        while self.running:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                _LOG.error(f"[DB_MAINT] tick failed: {e}")
+            try:
+                await asyncio.sleep(float(settings.db_maintenance_check_interval_seconds))
+            except asyncio.CancelledError:
+                break
+
+    def _writer_idle_seconds(self) -> float:
+        w = get_db_writer()
+        count = int(w.committed_transactions + w.committed_commands)
+        now = time.monotonic()
+        if count != self._last_commit_count or w.queue_size > 0:
+            self._last_commit_count = count
+            self._last_commit_change_at = now
+        return now - self._last_commit_change_at
+
+    def _after_close_due(self) -> Optional[int]:
+        """今日（北京时间）收盘后完整维护是否到期；到期返回今日 YYYYMMDD。"""
+        from backend.db.calendar import is_trading_day
+        from backend.utils.time import now_dt, today_ymd
+
+        today = today_ymd()
+        if self._last_after_close_ymd == today:
+            return None
+        now = now_dt()
+        if f"{now.hour:02d}:{now.minute:02d}" < settings.db_maintenance_after_close_time:
+            return None
+        return today if is_trading_day(today, market="CN") else None
+
+    async def _run(self, **kwargs: Any) -> None:
+        try:
+            report = await asyncio.to_thread(run_db_maintenance, **kwargs)
+            self._last_report = report
+            self.runs_total += 1
+        except Exception as e:
+            self.failures_total += 1
+            _LOG.error(f"[DB_MAINT] run failed reason={kwargs.get('reason')} err={e}")
+
+    async def _tick(self) -> None:
+        self._stats = await asyncio.to_thread(collect_db_stats)
+        idle_for = self._writer_idle_seconds()
+
+        with self._lock:
+            requested = list(self._requested)
+            self._requested.clear()
+
+        if requested:
+            await self._run(
+                reason="+".join(requested),
+                checkpoint=True,
+                vacuum=True,
+                optimize=True,
+            )
+            return
+
+        due_ymd = await asyncio.to_thread(self._after_close_due)
+        if due_ymd is not None:
+            self._last_after_close_ymd = due_ymd
+            await self._run(
+                reason="after_close",
+                checkpoint=True,
+                vacuum=True,
+                optimize=True,
+                analyze=True,
+            )
+            try:
+                self._stale_day_series = await asyncio.to_thread(collect_stale_day_series, due_ymd)
+                _LOG.info(
+                    f"[DB_MAINT] stale day series as_of={due_ymd} count={self._stale_day_series['count']} "
+                    f"sample={self._stale_day_series['sample']}"
+                )
+            except Exception as e:
+                _LOG.error(f"[DB_MAINT] stale day series scan failed: {e}")
+            return
+
+        if idle_for < float(settings.db_maintenance_idle_seconds):
+            return
+
+        wal_due = int(self._stats.get("wal_bytes") or 0) >= int(settings.db_maintenance_wal_checkpoint_mb) * 1024 * 1024
+        vacuum_due = int(self._stats.get("freelist_count") or 0) >= int(settings.db_maintenance_vacuum_freelist_pages)
+        if wal_due or vacuum_due:
+            await self._run(
+                reason="idle",
+                checkpoint=True,
+                vacuum=vacuum_due,
+                optimize=False,
+            )
+
+
+_scheduler: Optional[DBMaintenanceScheduler] = None
+
+
+def get_db_maintenance() -> DBMaintenanceScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = DBMaintenanceScheduler()
+    return _scheduler
+
+
+def request_db_maintenance(reason: str) -> None:
+    """请求一次维护（盘后导入批次结束等场景调用）。"""
+    get_db_maintenance().request(reason)
@@ -15,11 +15,56 @@
 # 说明：
 #   - 只对批量快照表做去冗余收口
 #   - 逐行/分批写入表保留各自时间字段
+#
+# 本轮改动（日线列式打包存储）：
+#   - 新增表11 candles_day_packed：(market, symbol, year) 一行，列数组打包为 BLOB
+#   - 该表为 candles_day_raw 的派生读取加速层，可由 settings 开关启停
+#
+# 本轮改动（日线紧凑整数存储）：
+#   - day_bars_storage_schema="compact" 时创建 candles_day_compact（表12）
+#   - raw 模式下该表只由迁移工具创建（python -m backend.db.candles_compact --migrate）
+#
+# 本轮改动（序列摘要）：
+#   - 新增表13 series_summary：(market, symbol, freq) 的 first_ts / last_ts / rows / version
+#
+# 本轮改动（gbbq 变化感知）：
+#   - 新增表14 source_file_fingerprints：源文件 size / mtime_ns / content_hash 指纹
+#   - 新增表15 adj_factors_stale：事件差异涉及的标的因子失效标记
+#
+# 本轮改动（盘后导入增量读取）：
+#   - 新增表16 local_import_file_manifest：(market, symbol, freq) 已导入文件的 size / mtime / offset / 尾记录摘要
+#
+# 本轮改动（候选扫描快照入库）：
+#   - 新增表17 local_import_scan_meta / local_import_scan_files：候选扫描快照（替代 JSON 快照文件，增量写入）
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 表9 local_import_tasks 新增 checkpoint_offset：分块导入已合并到的源文件偏移（断点续做）
+#   - 旧库缺少该列时自动 ALTER TABLE 补齐
+#
+# 本轮改动（分钟归档巡检）：
+#   - 新增表18 minute_archive_scrub_report：每个分钟归档文件最近一次巡检结果（合法性 / 顺序 / 内部缺口）
+#
+# 本轮改动（因子按市场区分）：
+#   - 表2 adj_factors 主键升级为 (market, symbol, date)，建表与旧库迁移统一由 factors.ensure_adj_factors_table 负责
 # ==============================
 
 from __future__ import annotations
 
 from backend.db.connection import get_conn
+from backend.db.candles_compact import ensure_compact_table, is_compact_schema_active
+from backend.db.series_summary import ensure_series_summary_table
+from backend.db.file_fingerprints import ensure_file_fingerprints_table
+from backend.db.factors import ensure_adj_factors_stale_table, ensure_adj_factors_table
+from backend.db.import_manifest import ensure_import_manifest_table
+from backend.db.import_scan_snapshot import ensure_import_scan_snapshot_tables
+from backend.db.archive_scrub_report import ensure_archive_scrub_report_table
+
+def _ensure_column(cur, table: str, column: str, decl: str) -> None:
+    """旧库补列（CREATE TABLE IF NOT EXISTS 不会为已存在的表新增列）。"""
+    cols = {str(r[1]) for r in cur.execute(f"PRAGMA table_info({table});").fetchall()}
+    if column not in cols:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl};")
+
 
 def init_schema() -> None:
     conn = get_conn()
@@ -41,21 +86,8 @@ def init_schema() -> None:
     ) WITHOUT ROWID;
     """)
 
-    # ===== 表2：复权因子 =====
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS adj_factors (
-      symbol     TEXT NOT NULL,
-      date       INTEGER NOT NULL,
-      qfq_factor REAL NOT NULL,
-      hfq_factor REAL NOT NULL,
-      updated_at TEXT,
-      PRIMARY KEY (symbol, date)
-    );
-    """)
-    cur.execute("""
-    CREATE INDEX IF NOT EXISTS idx_adj_factors_symdate
-      ON adj_factors(symbol, date);
-    """)
+    # ===== 表2：复权因子（(market, symbol, date) 主键；旧 symbol 主键库在此迁移）=====
+    ensure_adj_factors_table(cur)
 
     # ===== 表3：标的索引（批量快照表，删除逐行 updated_at）=====
     cur.execute("""
@@ -200,12 +232,14 @@ def init_schema() -> None:
       source_file_path TEXT,
       started_at       TEXT,
       finished_at      TEXT,
+      checkpoint_offset INTEGER NOT NULL DEFAULT 0,
       UNIQUE(batch_id, market, symbol, freq),
       FOREIGN KEY (batch_id) REFERENCES local_import_batches (batch_id)
         ON DELETE CASCADE
         ON UPDATE CASCADE
     );
     """)
+    _ensure_column(cur, "local_import_tasks", "checkpoint_offset", "INTEGER NOT NULL DEFAULT 0")
     cur.execute("""
     CREATE INDEX IF NOT EXISTS idx_local_import_tasks_batch_state
       ON local_import_tasks(batch_id, state, id);
@@ -230,6 +264,69 @@ def init_schema() -> None:
     );
     """)
 
+    # ==========================================================
+    # 表11：日线列式打包存储（派生读取加速层，可选）
+    # ==========================================================
+    # 说明：
+    #   - 每行 = 某标的某自然年的全部日线
+    #   - ts 为 int64 小端数组，其余列为 float64 小端数组（amount 缺失为 NaN）
+    #   - BLOB 体积较大，因此不使用 WITHOUT ROWID
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS candles_day_packed (
+      market TEXT NOT NULL,
+      symbol TEXT NOT NULL,
+      year   INTEGER NOT NULL,
+      n      INTEGER NOT NULL,
+      ts     BLOB NOT NULL,
+      open   BLOB NOT NULL,
+      high   BLOB NOT NULL,
+      low    BLOB NOT NULL,
+      close  BLOB NOT NULL,
+      volume BLOB NOT NULL,
+      amount BLOB NOT NULL,
+      PRIMARY KEY (market, symbol, year)
+    );
+    """)
+
+    # ==========================================================
+    # 表12：日线紧凑整数存储（day_bars_storage_schema="compact" 时生效）
+    # ==========================================================
+    if is_compact_schema_active():
+        ensure_compact_table(cur)
+
+    # ==========================================================
+    # 表13：序列摘要（写入即维护的派生表）
+    # ==========================================================
+    # 说明：
+    #   - 每个 (market, symbol, freq) 一行：首尾时间戳 / 行数 / 版本号
+    #   - 日线由写入钩子同事务维护；分钟线由归档写入后刷新
+    ensure_series_summary_table(cur)
+
+    # ==========================================================
+    # 表14：源文件指纹（快照类任务的变化检测）
+    # ==========================================================
+    ensure_file_fingerprints_table(cur)
+
+    # ==========================================================
+    # 表15：复权因子失效标记（gbbq 事件差异驱动的按标的重算）
+    # ==========================================================
+    ensure_adj_factors_stale_table(cur)
+
+    # ==========================================================
+    # 表16：盘后导入文件清单（增量读取的续读位置）
+    # ==========================================================
+    ensure_import_manifest_table(cur)
+
+    # ==========================================================
+    # 表17：盘后导入候选扫描快照（meta 单行 + 每文件一行）
+    # ==========================================================
+    ensure_import_scan_snapshot_tables(cur)
+
+    # ==========================================================
+    # 表18：分钟归档巡检报告（每个归档文件最近一次巡检结果）
+    # ==========================================================
+    ensure_archive_scrub_report_table(cur)
+
     conn.commit()
 
 def ensure_initialized() -> None:
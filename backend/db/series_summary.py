@@ -0,0 +1,354 @@
+# backend/db/series_summary.py
+# ==============================
+# 说明：序列摘要表（series_summary）
+#
+# 职责：
+#   - 每个 (market, symbol, freq) 一行：first_ts / last_ts / rows / version
+#   - 写入即维护：
+#       * 1d：写入前 count_new_day_rows 只点查本批键得出新增行数，写入后 apply_day_summary_deltas
+#         在同一写事务内增量更新（rows 累加、first/last 取并集）；尚无摘要的标的全量重算一次
+#       * 1m / 5m：分钟归档文件写入完成后立即刷新（经 writer_thread）
+#   - 读取 O(1)：最新时间戳、覆盖范围、缓存失效版本号、陈旧标的查询
+#
+# 口径：
+#   - ts 统一为毫秒时间戳：日线为收盘时刻，分钟线为该分钟 bar 的结束时刻
+#   - version 每次该序列被写入即 +1（内容修订但行数不变同样递增），供缓存失效比对
+#   - 摘要是派生数据：缺失时调用方应回退到真相源；可全量重建：
+#       python -m backend.db.series_summary --rebuild
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.db.candles_compact import close_ts_of_date, date_of_ts, is_compact_schema_active
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.series_summary")
+
+_UPSERT_SERIES_SUMMARY_SQL = """
+INSERT INTO series_summary (
+    market, symbol, freq,
+    first_ts, last_ts, rows,
+    version, updated_at
+)
+VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT(market, symbol, freq) DO UPDATE SET
+    first_ts=excluded.first_ts,
+    last_ts=excluded.last_ts,
+    rows=excluded.rows,
+    version=series_summary.version + 1,
+    updated_at=excluded.updated_at;
+"""
+
+
+def ensure_series_summary_table(cur: sqlite3.Cursor) -> None:
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS series_summary (
+      market     TEXT NOT NULL,
+      symbol     TEXT NOT NULL,
+      freq       TEXT NOT NULL,
+      first_ts   INTEGER NOT NULL,
+      last_ts    INTEGER NOT NULL,
+      rows       INTEGER NOT NULL,
+      version    INTEGER NOT NULL DEFAULT 1,
+      updated_at TEXT NOT NULL,
+      PRIMARY KEY (market, symbol, freq)
+    ) WITHOUT ROWID;
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_series_summary_freq_last
+    ON series_summary(freq, last_ts);
+    """)
+
+
+# ==============================================================================
+# 写入侧（仅在 writer_thread 事务内调用）
+# ==============================================================================
+
+def upsert_series_summary_row(
+    cur: sqlite3.Cursor,
+    market: str,
+    symbol: str,
+    freq: str,
+    first_ts: Optional[int],
+    last_ts: Optional[int],
+    rows: int,
+) -> None:
+    """写入一条摘要；rows<=0 视为序列已空，直接删除。"""
+    if rows <= 0 or first_ts is None or last_ts is None:
+        cur.execute(
+            "DELETE FROM series_summary WHERE market=? AND symbol=? AND freq=?;",
+            (market, symbol, freq),
+        )
+        return
+    cur.execute(
+        _UPSERT_SERIES_SUMMARY_SQL,
+        (market, symbol, freq, int(first_ts), int(last_ts), int(rows), datetime.now().isoformat()),
+    )
+
+
+def _day_series_stats(cur: sqlite3.Cursor, market: str, symbol: str) -> Tuple[int, Optional[int], Optional[int]]:
+    if is_compact_schema_active():
+        cur.execute(
+            "SELECT COUNT(*), MIN(date), MAX(date) FROM candles_day_compact WHERE market=? AND symbol=?;",
+            (market, symbol),
+        )
+        n, lo, hi = cur.fetchone()
+        if not n:
+            return 0, None, None
+        return int(n), close_ts_of_date(int(lo)), close_ts_of_date(int(hi))
+
+    cur.execute(
+        "SELECT COUNT(*), MIN(ts), MAX(ts) FROM candles_day_raw WHERE market=? AND symbol=?;",
+        (market, symbol),
+    )
+    n, lo, hi = cur.fetchone()
+    if not n:
+        return 0, None, None
+    return int(n), int(lo), int(hi)
+
+
+DaySummaryDelta = Optional[Tuple[int, int, int]]
+
+_EXISTING_KEYS_CHUNK = 500
+
+
+def count_new_day_rows(
+    cur: sqlite3.Cursor,
+    keys: Iterable[Tuple[str, str, int]],
+) -> Dict[Tuple[str, str], DaySummaryDelta]:
+    """
+    日线写入前调用：按标的算出本批写入对摘要的增量（只按本批键做主键点查，不扫整段历史）。
+
+    Returns:
+        {(market, symbol): (new_rows, batch_first_ts, batch_last_ts)}；
+        标的尚无摘要时为 None（写入后需按生效表全量重算一次）
+    """
+    compact = is_compact_schema_active()
+    table, col = ("candles_day_compact", "date") if compact else ("candles_day_raw", "ts")
+
+    by_series: Dict[Tuple[str, str], set] = {}
+    for m, s, ts in keys:
+        by_series.setdefault((m, s), set()).add(date_of_ts(int(ts)) if compact else int(ts))
+
+    out: Dict[Tuple[str, str], DaySummaryDelta] = {}
+    for (m, s), ks in by_series.items():
+        cur.execute(
+            "SELECT first_ts, last_ts FROM series_summary WHERE market=? AND symbol=? AND freq='1d';",
+            (m, s),
+        )
+        row = cur.fetchone()
+        if row is None:
+            out[(m, s)] = None
+            continue
+
+        lo, hi = int(row[0]), int(row[1])
+        if compact:
+            lo, hi = date_of_ts(lo), date_of_ts(hi)
+        # 摘要范围外的键必然是新行，只需点查范围内的键
+        inside = sorted(k for k in ks if lo <= k <= hi)
+        existing = 0
+        for i in range(0, len(inside), _EXISTING_KEYS_CHUNK):
+            chunk = inside[i:i + _EXISTING_KEYS_CHUNK]
+            cur.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE market=? AND symbol=? AND {col} IN ({','.join('?' * len(chunk))});",
+                (m, s, *chunk),
+            )
+            existing += int(cur.fetchone()[0])
+
+        k_min, k_max = min(ks), max(ks)
+        if compact:
+            k_min, k_max = close_ts_of_date(k_min), close_ts_of_date(k_max)
+        out[(m, s)] = (len(ks) - existing, k_min, k_max)
+    return out
+
+
+def apply_day_summary_deltas(cur: sqlite3.Cursor, deltas: Dict[Tuple[str, str], DaySummaryDelta]) -> int:
+    """
+    日线写入后调用：按 count_new_day_rows 的结果增量更新 1d 摘要（rows / first_ts / last_ts / version）。
+    无摘要的标的按生效表全量重算一次，此后即走增量。返回处理的标的数。
+    """
+    missing: List[Tuple[str, str]] = []
+    for (m, s), delta in deltas.items():
+        if delta is None:
+            missing.append((m, s))
+            continue
+        new_rows, b_first, b_last = delta
+        cur.execute(
+            "SELECT first_ts, last_ts, rows FROM series_summary WHERE market=? AND symbol=? AND freq='1d';",
+            (m, s),
+        )
+        row = cur.fetchone()
+        if row is None:
+            missing.append((m, s))
+            continue
+        upsert_series_summary_row(
+            cur, m, s, "1d",
+            min(int(row[0]), b_first),
+            max(int(row[1]), b_last),
+            int(row[2]) + new_rows,
+        )
+    if missing:
+        refresh_day_series_summary(cur, missing)
+    return len(deltas)
+
+
+def refresh_day_series_summary(cur: sqlite3.Cursor, series: Iterable[Tuple[str, str]]) -> int:
+    """
+    按日线生效表重算若干标的的 1d 摘要（主键范围扫描，单标的亚毫秒级）。
+    返回刷新的标的数。
+    """
+    count = 0
+    for market, symbol in series:
+        n, lo, hi = _day_series_stats(cur, market, symbol)
+        upsert_series_summary_row(cur, market, symbol, "1d", lo, hi, n)
+        count += 1
+    return count
+
+
+def record_series_summary(
+    market: str,
+    symbol: str,
+    freq: str,
+    first_ts: Optional[int],
+    last_ts: Optional[int],
+    rows: int,
+) -> None:
+    """同步入口：经 writer_thread 写入一条摘要（分钟归档写入后调用）。"""
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+    run_write(WriteFunc(
+        lambda cur: upsert_series_summary_row(cur, m, s, f, first_ts, last_ts, rows),
+        label="series_summary.record",
+    ))
+
+
+# ==============================================================================
+# 读取侧
+# ==============================================================================
+
+_SELECT_COLUMNS = "market, symbol, freq, first_ts, last_ts, rows, version, updated_at"
+
+
+def get_series_summary(market: str, symbol: str, freq: str) -> Optional[Dict[str, Any]]:
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {_SELECT_COLUMNS} FROM series_summary WHERE market=? AND symbol=? AND freq=?;",
+        (str(market or "").strip().upper(), str(symbol or "").strip(), str(freq or "").strip()),
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def get_series_version(market: str, symbol: str, freq: str) -> int:
+    """序列版本号；无摘要时返回 0。"""
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT version FROM series_summary WHERE market=? AND symbol=? AND freq=?;",
+        (str(market or "").strip().upper(), str(symbol or "").strip(), str(freq or "").strip()),
+    )
+    row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def select_stale_series(
+    freq: str,
+    before_ts: int,
+    market: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """last_ts < before_ts 的序列（走 (freq, last_ts) 索引）。"""
+    where = ["freq=?", "last_ts<?"]
+    params: List[Any] = [str(freq).strip(), int(before_ts)]
+    if market:
+        where.append("market=?")
+        params.append(str(market).strip().upper())
+
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT {_SELECT_COLUMNS}
+        FROM series_summary
+        WHERE {' AND '.join(where)}
+        ORDER BY last_ts ASC, market, symbol;
+        """,
+        params,
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+# ==============================================================================
+# 全量重建
+# ==============================================================================
+
+def rebuild_day_series_summary(market: Optional[str] = None) -> int:
+    """从日线生效表一次 GROUP BY 重建全部 1d 摘要。返回标的数。"""
+
+    def _apply(cur: sqlite3.Cursor) -> int:
+        where_sql = "WHERE market=?" if market else ""
+        params = (str(market).strip().upper(),) if market else ()
+        if is_compact_schema_active():
+            cur.execute(
+                f"""
+                SELECT market, symbol, COUNT(*), MIN(date), MAX(date)
+                FROM candles_day_compact {where_sql}
+                GROUP BY market, symbol;
+                """,
+                params,
+            )
+            stats = [
+                (m, s, int(n), close_ts_of_date(int(lo)), close_ts_of_date(int(hi)))
+                for m, s, n, lo, hi in cur.fetchall()
+            ]
+        else:
+            cur.execute(
+                f"""
+                SELECT market, symbol, COUNT(*), MIN(ts), MAX(ts)
+                FROM candles_day_raw {where_sql}
+                GROUP BY market, symbol;
+                """,
+                params,
+            )
+            stats = [(m, s, int(n), int(lo), int(hi)) for m, s, n, lo, hi in cur.fetchall()]
+
+        cur.execute(
+            f"DELETE FROM series_summary WHERE freq='1d' {'AND market=?' if market else ''};",
+            params,
+        )
+        for m, s, n, lo, hi in stats:
+            upsert_series_summary_row(cur, m, s, "1d", lo, hi, n)
+        return len(stats)
+
+    n = run_write(WriteFunc(_apply, label="series_summary.rebuild_day"))
+    _LOG.info(f"[SERIES_SUMMARY] rebuild 1d done series={n}")
+    return int(n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="series_summary 维护工具")
+    parser.add_argument("--rebuild", action="store_true", help="从日线表与分钟归档全量重建")
+    parser.add_argument("--market", default=None)
+    args = parser.parse_args()
+
+    from backend.db.schema import ensure_initialized
+    ensure_initialized()
+
+    if args.rebuild:
+        from backend.services.minute_archive.summary import rebuild_minute_series_summary
+
+        n_day = rebuild_day_series_summary(market=args.market)
+        n_min = rebuild_minute_series_summary(market=args.market)
+        print(f"rebuilt day_series={n_day} minute_series={n_min}")
+
+
+if __name__ == "__main__":
+    main()
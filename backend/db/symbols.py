@@ -10,6 +10,13 @@
 #   - symbol_index / symbol_profile 作为批量快照表
 #   - 删除逐行 updated_at 写入
 #   - 最近同步时间统一由 data_task_status 承担
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 提交；校验/组装在调用方线程完成
+#
+# 本轮改动（候选视图缓存）：
+#   - symbol_index 进程内版本号：每次 upsert_symbol_index 成功后递增，
+#     供依赖 symbol_index 的派生视图（如盘后导入候选列表）判断缓存是否失效
 # ==============================
 
 from __future__ import annotations
@@ -17,7 +24,10 @@ from __future__ import annotations
 from typing import List, Dict, Any, Optional, Iterable
 import json
 
-from backend.db.connection import get_conn, get_write_lock
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecuteMany, WriteFunc, run_write
+
+_SYMBOL_INDEX_VERSION = 0
 
 
 # ==============================================================================
@@ -40,74 +50,76 @@ def upsert_symbol_index(rows: Iterable[Dict[str, Any]]) -> int:
     if not rows:
         return 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-
-        sql = """
-        INSERT INTO symbol_index(
-            symbol,
-            name,
-            market,
-            class,
-            type,
-            listing_date
-        )
-        VALUES (
-            :symbol,
-            :name,
-            :market,
-            :class,
-            :type,
-            :listing_date
-        )
-        ON CONFLICT(symbol, market) DO UPDATE SET
-          name         = excluded.name,
-          class        = excluded.class,
-          type         = excluded.type,
-          listing_date = COALESCE(excluded.listing_date, symbol_index.listing_date);
-        """
-
-        prepared: List[Dict[str, Any]] = []
-
-        for row in rows:
-            if not isinstance(row, dict):
-                raise TypeError(
-                    f"upsert_symbol_index expects dict rows, got {type(row).__name__}"
-                )
-
-            symbol = str(row.get("symbol") or "").strip()
-            name = str(row.get("name") or "").strip()
-            market = str(row.get("market") or "").strip().upper()
-
-            if not symbol:
-                raise ValueError("upsert_symbol_index: symbol is required")
-            if market not in ("SH", "SZ", "BJ"):
-                raise ValueError(f"upsert_symbol_index: invalid market={market!r}")
-            if not name:
-                raise ValueError("upsert_symbol_index: name is required")
-
-            listing_date = row.get("listing_date")
-            if listing_date in ("", None):
+    sql = """
+    INSERT INTO symbol_index(
+        symbol,
+        name,
+        market,
+        class,
+        type,
+        listing_date
+    )
+    VALUES (
+        :symbol,
+        :name,
+        :market,
+        :class,
+        :type,
+        :listing_date
+    )
+    ON CONFLICT(symbol, market) DO UPDATE SET
+      name         = excluded.name,
+      class        = excluded.class,
+      type         = excluded.type,
+      listing_date = COALESCE(excluded.listing_date, symbol_index.listing_date);
+    """
+
+    prepared: List[Dict[str, Any]] = []
+
+    for row in rows:
+        if not isinstance(row, dict):
+            raise TypeError(
+                f"upsert_symbol_index expects dict rows, got {type(row).__name__}"
+            )
+
+        symbol = str(row.get("symbol") or "").strip()
+        name = str(row.get("name") or "").strip()
+        market = str(row.get("market") or "").strip().upper()
+
+        if not symbol:
+            raise ValueError("upsert_symbol_index: symbol is required")
+        if market not in ("SH", "SZ", "BJ"):
+            raise ValueError(f"upsert_symbol_index: invalid market={market!r}")
+        if not name:
+            raise ValueError("upsert_symbol_index: name is required")
+
+        listing_date = row.get("listing_date")
+        if listing_date in ("", None):
+            listing_date = None
+        else:
+            try:
+                listing_date = int(listing_date)
+            except Exception:
                 listing_date = None
-            else:
-                try:
-                    listing_date = int(listing_date)
-                except Exception:
-                    listing_date = None
-
-            prepared.append({
-                "symbol": symbol,
-                "name": name,
-                "market": market,
-                "class": row.get("class"),
-                "type": row.get("type"),
-                "listing_date": listing_date,
-            })
-
-        cur.executemany(sql, prepared)
-        conn.commit()
-        return cur.rowcount
+
+        prepared.append({
+            "symbol": symbol,
+            "name": name,
+            "market": market,
+            "class": row.get("class"),
+            "type": row.get("type"),
+            "listing_date": listing_date,
+        })
+
+    global _SYMBOL_INDEX_VERSION
+    written = run_write(SqlExecuteMany(sql, prepared, label="symbol_index.upsert"))
+    _SYMBOL_INDEX_VERSION += 1
+    return written
+
+
+def get_symbol_index_version() -> int:
+    """symbol_index 进程内版本号（仅用于判断派生缓存是否失效，不持久化）。"""
+    return _SYMBOL_INDEX_VERSION
 
 
 def select_symbol_index(
@@ -127,7 +139,7 @@ def select_symbol_index(
       - market_filter: 市场（与 market 二选一即可，保留兼容调用语义）
       - class_filter: 大类
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     where_clauses = []
@@ -173,7 +185,7 @@ def get_listing_date(symbol: str, market: str) -> Optional[int]:
     """
     获取指定标的（symbol + market）的上市日期。
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT listing_date FROM symbol_index WHERE symbol=? AND market=?;",
@@ -194,75 +206,73 @@ def upsert_symbol_profile(profiles: List[Dict[str, Any]]) -> int:
     if not profiles:
         return 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-
-        sql = """
-        INSERT INTO symbol_profile (
-            symbol,
-            market,
-            float_shares,
-            float_value,
-            industry,
-            region,
-            concepts
-        )
-        VALUES (
-            :symbol,
-            :market,
-            :float_shares,
-            :float_value,
-            :industry,
-            :region,
-            :concepts
-        )
-        ON CONFLICT(symbol, market) DO UPDATE SET
-            float_shares = COALESCE(excluded.float_shares, symbol_profile.float_shares),
-            float_value  = COALESCE(excluded.float_value,  symbol_profile.float_value),
-            industry     = COALESCE(excluded.industry,     symbol_profile.industry),
-            region       = COALESCE(excluded.region,       symbol_profile.region),
-            concepts     = COALESCE(excluded.concepts,     symbol_profile.concepts);
-        """
-
-        prepared: List[Dict[str, Any]] = []
-
-        for p in profiles:
-            if not isinstance(p, dict):
-                raise TypeError(
-                    f"upsert_symbol_profile expects dict profiles, got {type(p).__name__}"
-                )
-
-            symbol = str(p.get("symbol") or "").strip()
-            market = str(p.get("market") or "").strip().upper()
-
-            if not symbol:
-                raise ValueError("upsert_symbol_profile: symbol is required")
-            if market not in ("SH", "SZ", "BJ"):
-                raise ValueError(f"upsert_symbol_profile: invalid market={market!r}")
-
-            record: Dict[str, Any] = {
-                "symbol": symbol,
-                "market": market,
-                "float_shares": p.get("float_shares"),
-                "float_value": p.get("float_value"),
-                "industry": p.get("industry"),
-                "region": p.get("region"),
-            }
-
-            concepts_val = p.get("concepts")
-            if isinstance(concepts_val, list):
-                record["concepts"] = json.dumps(concepts_val, ensure_ascii=False)
-            elif isinstance(concepts_val, str):
-                record["concepts"] = concepts_val
-            else:
-                record["concepts"] = None
-
-            prepared.append(record)
-
-        if not prepared:
-            return 0
+    sql = """
+    INSERT INTO symbol_profile (
+        symbol,
+        market,
+        float_shares,
+        float_value,
+        industry,
+        region,
+        concepts
+    )
+    VALUES (
+        :symbol,
+        :market,
+        :float_shares,
+        :float_value,
+        :industry,
+        :region,
+        :concepts
+    )
+    ON CONFLICT(symbol, market) DO UPDATE SET
+        float_shares = COALESCE(excluded.float_shares, symbol_profile.float_shares),
+        float_value  = COALESCE(excluded.float_value,  symbol_profile.float_value),
+        industry     = COALESCE(excluded.industry,     symbol_profile.industry),
+        region       = COALESCE(excluded.region,       symbol_profile.region),
+        concepts     = COALESCE(excluded.concepts,     symbol_profile.concepts);
+    """
 
+    prepared: List[Dict[str, Any]] = []
+
+    for p in profiles:
+        if not isinstance(p, dict):
+            raise TypeError(
+                f"upsert_symbol_profile expects dict profiles, got {type(p).__name__}"
+            )
+
+        symbol = str(p.get("symbol") or "").strip()
+        market = str(p.get("market") or "").strip().upper()
+
+        if not symbol:
+            raise ValueError("upsert_symbol_profile: symbol is required")
+        if market not in ("SH", "SZ", "BJ"):
+            raise ValueError(f"upsert_symbol_profile: invalid market={market!r}")
+
+        record: Dict[str, Any] = {
+            "symbol": symbol,
+            "market": market,
+            "float_shares": p.get("float_shares"),
+            "float_value": p.get("float_value"),
+            "industry": p.get("industry"),
+            "region": p.get("region"),
+        }
+
+        concepts_val = p.get("concepts")
+        if isinstance(concepts_val, list):
+            record["concepts"] = json.dumps(concepts_val, ensure_ascii=False)
+        elif isinstance(concepts_val, str):
+            record["concepts"] = concepts_val
+        else:
+            record["concepts"] = None
+
+        prepared.append(record)
+
+    if not prepared:
+        return 0
+
+    def _apply(cur) -> int:
+        # 只写入 symbol_index 中真实存在的联合键（与写入同一事务内判定）
         cur.execute("SELECT symbol, market FROM symbol_index;")
         valid_keys = {
             (str(row[0]).strip(), str(row[1]).strip().upper())
@@ -278,15 +288,16 @@ def upsert_symbol_profile(profiles: List[Dict[str, Any]]) -> int:
             return 0
 
         cur.executemany(sql, filtered_profiles)
-        conn.commit()
         return cur.rowcount
 
+    return run_write(WriteFunc(_apply, label="symbol_profile.upsert"))
+
 
 def select_symbol_profile(symbol: str, market: str) -> Optional[Dict[str, Any]]:
     """
     查询单个标的的详细档案（按联合主键）。
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT * FROM symbol_profile WHERE symbol=? AND market=?;",
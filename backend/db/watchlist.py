@@ -12,6 +12,9 @@
 #   - delete_watchlist
 #   - select_user_watchlist
 #   - select_user_watchlist_with_details
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再自行 commit
 # ==============================
 
 from __future__ import annotations
@@ -19,7 +22,8 @@ from typing import List, Dict, Any
 from datetime import datetime
 import json
 
-from backend.db.connection import get_conn
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecute, run_write
 
 def insert_watchlist(
     symbol: str,
@@ -43,7 +47,7 @@ def insert_watchlist(
     if not s or not m:
         return False
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     now = datetime.now().isoformat()
 
@@ -62,7 +66,7 @@ def insert_watchlist(
     tags_json = json.dumps(tags, ensure_ascii=False) if tags else None
 
     try:
-        cur.execute(
+        run_write(SqlExecute(
             """
             INSERT INTO user_watchlist (
                 symbol, market, added_at, source, note, tags, sort_order, updated_at
@@ -74,9 +78,9 @@ def insert_watchlist(
                 sort_order=excluded.sort_order,
                 updated_at=excluded.updated_at;
             """,
-            (s, m, now, source, note, tags_json, sort_order, now)
-        )
-        conn.commit()
+            (s, m, now, source, note, tags_json, sort_order, now),
+            label="user_watchlist.upsert",
+        ))
         return True
     except Exception:
         return False
@@ -91,20 +95,18 @@ def delete_watchlist(symbol: str, market: str) -> bool:
     if not s or not m:
         return False
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    affected = run_write(SqlExecute(
         "DELETE FROM user_watchlist WHERE symbol=? AND market=?;",
         (s, m),
-    )
-    conn.commit()
-    return cur.rowcount > 0
+        label="user_watchlist.delete",
+    ))
+    return affected > 0
 
 def select_user_watchlist() -> List[Dict[str, Any]]:
     """
     查询用户自选池的所有标的（双主键版）
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -137,7 +139,7 @@ def select_user_watchlist_with_details() -> List[Dict[str, Any]]:
       - symbol, market, added_at, source, note, tags, sort_order, updated_at
       - name, class, type, listing_date
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     cur.execute("""
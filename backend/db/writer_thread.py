@@ -0,0 +1,405 @@
+# backend/db/writer_thread.py
+# ==============================
+# 说明：SQLite 单写线程（所有写入的唯一出口）
+#
+# 职责：
+#   - 持有写连接 get_conn()，是进程内唯一执行写 SQL 的线程
+#   - 接收“类型化写命令”（SqlExecute / SqlExecuteMany / WriteFunc）
+#   - 把不同来源的写命令合并进同一个事务提交：
+#       * 单事务最多 settings.db_writer_max_batch_commands 条命令
+#       * 命令从入队到提交最多等待 settings.db_writer_max_latency_ms
+#   - 每条命令在独立 SAVEPOINT 中执行：
+#       * 单条命令失败只回滚自身，不影响同组其它命令
+#       * SQLite 因 SQLITE_FULL / IOERR 等自行回滚整个事务时，同组全部命令按失败返回
+#       * BEGIN / SAVEPOINT / COMMIT 失败同样按组失败返回，写线程继续运行，调用方不会永久等待
+#   - 调用方拿到 concurrent.futures.Future：
+#       * 同步调用：run_write(cmd) 阻塞等待结果
+#       * 异步调用：await run_write_async(cmd)
+#
+# 说明：
+#   - 命令内部禁止自行 commit/rollback，事务边界由写线程统一掌控
+#   - 在写线程内部再次提交写命令（嵌套调用）时直接在当前事务内执行，不会死锁
+#   - transactional=False 的命令（如 PRAGMA wal_checkpoint）单独在事务外执行
+#   - stop() 完成后可再次提交：下一次 submit 照常惰性启动新的写线程；
+#     stop() 超时（写线程仍在排空队列）期间提交直接报错
+# ==============================
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+from backend.db.connection import get_conn
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("db.writer_thread")
+
+
+# ==============================================================================
+# 类型化写命令
+# ==============================================================================
+
+class WriteCommand(abc.ABC):
+    """
+    写命令抽象基类。
+
+    子类只需实现 apply(cur)：
+      - cur 为写连接上的游标，已处于事务中（transactional=True 时）
+      - 返回值即 Future 的结果
+    """
+
+    label: str = "write"
+    transactional: bool = True
+
+    @abc.abstractmethod
+    def apply(self, cur: sqlite3.Cursor) -> Any:
+        ...
+
+
+@dataclass
+class SqlExecute(WriteCommand):
+    """单条 SQL（params 可为序列或命名参数字典）；返回 rowcount。"""
+
+    sql: str
+    params: Any = ()
+    label: str = "sql.execute"
+
+    def apply(self, cur: sqlite3.Cursor) -> int:
+        cur.execute(self.sql, self.params if self.params is not None else ())
+        return int(cur.rowcount or 0)
+
+
+@dataclass
+class SqlExecuteMany(WriteCommand):
+    """同一 SQL 批量参数；返回 rowcount。"""
+
+    sql: str
+    seq_of_params: Sequence[Sequence[Any]] = field(default_factory=list)
+    label: str = "sql.executemany"
+
+    def apply(self, cur: sqlite3.Cursor) -> int:
+        if not self.seq_of_params:
+            return 0
+        cur.executemany(self.sql, self.seq_of_params)
+        return int(cur.rowcount or 0)
+
+
+@dataclass
+class WriteFunc(WriteCommand):
+    """
+    多语句写入：fn(cur) 内可执行任意写 SQL（同一 SAVEPOINT 内原子生效）。
+    """
+
+    fn: Callable[[sqlite3.Cursor], Any]
+    label: str = "write.func"
+    transactional: bool = True
+
+    def apply(self, cur: sqlite3.Cursor) -> Any:
+        return self.fn(cur)
+
+
+# ==============================================================================
+# 写线程
+# ==============================================================================
+
+@dataclass
+class _Pending:
+    command: WriteCommand
+    future: Future
+    enqueued_at: float
+
+
+_STOP = object()
+
+
+class DBWriterThread:
+    """SQLite 单写线程。"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopping = False
+
+        # 统计（供 runtime.metrics 使用）
+        self.committed_transactions = 0
+        self.committed_commands = 0
+        self.failed_commands = 0
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name="sqlite-writer",
+                daemon=True,
+            )
+            self._thread.start()
+            _LOG.info("[DB_WRITER] started")
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """停止写线程：已入队命令会先全部执行完毕。"""
+        with self._start_lock:
+            th = self._thread
+            if th is None:
+                return
+            self._stopping = True
+            self._queue.put(_STOP)
+        th.join(timeout=timeout)
+        with self._start_lock:
+            if th.is_alive():
+                # 超时仍在排空队列：保持停止中，拒绝新命令（_STOP 之后入队的命令不会再被执行）
+                _LOG.warning("[DB_WRITER] stop timed out, queue still draining")
+                return
+            self._thread = None
+            self._stopping = False
+        _LOG.info("[DB_WRITER] stopped")
+
+    def is_writer_thread(self) -> bool:
+        th = self._thread
+        return th is not None and threading.get_ident() == th.ident
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------------------------------------------------------
+    # 提交入口
+    # ------------------------------------------------------------------
+    def submit(self, command: WriteCommand) -> Future:
+        if not isinstance(command, WriteCommand):
+            raise TypeError(f"submit: invalid write command {command!r}")
+
+        fut: Future = Future()
+
+        # 写线程内部的嵌套写入：直接并入当前事务执行
+        if self.is_writer_thread():
+            try:
+                fut.set_result(command.apply(get_conn().cursor()))
+            except BaseException as e:
+                fut.set_exception(e)
+            return fut
+
+        if self._stopping:
+            raise RuntimeError("submit: db writer is stopping")
+
+        self.start()
+        self._queue.put(_Pending(command=command, future=fut, enqueued_at=time.monotonic()))
+        return fut
+
+    # ------------------------------------------------------------------
+    # 主循环
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        carry: Any = None
+        while True:
+            first = carry if carry is not None else self._queue.get()
+            carry = None
+            if first is _STOP:
+                break
+
+            if not first.command.transactional:
+                self._execute_standalone(first)
+                continue
+
+            group: List[_Pending] = [first]
+            max_cmds = int(settings.db_writer_max_batch_commands)
+            deadline = first.enqueued_at + float(settings.db_writer_max_latency_ms) / 1000.0
+
+            while len(group) < max_cmds:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        nxt = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+
+                if nxt is _STOP or not nxt.command.transactional:
+                    carry = nxt
+                    break
+                group.append(nxt)
+
+            self._execute_group(group)
+
+        # 退出前把残余命令执行完，避免调用方永远等不到结果
+        while True:
+            try:
+                rest = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if rest is _STOP:
+                continue
+            if rest.command.transactional:
+                self._execute_group([rest])
+            else:
+                self._execute_standalone(rest)
+
+    @staticmethod
+    def _fail(p: _Pending, err: BaseException) -> None:
+        """把异常交给调用方（已完成 / 已取消的 Future 跳过）。"""
+        fut = p.future
+        if fut.done():
+            return
+        if not fut.running() and not fut.set_running_or_notify_cancel():
+            return
+        fut.set_exception(err)
+
+    def _execute_group(self, group: List[_Pending]) -> None:
+        """执行一组事务命令；任何意外（BEGIN / SAVEPOINT / COMMIT 失败等）都不会让组内 Future 悬空。"""
+        try:
+            self._execute_group_inner(group)
+        except BaseException as e:
+            _LOG.error(f"[DB_WRITER] group failed size={len(group)} err={e}")
+            try:
+                get_conn().rollback()
+            except Exception:
+                pass
+            for p in group:
+                if not p.future.done():
+                    self.failed_commands += 1
+                    self._fail(p, e)
+
+    def _execute_group_inner(self, group: List[_Pending]) -> None:
+        conn = get_conn()
+        cur = conn.cursor()
+
+        if conn.in_transaction:
+            conn.commit()
+        cur.execute("BEGIN IMMEDIATE;")
+
+        done: List[tuple] = []
+        for p in group:
+            if not p.future.set_running_or_notify_cancel():
+                continue
+            try:
+                cur.execute("SAVEPOINT writer_cmd;")
+                result = p.command.apply(cur)
+                cur.execute("RELEASE writer_cmd;")
+                done.append((p, result))
+                continue
+            except BaseException as e:
+                err = e
+
+            self.failed_commands += 1
+            _LOG.error(f"[DB_WRITER] command failed label={p.command.label} err={err}")
+            p.future.set_exception(err)
+
+            # SQLITE_FULL / IOERR 等错误会让 SQLite 自行回滚整个事务：
+            # 此时同组已执行的命令也已丢失，不能再当作成功提交
+            rolled_back = False
+            if conn.in_transaction:
+                try:
+                    cur.execute("ROLLBACK TO writer_cmd;")
+                    cur.execute("RELEASE writer_cmd;")
+                except Exception:
+                    rolled_back = True
+            else:
+                rolled_back = True
+
+            if rolled_back:
+                _LOG.error(f"[DB_WRITER] transaction lost, failing group size={len(group)} err={err}")
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                for q in group:
+                    if not q.future.done():
+                        self.failed_commands += 1
+                        self._fail(q, err)
+                return
+
+        try:
+            conn.commit()
+        except Exception as e:
+            _LOG.error(f"[DB_WRITER] commit failed size={len(done)} err={e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            self.failed_commands += len(done)
+            for p, _ in done:
+                p.future.set_exception(e)
+            return
+
+        self.committed_transactions += 1
+        self.committed_commands += len(done)
+        for p, result in done:
+            p.future.set_result(result)
+
+    def _execute_standalone(self, p: _Pending) -> None:
+        if not p.future.set_running_or_notify_cancel():
+            return
+        try:
+            conn = get_conn()
+            if conn.in_transaction:
+                conn.commit()
+            result = p.command.apply(conn.cursor())
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException as e:
+            try:
+                get_conn().rollback()
+            except Exception:
+                pass
+            self.failed_commands += 1
+            _LOG.error(f"[DB_WRITER] standalone command failed label={p.command.label} err={e}")
+            p.future.set_exception(e)
+            return
+        self.committed_commands += 1
+        p.future.set_result(result)
+
+
+# ==============================================================================
+# 单例与便捷入口
+# ==============================================================================
+
+_writer: Optional[DBWriterThread] = None
+_writer_lock = threading.Lock()
+
+
+def get_db_writer() -> DBWriterThread:
+    """获取全局单写线程（首次提交时自动启动）。"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DBWriterThread()
+        return _writer
+
+
+def submit_write(command: WriteCommand) -> Future:
+    """提交写命令，返回 Future。"""
+    return get_db_writer().submit(command)
+
+
+def run_write(command: WriteCommand, timeout: Optional[float] = None) -> Any:
+    """提交写命令并阻塞等待提交完成，返回命令结果（失败则抛出原异常）。"""
+    return submit_write(command).result(timeout=timeout)
+
+
+async def run_write_async(command: WriteCommand) -> Any:
+    """异步版本：不阻塞事件循环。"""
+    return await asyncio.wrap_future(submit_write(command))
+
+
+def stop_db_writer(timeout: Optional[float] = 10.0) -> None:
+    """停止写线程（应用关闭时调用）。"""
+    w = _writer
+    if w is not None:
+        w.stop(timeout=timeout)
@@ -0,0 +1,233 @@
+# backend/dev_tests/local_files/bench_local_import.py
+# ==============================
+# 盘后导入吞吐基准（合成 vipdoc，无需本机 TDX）
+#
+# 作用：
+#   - 在临时工作目录内用 synthetic_vipdoc 生成通达信目录（含 hq_cache 夹具），
+#     并把 CHAN_DATA_DIR 指到工作目录下的独立数据目录（不触碰本机库与归档）
+#   - 依次计时以下阶段：
+#       * generate     ：生成合成目录
+#       * symbol_index ：tnf + base.dbf -> symbol_index（与 symbol_index 配方同一路径）
+#       * gbbq         ：解析 gbbq
+#       * scan         ：scan_importable_files(force=True)
+#       * candidates   ：refresh_import_candidates_snapshot(force=True) + 读取候选
+#       * import       ：start_import_batch 全量导入直到批次终态
+#   - 输出 files/s、rows/s、峰值 RSS（本进程 / 子进程）、各阶段耗时与导入流水线阶段计数器
+#   - --min-files-per-s / --min-rows-per-s 给定时低于阈值即判失败；批次非 success 亦判失败；
+#     失败时进程以退出码 1 结束，可直接挂到任意 CI 步骤上做回归门禁
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.bench_local_import
+#   python -m backend.dev_tests.local_files.bench_local_import --symbols 200 --years 2 --minute-symbols 40 --workers 2 --json-out bench.json
+#   python -m backend.dev_tests.local_files.bench_local_import --symbols 50 --min-files-per-s 20 --min-rows-per-s 50000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_TERMINAL_BATCH_STATES = ("success", "failed", "cancelled")
+
+
+def _peak_rss_mb() -> Dict[str, Optional[float]]:
+    """峰值 RSS（MB）：Linux ru_maxrss 单位 KB，macOS 为字节；Windows 无 resource 时尝试 psutil（仅当前值）。"""
+    try:
+        import resource
+
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+        }
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return {"self": round(getattr(info, "peak_wset", info.rss) / 1048576, 1), "children": None}
+    except ImportError:
+        return {"self": None, "children": None}
+
+
+def _stage(stages: Dict[str, Any], name: str, started: float, **extra: Any) -> None:
+    stages[name] = {"ms": round((time.perf_counter() - started) * 1000, 1), **extra}
+
+
+async def _run_import(items: list) -> Dict[str, Any]:
+    from backend.services.local_import import orchestrator
+    from backend.services.local_import.repository import list_all_batches_ordered, list_tasks_for_batch
+
+    await orchestrator.start_import_batch(items)
+    while True:
+        await asyncio.sleep(0.2)
+        batches = list_all_batches_ordered()
+        batch = batches[-1] if batches else None
+        if batch and batch["state"] in _TERMINAL_BATCH_STATES and batch.get("started_at"):
+            break
+
+    tasks = list_tasks_for_batch(batch["batch_id"])
+    return {
+        "state": batch["state"],
+        "tasks": len(tasks),
+        "failed": [
+            {"market": t["market"], "symbol": t["symbol"], "freq": t["freq"], "signal_code": t["signal_code"]}
+            for t in tasks if t["state"] != "success"
+        ][:20],
+        "appended_rows": sum(int(t["appended_rows"] or 0) for t in tasks),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=40)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--minute-symbols", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=0, help="local_import_workers；0 沿用配置")
+    parser.add_argument("--work", default="", help="工作目录；默认临时目录，结束后删除")
+    parser.add_argument("--keep", action="store_true", help="保留工作目录")
+    parser.add_argument("--min-files-per-s", type=float, default=0.0)
+    parser.add_argument("--min-rows-per-s", type=float, default=0.0)
+    parser.add_argument("--json-out", default="")
+    args = parser.parse_args()
+
+    work = Path(args.work).resolve() if args.work else Path(tempfile.mkdtemp(prefix="bench_local_import_"))
+    work.mkdir(parents=True, exist_ok=True)
+    # settings 在首次导入时读取 CHAN_DATA_DIR：必须先于任何 backend 模块导入
+    os.environ["CHAN_DATA_DIR"] = str(work / "data")
+
+    payload: Dict[str, Any] = {
+        "ok": False,
+        "test": "local_files.bench_local_import",
+        "work": str(work),
+        "corpus": {},
+        "stages": {},
+        "import": {},
+        "pipeline": None,
+        "peak_rss_mb": {},
+        "thresholds": {"min_files_per_s": args.min_files_per_s, "min_rows_per_s": args.min_rows_per_s},
+        "violations": [],
+        "message": "",
+    }
+
+    try:
+        from backend.dev_tests.local_files.synthetic_vipdoc import build_synthetic_vipdoc
+        from backend.settings import settings
+
+        stages = payload["stages"]
+
+        t0 = time.perf_counter()
+        corpus = build_synthetic_vipdoc(
+            work / "tdx",
+            symbols=args.symbols,
+            years=args.years,
+            minute_symbols=args.minute_symbols,
+            hq_cache=True,
+            seed=args.seed,
+        )
+        _stage(stages, "generate", t0, bytes=corpus["bytes"])
+        payload["corpus"] = corpus
+
+        settings.tdx_vipdoc_dir = Path(corpus["vipdoc"])
+        settings.tdx_hq_cache_dir = Path(corpus["hq_cache"])
+        if args.workers > 0:
+            settings.local_import_workers = args.workers
+
+        from backend.datasource.local_files import load_tdx_gbbq_df
+        from backend.db.calendar import upsert_trade_calendar
+        from backend.db.schema import init_schema
+        from backend.services.local_import.candidates import (
+            get_import_candidates_snapshot,
+            refresh_import_candidates_snapshot,
+        )
+        from backend.services.local_import.pipeline import get_import_pipeline_stats
+        from backend.services.local_import.scan import scan_importable_files
+        from backend.services.sync_helper import fetch_normalize_save_symbol_index
+
+        init_schema()
+        # 合成目录按“工作日即交易日”生成，日历同口径
+        calendar = []
+        d = dt.date(2004, 1, 1)
+        while d <= dt.date(2025, 12, 31):
+            calendar.append({"date": d.year * 10000 + d.month * 100 + d.day, "market": "CN", "is_trading_day": int(d.weekday() < 5)})
+            d += dt.timedelta(days=1)
+        upsert_trade_calendar(calendar)
+
+        t0 = time.perf_counter()
+        listed = 0
+        for category, source_tag in (("symbol_list_sh", "tdx_sh_symbols"), ("symbol_list_sz", "tdx_sz_symbols")):
+            res = asyncio.run(fetch_normalize_save_symbol_index(category=category, display_name=category, source_tag=source_tag))
+            if res.get("status") != "success":
+                raise RuntimeError(f"symbol_index {category} failed: {res.get('error')}")
+            listed += int(res.get("count") or 0)
+        _stage(stages, "symbol_index", t0, rows=listed)
+
+        t0 = time.perf_counter()
+        gbbq_rows = len(load_tdx_gbbq_df())
+        _stage(stages, "gbbq", t0, rows=gbbq_rows)
+
+        t0 = time.perf_counter()
+        scanned = scan_importable_files(force=True)
+        _stage(stages, "scan", t0, files=len(scanned))
+
+        t0 = time.perf_counter()
+        refresh_import_candidates_snapshot(force=True)
+        items = get_import_candidates_snapshot()["items"]
+        _stage(stages, "candidates", t0, items=len(items))
+
+        t0 = time.perf_counter()
+        result = asyncio.run(_run_import(items))
+        elapsed = time.perf_counter() - t0
+        _stage(stages, "import", t0)
+
+        source_rows = sum(corpus["rows"].values())
+        result.update({
+            "files": len(items),
+            "source_rows": source_rows,
+            "files_per_s": round(len(items) / elapsed, 1) if elapsed > 0 else None,
+            "rows_per_s": round(source_rows / elapsed, 1) if elapsed > 0 else None,
+            "workers": int(settings.local_import_workers),
+            "pipeline_enabled": bool(settings.local_import_pipeline_enabled),
+        })
+        payload["import"] = result
+        payload["pipeline"] = get_import_pipeline_stats()
+
+        violations = payload["violations"]
+        if result["state"] != "success" or result["failed"]:
+            violations.append(f"batch state={result['state']} failed={len(result['failed'])}")
+        if len(items) != len(scanned):
+            violations.append(f"candidates {len(items)} != scanned {len(scanned)}")
+        if args.min_files_per_s > 0 and (result["files_per_s"] or 0) < args.min_files_per_s:
+            violations.append(f"files_per_s {result['files_per_s']} < {args.min_files_per_s}")
+        if args.min_rows_per_s > 0 and (result["rows_per_s"] or 0) < args.min_rows_per_s:
+            violations.append(f"rows_per_s {result['rows_per_s']} < {args.min_rows_per_s}")
+        payload["ok"] = not violations
+    except Exception as e:
+        payload["message"] = f"{type(e).__name__}: {e}"[:1000]
+    finally:
+        payload["peak_rss_mb"] = _peak_rss_mb()
+        if not args.keep and not args.work:
+            shutil.rmtree(work, ignore_errors=True)
+
+    text = json.dumps(payload, ensure_ascii=False, indent=2, default=str)
+    print(text)
+    if args.json_out:
+        Path(args.json_out).write_text(text, encoding="utf-8")
+    if not payload["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# backend/dev_tests/local_files/synthetic_vipdoc.py
+# ==============================
+# 合成通达信目录生成器（盘后导入基准 / 无本机 TDX 时的开发夹具）
+#
+# 作用：
+#   - 按通达信安装目录布局写出：
+#       <out>/vipdoc/{sh,sz}/lday/*.day
+#       <out>/vipdoc/{sh,sz}/minline/*.lc1
+#       <out>/vipdoc/{sh,sz}/fzline/*.lc5
+#       <out>/T0002/hq_cache/{gbbq, shs.tnf, szs.tnf, base.dbf}（--hq-cache 时）
+#   - 记录格式与真实文件逐字节一致（32 字节 .day / .lc1 / .lc5，29 字节加密 gbbq，360 字节 tnf，dBase III base.dbf），
+#     可直接被 backend.datasource.local_files 各解析器读取
+#   - 交易日按“工作日即交易日”生成；每个标的上市日在区间前 30% 内随机，文件长度因此参差
+#   - 价格为对数随机游走，同一 seed 生成结果逐字节可复现
+#
+# 说明：
+#   - 仅供开发 / 基准使用，不参与任何业务路径
+#   - gbbq 的加密是解析器 Blowfish 解密轮序的逆序，生成后可由 load_tdx_gbbq_df 原样解出
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.synthetic_vipdoc --out D:\tmp\synthetic_tdx --symbols 50 --years 2 --hq-cache
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from backend.datasource.local_files.tdx_day import _DAY_DTYPE
+from backend.datasource.local_files.tdx_gbbq import _P_NP, _bf_f_np
+from backend.datasource.local_files.tdx_minute import _MINUTE_DTYPE
+
+_MARKET_PREFIX = {"SH": ("sh", 600000), "SZ": ("sz", 1)}
+_MARKET_ID = {"SZ": 0, "SH": 1}
+
+# 1m：09:31..11:30 + 13:01..15:00；5m：09:35..11:30 + 13:05..15:00（分钟数）
+_TIMES_1M = np.concatenate([np.arange(9 * 60 + 31, 11 * 60 + 31), np.arange(13 * 60 + 1, 15 * 60 + 1)]).astype(np.uint16)
+_TIMES_5M = np.concatenate([np.arange(9 * 60 + 35, 11 * 60 + 31, 5), np.arange(13 * 60 + 5, 15 * 60 + 1, 5)]).astype(np.uint16)
+
+
+# ==========================================================
+# 日历 / 代码
+# ==========================================================
+def weekday_trading_days(start: dt.date, end: dt.date) -> List[int]:
+    out: List[int] = []
+    d = start
+    while d <= end:
+        if d.weekday() < 5:
+            out.append(d.year * 10000 + d.month * 100 + d.day)
+        d += dt.timedelta(days=1)
+    return out
+
+
+def synthetic_symbols(count: int, markets: Tuple[str, ...] = ("SH", "SZ")) -> List[Tuple[str, str]]:
+    """按市场轮转分配代码：SH 600000 起、SZ 000001 起。"""
+    out: List[Tuple[str, str]] = []
+    for i in range(int(count)):
+        market = markets[i % len(markets)]
+        base = _MARKET_PREFIX[market][1]
+        out.append((market, f"{base + i // len(markets):06d}"))
+    return out
+
+
+# ==========================================================
+# 行情文件
+# ==========================================================
+def _random_walk(rng: np.random.Generator, n: int, start: float, sigma: float) -> np.ndarray:
+    return start * np.exp(np.cumsum(rng.normal(0.0, sigma, n)))
+
+
+def build_day_bytes(rng: np.random.Generator, dates: List[int]) -> bytes:
+    n = len(dates)
+    close = _random_walk(rng, n, rng.uniform(5, 50), 0.02)
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n))
+    volume = rng.integers(100_000, 50_000_000, n)
+
+    rec = np.zeros(n, dtype=_DAY_DTYPE)
+    rec["date"] = dates
+    rec["open"] = np.round(open_ * 100)
+    rec["high"] = np.round(high * 100)
+    rec["low"] = np.round(low * 100)
+    rec["close"] = np.round(close * 100)
+    rec["volume"] = volume
+    rec["amount"] = volume * close
+    return rec.tobytes()
+
+
+def _date_codes(dates: List[int]) -> np.ndarray:
+    d = np.asarray(dates, dtype=np.int64)
+    return ((d // 10000 - 2004) * 2048 + (d // 100 % 100) * 100 + d % 100).astype(np.uint16)
+
+
+def build_minute_bytes(rng: np.random.Generator, dates: List[int], freq: str) -> bytes:
+    times = _TIMES_1M if freq == "1m" else _TIMES_5M
+    per_day = len(times)
+    n = len(dates) * per_day
+
+    close = _random_walk(rng, n, rng.uniform(5, 50), 0.0015 if freq == "1m" else 0.003)
+    open_ = np.concatenate([close[:1], close[:-1]])
+    spread = rng.uniform(0, 0.002, n)
+    volume = rng.integers(100, 200000, n)
+
+    rec = np.zeros(n, dtype=_MINUTE_DTYPE)
+    rec["date_code"] = np.repeat(_date_codes(dates), per_day)
+    rec["time_code"] = np.tile(times, len(dates))
+    rec["open"] = open_
+    rec["high"] = np.maximum(open_, close) * (1 + spread)
+    rec["low"] = np.minimum(open_, close) * (1 - spread)
+    rec["close"] = close
+    rec["volume"] = volume
+    rec["amount"] = volume * close
+    return rec.tobytes()
+
+
+# ==========================================================
+# hq_cache 夹具
+# ==========================================================
+def _blowfish_encrypt_blocks_np(blocks: np.ndarray) -> np.ndarray:
+    """blowfish_decrypt_blocks_np 的逆运算（ECB，(N, 2) uint32）。"""
+    left = np.ascontiguousarray(blocks[:, 0], dtype=np.uint32)
+    right = np.ascontiguousarray(blocks[:, 1], dtype=np.uint32)
+
+    left ^= _P_NP[0]
+    right ^= _P_NP[1]
+    left, right = right, left
+    for i in range(2, 18):
+        left, right = right, left
+        right ^= _bf_f_np(left)
+        left ^= _P_NP[i]
+
+    return np.stack([left, right], axis=1)
+
+
+def build_gbbq_bytes(rng: np.random.Generator, symbols: List[Tuple[str, str]], dates: List[int]) -> bytes:
+    """每个标的 0~3 条分红送转事件（category=1）。"""
+    plain: List[bytes] = []
+    for market, symbol in symbols:
+        for date in sorted(rng.choice(dates, size=int(rng.integers(0, 4)), replace=False).tolist()):
+            plain.append(struct.pack(
+                "<B7sIBffff",
+                _MARKET_ID[market],
+                symbol.encode("ascii"),
+                int(date),
+                1,
+                float(round(rng.uniform(0.5, 5.0), 2)),
+                0.0,
+                float(rng.choice([0.0, 2.0, 3.0])),
+                0.0,
+            ))
+
+    total = len(plain)
+    if total == 0:
+        return struct.pack("<I", 0)
+
+    rec = np.frombuffer(b"".join(plain), dtype=np.uint8).reshape(total, 29).copy()
+    blocks = np.ascontiguousarray(rec[:, :24]).view("<u4").reshape(total * 3, 2)
+    rec[:, :24] = _blowfish_encrypt_blocks_np(blocks).astype("<u4").view(np.uint8).reshape(total, 24)
+    return struct.pack("<I", total) + rec.tobytes()
+
+
+def build_tnf_bytes(symbols: List[Tuple[str, str]], market: str) -> bytes:
+    out = bytearray(50)
+    for m, symbol in symbols:
+        if m != market:
+            continue
+        rec = bytearray(360)
+        rec[0:6] = symbol.encode("ascii")
+        name = f"合成{symbol}".encode("gbk")
+        rec[31:31 + len(name)] = name
+        rec[76:78] = struct.pack("<H", 2)
+        rec[276:280] = struct.pack("<f", 10.0)
+        rec[280:282] = struct.pack("<H", _MARKET_ID[market])
+        rec[329:333] = b"HCGP"
+        out += rec
+    return bytes(out)
+
+
+_DBF_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ("SC", 1),
+    ("GPDM", 6),
+    ("SSDATE", 8),
+    ("ZGB", 14),
+    ("LTAG", 14),
+    ("DY", 4),
+    ("HY", 8),
+)
+
+
+def build_base_dbf_bytes(rng: np.random.Generator, listings: List[Tuple[str, str, int]]) -> bytes:
+    record_len = 1 + sum(length for _, length in _DBF_FIELDS)
+    header_len = 32 + 32 * len(_DBF_FIELDS) + 1
+
+    header = bytearray(32)
+    header[0] = 0x03
+    header[1:4] = bytes([124, 1, 1])
+    header[4:8] = struct.pack("<I", len(listings))
+    header[8:10] = struct.pack("<H", header_len)
+    header[10:12] = struct.pack("<H", record_len)
+
+    for name, length in _DBF_FIELDS:
+        desc = bytearray(32)
+        desc[0:len(name)] = name.encode("ascii")
+        desc[11] = ord("C")
+        desc[16] = length
+        header += desc
+    header += b"\x0d"
+
+    body = bytearray()
+    for market, symbol, listing in listings:
+        total = int(rng.integers(100_000_000, 10_000_000_000))
+        values = {
+            "SC": str(_MARKET_ID[market]),
+            "GPDM": symbol,
+            "SSDATE": str(listing),
+            "ZGB": f"{total / 1e4:.2f}",
+            "LTAG": f"{total * 0.8 / 1e4:.2f}",
+            "DY": "11",
+            "HY": "T0101",
+        }
+        body += b" "
+        for name, length in _DBF_FIELDS:
+            body += values[name].encode("ascii")[:length].ljust(length)
+    return bytes(header + body + b"\x1a")
+
+
+# ==========================================================
+# 入口
+# ==========================================================
+def build_synthetic_vipdoc(
+    out: Path | str,
+    *,
+    symbols: int = 20,
+    years: int = 1,
+    minute_symbols: int = -1,
+    end_date: dt.date = dt.date(2024, 12, 31),
+    hq_cache: bool = False,
+    seed: int = 7,
+) -> Dict[str, Any]:
+    """
+    写出合成通达信目录，返回文件 / 字节 / 记录数汇总。
+
+    Args:
+        out           : 输出根目录（其下生成 vipdoc/ 与 T0002/hq_cache/）
+        symbols       : 标的数（SH / SZ 轮转）
+        years         : 交易日区间年数（截止 end_date）
+        minute_symbols: 带 .lc1 / .lc5 的标的数，-1 表示全部
+        hq_cache      : 是否生成 gbbq / shs.tnf / szs.tnf / base.dbf
+    """
+    root = Path(out).resolve()
+    vipdoc = root / "vipdoc"
+    rng = np.random.default_rng(seed)
+
+    all_dates = weekday_trading_days(end_date.replace(year=end_date.year - int(years)) + dt.timedelta(days=1), end_date)
+    syms = synthetic_symbols(symbols)
+    n_minute = len(syms) if minute_symbols < 0 else min(int(minute_symbols), len(syms))
+
+    summary: Dict[str, Any] = {
+        "root": str(root),
+        "vipdoc": str(vipdoc),
+        "hq_cache": str(root / "T0002" / "hq_cache") if hq_cache else None,
+        "symbols": len(syms),
+        "trading_days": len(all_dates),
+        "files": {"1d": 0, "1m": 0, "5m": 0},
+        "rows": {"1d": 0, "1m": 0, "5m": 0},
+        "bytes": 0,
+    }
+
+    listings: List[Tuple[str, str, int]] = []
+    for i, (market, symbol) in enumerate(syms):
+        prefix = _MARKET_PREFIX[market][0]
+        dates = all_dates[int(rng.integers(0, max(1, int(len(all_dates) * 0.3)))):]
+        listings.append((market, symbol, dates[0]))
+
+        targets = [("1d", "lday", ".day")]
+        if i < n_minute:
+            targets += [("1m", "minline", ".lc1"), ("5m", "fzline", ".lc5")]
+
+        for freq, sub, suffix in targets:
+            raw = build_day_bytes(rng, dates) if freq == "1d" else build_minute_bytes(rng, dates, freq)
+            path = vipdoc / prefix / sub / f"{prefix}{symbol}{suffix}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(raw)
+            summary["files"][freq] += 1
+            summary["rows"][freq] += len(raw) // 32
+            summary["bytes"] += len(raw)
+
+    if hq_cache:
+        cache = root / "T0002" / "hq_cache"
+        cache.mkdir(parents=True, exist_ok=True)
+        (cache / "gbbq").write_bytes(build_gbbq_bytes(rng, syms, all_dates))
+        (cache / "shs.tnf").write_bytes(build_tnf_bytes(syms, "SH"))
+        (cache / "szs.tnf").write_bytes(build_tnf_bytes(syms, "SZ"))
+        (cache / "base.dbf").write_bytes(build_base_dbf_bytes(rng, listings))
+
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--minute-symbols", type=int, default=-1)
+    parser.add_argument("--hq-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    summary = build_synthetic_vipdoc(
+        args.out,
+        symbols=args.symbols,
+        years=args.years,
+        minute_symbols=args.minute_symbols,
+        hq_cache=args.hq_cache,
+        seed=args.seed,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
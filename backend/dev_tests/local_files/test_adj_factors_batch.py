@@ -0,0 +1,167 @@
+# backend/dev_tests/local_files/test_adj_factors_batch.py
+# ==============================
+# 复权因子全市场批量计算 - 与逐标的原实现的等价性验证
+#
+# 作用：
+#   - 同一批事件 + 日线收盘价，compute_tdx_gbbq_adj_factors_batch 与逐标的 normalize_tdx_gbbq_adj_factors_df：
+#       * 成功标的：date / qfq_factor / hfq_factor 必须完全一致
+#       * 失败标的：两者都必须失败，且错误信息一致
+#   - 输出两种实现耗时
+#
+# 数据来源：
+#   - 默认读取本地库：gbbq_events_raw（category=1）+ 当前生效日线表
+#   - --synthetic N：内存生成 N 个标的的随机日线与事件（含事件早于首根日线、无日线、分母 / 除权价非法等）
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_adj_factors_batch
+#   python -m backend.dev_tests.local_files.test_adj_factors_batch --synthetic 3000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.normalizer.factors import (
+    compute_tdx_gbbq_adj_factors_batch,
+    normalize_tdx_gbbq_adj_factors_df,
+)
+from backend.utils.time import ms_at_market_close_array
+
+_FIELD_RENAME = {
+    "field1": "cash_dividend_per_10",
+    "field2": "rights_price",
+    "field3": "bonus_share_per_10",
+    "field4": "rights_share_per_10",
+}
+
+
+def _synthetic(n: int) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    rng = np.random.default_rng(20240601)
+    all_days = pd.bdate_range("1995-01-01", "2025-12-31")
+    all_ymd = (all_days.year * 10000 + all_days.month * 100 + all_days.day).to_numpy(dtype=np.int64)
+
+    ev, cm, cs, cd, cc = [], [], [], [], []
+    for i in range(n):
+        market = ("SH", "SZ", "BJ")[i % 3]
+        symbol = f"{i:06d}"
+        start = int(rng.integers(0, len(all_ymd) - 300))
+        days = all_ymd[start:start + int(rng.integers(50, 4000))]
+        if i % 97 != 5:  # 少量标的无日线
+            cm.append(np.full(len(days), market, dtype=object))
+            cs.append(np.full(len(days), symbol, dtype=object))
+            cd.append(days)
+            cc.append(np.round(rng.uniform(2, 80, len(days)), 2))
+        for _ in range(int(rng.integers(1, 12))):
+            lo = max(0, start - (30 if i % 13 == 0 else -1))  # 部分标的事件早于首根日线
+            d = int(all_ymd[min(int(rng.integers(lo, start + len(days))), len(all_ymd) - 1)])
+            ev.append({
+                "market": market,
+                "symbol": symbol,
+                "date": d,
+                "cash_dividend_per_10": float(rng.choice([0.0, rng.uniform(0, 10)])),
+                "rights_price": float(rng.choice([0.0, rng.uniform(1, 10)])),
+                "bonus_share_per_10": float(rng.choice([0.0, rng.uniform(0, 10), -20.0 if i % 211 == 0 else 0.0])),
+                "rights_share_per_10": float(rng.choice([0.0, 0.0, rng.uniform(0, 3)])),
+            })
+            if i % 151 == 0:
+                ev[-1]["cash_dividend_per_10"] = 5000.0  # 除权价 <= 0
+
+    closes = {
+        "market": np.concatenate(cm),
+        "symbol": np.concatenate(cs),
+        "date": np.concatenate(cd),
+        "close": np.concatenate(cc),
+    }
+    return pd.DataFrame(ev), closes
+
+
+def _from_db() -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    from backend.db.candles import select_candles_day_close_arrays
+    from backend.db.gbbq_events import select_gbbq_events_raw
+
+    events = pd.DataFrame(select_gbbq_events_raw(category=1)).rename(columns=_FIELD_RENAME)
+    parts = []
+    for market, grp in events.groupby("market"):
+        arr = select_candles_day_close_arrays(market, sorted(set(grp["symbol"])))
+        arr["market"] = np.full(len(arr["symbol"]), market, dtype=object)
+        parts.append(arr)
+    closes = {k: np.concatenate([p[k] for p in parts]) for k in ("market", "symbol", "date", "close")}
+    return events, closes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=0)
+    args = parser.parse_args()
+
+    payload = {
+        "ok": False,
+        "test": "local_files.adj_factors_batch",
+        "source": f"synthetic:{args.synthetic}" if args.synthetic > 0 else "db",
+        "series": 0,
+        "ok_series": 0,
+        "failed_series": 0,
+        "mismatches": [],
+        "batch_seconds": 0.0,
+        "reference_seconds": 0.0,
+        "message": "",
+    }
+
+    try:
+        events, closes = _synthetic(args.synthetic) if args.synthetic > 0 else _from_db()
+
+        t0 = time.perf_counter()
+        batch_df, failures = compute_tdx_gbbq_adj_factors_batch(events, closes)
+        payload["batch_seconds"] = round(time.perf_counter() - t0, 3)
+
+        closes_df = pd.DataFrame(closes)
+        closes_df["ts"] = ms_at_market_close_array(closes_df["date"].to_numpy(dtype=np.int64))
+        day_groups = dict(tuple(closes_df.groupby(["market", "symbol"], sort=False)))
+        batch_groups = dict(tuple(batch_df.groupby(["market", "symbol"], sort=False)))
+
+        keys = sorted(set(zip(events["market"].astype(str), events["symbol"].astype(str))))
+        payload["series"] = len(keys)
+
+        t_ref = 0.0
+        for key in keys:
+            day_df = day_groups.get(key, pd.DataFrame(columns=["ts", "close"]))
+            t0 = time.perf_counter()
+            try:
+                ref, ref_err = normalize_tdx_gbbq_adj_factors_df(
+                    events, day_df[["ts", "close"]], market=key[0], symbol=key[1]
+                ), None
+            except Exception as e:
+                ref, ref_err = None, str(e)
+            t_ref += time.perf_counter() - t0
+
+            got_err = failures.get(key)
+            if ref_err or got_err:
+                payload["failed_series"] += 1
+                if ref_err != got_err:
+                    payload["mismatches"].append({"series": key, "batch": got_err, "reference": ref_err})
+                continue
+
+            got = batch_groups[key][["date", "qfq_factor", "hfq_factor"]].reset_index(drop=True)
+            try:
+                pd.testing.assert_frame_equal(got, ref.reset_index(drop=True), check_exact=True, check_dtype=False)
+                payload["ok_series"] += 1
+            except AssertionError as e:
+                payload["mismatches"].append({"series": key, "diff": str(e)[:300]})
+
+        payload["reference_seconds"] = round(t_ref, 3)
+        payload["ok"] = not payload["mismatches"] and payload["series"] > 0
+        payload["mismatches"] = payload["mismatches"][:20]
+    except Exception as e:
+        payload["message"] = str(e)[:1000]
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/dev_tests/local_files/test_async_writer_factors.py
+# ==============================
+# 异步写入队列 - 复权因子多日期写入与旧版落盘回放验证
+#
+# 作用：
+#   - 经 AsyncDBWriter.write_factors 写入多个标的、多个日期的因子（含 SH / SZ 同代码），
+#     读回 adj_factors 与压缩后的期望逐条一致（同标的不同日期不得互相覆盖）
+#   - 在落盘目录放一份旧版 4 字段因子文件 (symbol, date, qfq, hfq)，重启写入器回放：
+#       * symbol_index 中唯一市场的标的：补 market 后写入，文件删除
+#       * 多市场标的：丢弃并标记因子失效
+#   - 放一份行宽度不符的文件：回放跳过并保留文件
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_async_writer_factors
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.db.async_writer import AsyncDBWriter
+from backend.db.factors import compress_factor_records, is_factors_stale, select_factors
+from backend.db.schema import init_schema
+from backend.db.writer_thread import SqlExecuteMany, run_write
+from backend.settings import settings
+from backend.utils.fileio import atomic_write_json
+
+
+def _records(market: str, symbol: str, base: float) -> List[Dict[str, Any]]:
+    # 每 3 天变化一次：压缩后每组仍有多个日期
+    return [
+        {"market": market, "symbol": symbol, "date": 20220101 + d, "qfq_factor": base + d // 3, "hfq_factor": 1.0 + d // 3}
+        for d in range(10)
+    ]
+
+
+def _rows(market: str, symbol: str) -> List[tuple]:
+    return [(r["date"], r["qfq_factor"], r["hfq_factor"]) for r in select_factors(market, symbol)]
+
+
+async def _run(spill: Path) -> Dict[str, Any]:
+    checks: Dict[str, Any] = {}
+
+    records = _records("SH", "600000", 1.0) + _records("SH", "000001", 2.0) + _records("SZ", "000001", 3.0)
+    writer = AsyncDBWriter()
+    await writer.start()
+    await writer.write_factors(records[:12])
+    await writer.write_factors(records[12:])
+    await writer.flush()
+    await writer.stop()
+
+    expected: Dict[tuple, List[tuple]] = {}
+    for r in compress_factor_records(records):
+        expected.setdefault((r["market"], r["symbol"]), []).append((r["date"], r["qfq_factor"], r["hfq_factor"]))
+    got = {k: _rows(*k) for k in expected}
+    checks["rows_per_series"] = {f"{m}.{s}": len(v) for (m, s), v in got.items()}
+    checks["written_equals_expected"] = got == {k: sorted(v) for k, v in expected.items()}
+
+    run_write(SqlExecuteMany(
+        "INSERT OR REPLACE INTO symbol_index (symbol, name, market) VALUES (?, ?, ?);",
+        [("600036", "unique", "SH"), ("000002", "dup", "SH"), ("000002", "dup", "SZ")],
+    ))
+    spill.mkdir(parents=True, exist_ok=True)
+    legacy = spill / "20200101000000-factors-legacy.json"
+    atomic_write_json(legacy, {"kind": "factors", "rows": [
+        ["600036", 20220101, 1.0, 1.0], ["600036", 20220105, 1.5, 1.2], ["000002", 20220101, 9.0, 9.0],
+    ]}, indent=0, rotate_backup=False)
+    broken = spill / "20200101000001-factors-broken.json"
+    atomic_write_json(broken, {"kind": "factors", "rows": [["SH", "600000"]]}, indent=0, rotate_backup=False)
+
+    writer = AsyncDBWriter()
+    await writer.start()
+    await writer.stop()
+
+    checks["legacy_upgraded"] = _rows("SH", "600036") == [(20220101, 1.0, 1.0), (20220105, 1.5, 1.2)]
+    checks["legacy_ambiguous_dropped"] = not _rows("SH", "000002") and not _rows("SZ", "000002")
+    checks["legacy_ambiguous_stale"] = is_factors_stale("SH", "000002") and is_factors_stale("SZ", "000002")
+    checks["legacy_file_removed"] = not legacy.exists()
+    checks["broken_file_kept"] = broken.exists()
+    return checks
+
+
+def main() -> None:
+    work = Path(tempfile.mkdtemp(prefix="async_writer_factors_"))
+    payload: Dict[str, Any] = {"ok": False, "test": "local_files.async_writer_factors", "checks": {}, "message": ""}
+
+    try:
+        init_schema()
+        settings.async_writer_spill_dir = work / "spill"
+        checks = asyncio.run(_run(settings.async_writer_spill_dir))
+        payload["checks"] = checks
+        payload["ok"] = all(v for k, v in checks.items() if k != "rows_per_series")
+    except Exception as e:
+        payload["message"] = f"{type(e).__name__}: {e}"[:1000]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# backend/dev_tests/local_files/test_day_normalize_vectorized.py
+# ==============================
+# 日线向量化标准化 - 与逐行原实现的等价性验证
+#
+# 作用：
+#   - 时间戳：1900-01-01..2100-12-31 每个日历日，ms_at_market_close_array 与 ms_at_market_close 必须逐一相等；
+#     非法日历日期（如 20230230）两者都必须报错
+#   - 标准化：扫描 vipdoc 下 .day 文件（默认 settings.tdx_vipdoc_dir），
+#     normalize_tdx_day_df_to_candles_records 与 *_reference 的 records 必须完全一致（NaN 视为相等）；
+#     列数组路径 day_arrays_to_tuples 与 day_records_to_tuples 的元组一致（amount 的 NaN 对应 None）；
+#     两者报错时要求报错信息一致
+#   - 输出两种实现的累计耗时
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_day_normalize_vectorized
+#   python -m backend.dev_tests.local_files.test_day_normalize_vectorized --dir D:\TDX_new\vipdoc --limit 2000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backend.datasource.local_files.tdx_day import load_tdx_day_arrays, load_tdx_day_df
+from backend.db.candles_bulk import day_arrays_to_tuples, day_records_to_tuples
+from backend.services.normalizer.day_bars import (
+    normalize_tdx_day_arrays,
+    normalize_tdx_day_df_to_candles_records,
+    normalize_tdx_day_df_to_candles_records_reference,
+)
+from backend.settings import settings
+from backend.utils.time import ms_at_market_close, ms_at_market_close_array
+
+
+def _check_calendar() -> dict:
+    d, end, ymds = date(1900, 1, 1), date(2100, 12, 31), []
+    while d <= end:
+        ymds.append(d.year * 10000 + d.month * 100 + d.day)
+        d += timedelta(days=1)
+
+    got = ms_at_market_close_array(np.array(ymds, dtype=np.int64))
+    mismatched = [v for v, ts in zip(ymds, got.tolist()) if ts != ms_at_market_close(v)]
+
+    invalid_not_raised = []
+    for bad in (20230229, 20230230, 20231301, 20230100, 19000132):
+        try:
+            ms_at_market_close_array(np.array([20200102, bad], dtype=np.int64))
+            invalid_not_raised.append(bad)
+        except ValueError:
+            pass
+
+    return {
+        "days": len(ymds),
+        "mismatched": mismatched[:20],
+        "invalid_not_raised": invalid_not_raised,
+    }
+
+
+def _same_value(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b and type(a) is type(b)
+
+
+def _same_records(new, ref) -> str | None:
+    if len(new) != len(ref):
+        return f"row count differs: {len(new)} vs {len(ref)}"
+    for i, (x, y) in enumerate(zip(new, ref)):
+        if x.keys() != y.keys() or not all(_same_value(x[k], y[k]) for k in y):
+            return f"row {i} differs: {x} vs {y}"
+    return None
+
+
+def _same_tuples(new, ref) -> str | None:
+    if len(new) != len(ref):
+        return f"tuple count differs: {len(new)} vs {len(ref)}"
+    for i, (x, y) in enumerate(zip(new, ref)):
+        y = y[:8] + (None if isinstance(y[8], float) and math.isnan(y[8]) else y[8],)
+        if not all(_same_value(a, b) for a, b in zip(x, y)):
+            return f"tuple {i} differs: {x} vs {y}"
+    return None
+
+
+def _run(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=str(settings.tdx_vipdoc_dir))
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    root = Path(args.dir).resolve()
+    files = sorted(root.rglob("*.day"))
+    if args.limit > 0:
+        files = files[: args.limit]
+
+    payload = {
+        "ok": False,
+        "test": "local_files.day_normalize_vectorized",
+        "root": str(root),
+        "calendar": _check_calendar(),
+        "files": len(files),
+        "rows": 0,
+        "error_files": 0,
+        "mismatches": [],
+        "vectorized_seconds": 0.0,
+        "reference_seconds": 0.0,
+    }
+
+    for p in files:
+        market = p.name[:2].upper()
+        symbol = p.stem[2:]
+        try:
+            raw_df = load_tdx_day_df(p)
+        except Exception:
+            continue
+
+        new_records, new_err, t_new = _run(
+            normalize_tdx_day_df_to_candles_records, raw_df, symbol=symbol, market=market
+        )
+        ref_records, ref_err, t_ref = _run(
+            normalize_tdx_day_df_to_candles_records_reference, raw_df, symbol=symbol, market=market
+        )
+        payload["vectorized_seconds"] += t_new
+        payload["reference_seconds"] += t_ref
+
+        arrays, arr_err, _ = _run(normalize_tdx_day_arrays, load_tdx_day_arrays(p), symbol=symbol, market=market)
+
+        if new_err or ref_err or arr_err:
+            payload["error_files"] += 1
+            if not (new_err == ref_err == arr_err):
+                payload["mismatches"].append(
+                    {"file": str(p), "vectorized": new_err, "arrays": arr_err, "reference": ref_err}
+                )
+            continue
+
+        diff = _same_records(new_records, ref_records) or _same_tuples(
+            day_arrays_to_tuples(arrays, market=market, symbol=symbol),
+            day_records_to_tuples(ref_records, market=market, symbol=symbol),
+        )
+        if diff:
+            payload["mismatches"].append({"file": str(p), "diff": diff[:500]})
+        payload["rows"] += len(ref_records)
+
+    cal = payload["calendar"]
+    payload["ok"] = (
+        not payload["mismatches"]
+        and not cal["mismatched"]
+        and not cal["invalid_not_raised"]
+        and len(files) > 0
+    )
+    payload["vectorized_seconds"] = round(payload["vectorized_seconds"], 3)
+    payload["reference_seconds"] = round(payload["reference_seconds"], 3)
+    payload["mismatches"] = payload["mismatches"][:20]
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# backend/dev_tests/local_files/test_import_manifest_placeholder.py
+# ==============================
+# 导入清单 - 末尾占位整日被清洗后续读与整文件导入一致性验证
+#
+# 作用：
+#   - 合成 .lc1：前 N-1 个交易日正常，第 N 日全零成交（作为末尾日会被归档清洗）
+#   - 第一次导入后清单必须停在第 N 日首条记录处（而不是文件末尾）
+#   - 追加一个正常交易日后增量导入（tail），归档须与关闭增量、整文件导入同一文件的归档逐字节一致
+#     （第 N 日此时不再是末尾日，应作为真实零成交日入归档）
+#   - 两种首轮读取：整文件读入（full）与大文件分块（chunked）
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_import_manifest_placeholder
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.db.calendar import upsert_trade_calendar
+from backend.db.import_manifest import get_import_manifest
+from backend.db.schema import init_schema
+from backend.services.local_import.executor import commit_prepared_minute_records, prepare_import_file_sync
+from backend.services.local_import.manifest import record_import_manifests, rewind_manifest_before_date
+from backend.services.minute_archive import resolve_minute_archive_path
+from backend.services.minute_archive.codec import encode_records_to_bytes
+from backend.settings import settings
+
+_DAY_RECORDS = 240
+
+
+def _day_records(n: int, d: dt.date, zero: bool) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for k in range(1, _DAY_RECORDS + 1):
+        t = 9 * 60 + 30 + k if k <= 120 else 13 * 60 + (k - 120)
+        lo = 10.0 + (n % 50) * 0.1
+        out.append(dict(
+            market="SH", symbol="600000", freq="1m",
+            date=d.year * 10000 + d.month * 100 + d.day, time=f"{t // 60:02d}:{t % 60:02d}",
+            open=lo, high=lo + 0.5, low=lo, close=lo + 0.25,
+            amount=0.0 if zero else 1000.0 + k, volume=0.0 if zero else float(100 + k),
+        ))
+    return out
+
+
+def _weekdays(days: int) -> List[dt.date]:
+    out: List[dt.date] = []
+    d = dt.date(2019, 1, 2)
+    while len(out) < days:
+        if d.weekday() < 5:
+            out.append(d)
+        d += dt.timedelta(days=1)
+    return out
+
+
+def _seed_weekday_calendar(days: int) -> None:
+    d = dt.date(2019, 1, 1)
+    rows: List[Dict[str, Any]] = []
+    for _ in range(days * 2 + 30):
+        rows.append({"date": d.year * 10000 + d.month * 100 + d.day, "market": "CN", "is_trading_day": 1 if d.weekday() < 5 else 0})
+        d += dt.timedelta(days=1)
+    upsert_trade_calendar(rows)
+
+
+def _import(path: Path) -> str:
+    """同 orchestrator._commit_prepared_task 的分钟线路径：准备 -> 写归档 -> 回退并写清单。"""
+    prepared = prepare_import_file_sync(market="SH", symbol="600000", freq="1m", file_path=str(path))
+    result = asyncio.run(commit_prepared_minute_records(market="SH", symbol="600000", freq="1m", prepared=prepared))
+    record_import_manifests([rewind_manifest_before_date(prepared.get("manifest"), result.get("placeholder_date"))])
+    return str(prepared["read_mode"])
+
+
+def _archive_bytes() -> bytes:
+    return resolve_minute_archive_path(market="SH", symbol="600000", freq="1m").read_bytes()
+
+
+def _scenario(work: Path, name: str, days: int, chunk_threshold_mb: int) -> Dict[str, Any]:
+    dates = _weekdays(days + 1)
+    src = work / f"{name}.lc1"
+    head = [r for n, d in enumerate(dates[:days - 1]) for r in _day_records(n, d, False)]
+    src.write_bytes(encode_records_to_bytes(head + _day_records(days - 1, dates[days - 1], True)))
+    settings.local_import_minute_chunk_threshold_mb = chunk_threshold_mb
+
+    settings.local_import_incremental_enabled = True
+    settings.tdx_minute_archive_dir = work / f"{name}.incremental"
+    first_mode = _import(src)
+    manifest = get_import_manifest("SH", "600000", "1m") or {}
+    rewound_ok = int(manifest.get("offset") or 0) == (days - 1) * _DAY_RECORDS * 32
+
+    with src.open("ab") as fh:
+        fh.write(encode_records_to_bytes(_day_records(days, dates[days], False)))
+    second_mode = _import(src)
+    incremental = _archive_bytes()
+
+    settings.local_import_incremental_enabled = False
+    settings.tdx_minute_archive_dir = work / f"{name}.full"
+    _import(src)
+    full = _archive_bytes()
+
+    return {
+        "first_mode": first_mode,
+        "second_mode": second_mode,
+        "manifest_rewound": rewound_ok,
+        "archive_rows": len(incremental) // 32,
+        "equals_full_import": incremental == full,
+        "placeholder_day_kept": len(full) == (days + 1) * _DAY_RECORDS * 32,
+    }
+
+
+def main() -> None:
+    work = Path(tempfile.mkdtemp(prefix="manifest_placeholder_"))
+    payload: Dict[str, Any] = {"ok": False, "test": "local_files.import_manifest_placeholder", "scenarios": {}, "message": ""}
+
+    try:
+        init_schema()
+        _seed_weekday_calendar(200)
+        # 150 日 * 240 条 * 32 字节 ≈ 1.1MB，阈值 1MB 时首轮走分块
+        payload["scenarios"]["full"] = _scenario(work, "full", 10, 0)
+        payload["scenarios"]["chunked"] = _scenario(work, "chunked", 150, 1)
+
+        expected_first = {"full": "full", "chunked": "chunked"}
+        payload["ok"] = all(
+            s["first_mode"] == expected_first[name]
+            and s["second_mode"] == "tail"
+            and s["manifest_rewound"]
+            and s["equals_full_import"]
+            and s["placeholder_day_kept"]
+            for name, s in payload["scenarios"].items()
+        )
+    except Exception as e:
+        payload["message"] = f"{type(e).__name__}: {e}"[:1000]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
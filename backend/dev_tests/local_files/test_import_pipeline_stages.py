@@ -0,0 +1,208 @@
+# backend/dev_tests/local_files/test_import_pipeline_stages.py
+# ==============================
+# 盘后导入分阶段流水线 - 与逐文件准备路径的等价性验证
+#
+# 作用：
+#   - 扫描 vipdoc 下 .day / .lc1 / .lc5 文件（默认 settings.tdx_vipdoc_dir），
+#     经 StagedImportPipeline（读取 -> 解码 -> 标准化 -> 写入回调）得到的结果
+#     与 prepare_import_file_sync 逐文件结果必须完全一致（失败文件要求报错信息一致）
+#   - 写入回调只收集结果，不落库、不写归档
+#   - 输出两种方式耗时与流水线各阶段计数器（吞吐 / 忙碌占比 / 队列深度）
+#   - --normalize-processes N（N > 1）时标准化阶段改在 N 进程的进程池中执行，结果同样须一致
+#   - 启动时初始化库表（读取阶段依赖导入清单表）；有文件报错即失败（error_files > 0），
+#     流水线比逐文件慢时在 regressions 中记录 pipeline_slower_than_sequential
+#   - 计时前先逐文件准备一个文件预热（模块首次调用开销不计入先跑的流水线）
+#   - --timeout 秒：流水线超时即中止并输出各阶段计数器（区分卡死与单纯慢：看哪个阶段停止前进）
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_import_pipeline_stages
+#   python -m backend.dev_tests.local_files.test_import_pipeline_stages --dir D:\TDX_new\vipdoc --limit 2000 --queue-size 16
+#   python -m backend.dev_tests.local_files.test_import_pipeline_stages --normalize-processes 2 --timeout 600
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.db.schema import ensure_initialized
+from backend.services.local_import.executor import prepare_import_file_sync
+from backend.services.local_import.pipeline import ImportWorkItem, StagedImportPipeline
+from backend.settings import settings
+
+_SUFFIX_FREQ = {".day": "1d", ".lc1": "1m", ".lc5": "5m"}
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return a == b and type(a) is type(b)
+
+
+def _work_items(root: Path, limit: int) -> List[ImportWorkItem]:
+    items = []
+    for p in sorted(root.rglob("*")):
+        freq = _SUFFIX_FREQ.get(p.suffix.lower())
+        if freq is None or not p.is_file():
+            continue
+        items.append(ImportWorkItem(
+            market=p.name[:2].upper(),
+            symbol=p.stem[2:],
+            freq=freq,
+            file_path=str(p),
+        ))
+    return items[:limit] if limit > 0 else items
+
+
+async def _run_pipeline(
+    items: List[ImportWorkItem],
+    queue_size: int,
+    normalize_executor: Optional[ProcessPoolExecutor] = None,
+    timeout: float = 0.0,
+) -> Dict[str, Any]:
+    done: List[ImportWorkItem] = []
+
+    async def _collect(batch: List[ImportWorkItem]) -> None:
+        for item in batch:
+            done.append(ImportWorkItem(
+                market=item.market,
+                symbol=item.symbol,
+                freq=item.freq,
+                file_path=item.file_path,
+                prepared=item.prepared,
+                error=item.error,
+            ))
+
+    pipeline = StagedImportPipeline(_collect, queue_size=queue_size, normalize_executor=normalize_executor)
+    pipeline.start()
+
+    async def _feed() -> None:
+        for item in items:
+            await pipeline.submit(item)
+        await pipeline.join()
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(_feed(), timeout if timeout > 0 else None)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await pipeline.abort()
+    return {"done": done, "stats": pipeline.stats(), "timed_out": timed_out}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=str(settings.tdx_vipdoc_dir))
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--queue-size", type=int, default=0)
+    parser.add_argument("--normalize-processes", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=0.0)
+    args = parser.parse_args()
+
+    root = Path(args.dir).resolve()
+    items = _work_items(root, args.limit)
+
+    payload = {
+        "ok": False,
+        "test": "local_files.import_pipeline_stages",
+        "root": str(root),
+        "files": len(items),
+        "normalize_processes": args.normalize_processes if args.normalize_processes > 1 else 0,
+        "error_files": 0,
+        "mismatches": [],
+        "pipeline_seconds": 0.0,
+        "sequential_seconds": 0.0,
+        "stats": None,
+        "timed_out": False,
+        "regressions": [],
+        "message": "",
+    }
+
+    pool = None
+    if args.normalize_processes > 1:
+        pool = ProcessPoolExecutor(max_workers=args.normalize_processes, mp_context=multiprocessing.get_context("spawn"))
+
+    try:
+        ensure_initialized()
+        if items:
+            try:
+                prepare_import_file_sync(
+                    market=items[0].market,
+                    symbol=items[0].symbol,
+                    freq=items[0].freq,
+                    file_path=items[0].file_path,
+                )
+            except Exception:
+                pass
+
+        t0 = time.perf_counter()
+        result = asyncio.run(_run_pipeline(items, args.queue_size or None, pool, args.timeout))
+        payload["pipeline_seconds"] = round(time.perf_counter() - t0, 3)
+        payload["stats"] = result["stats"]
+        payload["timed_out"] = result["timed_out"]
+        if result["timed_out"]:
+            raise TimeoutError(f"pipeline did not finish within {args.timeout}s, see stats for per-stage progress")
+
+        got = {(i.market, i.symbol, i.freq): i for i in result["done"]}
+        if len(got) != len(items):
+            payload["mismatches"].append({"reason": f"pipeline returned {len(got)} of {len(items)} items"})
+
+        t_seq = 0.0
+        for item in items:
+            key = (item.market, item.symbol, item.freq)
+            t0 = time.perf_counter()
+            try:
+                ref, ref_err = prepare_import_file_sync(
+                    market=item.market,
+                    symbol=item.symbol,
+                    freq=item.freq,
+                    file_path=item.file_path,
+                ), None
+            except Exception as e:
+                ref, ref_err = None, f"{type(e).__name__}: {e}"
+            t_seq += time.perf_counter() - t0
+
+            out = got.get(key)
+            if out is None:
+                continue
+            out_err = f"{type(out.error).__name__}: {out.error}" if out.error is not None else None
+            if ref_err or out_err:
+                payload["error_files"] += 1
+                if ref_err != out_err:
+                    payload["mismatches"].append({"file": item.file_path, "pipeline": out_err, "reference": ref_err})
+                continue
+            if not _same(out.prepared, ref):
+                payload["mismatches"].append({"file": item.file_path, "diff": "prepared result differs"})
+
+        payload["sequential_seconds"] = round(t_seq, 3)
+        if payload["pipeline_seconds"] > payload["sequential_seconds"]:
+            payload["regressions"].append("pipeline_slower_than_sequential")
+        payload["ok"] = (
+            not payload["mismatches"]
+            and len(items) > 0
+            and payload["error_files"] == 0
+            and not payload["regressions"]
+        )
+        payload["mismatches"] = payload["mismatches"][:20]
+    except Exception as e:
+        payload["message"] = str(e)[:1000]
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=not payload["timed_out"], cancel_futures=True)
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# backend/dev_tests/local_files/test_minute_archive_chunked.py
+# ==============================
+# 分钟归档分块合并 - 与一次性合并的等价性验证
+#
+# 作用：
+#   - 同一 .lc1 / .lc5 源文件（--file 指定；未指定时生成 --days 个交易日的合成 1m 文件），
+#     以下场景中 merge_and_write_minute_archive_chunked 与 merge_and_write_minute_archive
+#     的最终归档字节、status / appended_rows / final_total_rows / warning_code 必须完全一致：
+#       * fresh  ：归档不存在
+#       * middle ：归档预置为源文件中间一段（左补 + 右补）
+#       * resume ：分块合并在第 2 块追加后中断，再从断点续做（结果与一次性合并比较字节）
+#       * placeholder：合成文件末尾追加一个全零成交的占位交易日（仅合成文件）
+#   - 非升序源文件：plan_tdx_minute_chunks 返回 None
+#   - 输出两种方式耗时与 Python 堆峰值（tracemalloc）
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_minute_archive_chunked
+#   （--file 模式依赖库内已有交易日历；合成模式会按工作日补一段日历）
+#   python -m backend.dev_tests.local_files.test_minute_archive_chunked --file D:\TDX_new\vipdoc\sh\minline\sh000001.lc1 --chunk-records 20000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from backend.datasource.local_files.tdx_minute import (
+    load_tdx_minute_arrays,
+    minute_arrays_to_df,
+    plan_tdx_minute_chunks,
+    read_tdx_minute_range,
+)
+from backend.db.calendar import upsert_trade_calendar
+from backend.db.schema import init_schema
+from backend.services.minute_archive import (
+    merge_and_write_minute_archive,
+    merge_and_write_minute_archive_chunked,
+    resolve_minute_archive_path,
+)
+from backend.services.minute_archive.codec import encode_records_to_bytes
+from backend.services.normalizer import normalize_tdx_minute_df_to_archive_records
+from backend.settings import settings
+
+_COMPARE_KEYS = ("status", "appended_rows", "final_total_rows", "warning_code", "placeholder_removed")
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def _synthetic_records(days: int, placeholder: bool) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    d = dt.date(2019, 1, 2)
+    n = 0
+    while n < days:
+        if d.weekday() < 5:
+            n += 1
+            zero = placeholder and n == days
+            for k in range(1, 241):
+                t = 9 * 60 + 30 + k if k <= 120 else 13 * 60 + (k - 120)
+                lo = 10.0 + (n % 50) * 0.1
+                out.append(dict(
+                    market="SH", symbol="600000", freq="1m",
+                    date=d.year * 10000 + d.month * 100 + d.day, time=f"{t // 60:02d}:{t % 60:02d}",
+                    open=lo, high=lo + 0.5, low=lo, close=lo + 0.25,
+                    amount=0.0 if zero else 1000.0 + k, volume=0.0 if zero else float(100 + k),
+                ))
+        d += dt.timedelta(days=1)
+    return out
+
+
+def _seed_weekday_calendar(days: int) -> None:
+    """合成文件按“工作日即交易日”补一段日历（middle 场景的左补连续性校验依赖日历）。"""
+    d = dt.date(2019, 1, 1)
+    rows: List[Dict[str, Any]] = []
+    for _ in range(days * 2 + 30):
+        rows.append({"date": d.year * 10000 + d.month * 100 + d.day, "market": "CN", "is_trading_day": 1 if d.weekday() < 5 else 0})
+        d += dt.timedelta(days=1)
+    upsert_trade_calendar(rows)
+
+
+def _records_of(path: Path, market: str, symbol: str, freq: str, start: int = 0, end: int = -1) -> List[Dict[str, Any]]:
+    arrays = load_tdx_minute_arrays(path) if end < 0 else read_tdx_minute_range(path, start, end)
+    return normalize_tdx_minute_df_to_archive_records(minute_arrays_to_df(arrays), symbol=symbol, market=market, freq=freq)
+
+
+def _chunks(path: Path, market: str, symbol: str, freq: str, plan):
+    for start, end in plan:
+        yield start, _records_of(path, market, symbol, freq, start, end)
+
+
+def _measure(fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    result["_ms"] = round(elapsed * 1000, 1)
+    result["_peak_mb"] = round(peak / 1048576, 2)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default="")
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--chunk-records", type=int, default=16384)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="chunked_merge_"))
+    payload: Dict[str, Any] = {"ok": False, "test": "local_files.minute_archive_chunked", "scenarios": {}, "message": ""}
+
+    try:
+        init_schema()
+        sources: List[tuple] = []
+        if args.file:
+            src = Path(args.file).resolve()
+            sources.append(("file", src, src.name[:2].upper(), src.stem[2:], "1m" if src.suffix == ".lc1" else "5m"))
+        else:
+            _seed_weekday_calendar(args.days)
+            for name, placeholder in (("synthetic", False), ("placeholder", True)):
+                src = work / f"{name}.lc1"
+                src.write_bytes(encode_records_to_bytes(_synthetic_records(args.days, placeholder)))
+                sources.append((name, src, "SH", "600000", "1m"))
+
+        mismatches: List[Dict[str, Any]] = []
+        for name, src, market, symbol, freq in sources:
+            plan = plan_tdx_minute_chunks(src, chunk_records=args.chunk_records)
+            if plan is None:
+                raise ValueError(f"source not ascending: {src}")
+            size = src.stat().st_size
+
+            scenarios = ["fresh", "middle", "resume"] if name != "placeholder" else ["fresh"]
+            for scenario in scenarios:
+                label = name if scenario == "fresh" and name == "placeholder" else f"{name}.{scenario}"
+                outs: Dict[str, Any] = {}
+                archives: Dict[str, bytes] = {}
+                for mode in ("full", "chunked"):
+                    settings.tdx_minute_archive_dir = work / f"{label}.{mode}"
+                    archive = resolve_minute_archive_path(market=market, symbol=symbol, freq=freq)
+                    if scenario == "middle":
+                        seed = plan_tdx_minute_chunks(src, chunk_records=max(1, size // 32 // 4))
+                        a, b = seed[1][0], seed[min(2, len(seed) - 1)][1]
+                        archive.parent.mkdir(parents=True, exist_ok=True)
+                        archive.write_bytes(encode_records_to_bytes(_records_of(src, market, symbol, freq, a, b)))
+
+                    if mode == "full":
+                        outs[mode] = _measure(lambda: merge_and_write_minute_archive(
+                            market=market, symbol=symbol, freq=freq, records=_records_of(src, market, symbol, freq),
+                        ))
+                    elif scenario == "resume":
+                        checkpoints: List[int] = []
+
+                        def _cp(offset: int) -> None:
+                            checkpoints.append(offset)
+                            if len(checkpoints) == 2:
+                                raise _Interrupted()
+
+                        try:
+                            merge_and_write_minute_archive_chunked(
+                                market=market, symbol=symbol, freq=freq, chunks=_chunks(src, market, symbol, freq, plan),
+                                on_checkpoint=_cp,
+                            )
+                        except _Interrupted:
+                            pass
+                        resume_plan = plan_tdx_minute_chunks(src, start_offset=checkpoints[-1], chunk_records=args.chunk_records)
+                        outs[mode] = _measure(lambda: merge_and_write_minute_archive_chunked(
+                            market=market, symbol=symbol, freq=freq, chunks=_chunks(src, market, symbol, freq, resume_plan),
+                        ))
+                        outs[mode]["resumed_from"] = checkpoints[-1]
+                    else:
+                        outs[mode] = _measure(lambda: merge_and_write_minute_archive_chunked(
+                            market=market, symbol=symbol, freq=freq, chunks=_chunks(src, market, symbol, freq, plan),
+                        ))
+                    archives[mode] = archive.read_bytes()
+
+                same_bytes = archives["full"] == archives["chunked"]
+                keys = _COMPARE_KEYS if scenario != "resume" else ("final_total_rows",)
+                diff = {k: (outs["full"].get(k), outs["chunked"].get(k)) for k in keys if outs["full"].get(k) != outs["chunked"].get(k)}
+                if not same_bytes or diff:
+                    mismatches.append({"scenario": label, "same_bytes": same_bytes, "diff": diff})
+                payload["scenarios"][label] = {
+                    "source_rows": size // 32,
+                    "chunks": outs["chunked"].get("chunks"),
+                    "full": {k: outs["full"].get(k) for k in (*_COMPARE_KEYS, "_ms", "_peak_mb")},
+                    "chunked": {k: outs["chunked"].get(k) for k in (*_COMPARE_KEYS, "resumed_from", "_ms", "_peak_mb")},
+                    "same_bytes": same_bytes,
+                }
+
+        # 非升序：交换相邻两个交易日
+        unsorted = work / "unsorted.lc1"
+        raw = (work / "synthetic.lc1").read_bytes() if not args.file else Path(args.file).read_bytes()
+        day = 240 * 32
+        unsorted.write_bytes(raw[day:2 * day] + raw[:day] + raw[2 * day:])
+        payload["unsorted_detected"] = plan_tdx_minute_chunks(unsorted, chunk_records=args.chunk_records) is None
+
+        payload["mismatches"] = mismatches
+        payload["ok"] = not mismatches and payload["unsorted_detected"]
+    except Exception as e:
+        payload["message"] = f"{type(e).__name__}: {e}"[:1000]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
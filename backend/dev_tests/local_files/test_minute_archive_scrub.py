@@ -0,0 +1,192 @@
+# backend/dev_tests/local_files/test_minute_archive_scrub.py
+# ==============================
+# 分钟归档巡检 - 注入故障检出与缺口补齐验证
+#
+# 作用：
+#   - 在临时归档目录内按“工作日即交易日”生成合成 1m / 5m 归档并补一段日历，注入以下故障：
+#       * SH600000 1m：干净文件（status 必须为 ok）
+#       * SH600001 1m：日内抽掉 5 根 + 整日缺失 1 天（缺口数 / 缺失根数 / 整日数必须精确）
+#       * SZ000001 1m：一条非法记录（high < low）、一对相邻记录交换、一条非交易时段时间（同时造成一次倒序）、7 字节尾部残片
+#       * SZ000002 5m：干净文件
+#   - 缺口与 next_minute_bucket_key 逐根推进的参考实现交叉核对
+#   - 单进程与多进程巡检结果一致；报告表行数与状态正确
+#   - fill_minute_archive_gaps 用完整记录补齐后，SH600001 与干净文件逐字节一致，重扫为 ok
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_minute_archive_scrub
+#   python -m backend.dev_tests.local_files.test_minute_archive_scrub --days 60 --workers 2
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.db.archive_scrub_report import select_archive_scrub_report
+from backend.db.calendar import upsert_trade_calendar
+from backend.db.schema import init_schema
+from backend.services.minute_archive import resolve_minute_archive_path
+from backend.services.minute_archive.codec import encode_records_to_bytes
+from backend.services.minute_archive.merger import fill_minute_archive_gaps
+from backend.services.minute_archive.scrub import scrub_archive_file, scrub_minute_archives
+from backend.settings import settings
+from backend.utils.minute_bucket import next_minute_bucket_key
+
+_START = dt.date(2020, 1, 1)
+
+
+def _weekdays(days: int) -> List[int]:
+    out: List[int] = []
+    d = _START
+    while len(out) < days:
+        if d.weekday() < 5:
+            out.append(d.year * 10000 + d.month * 100 + d.day)
+        d += dt.timedelta(days=1)
+    return out
+
+
+def _seed_weekday_calendar(days: int) -> None:
+    d = _START - dt.timedelta(days=10)
+    rows: List[Dict[str, Any]] = []
+    for _ in range(days * 2 + 30):
+        rows.append({"date": d.year * 10000 + d.month * 100 + d.day, "market": "CN", "is_trading_day": 1 if d.weekday() < 5 else 0})
+        d += dt.timedelta(days=1)
+    upsert_trade_calendar(rows)
+
+
+def _records(market: str, symbol: str, freq: str, days: int) -> List[Dict[str, Any]]:
+    step = 1 if freq == "1m" else 5
+    times = list(range(9 * 60 + 30 + step, 11 * 60 + 31, step)) + list(range(13 * 60 + step, 15 * 60 + 1, step))
+    out: List[Dict[str, Any]] = []
+    for n, ymd in enumerate(_weekdays(days)):
+        for k, t in enumerate(times):
+            lo = 10.0 + (n % 50) * 0.1
+            out.append(dict(
+                market=market, symbol=symbol, freq=freq, date=ymd, time=f"{t // 60:02d}:{t % 60:02d}",
+                open=lo, high=lo + 0.5, low=lo, close=lo + 0.25, amount=1000.0 + k, volume=float(100 + k),
+            ))
+    return out
+
+
+def _write(market: str, symbol: str, freq: str, payload: bytes) -> Path:
+    path = resolve_minute_archive_path(market=market, symbol=symbol, freq=freq)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return path
+
+
+def _reference_gaps(records: List[Dict[str, Any]], freq: str) -> Dict[str, int]:
+    """逐根推进参考实现：相邻记录之间数 next_minute_bucket_key 走了几步。"""
+    count = bars = 0
+    for a, b in zip(records, records[1:]):
+        key = (a["date"], a["time"])
+        missing = 0
+        while True:
+            key = next_minute_bucket_key(last_date=key[0], last_time=key[1], freq=freq)
+            if key == (b["date"], b["time"]):
+                break
+            missing += 1
+        if missing:
+            count += 1
+            bars += missing
+    return {"gap_count": count, "gap_bars": bars}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="archive_scrub_"))
+    payload: Dict[str, Any] = {"ok": False, "test": "local_files.minute_archive_scrub", "checks": {}, "message": ""}
+    checks = payload["checks"]
+
+    try:
+        init_schema()
+        _seed_weekday_calendar(args.days)
+        settings.tdx_minute_archive_dir = work / "archive"
+
+        clean = _records("SH", "600000", "1m", args.days)
+        _write("SH", "600000", "1m", encode_records_to_bytes(clean))
+
+        # 日内缺 5 根（第 3 天 10:00..10:04）+ 整日缺失（第 10 天）
+        full = _records("SH", "600001", "1m", args.days)
+        drop = set(range(2 * 240 + 29, 2 * 240 + 34)) | set(range(9 * 240, 10 * 240))
+        gapped = [r for i, r in enumerate(full) if i not in drop]
+        gap_path = _write("SH", "600001", "1m", encode_records_to_bytes(gapped))
+
+        corrupt = _records("SZ", "000001", "1m", args.days)
+        corrupt[100]["high"] = corrupt[100]["low"] - 1.0
+        corrupt[500], corrupt[501] = corrupt[501], corrupt[500]
+        corrupt[700]["time"] = "12:00"
+        _write("SZ", "000001", "1m", encode_records_to_bytes(corrupt) + b"\x00" * 7)
+
+        _write("SZ", "000002", "5m", encode_records_to_bytes(_records("SZ", "000002", "5m", args.days)))
+
+        inline = scrub_minute_archives(workers=1)
+        pooled = scrub_minute_archives(workers=args.workers)
+
+        def _strip(rows):
+            return [{k: v for k, v in r.items() if k not in ("elapsed_ms", "run_id", "scanned_at")} for r in rows]
+
+        checks["inline_equals_pool"] = _strip(inline["rows"]) == _strip(pooled["rows"])
+        by_key = {(r["market"], r["symbol"], r["freq"]): r for r in pooled["rows"]}
+
+        checks["clean_ok"] = by_key[("SH", "600000", "1m")]["status"] == "ok" and by_key[("SZ", "000002", "5m")]["status"] == "ok"
+
+        g = by_key[("SH", "600001", "1m")]
+        ref = _reference_gaps(gapped, "1m")
+        checks["gaps_exact"] = (g["gap_count"], g["gap_bars"], g["gap_days"]) == (2, 245, 1)
+        checks["gaps_match_reference"] = {"gap_count": g["gap_count"], "gap_bars": g["gap_bars"]} == ref
+        checks["gap_sample"] = [(x["from_date"], x["from_time"], x["to_time"], x["kind"]) for x in g["gaps_json"]]
+
+        c = by_key[("SZ", "000001", "1m")]
+        checks["corrupt_counts"] = {k: c[k] for k in ("tail_fragment_bytes", "invalid_records", "first_invalid_offset", "non_monotonic", "off_bucket", "status")}
+        corrupt_ok = (
+            c["tail_fragment_bytes"] == 7
+            and c["invalid_records"] == 1
+            and c["first_invalid_offset"] == 100 * 32
+            # 交换一对记录 1 次倒序；第 700 条（14:40 附近）改成 12:00 再 1 次
+            and c["non_monotonic"] == 2
+            and c["off_bucket"] == 1
+            and c["status"] == "issues"
+        )
+
+        report = select_archive_scrub_report()
+        checks["report_rows"] = len(report)
+        checks["report_issues"] = sorted(r["symbol"] for r in report if r["status"] == "issues")
+        report_ok = len(report) == 4 and checks["report_issues"] == ["000001", "600001"]
+
+        filled = fill_minute_archive_gaps(market="SH", symbol="600001", freq="1m", records=full)
+        checks["filled_rows"] = filled["inserted_rows"]
+        checks["filled_equals_clean"] = gap_path.read_bytes() == encode_records_to_bytes(full)
+        checks["rescan_ok"] = scrub_archive_file(gap_path, market="SH", symbol="600001", freq="1m")["status"] == "ok"
+
+        payload["summary"] = {k: v for k, v in pooled.items() if k != "rows"}
+        payload["ok"] = bool(
+            checks["inline_equals_pool"]
+            and checks["clean_ok"]
+            and checks["gaps_exact"]
+            and checks["gaps_match_reference"]
+            and corrupt_ok
+            and report_ok
+            and filled["inserted_rows"] == len(drop)
+            and checks["filled_equals_clean"]
+            and checks["rescan_ok"]
+        )
+    except Exception as e:
+        payload["message"] = f"{type(e).__name__}: {e}"[:1000]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# backend/dev_tests/local_files/test_minute_normalize_vectorized.py
+# ==============================
+# 分钟线逐列标准化 - 与逐行原实现的等价性验证
+#
+# 作用：
+#   - 扫描 vipdoc 下 .lc1 / .lc5 文件（默认 settings.tdx_vipdoc_dir），
+#     normalize_tdx_minute_df_to_archive_records 与 *_reference 的 records 必须完全一致
+#     （键、值与类型；NaN 视为相等）；两者报错时要求报错信息一致
+#   - 另构造若干边界输入（重复键逆序、time 缺失 / 非法、价量含 NaN、整数价量列、date 为字符串列）逐一比较
+#   - 输出两种实现的累计耗时
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_minute_normalize_vectorized
+#   python -m backend.dev_tests.local_files.test_minute_normalize_vectorized --dir D:\TDX_new\vipdoc --limit 2000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from backend.datasource.local_files.tdx_minute import load_tdx_minute_df
+from backend.services.normalizer.minute_bars import (
+    normalize_tdx_minute_df_to_archive_records,
+    normalize_tdx_minute_df_to_archive_records_reference,
+)
+from backend.settings import settings
+
+
+def _same_value(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b and type(a) is type(b)
+
+
+def _same_records(new, ref) -> str | None:
+    if len(new) != len(ref):
+        return f"row count differs: {len(new)} vs {len(ref)}"
+    for i, (x, y) in enumerate(zip(new, ref)):
+        if x.keys() != y.keys() or not all(_same_value(x[k], y[k]) for k in y):
+            return f"row {i} differs: {x} vs {y}"
+    return None
+
+
+def _run(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args, **kwargs), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+
+def _edge_cases() -> Dict[str, pd.DataFrame]:
+    base = {
+        "date": [20240103, 20240102, 20240102, 20240102],
+        "time": ["09:31", "09:32", "09:31", "09:32"],
+        "open": [1.0, 2.0, 3.0, 4.0],
+        "high": [1.5, 2.5, 3.5, 4.5],
+        "low": [0.5, 1.5, 2.5, 3.5],
+        "close": [1.2, 2.2, 3.2, 4.2],
+        "amount": [10.0, 20.0, 30.0, 40.0],
+        "volume": [100.0, 200.0, 300.0, 400.0],
+    }
+    cases = {"duplicates_unsorted": pd.DataFrame(base)}
+    cases["bad_time"] = pd.DataFrame({**base, "time": ["09:31", None, "0932", " 09:33 "]})
+    cases["nan_values"] = pd.DataFrame({**base, "open": [float("nan"), 2.0, 3.0, 4.0], "amount": [10.0, float("nan"), 30.0, 40.0]})
+    cases["int_values"] = pd.DataFrame({**base, "volume": [100, 200, 300, 400], "amount": [10, 20, 30, 40]})
+    cases["str_date"] = pd.DataFrame({**base, "date": ["20240103", "x", "20240102", "20240102"]})
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=str(settings.tdx_vipdoc_dir))
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    root = Path(args.dir).resolve()
+    files = sorted([*root.rglob("*.lc1"), *root.rglob("*.lc5")])
+    if args.limit > 0:
+        files = files[: args.limit]
+
+    payload = {
+        "ok": False,
+        "test": "local_files.minute_normalize_vectorized",
+        "root": str(root),
+        "files": len(files),
+        "rows": 0,
+        "error_files": 0,
+        "edge_cases": {},
+        "mismatches": [],
+        "vectorized_seconds": 0.0,
+        "reference_seconds": 0.0,
+    }
+
+    for name, df in _edge_cases().items():
+        new, new_err, _ = _run(normalize_tdx_minute_df_to_archive_records, df, symbol="600000", market="SH", freq="1m")
+        ref, ref_err, _ = _run(normalize_tdx_minute_df_to_archive_records_reference, df, symbol="600000", market="SH", freq="1m")
+        diff = (None if new_err == ref_err else f"errors differ: {new_err} vs {ref_err}") if (new_err or ref_err) else _same_records(new, ref)
+        payload["edge_cases"][name] = diff or "ok"
+        if diff:
+            payload["mismatches"].append({"case": name, "diff": diff[:500]})
+
+    for p in files:
+        market = p.name[:2].upper()
+        symbol = p.stem[2:]
+        freq = "1m" if p.suffix.lower() == ".lc1" else "5m"
+        try:
+            raw_df = load_tdx_minute_df(p)
+        except Exception:
+            continue
+
+        new_records, new_err, t_new = _run(
+            normalize_tdx_minute_df_to_archive_records, raw_df, symbol=symbol, market=market, freq=freq
+        )
+        ref_records, ref_err, t_ref = _run(
+            normalize_tdx_minute_df_to_archive_records_reference, raw_df, symbol=symbol, market=market, freq=freq
+        )
+        payload["vectorized_seconds"] += t_new
+        payload["reference_seconds"] += t_ref
+
+        if new_err or ref_err:
+            payload["error_files"] += 1
+            if new_err != ref_err:
+                payload["mismatches"].append({"file": str(p), "vectorized": new_err, "reference": ref_err})
+            continue
+
+        diff = _same_records(new_records, ref_records)
+        if diff:
+            payload["mismatches"].append({"file": str(p), "diff": diff[:500]})
+        payload["rows"] += len(ref_records)
+
+    payload["ok"] = not payload["mismatches"] and len(files) > 0
+    payload["vectorized_seconds"] = round(payload["vectorized_seconds"], 3)
+    payload["reference_seconds"] = round(payload["reference_seconds"], 3)
+    payload["mismatches"] = payload["mismatches"][:20]
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
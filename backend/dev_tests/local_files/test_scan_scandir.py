@@ -0,0 +1,135 @@
+# backend/dev_tests/local_files/test_scan_scandir.py
+# ==============================
+# 盘后导入快速扫描 - 与 rglob 原实现的等价性验证
+#
+# 作用：
+#   - 同一 vipdoc 根目录（默认 local-import 当前有效根目录），以下三次扫描结果必须与
+#     scan_importable_files_reference（rglob 原实现）逐项完全一致：
+#       * cold ：force=True，全部目录重新扫描
+#       * warm ：目录未变化，全部命中目录缓存
+#       * touch：--touch 时先在第一个数据目录内新建并删除一个临时文件（目录 mtime 变化），再扫描
+#   - append：临时目录内建一个 sh/lday 文件并扫描一次，原地追加一条记录（目录 mtime 不变）后
+#     不带 force 再扫描，file_size / file_mtime_ns 必须反映追加（缓存只复用目录列表）
+#   - 输出各次耗时
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_scan_scandir
+#   python -m backend.dev_tests.local_files.test_scan_scandir --dir D:\TDX_new\vipdoc --touch
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.services.local_import import scan
+
+
+def _diff(got: List[scan.LocalImportFileItem], ref: List[scan.LocalImportFileItem]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    if len(got) != len(ref):
+        out.append({"reason": f"items {len(got)} != reference {len(ref)}"})
+    for a, b in zip(got, ref):
+        if a != b:
+            out.append({"scandir": a.__dict__, "reference": b.__dict__})
+    return out
+
+
+def _touch_first_data_dir(root: Path) -> str:
+    dirs = scan._known_layout_dirs(root) or [str(root)]
+    probe = Path(dirs[0]) / ".scan_probe.tmp"
+    probe.write_bytes(b"")
+    probe.unlink()
+    return dirs[0]
+
+
+def _check_append_visible() -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix="scan_append_"))
+    original = scan.get_effective_local_import_root_dir
+    try:
+        data_dir = work / "sh" / "lday"
+        data_dir.mkdir(parents=True)
+        path = data_dir / "sh600000.day"
+        path.write_bytes(b"\x00" * 64)
+        scan.get_effective_local_import_root_dir = lambda: work
+
+        before = scan.scan_importable_files(force=True)
+        dir_mtime = os.stat(data_dir).st_mtime_ns
+        with open(path, "ab") as f:
+            f.write(b"\x01" * 32)
+        os.utime(path, ns=(before[0].file_mtime_ns + 10**9, before[0].file_mtime_ns + 10**9))
+        after = scan.scan_importable_files(force=False)
+
+        st = path.stat()
+        return {
+            "dir_mtime_unchanged": os.stat(data_dir).st_mtime_ns == dir_mtime,
+            "size": [before[0].file_size, after[0].file_size],
+            "ok": (
+                after[0].file_size == st.st_size == 96
+                and after[0].file_mtime_ns == st.st_mtime_ns != before[0].file_mtime_ns
+            ),
+        }
+    finally:
+        scan.get_effective_local_import_root_dir = original
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default="")
+    parser.add_argument("--touch", action="store_true")
+    args = parser.parse_args()
+
+    if args.dir:
+        fixed = Path(args.dir).expanduser().resolve()
+        scan.get_effective_local_import_root_dir = lambda: fixed
+
+    root = scan.get_effective_local_import_root_dir().resolve()
+    payload = {
+        "ok": False,
+        "test": "local_files.scan_scandir",
+        "root": str(root),
+        "files": 0,
+        "timings_ms": {},
+        "touched_dir": None,
+        "append": None,
+        "mismatches": [],
+        "message": "",
+    }
+
+    try:
+        t0 = time.perf_counter()
+        ref = scan.scan_importable_files_reference()
+        payload["timings_ms"]["reference"] = round((time.perf_counter() - t0) * 1000, 1)
+        payload["files"] = len(ref)
+
+        runs = [("cold", True), ("warm", False)]
+        if args.touch:
+            runs.append(("touch", False))
+
+        for name, force in runs:
+            if name == "touch":
+                payload["touched_dir"] = _touch_first_data_dir(root)
+            t0 = time.perf_counter()
+            got = scan.scan_importable_files(force=force)
+            payload["timings_ms"][name] = round((time.perf_counter() - t0) * 1000, 1)
+            for m in _diff(got, ref):
+                payload["mismatches"].append({"run": name, **m})
+
+        payload["append"] = _check_append_visible()
+        payload["ok"] = not payload["mismatches"] and len(ref) > 0 and payload["append"]["ok"]
+        payload["mismatches"] = payload["mismatches"][:20]
+    except Exception as e:
+        payload["message"] = str(e)[:1000]
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
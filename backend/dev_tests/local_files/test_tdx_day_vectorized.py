@@ -0,0 +1,98 @@
+# backend/dev_tests/local_files/test_tdx_day_vectorized.py
+# ==============================
+# .day 向量化解析 - 与逐条 struct 原实现的等价性验证
+#
+# 作用：
+#   - 递归扫描 vipdoc 目录下的 .day 文件（默认 settings.tdx_vipdoc_dir）
+#   - 每个文件分别用 load_tdx_day_df / load_tdx_day_df_reference 解析
+#   - 逐列比较（dtype 与值均须完全一致，NaN 视为相等）；两者报错时要求报错信息一致
+#   - 输出两种实现的累计耗时
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_tdx_day_vectorized
+#   python -m backend.dev_tests.local_files.test_tdx_day_vectorized --dir D:\TDX_new\vipdoc --limit 2000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from backend.datasource.local_files.tdx_day import load_tdx_day_df, load_tdx_day_df_reference
+from backend.settings import settings
+
+
+def _run(fn, path: Path):
+    t0 = time.perf_counter()
+    try:
+        return fn(path), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+
+def _compare(new_df: pd.DataFrame, ref_df: pd.DataFrame) -> str | None:
+    if list(new_df.columns) != list(ref_df.columns):
+        return f"columns differ: {list(new_df.columns)} vs {list(ref_df.columns)}"
+    if len(new_df) != len(ref_df):
+        return f"row count differs: {len(new_df)} vs {len(ref_df)}"
+    if len(ref_df) == 0:
+        return None
+    try:
+        pd.testing.assert_frame_equal(new_df, ref_df, check_exact=True)
+    except AssertionError as e:
+        return str(e)
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=str(settings.tdx_vipdoc_dir))
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+
+    root = Path(args.dir).resolve()
+    files = sorted(root.rglob("*.day"))
+    if args.limit > 0:
+        files = files[: args.limit]
+
+    payload = {
+        "ok": True,
+        "test": "local_files.tdx_day_vectorized",
+        "root": str(root),
+        "files": len(files),
+        "rows": 0,
+        "mismatches": [],
+        "vectorized_seconds": 0.0,
+        "reference_seconds": 0.0,
+    }
+
+    for p in files:
+        new_df, new_err, t_new = _run(load_tdx_day_df, p)
+        ref_df, ref_err, t_ref = _run(load_tdx_day_df_reference, p)
+        payload["vectorized_seconds"] += t_new
+        payload["reference_seconds"] += t_ref
+
+        if new_err or ref_err:
+            if new_err != ref_err:
+                payload["mismatches"].append({"file": str(p), "vectorized": new_err, "reference": ref_err})
+            continue
+
+        diff = _compare(new_df, ref_df)
+        if diff:
+            payload["mismatches"].append({"file": str(p), "diff": diff[:500]})
+        payload["rows"] += len(ref_df)
+
+    payload["ok"] = not payload["mismatches"] and len(files) > 0
+    payload["vectorized_seconds"] = round(payload["vectorized_seconds"], 3)
+    payload["reference_seconds"] = round(payload["reference_seconds"], 3)
+    payload["mismatches"] = payload["mismatches"][:20]
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# backend/dev_tests/local_files/test_tdx_gbbq_vectorized.py
+# ==============================
+# gbbq 向量化 Blowfish 解密 - 与逐块纯 Python 原实现的等价性验证
+#
+# 作用：
+#   - 字节级：每条记录的 29 字节明文，decrypt_gbbq_records_np 与 _decrypt_gbbq_record_body 必须完全一致
+#   - 结果级：load_tdx_gbbq_df 与 load_tdx_gbbq_df_reference 的 DataFrame 必须完全一致
+#   - 输出两种实现耗时
+#
+# 数据来源：
+#   - 默认读取 settings.tdx_hq_cache_dir/gbbq
+#   - --synthetic N：在临时目录按同一密钥加密生成 N 条随机记录（含非法市场 / 日期 / 代码、重复键），
+#     用于没有通达信目录的环境
+#
+# 运行方式（示例）：
+#   python -m backend.dev_tests.local_files.test_tdx_gbbq_vectorized
+#   python -m backend.dev_tests.local_files.test_tdx_gbbq_vectorized --synthetic 150000
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from backend.datasource.local_files import tdx_gbbq
+from backend.settings import settings
+
+
+def _encrypt_block(block8: bytes) -> bytes:
+    # Blowfish 加密轮序（解密的逆过程），仅用于生成合成样本
+    left, right = struct.unpack("<II", block8)
+    for i in range(16):
+        left ^= tdx_gbbq._P_ARRAY[i]
+        right ^= tdx_gbbq._bf_f(left)
+        left, right = right, left
+    left, right = right, left
+    right ^= tdx_gbbq._P_ARRAY[16]
+    left ^= tdx_gbbq._P_ARRAY[17]
+    return struct.pack("<II", left, right)
+
+
+def _write_synthetic_gbbq(root: Path, n: int) -> None:
+    rng = random.Random(20240601)
+    codes = [f"{600000 + i:06d}".encode() for i in range(max(1, n // 20))] + [b"AB12", b"", b"60\x00001"]
+    body = bytearray()
+    for _ in range(n):
+        plain = struct.pack(
+            "<B7sIBffff",
+            rng.choice([0, 1, 2, 2, 7]),
+            rng.choice(codes),
+            rng.choice([rng.randint(19900101, 20251231), 1234, 4000000000]),
+            rng.randint(1, 15),
+            rng.uniform(-10, 100),
+            rng.uniform(0, 50),
+            rng.uniform(0, 1e6),
+            rng.uniform(0, 1e6),
+        )
+        body += b"".join(_encrypt_block(plain[k:k + 8]) for k in (0, 8, 16)) + plain[24:]
+    (root / "gbbq").write_bytes(struct.pack("<I", n) + bytes(body))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=0)
+    args = parser.parse_args()
+
+    tmp = None
+    if args.synthetic > 0:
+        tmp = tempfile.TemporaryDirectory()
+        _write_synthetic_gbbq(Path(tmp.name), args.synthetic)
+        settings.tdx_hq_cache_dir = Path(tmp.name)
+
+    payload = {
+        "ok": False,
+        "test": "local_files.tdx_gbbq_vectorized",
+        "file": str(tdx_gbbq._gbbq_file_path()),
+        "records": 0,
+        "byte_mismatches": 0,
+        "df_equal": False,
+        "df_rows": 0,
+        "vectorized_seconds": 0.0,
+        "reference_seconds": 0.0,
+        "message": "",
+    }
+
+    try:
+        _, total, raw = tdx_gbbq._read_gbbq_payload()
+        payload["records"] = int(total)
+
+        plain = tdx_gbbq.decrypt_gbbq_records_np(raw, total)
+        mismatches = 0
+        for i in range(total):
+            rec = raw[i * 29:(i + 1) * 29]
+            if tdx_gbbq._decrypt_gbbq_record_body(rec[:24], rec[24:]) != plain[i].tobytes():
+                mismatches += 1
+        payload["byte_mismatches"] = mismatches
+
+        t0 = time.perf_counter()
+        new_df = tdx_gbbq.load_tdx_gbbq_df()
+        payload["vectorized_seconds"] = round(time.perf_counter() - t0, 3)
+
+        t0 = time.perf_counter()
+        ref_df = tdx_gbbq.load_tdx_gbbq_df_reference()
+        payload["reference_seconds"] = round(time.perf_counter() - t0, 3)
+
+        pd.testing.assert_frame_equal(new_df, ref_df, check_exact=True)
+        payload["df_equal"] = True
+        payload["df_rows"] = len(ref_df)
+        payload["ok"] = mismatches == 0
+    except Exception as e:
+        payload["message"] = str(e)[:1000]
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    print(json.dumps(payload, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 # ==============================
 # 说明：复权因子查询路由
 # 职责：提供前端查询复权因子的接口
+#
+# 本轮改动（因子按市场区分）：
+#   - 新增必填参数 market：同代码标的在不同市场各有因子
 # ==============================
 
 from __future__ import annotations
@@ -21,6 +24,7 @@ router = APIRouter(prefix="/api", tags=["factors"])
 @router.get("/factors")
 async def api_get_factors(
     request: Request,
+    market: str = Query(..., description="市场（SH / SZ）"),
     symbol: str = Query(..., description="标的代码"),
     start_date: Optional[str] = Query(None, description="起始日期（YYYYMMDD）"),
     end_date: Optional[str] = Query(None, description="结束日期（YYYYMMDD）"),
@@ -45,8 +49,8 @@ async def api_get_factors(
         line=0,
         trace_id=tid,
         event="api.factors.start",
-        message=f"查询复权因子 {symbol}",
-        extra={"symbol": symbol, "start_date": start_date, "end_date": end_date}
+        message=f"查询复权因子 {market}.{symbol}",
+        extra={"market": market, "symbol": symbol, "start_date": start_date, "end_date": end_date}
     )
     
     try:
@@ -57,6 +61,7 @@ async def api_get_factors(
         # 查询因子
         factors = await asyncio.to_thread(
             select_factors,
+            market=market,
             symbol=symbol,
             start_date=start_ymd,
             end_date=end_ymd
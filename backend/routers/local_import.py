@@ -29,13 +29,26 @@
 #   - 因此已删除 /api/local-import/tasks 明细接口
 #   - 后端唯一实时状态路径统一收敛为：
 #       local_import.status
+#
+# 本轮改动（分阶段流水线）：
+#   - GET /status 附带 pipeline：当前（或最近一次）导入流水线各阶段的吞吐与队列深度计数器
+#
+# 本轮改动（快速扫描）：
+#   - POST /candidates/refresh 支持 ?force=true：忽略扫描器目录缓存，全部目录重新扫描
+#
+# 本轮改动（候选视图缓存）：
+#   - GET /candidates 支持 market / freq / keyword 筛选与 offset / limit 分页，返回附带 total（筛选后总数）
+#
+# 本轮改动（候选扫描快照入库）：
+#   - GET /candidates 支持 changed_since（快照 version）：只返回其后新增 / 变化的文件
+#   - POST /candidates/refresh 返回本次快照 version 与差异计数
 # ==============================
 
 from __future__ import annotations
 
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
 from pydantic import BaseModel, Field
 
 from backend.services.local_import.candidates import (
@@ -43,6 +56,7 @@ from backend.services.local_import.candidates import (
     refresh_import_candidates_snapshot,
 )
 from backend.services.local_import.repository import build_status_snapshot
+from backend.services.local_import.pipeline import get_import_pipeline_stats
 from backend.services.local_import.orchestrator import (
     start_import_batch,
     cancel_import_batch,
@@ -83,11 +97,20 @@ class SaveSettingsRequest(BaseModel):
 
 
 @router.get("/candidates")
-async def api_local_import_candidates(request: Request) -> Dict[str, Any]:
+async def api_local_import_candidates(
+    request: Request,
+    market: Optional[str] = Query(None, description="市场筛选：SH / SZ / BJ"),
+    freq: Optional[str] = Query(None, description="频率筛选：1d / 1m / 5m"),
+    keyword: Optional[str] = Query(None, description="代码或名称包含"),
+    changed_since: Optional[int] = Query(None, ge=0, description="只返回该快照 version 之后新增 / 变化的文件"),
+    offset: int = Query(0, ge=0, description="分页起点"),
+    limit: Optional[int] = Query(None, ge=1, description="分页大小；不传返回全部"),
+) -> Dict[str, Any]:
     """
     轻操作：
       - 只读取当前已保存候选结果
       - 不触发重扫描
+      - 可选筛选 / 分页，total 为筛选后总数
     """
     tid = request.headers.get("x-trace-id")
 
@@ -101,10 +124,25 @@ async def api_local_import_candidates(request: Request) -> Dict[str, Any]:
         trace_id=tid,
         event="local_import.candidates.get.start",
         message="GET /api/local-import/candidates",
+        extra={
+            "market": market,
+            "freq": freq,
+            "keyword": keyword,
+            "changed_since": changed_since,
+            "offset": offset,
+            "limit": limit,
+        },
     )
 
     try:
-        payload = get_import_candidates_snapshot()
+        payload = get_import_candidates_snapshot(
+            market=market,
+            freq=freq,
+            keyword=keyword,
+            changed_since=changed_since,
+            offset=offset,
+            limit=limit,
+        )
 
         log_event(
             logger=_LOG,
@@ -119,6 +157,7 @@ async def api_local_import_candidates(request: Request) -> Dict[str, Any]:
             extra={
                 "ready": bool(payload.get("ready")),
                 "rows": len(payload.get("items") or []),
+                "total": payload.get("total"),
             },
         )
         return payload
@@ -140,10 +179,13 @@ async def api_local_import_candidates(request: Request) -> Dict[str, Any]:
 
 
 @router.post("/candidates/refresh")
-async def api_local_import_candidates_refresh(request: Request) -> Dict[str, Any]:
+async def api_local_import_candidates_refresh(
+    request: Request,
+    force: bool = Query(False, description="忽略目录缓存，全部目录重新扫描"),
+) -> Dict[str, Any]:
     """
     重操作：
-      - 显式触发重扫描
+      - 显式触发重扫描（未变化目录默认复用扫描缓存；force=true 时全部重扫）
       - 覆盖当前候选结果真相源
       - 只返回轻状态，不返回候选结果本体
     """
@@ -159,10 +201,11 @@ async def api_local_import_candidates_refresh(request: Request) -> Dict[str, Any
         trace_id=tid,
         event="local_import.candidates.refresh.start",
         message="POST /api/local-import/candidates/refresh",
+        extra={"force": bool(force)},
     )
 
     try:
-        payload = refresh_import_candidates_snapshot()
+        payload = refresh_import_candidates_snapshot(force=force)
 
         log_event(
             logger=_LOG,
@@ -177,6 +220,8 @@ async def api_local_import_candidates_refresh(request: Request) -> Dict[str, Any
             extra={
                 "ready": bool(payload.get("ready")),
                 "generated_at": payload.get("generated_at"),
+                "version": payload.get("version"),
+                "diff": payload.get("diff"),
             },
         )
         return payload
@@ -275,6 +320,7 @@ async def api_local_import_status(request: Request) -> Dict[str, Any]:
             "display_batch": snap.get("display_batch"),
             "queued_batches": snap.get("queued_batches") or [],
             "ui_message": snap.get("ui_message"),
+            "pipeline": get_import_pipeline_stats(),
         }
     except Exception as e:
         raise http_500_from_exc(e, trace_id=tid)
@@ -24,7 +24,7 @@ from typing import Dict, Any, Optional
 
 from fastapi import APIRouter, Request, Query
 
-from backend.db.connection import get_conn
+from backend.db.connection import get_read_conn
 from backend.utils.errors import http_500_from_exc
 from backend.utils.logger import get_logger, log_event
 
@@ -130,7 +130,7 @@ async def api_get_profile_current(
 
 
 def _select_profile_for_symbol_market(symbol: str, market: str) -> Optional[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     market_u = str(market or "").strip().upper()
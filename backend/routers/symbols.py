@@ -19,7 +19,7 @@ from fastapi import APIRouter, Request
 from typing import Dict, Any
 
 from backend.utils.errors import http_500_from_exc
-from backend.db.connection import get_conn
+from backend.db.connection import get_read_conn
 from backend.utils.logger import get_logger, log_event
 
 router = APIRouter(prefix="/api/symbols", tags=["symbols"])
@@ -103,7 +103,7 @@ async def api_symbols_summary(request: Request) -> Dict[str, Any]:
     )
 
     try:
-        conn = get_conn()
+        conn = get_read_conn()
         cur = conn.cursor()
 
         cur.execute(
@@ -162,7 +162,7 @@ async def api_symbols_summary(request: Request) -> Dict[str, Any]:
 
 
 def _select_symbol_index_only() -> list:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
 
     cur.execute(
@@ -26,7 +26,7 @@ from typing import Dict, Any, List
 
 from fastapi import APIRouter, Request
 
-from backend.db.connection import get_conn
+from backend.db.connection import get_read_conn
 from backend.utils.errors import http_500_from_exc
 from backend.utils.logger import get_logger, log_event
 
@@ -115,7 +115,7 @@ def _select_trade_calendar_all() -> List[Dict[str, Any]]:
         - market        (str)
         - is_trading_day(int)
     """
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
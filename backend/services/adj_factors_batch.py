@@ -0,0 +1,156 @@
+# backend/services/adj_factors_batch.py
+# ==============================
+# 复权因子全市场批量物化
+#
+# 职责：
+#   - 读取 gbbq_events_raw 全部 category=1 事件 + 本地日线收盘价
+#   - 调用 compute_tdx_gbbq_adj_factors_batch 一次性计算 hfq / qfq
+#   - 按标的整体替换 adj_factors（replace_factors_batch），并清除失效标记
+#
+# 设计：
+#   - 按市场分组、每块 _SERIES_PER_CHUNK 个标的读取日线收盘价，块内一次 searchsorted，
+#     避免全市场日线同时驻留内存；每块一个写事务
+#   - 单标的失败（缺前收盘 / 分母非法 / 除权价非法 / 无日线）只跳过该标的并计入报告，
+#     其旧因子与失效标记保持不变，请求侧仍可走 ensure_local_factors 兜底
+#   - 已无 category=1 事件的失效标的：写入空因子（删除旧因子并清除失效标记）
+#
+# 调用方：
+#   - factor_events_snapshot：gbbq 变化时全量物化；未变化时只物化仍处于失效状态的标的
+# ==============================
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from backend.db.candles import select_candles_day_close_arrays
+from backend.db.factors import replace_factors_batch, select_stale_factor_series
+from backend.db.gbbq_events import select_gbbq_events_raw
+from backend.services.normalizer import compute_tdx_gbbq_adj_factors_batch
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("adj_factors_batch")
+
+_SERIES_PER_CHUNK = 500
+_FAILURE_SAMPLES = 50
+
+_FIELD_RENAME = {
+    "field1": "cash_dividend_per_10",
+    "field2": "rights_price",
+    "field3": "bonus_share_per_10",
+    "field4": "rights_share_per_10",
+}
+
+
+def _load_factor_events(series: Optional[Set[Tuple[str, str]]]) -> pd.DataFrame:
+    rows = select_gbbq_events_raw(category=1)
+    df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=["market", "symbol", "date", *_FIELD_RENAME])
+    df = df.rename(columns=_FIELD_RENAME)
+    df["market"] = df["market"].astype(str).str.strip().str.upper()
+    df["symbol"] = df["symbol"].astype(str).str.strip()
+    if series is not None:
+        keys = pd.MultiIndex.from_arrays([df["market"], df["symbol"]])
+        df = df[keys.isin(list(series))]
+    return df
+
+
+def _chunks(symbols: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(symbols), size):
+        yield symbols[i:i + size]
+
+
+def materialize_adj_factors(
+    series: Optional[Iterable[Tuple[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    批量物化复权因子（同步，供 asyncio.to_thread 调用）。
+
+    Args:
+        series: 限定的 (market, symbol)；None 表示全部有 category=1 事件的标的 + 全部失效标的
+
+    Returns:
+        报告：series / computed / failed / failed_by_code / failures（样本）/ rows_written / duration_ms
+    """
+    started = time.perf_counter()
+    wanted: Optional[Set[Tuple[str, str]]] = None
+    if series is not None:
+        wanted = {(str(m).strip().upper(), str(s).strip()) for m, s in series}
+
+    events = _load_factor_events(wanted)
+
+    targets: Set[Tuple[str, str]] = set(zip(events["market"], events["symbol"]))
+    stale = {(r["market"], r["symbol"]) for r in select_stale_factor_series()}
+    # 失效但已无事件的标的：写空因子以清除旧因子与失效标记
+    orphaned = (stale if wanted is None else stale & wanted) - targets
+
+    by_market: Dict[str, List[str]] = {}
+    for m, s in sorted(targets):
+        by_market.setdefault(m, []).append(s)
+
+    computed = 0
+    rows_written = 0
+    failures: Dict[Tuple[str, str], str] = {}
+
+    for market, symbols in by_market.items():
+        market_events = events[events["market"] == market]
+        for chunk in _chunks(symbols, _SERIES_PER_CHUNK):
+            chunk_events = market_events[market_events["symbol"].isin(chunk)]
+            closes = select_candles_day_close_arrays(market, chunk)
+            closes["market"] = [market] * len(closes["symbol"])
+
+            factors_df, chunk_failures = compute_tdx_gbbq_adj_factors_batch(chunk_events, closes)
+            failures.update(chunk_failures)
+
+            items = [
+                (
+                    market,
+                    symbol,
+                    [
+                        {"market": market, "symbol": symbol, "date": d, "qfq_factor": q, "hfq_factor": h}
+                        for d, q, h in zip(
+                            grp["date"].tolist(),
+                            grp["qfq_factor"].tolist(),
+                            grp["hfq_factor"].tolist(),
+                        )
+                    ],
+                )
+                for (_, symbol), grp in factors_df.groupby(["market", "symbol"], sort=False)
+            ]
+            if items:
+                rows_written += replace_factors_batch(items)
+                computed += len(items)
+
+    if orphaned:
+        replace_factors_batch([(m, s, []) for m, s in sorted(orphaned)])
+
+    by_code = Counter(msg.split(":", 1)[0] for msg in failures.values())
+    report = {
+        "series": len(targets),
+        "computed": computed,
+        "cleared": len(orphaned),
+        "failed": len(failures),
+        "failed_by_code": dict(by_code),
+        "failures": [
+            {"market": m, "symbol": s, "message": msg}
+            for (m, s), msg in sorted(failures.items())[:_FAILURE_SAMPLES]
+        ],
+        "rows_written": rows_written,
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+
+    _LOG.info(
+        "[ADJ_FACTORS_BATCH] series=%s computed=%s cleared=%s failed=%s rows=%s duration_ms=%s",
+        report["series"],
+        computed,
+        report["cleared"],
+        report["failed"],
+        rows_written,
+        report["duration_ms"],
+    )
+    if failures:
+        _LOG.warning("[ADJ_FACTORS_BATCH] failed_by_code=%s samples=%s", dict(by_code), report["failures"][:5])
+
+    return report
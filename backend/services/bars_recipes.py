@@ -14,6 +14,21 @@
 #   - SH/SZ 远程逐页补缺
 #   - BJ 不做远程补缺，只提示缺口
 #   - 原始数据统一“最终一次性落回”本地真相源
+#
+# 本轮改动（日线列式打包存储）：
+#   - 开启 day_bars_packed_store_enabled 时，日线整段读取优先走 candles_day_packed
+#     （np.frombuffer 直接得到列数组），打包表无数据、或打包行数与 series_summary.rows 不一致
+#     （开关打开后未回填）时回退 candles_day_raw
+#
+# 本轮改动（数组化读取）：
+#   - 回退路径改用 select_candles_day_arrays：元组 -> numpy 列数组 -> DataFrame，
+#     不再经过 sqlite3.Row / dict / DataFrame(records) 多次拷贝
+#
+# 本轮改动（序列摘要）：
+#   - 运行时缓存按 series_summary.version 校验：序列被其它路径写入后自动失效重载
+#
+# 本轮改动（因子失效标记）：
+#   - ensure_local_factors 重算后改用 replace_symbol_factors 整标的替换，并清除失效标记
 # ==============================
 
 from __future__ import annotations
@@ -22,7 +37,8 @@ from typing import Dict, Any, Optional
 import asyncio
 import pandas as pd
 
-from backend.db.candles import select_candles_day_raw, upsert_candles_day_raw
+from backend.db.candles import select_candles_day_arrays, upsert_candles_day_raw
+from backend.db.candles_packed import is_packed_store_enabled, select_packed_day_arrays
 from backend.datasource.providers.tdx_remote_adapter import get_auto_routed_bars_tdx_remote
 from backend.services.market_cache import get_market_cache
 from backend.services.market_gap import (
@@ -33,7 +49,8 @@ from backend.services.market_gap import (
 from backend.services.minute_archive import merge_and_write_minute_archive, read_minute_archive_df
 from backend.services.normalizer import normalize_tdx_gbbq_adj_factors_df
 from backend.db.gbbq_events import select_gbbq_events_raw
-from backend.db.factors import upsert_factors
+from backend.db.factors import replace_symbol_factors
+from backend.db.series_summary import get_series_summary, get_series_version
 from backend.utils.logger import get_logger
 
 _LOG = get_logger("bars_recipes")
@@ -54,22 +71,32 @@ def _base_cache_freq_from_request_freq(request_freq: str) -> str:
     return "1d"
 
 
+_DAY_DF_COLUMNS = ["ts", "open", "high", "low", "close", "volume", "amount", "turnover_rate"]
+
+
+def _day_df_from_arrays(arrays: Dict[str, Any]) -> pd.DataFrame:
+    df = pd.DataFrame({k: arrays[k] for k in _DAY_DF_COLUMNS[:-1]}, copy=False)
+    df["turnover_rate"] = None
+    return df
+
+
 async def _load_day_df_from_db(market: str, code: str) -> pd.DataFrame:
-    rows = await asyncio.to_thread(
-        select_candles_day_raw,
+    if is_packed_store_enabled():
+        arrays = await asyncio.to_thread(select_packed_day_arrays, market, code)
+        if arrays is not None and len(arrays["ts"]) > 0:
+            # 打包表是派生层：行数与摘要一致才视为完整历史（未回填 / 部分年份时回退生效表）
+            summary = await asyncio.to_thread(get_series_summary, market, code, "1d")
+            if summary is not None and int(summary["rows"]) == len(arrays["ts"]):
+                return _day_df_from_arrays(arrays)
+
+    arrays = await asyncio.to_thread(
+        select_candles_day_arrays,
         market=market,
         symbol=code,
-        start_ts=None,
-        end_ts=None,
-        limit=None,
-        offset=0,
     )
-    if not rows:
-        return pd.DataFrame(columns=["ts", "open", "high", "low", "close", "volume", "amount", "turnover_rate"])
-    df = pd.DataFrame(rows)
-    if "turnover_rate" not in df.columns:
-        df["turnover_rate"] = None
-    return df[["ts", "open", "high", "low", "close", "volume", "amount", "turnover_rate"]].copy()
+    if len(arrays["ts"]) == 0:
+        return pd.DataFrame(columns=_DAY_DF_COLUMNS)
+    return _day_df_from_arrays(arrays)
 
 
 def _normalize_remote_day_df(raw_df: pd.DataFrame) -> pd.DataFrame:
@@ -190,12 +217,13 @@ async def ensure_local_day_bars(
     refresh_interval_seconds: Optional[int],
 ) -> Dict[str, Any]:
     cache = get_market_cache()
-    cached = cache.get(market, code, "1d")
+    version = await asyncio.to_thread(get_series_version, market, code, "1d")
+    cached = cache.get(market, code, "1d", version=version)
     is_hot = cached is not None
 
     if cached is None:
         working_df = await _load_day_df_from_db(market, code)
-        cache.put(market, code, "1d", working_df)
+        cache.put(market, code, "1d", working_df, version=version)
     else:
         working_df = cached.copy()
 
@@ -259,7 +287,8 @@ async def ensure_local_day_bars(
                 "amount": float(row["amount"]) if row["amount"] is not None else None,
             })
         await asyncio.to_thread(upsert_candles_day_raw, records)
-        cache.put(market, code, "1d", working_df)
+        version = await asyncio.to_thread(get_series_version, market, code, "1d")
+        cache.put(market, code, "1d", working_df, version=version)
 
     gap = assess_day_gap(market=market, code=code, day_df=working_df)
     if gap["has_gap"] and gap["remote_supported"] and remote_exhausted:
@@ -317,7 +346,8 @@ async def _ensure_local_minute_bars(
     refresh_interval_seconds: Optional[int],
 ) -> Dict[str, Any]:
     cache = get_market_cache()
-    cached = cache.get(market, code, freq)
+    version = await asyncio.to_thread(get_series_version, market, code, freq)
+    cached = cache.get(market, code, freq, version=version)
     is_hot = cached is not None
 
     if cached is None:
@@ -327,7 +357,7 @@ async def _ensure_local_minute_bars(
             symbol=code,
             freq=freq,
         )
-        cache.put(market, code, freq, working_df)
+        cache.put(market, code, freq, working_df, version=version)
     else:
         working_df = cached.copy()
 
@@ -383,7 +413,8 @@ async def _ensure_local_minute_bars(
             freq=freq,
             df=working_df,
         )
-        cache.put(market, code, freq, working_df)
+        version = await asyncio.to_thread(get_series_version, market, code, freq)
+        cache.put(market, code, freq, working_df, version=version)
 
     gap = assess_minute_gap(market=market, code=code, freq=freq, minute_df=working_df)
     if gap["has_gap"] and gap["remote_supported"] and remote_exhausted:
@@ -508,12 +539,14 @@ async def ensure_local_factors(
     records = []
     for _, row in factor_df.iterrows():
         records.append({
+            "market": market,
             "symbol": code,
             "date": int(row["date"]),
             "qfq_factor": float(row["qfq_factor"]),
             "hfq_factor": float(row["hfq_factor"]),
         })
-    await asyncio.to_thread(upsert_factors, records)
+    # 整标的替换：事件被删除/修订后不残留旧日期因子，并清除失效标记
+    await asyncio.to_thread(replace_symbol_factors, market, code, records)
 
     return {
         "factor_ready": True,
@@ -41,7 +41,7 @@ def apply_adjustment(
     if req == "none":
         return bars_df.copy(), "none", ""
 
-    factor_rows = select_factors(symbol=code, start_date=None, end_date=None)
+    factor_rows = select_factors(market=market, symbol=code, start_date=None, end_date=None)
     if not factor_rows:
         return (
             bars_df.copy(),
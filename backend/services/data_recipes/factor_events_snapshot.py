@@ -8,30 +8,179 @@
 #   - 落库为 gbbq_events_raw
 #
 # 说明：
-#   - 本轮只完成“原始事件素材层”入库
-#   - 不在本轮计算 factor 成品表
+#   - 原始事件素材层入库后，随即批量物化 factor 成品表（见“因子物化”）
+#
+# 本轮改动（变化感知）：
+#   - gbbq 文件指纹（size / mtime_ns / content_hash）记录在 source_file_fingerprints
+#       * size + mtime 未变：直接跳过，不读文件
+#       * 内容哈希未变：只刷新指纹，跳过解析
+#   - 文件变化时与库内事件做集合差异，只 upsert 新增/变化行、删除消失行
+#   - 差异涉及 category=1（除权除息）的标的标记为因子失效（adj_factors_stale），
+#     仅这些标的需要重算因子
+#   - task.params["force"]=True 时忽略指纹，强制解析并做差异
+#
+# 本轮改动（因子物化）：
+#   - 事件同步后立即批量物化 adj_factors（materialize_adj_factors）：
+#       * gbbq 有变化：全量物化
+#       * gbbq 未变化：只物化仍处于失效状态的标的（无则跳过）
+#   - 物化失败的标的只计入报告（job result extra.factors），不影响事件快照任务成败
 # ==============================
 
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 import asyncio
 import pandas as pd
 
 from backend.datasource import dispatcher
+from backend.datasource.local_files.tdx_gbbq import get_gbbq_file_fingerprint
 from backend.db.data_task_status import (
     mark_data_task_running,
     mark_data_task_success,
     mark_data_task_failed,
 )
-from backend.db.gbbq_events import upsert_gbbq_events_raw
+from backend.db.factors import select_stale_factor_series
+from backend.db.file_fingerprints import get_file_fingerprint, record_file_fingerprint
+from backend.db.gbbq_events import apply_gbbq_events_diff, select_gbbq_events_raw
+from backend.services.adj_factors_batch import materialize_adj_factors
 from backend.services.task_model import Task
 from backend.services.task_events import emit_job_finished, emit_task_finished
 from backend.utils.logger import get_logger, log_event
 
 _LOG = get_logger("data_recipes.factor_events_snapshot")
 
+_FINGERPRINT_SOURCE = "gbbq"
+_KEY_COLS = ["market", "symbol", "date", "category"]
+_FIELD_COLS = ["field1", "field2", "field3", "field4"]
+
+# 参与复权因子计算的事件类别（与 ensure_local_factors 的读取口径一致）
+_FACTOR_EVENT_CATEGORY = 1
+
+
+def _check_gbbq_unchanged(force: bool) -> Tuple[bool, Dict[str, Any]]:
+    """
+    返回 (unchanged, fingerprint)。
+    unchanged=True 时已按需刷新指纹；否则 fingerprint 含 content_hash，供差异落库同事务写入。
+    """
+    fp = get_gbbq_file_fingerprint()
+    stored = None if force else get_file_fingerprint(_FINGERPRINT_SOURCE)
+
+    if stored and int(stored["size"]) == fp["size"] and int(stored["mtime_ns"]) == fp["mtime_ns"]:
+        return True, fp
+
+    fp = get_gbbq_file_fingerprint(with_hash=True)
+    if stored and stored["content_hash"] == fp["content_hash"]:
+        record_file_fingerprint(
+            _FINGERPRINT_SOURCE,
+            path=fp["path"],
+            size=fp["size"],
+            mtime_ns=fp["mtime_ns"],
+            content_hash=fp["content_hash"],
+            rows=int(stored["rows"]),
+        )
+        return True, fp
+
+    return False, fp
+
+
+def _events_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.reindex(columns=_KEY_COLS + _FIELD_COLS).copy()
+    out["market"] = out["market"].astype(str).str.strip().str.upper()
+    out["symbol"] = out["symbol"].astype(str).str.strip()
+    out["date"] = out["date"].astype("int64")
+    out["category"] = out["category"].astype("int64")
+    for c in _FIELD_COLS:
+        out[c] = pd.to_numeric(out[c], errors="coerce").astype("float64")
+    return out
+
+
+def _to_tuples(df: pd.DataFrame, cols: List[str]) -> List[Tuple[Any, ...]]:
+    if df.empty:
+        return []
+    part = df[cols].astype(object).where(df[cols].notna(), None)
+    return list(part.itertuples(index=False, name=None))
+
+
+def _diff_gbbq_events(
+    new_df: pd.DataFrame,
+    old_rows: List[Dict[str, Any]],
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]], List[Tuple[str, str]]]:
+    """
+    新旧事件集合差异。
+
+    Returns:
+        (upserts, deletes, stale_series)
+          - upserts：新增或任一字段变化（NaN 与 NULL 视为相等）
+          - deletes：旧有而新文件已不存在的键
+          - stale_series：差异中涉及因子事件类别的 (market, symbol)
+    """
+    new = _events_frame(new_df)
+    old = _events_frame(pd.DataFrame(old_rows, columns=_KEY_COLS + _FIELD_COLS))
+
+    merged = new.merge(old, on=_KEY_COLS, how="outer", suffixes=("", "_old"), indicator=True)
+
+    changed = pd.Series(False, index=merged.index)
+    for c in _FIELD_COLS:
+        a = merged[c]
+        b = merged[f"{c}_old"]
+        changed |= ~((a == b) | (a.isna() & b.isna()))
+
+    is_new = merged["_merge"] == "left_only"
+    is_gone = merged["_merge"] == "right_only"
+    is_upsert = is_new | ((merged["_merge"] == "both") & changed)
+
+    ups = merged[is_upsert]
+    gone = merged[is_gone]
+
+    touched = pd.concat([ups[_KEY_COLS], gone[_KEY_COLS]], ignore_index=True)
+    touched = touched[touched["category"] == _FACTOR_EVENT_CATEGORY]
+    stale: Set[Tuple[str, str]] = set(zip(touched["market"], touched["symbol"]))
+
+    return (
+        _to_tuples(ups, _KEY_COLS + _FIELD_COLS),
+        _to_tuples(gone, _KEY_COLS),
+        sorted(stale),
+    )
+
+
+def _sync_gbbq_events_diff(raw_df: pd.DataFrame, fingerprint: Dict[str, Any]) -> Dict[str, int]:
+    old_rows = select_gbbq_events_raw()
+    upserts, deletes, stale = _diff_gbbq_events(raw_df, old_rows)
+    return apply_gbbq_events_diff(
+        upserts,
+        deletes,
+        stale_series=stale,
+        fingerprint={
+            "source": _FINGERPRINT_SOURCE,
+            "path": fingerprint["path"],
+            "size": fingerprint["size"],
+            "mtime_ns": fingerprint["mtime_ns"],
+            "content_hash": fingerprint["content_hash"],
+            "rows": len(raw_df),
+        },
+    )
+
+
+def _materialize_factors(full: bool) -> Optional[Dict[str, Any]]:
+    """事件同步后的因子物化；异常只记录不外抛（请求侧仍可逐标的兜底计算）。"""
+    try:
+        if full:
+            return materialize_adj_factors()
+        stale = [(r["market"], r["symbol"]) for r in select_stale_factor_series()]
+        return materialize_adj_factors(stale) if stale else None
+    except Exception as e:
+        _LOG.error("[factor_events_snapshot配方] 因子物化异常: %s", e, exc_info=True)
+        return {"error": str(e)}
+
+
+def _factors_message(report: Optional[Dict[str, Any]]) -> str:
+    if not report:
+        return ""
+    if "error" in report:
+        return f"；复权因子物化异常：{report['error']}"
+    return f"；复权因子已物化 {report['computed']} 个标的，失败 {report['failed']} 个"
+
 
 async def run_factor_events_snapshot(task: Task) -> Dict[str, Any]:
     trace_id = task.trace_id
@@ -56,9 +205,34 @@ async def run_factor_events_snapshot(task: Task) -> Dict[str, Any]:
     )
 
     try:
-        raw_df, source_id = await dispatcher.fetch("gbbq_events_raw")
+        force = bool((task.params or {}).get("force"))
+        unchanged, fingerprint = await asyncio.to_thread(_check_gbbq_unchanged, force)
+
+        raw_df: Optional[pd.DataFrame] = None
+        if not unchanged:
+            raw_df, source_id = await dispatcher.fetch("gbbq_events_raw")
+
+        if unchanged:
+            factors = await asyncio.to_thread(_materialize_factors, False)
+            jobs_status[job_type] = "success"
+            mark_data_task_success("factor_events_snapshot")
 
-        if raw_df is None or (isinstance(raw_df, pd.DataFrame) and raw_df.empty):
+            emit_job_finished(
+                task,
+                job_type=job_type,
+                job_index=1,
+                job_count=1,
+                status="success",
+                result={
+                    "rows": 0,
+                    "message": "gbbq 文件未变化，跳过原始事件快照同步" + _factors_message(factors),
+                    "error_code": None,
+                    "error_message": None,
+                    "details": None,
+                    "extra": {"unchanged": True, "fingerprint": fingerprint, "factors": factors},
+                },
+            )
+        elif raw_df is None or (isinstance(raw_df, pd.DataFrame) and raw_df.empty):
             jobs_status[job_type] = "failed"
             mark_data_task_failed("factor_events_snapshot", "gbbq_events_raw dataframe is empty")
             emit_job_finished(
@@ -77,9 +251,9 @@ async def run_factor_events_snapshot(task: Task) -> Dict[str, Any]:
                 },
             )
         else:
-            records = raw_df.to_dict("records")
-            rows_written = await asyncio.to_thread(upsert_gbbq_events_raw, records)
-            total_rows = int(rows_written or 0)
+            diff = await asyncio.to_thread(_sync_gbbq_events_diff, raw_df, fingerprint)
+            total_rows = int(diff.get("upserted", 0)) + int(diff.get("deleted", 0))
+            factors = await asyncio.to_thread(_materialize_factors, True)
 
             jobs_status[job_type] = "success"
             mark_data_task_success("factor_events_snapshot")
@@ -92,11 +266,15 @@ async def run_factor_events_snapshot(task: Task) -> Dict[str, Any]:
                 status="success",
                 result={
                     "rows": total_rows,
-                    "message": f"gbbq 原始事件快照已更新 {total_rows} 条记录",
+                    "message": (
+                        f"gbbq 原始事件快照已更新：新增/变化 {diff.get('upserted', 0)} 条，"
+                        f"删除 {diff.get('deleted', 0)} 条，因子待重算标的 {diff.get('stale_series', 0)} 个"
+                        + _factors_message(factors)
+                    ),
                     "error_code": None,
                     "error_message": None,
                     "details": None,
-                    "extra": {"source_id": source_id},
+                    "extra": {"source_id": source_id, **diff, "factors": factors},
                 },
             )
 
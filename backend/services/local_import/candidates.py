@@ -12,26 +12,55 @@
 #   - GET candidates：只读当前已有结果，不触发重扫描
 #   - POST refresh：显式触发一次重扫描，并覆盖当前唯一结果
 #   - 新扫描结果覆盖旧结果，不保留历史版本
+#
+# 本轮改动（快速扫描）：
+#   - refresh_import_candidates_snapshot 增加 force：透传给扫描器，忽略目录缓存
+#
+# 本轮改动（候选视图缓存）：
+#   - 候选项补全改为集合式：一次读出 symbol_index 全表建 (market, symbol) 映射后逐项查表，
+#     不再每个扫描文件各查一次库
+#   - 补全后的候选视图按 (快照版本, symbol_index 版本) 缓存，两者都不变时 GET 不再解析快照、不再查库
+#   - GET candidates 支持筛选（market / freq / keyword）与分页（offset / limit），
+#     total 为筛选后总数；不传参数时行为与原来一致（返回全部候选）
+#
+# 本轮改动（候选扫描快照入库）：
+#   - 候选项附带 changed_version（该文件最近一次新增 / 变化时的快照 version）
+#   - GET candidates 返回当前快照 version，并支持 changed_since：只返回该 version 之后新增 / 变化的文件，
+#     前端可据此自动勾选需要导入的文件
+#   - refresh 返回本次快照 version 与差异计数（added / changed / removed / unchanged）
 # ==============================
 
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
+from backend.db.symbols import get_symbol_index_version, select_symbol_index
 from backend.services.local_import.runtime import get_local_import_runtime
 from backend.services.local_import.scan import build_scan_snapshot
 from backend.services.local_import.snapshot_store import (
     save_scan_snapshot,
 )
-from backend.utils.common import get_symbol_record_from_db
 from backend.utils.time import now_iso
 from backend.utils.logger import get_logger
 
 _LOG = get_logger("local_import.candidates")
 
+# (快照版本, symbol_index 版本) -> 补全后的候选视图
+_VIEW_CACHE_LOCK = threading.Lock()
+_VIEW_CACHE: Dict[str, Any] = {"key": None, "view": None}
+
+
+def _load_symbol_meta_map() -> Dict[Tuple[str, str], Dict[str, Any]]:
+    return {
+        (str(r.get("market") or "").strip().upper(), str(r.get("symbol") or "").strip()): r
+        for r in select_symbol_index()
+    }
+
 
 def _build_visible_items_from_snapshot(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
     scanned = snapshot.get("items") or []
+    meta_map = _load_symbol_meta_map() if scanned else {}
 
     items: List[Dict[str, Any]] = []
     for item in scanned:
@@ -40,13 +69,15 @@ def _build_visible_items_from_snapshot(snapshot: Dict[str, Any]) -> List[Dict[st
             symbol = str(item.get("symbol") or "").strip()
             freq = str(item.get("freq") or "").strip()
             file_datetime = item.get("file_datetime")
+            changed_version = item.get("changed_version")
         else:
             market = str(item.market or "").strip().upper()
             symbol = str(item.symbol or "").strip()
             freq = str(item.freq or "").strip()
             file_datetime = item.file_datetime
+            changed_version = None
 
-        meta = get_symbol_record_from_db(symbol=symbol, market=market)
+        meta = meta_map.get((market, symbol))
         if not meta:
             continue
 
@@ -62,61 +93,147 @@ def _build_visible_items_from_snapshot(snapshot: Dict[str, Any]) -> List[Dict[st
             "class": meta.get("class"),
             "type": meta.get("type"),
             "file_datetime": file_datetime,
+            "changed_version": changed_version,
         })
 
     items.sort(key=lambda x: (str(x.get("market")), str(x.get("symbol")), str(x.get("freq"))))
     return items
 
 
-def get_import_candidates_snapshot() -> Dict[str, Any]:
+def _get_visible_view() -> Optional[Dict[str, Any]]:
+    """
+    当前补全后的候选视图（带缓存）。
+
+    返回：
+      None -> 当前不存在候选结果
+      dict -> {"items", "scanned", "generated_at", "version", "cached"}
+    """
+    runtime = get_local_import_runtime()
+    snapshot_version = runtime.get_persisted_snapshot_version()
+    if snapshot_version is None:
+        return None
+
+    key = (snapshot_version, get_symbol_index_version())
+    with _VIEW_CACHE_LOCK:
+        if _VIEW_CACHE["key"] == key:
+            return {**_VIEW_CACHE["view"], "cached": True}
+
+        snapshot = runtime.get_persisted_snapshot()
+        if not snapshot:
+            return None
+
+        view = {
+            "items": _build_visible_items_from_snapshot(snapshot),
+            "scanned": len(snapshot.get("items") or []),
+            "generated_at": snapshot.get("generated_at"),
+            "version": snapshot.get("version"),
+        }
+        _VIEW_CACHE["key"] = key
+        _VIEW_CACHE["view"] = view
+        return {**view, "cached": False}
+
+
+def _filter_items(
+    items: List[Dict[str, Any]],
+    *,
+    market: Optional[str],
+    freq: Optional[str],
+    keyword: Optional[str],
+    changed_since: Optional[int],
+) -> List[Dict[str, Any]]:
+    m = str(market or "").strip().upper()
+    f = str(freq or "").strip()
+    k = str(keyword or "").strip().lower()
+    if not m and not f and not k and changed_since is None:
+        return items
+
+    return [
+        x for x in items
+        if (not m or x["market"] == m)
+        and (not f or x["freq"] == f)
+        and (not k or k in x["symbol"] or k in x["name"].lower())
+        and (changed_since is None or int(x.get("changed_version") or 0) > changed_since)
+    ]
+
+
+def get_import_candidates_snapshot(
+    *,
+    market: Optional[str] = None,
+    freq: Optional[str] = None,
+    keyword: Optional[str] = None,
+    changed_since: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     轻操作：
       - 只读取当前已持久化保存的候选结果
       - 不触发重扫描
+      - 可选筛选：market / freq / keyword（代码或名称包含）/ changed_since（该快照 version 之后新增或变化）
+      - 可选分页：offset / limit（limit 为空返回 offset 之后全部）
     """
-    runtime = get_local_import_runtime()
-    snapshot = runtime.get_persisted_snapshot()
+    view = _get_visible_view()
 
-    if not snapshot:
+    if not view:
         return {
             "ok": True,
             "ready": False,
             "items": [],
+            "total": 0,
+            "offset": 0,
+            "limit": limit,
+            "version": None,
             "generated_at": None,
             "ui_message": "当前还没有候选结果，请先刷新候选",
         }
 
-    items = _build_visible_items_from_snapshot(snapshot)
+    all_items = view["items"]
+    matched = _filter_items(
+        all_items,
+        market=market,
+        freq=freq,
+        keyword=keyword,
+        changed_since=changed_since,
+    )
+
+    start = max(int(offset or 0), 0)
+    page = matched[start:] if limit is None else matched[start:start + max(int(limit), 0)]
 
     ui_message = None
-    scanned = snapshot.get("items") or []
-    if scanned and not items:
+    if view["scanned"] and not all_items:
         ui_message = "已有候选扫描结果，但没有可用于展示处理的有效标的信息"
 
     _LOG.info(
-        "[LOCAL_IMPORT][CANDIDATES][GET] ready=true scanned=%s visible=%s generated_at=%s",
-        len(scanned),
-        len(items),
-        snapshot.get("generated_at"),
+        "[LOCAL_IMPORT][CANDIDATES][GET] ready=true scanned=%s visible=%s matched=%s returned=%s cached=%s generated_at=%s",
+        view["scanned"],
+        len(all_items),
+        len(matched),
+        len(page),
+        view["cached"],
+        view["generated_at"],
     )
 
     return {
         "ok": True,
         "ready": True,
-        "items": items,
-        "generated_at": snapshot.get("generated_at"),
+        "items": page,
+        "total": len(matched),
+        "offset": start,
+        "limit": limit,
+        "version": view["version"],
+        "generated_at": view["generated_at"],
         "ui_message": ui_message or "",
     }
 
 
-def refresh_import_candidates_snapshot() -> Dict[str, Any]:
+def refresh_import_candidates_snapshot(force: bool = False) -> Dict[str, Any]:
     """
     重操作：
-      - 显式重新扫描本地文件
+      - 显式重新扫描本地文件（force=True 时忽略目录缓存）
       - 覆盖当前唯一候选结果真相源
       - 只返回轻状态，不返回候选结果本体
     """
-    snapshot = build_scan_snapshot()
+    snapshot = build_scan_snapshot(force=force)
     saved = save_scan_snapshot(snapshot)
 
     scanned = saved.get("items") or []
@@ -125,8 +242,10 @@ def refresh_import_candidates_snapshot() -> Dict[str, Any]:
         ui_message = "刷新完成，但未扫描到可处理的本地盘后数据文件"
 
     _LOG.info(
-        "[LOCAL_IMPORT][CANDIDATES][REFRESH] scanned=%s generated_at=%s",
+        "[LOCAL_IMPORT][CANDIDATES][REFRESH] scanned=%s version=%s diff=%s generated_at=%s",
         len(scanned),
+        saved.get("version"),
+        saved.get("diff"),
         saved.get("generated_at"),
     )
 
@@ -134,5 +253,7 @@ def refresh_import_candidates_snapshot() -> Dict[str, Any]:
         "ok": True,
         "ready": True,
         "generated_at": saved.get("generated_at"),
+        "version": saved.get("version"),
+        "diff": saved.get("diff"),
         "ui_message": ui_message,
     }
@@ -0,0 +1,129 @@
+# backend/services/local_import/day_bulk.py
+# ==============================
+# 盘后数据导入 import - 日线批量装载会话
+#
+# 职责：
+#   - 在一次批次推进过程中攒批 .day 文件的类型化元组
+#   - 满足“文件数 / 行数”任一阈值即整体合并提交一次（db.candles_bulk）
+#   - 首个待装载文件到来时进入批量窗口（会话 PRAGMA），会话结束时恢复
+#
+# 任务状态约定：
+#   - 已解析但尚未提交的文件，其任务保持 running
+#   - 提交成功后由 orchestrator 统一落 success；提交失败统一落 failed
+#   - 会话持有的 running 任务不视为“外部阻塞”
+#
+# 本轮改动（增量读取）：
+#   - PendingDayFile 携带导入清单条目（manifest），提交成功后由 orchestrator 统一写入
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.db.candles_bulk import (
+    DayTuple,
+    begin_day_bulk_window,
+    bulk_upsert_day_tuples,
+    end_day_bulk_window,
+)
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("local_import.day_bulk")
+
+
+@dataclass
+class PendingDayFile:
+    market: str
+    symbol: str
+    freq: str
+    source_file_path: str
+    rows: List[DayTuple]
+    row_count: int = 0
+    manifest: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class DayBulkFlushResult:
+    files: List[PendingDayFile] = field(default_factory=list)
+    merged_rows: int = 0
+    error: Optional[BaseException] = None
+
+
+def is_day_bulk_enabled() -> bool:
+    return bool(getattr(settings, "local_import_day_bulk_enabled", False))
+
+
+class DayBulkSession:
+    """单次批次推进内的日线批量装载会话（仅在 orchestrator 协程内使用，无需加锁）。"""
+
+    def __init__(self):
+        self._pending: List[PendingDayFile] = []
+        self._pending_keys: Set[Tuple[str, str, str]] = set()
+        self._pending_rows = 0
+        self._window_open = False
+
+    @property
+    def pending_files(self) -> int:
+        return len(self._pending)
+
+    @property
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def owns(self, market: str, symbol: str, freq: str) -> bool:
+        return (str(market).upper(), str(symbol), str(freq)) in self._pending_keys
+
+    async def add(self, item: PendingDayFile) -> None:
+        if not self._window_open:
+            await asyncio.to_thread(begin_day_bulk_window)
+            self._window_open = True
+        item.row_count = len(item.rows)
+        self._pending.append(item)
+        self._pending_keys.add((item.market, item.symbol, item.freq))
+        self._pending_rows += len(item.rows)
+
+    def should_flush(self) -> bool:
+        if not self._pending:
+            return False
+        return (
+            len(self._pending) >= int(settings.local_import_day_bulk_files_per_commit)
+            or self._pending_rows >= int(settings.local_import_day_bulk_max_rows)
+        )
+
+    async def flush(self) -> DayBulkFlushResult:
+        """合并提交当前全部待装载文件；无论成败都清空待装载队列。"""
+        files = self._pending
+        rows_total = self._pending_rows
+        self._pending = []
+        self._pending_keys = set()
+        self._pending_rows = 0
+
+        if not files:
+            return DayBulkFlushResult()
+
+        rows: List[DayTuple] = []
+        for f in files:
+            rows.extend(f.rows)
+            f.rows = []
+
+        try:
+            merged = await asyncio.to_thread(bulk_upsert_day_tuples, rows)
+        except Exception as e:
+            _LOG.error("[BULK][DAY] flush failed files=%s rows=%s err=%s", len(files), rows_total, e)
+            return DayBulkFlushResult(files=files, error=e)
+
+        _LOG.info("[BULK][DAY] flush ok files=%s rows=%s", len(files), rows_total)
+        return DayBulkFlushResult(files=files, merged_rows=int(merged or 0))
+
+    async def close(self) -> None:
+        """结束批量窗口（调用前应已 flush）。"""
+        if not self._window_open:
+            return
+        self._window_open = False
+        try:
+            await asyncio.to_thread(end_day_bulk_window)
+        except Exception as e:
+            _LOG.error("[BULK][DAY] restore session pragmas failed: %s", e)
@@ -22,71 +22,349 @@
 #       * appended_rows
 #       * source_file_path
 #   - 不再返回 final_total_rows
+#
+# 本轮改动（日线批量装载）：
+#   - 新增 prepare_day_file_task：.day 只解析 + 标准化为类型化元组，不落库
+#     由 orchestrator 的批量装载会话攒批后统一合并提交
+#
+# 本轮改动（日线向量化标准化）：
+#   - prepare_day_file_task 改走列数组路径：
+#     load_tdx_day_arrays -> normalize_tdx_day_arrays -> day_arrays_to_tuples，全程不构造 DataFrame / dict
+#
+# 本轮改动（并行执行）：
+#   - 新增 prepare_import_file_sync：进程池入口，只做解析 + 标准化（不落库、不写归档），返回可 pickle 的结果
+#   - 新增 commit_prepared_day_rows / commit_prepared_minute_records：主进程侧落库 / 归档写入
+#   - 分钟线单文件执行拆为“准备 + 写入”两段，串行路径行为不变
+#
+# 本轮改动（分阶段流水线）：
+#   - “准备”拆为三个同步阶段函数，供 pipeline 的各阶段分别调用：
+#       * read_import_file_sync       ：读文件字节（I/O）
+#       * decode_import_payload_sync  ：字节 -> 列数组（struct 解码）
+#       * normalize_import_arrays_sync：列数组 -> 日线元组 / 分钟 records（标准化）
+#   - _prepare_day_file_sync / _prepare_minute_file_sync / prepare_import_file_sync 改为三阶段顺序组合，结果不变
+#
+# 本轮改动（增量读取）：
+#   - read_import_file_sync 改走 manifest.read_import_file_incremental：清单可续读时只读新增尾部
+#   - 准备结果新增 manifest（提交成功后写入的清单条目）与 read_mode（full / tail / unchanged）
+#   - tail / unchanged 模式下允许标准化结果为空：日线空提交、分钟线不写归档，任务按成功、appended_rows=0 处理
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 读取阶段返回 chunked 模式（大 .lc1 / .lc5 需整文件导入）时，准备结果不含记录，
+#     写入阶段改走 _write_minute_file_chunked_sync：
+#       * plan_tdx_minute_chunks 按整日切块 -> 逐块解码 / 标准化 -> merge_and_write_minute_archive_chunked
+#       * 每块追加后把块起始偏移写入 local_import_tasks.checkpoint_offset；
+#         重试时断点位于归档键范围内才从断点续做，否则从头开始（结果一致，仅多读）
+#       * 源文件记录非升序时回退整文件解析 + merge_and_write_minute_archive
+#   - commit_prepared_minute_records / execute_import_file_task 透传 batch_id 以定位任务断点
+#
+# 本轮改动（编排循环合并）：
+#   - 各执行模式统一为“准备（prepare_import_file_sync / 流水线阶段函数）+ 主进程提交（commit_prepared_*）”，
+#     移除只剩串行路径使用的 execute_import_file_task / prepare_day_file_task 及其 DataFrame 日线写入
+#
+# 本轮改动（占位日回报）：
+#   - 分钟线写入结果透传 placeholder_date（被清洗的末尾占位整日），由 orchestrator 回退清单
 # ==============================
 
 from __future__ import annotations
 
 import asyncio
+import functools
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Tuple
 
-from backend.datasource.local_files.tdx_day import load_tdx_day_df
-from backend.datasource.local_files.tdx_minute import load_tdx_minute_df
-from backend.db.candles import upsert_candles_day_raw
+import numpy as np
+
+from backend.datasource.local_files.tdx_day import decode_tdx_day_bytes
+from backend.datasource.local_files.tdx_minute import (
+    decode_tdx_minute_bytes,
+    load_tdx_minute_arrays,
+    minute_arrays_to_df,
+    minute_codes_to_time_text,
+    plan_tdx_minute_chunks,
+    read_tdx_minute_range,
+)
+from backend.db.candles_bulk import DayTuple, bulk_upsert_day_tuples, day_arrays_to_tuples
 from backend.services.normalizer import (
-    normalize_tdx_day_df_to_candles_records,
+    normalize_tdx_day_arrays,
     normalize_tdx_minute_df_to_archive_records,
 )
-from backend.services.minute_archive import merge_and_write_minute_archive
+from backend.services.minute_archive import (
+    merge_and_write_minute_archive,
+    merge_and_write_minute_archive_chunked,
+    read_minute_archive_key_range,
+)
+from backend.services.local_import.manifest import read_import_file_incremental
+from backend.services.local_import.repository import get_task_checkpoint, update_task_checkpoint
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("local_import.executor")
+
+_RECORD_SIZE = 32
 
 
-def _execute_day_file_sync(
+def read_import_file_sync(
     *,
-    file_path: str,
     market: str,
     symbol: str,
+    freq: str,
+    file_path: str,
 ) -> Dict[str, Any]:
-    path = Path(file_path).resolve()
-    if not path.exists():
-        raise FileNotFoundError(f"import file not found: {path}")
+    """
+    流水线读取阶段：按清单读取整文件或新增尾部。
 
-    raw_df = load_tdx_day_df(path)
-    records = normalize_tdx_day_df_to_candles_records(
-        raw_df,
+    Returns:
+        {"source", "payload", "mode", "offset", "manifest"}（见 manifest.read_import_file_incremental）
+    """
+    return read_import_file_incremental(
+        market=market,
         symbol=symbol,
+        freq=freq,
+        file_path=file_path,
+    )
+
+
+def decode_import_payload_sync(*, freq: str, payload: bytes, source: str) -> Dict[str, np.ndarray]:
+    """流水线解码阶段：TDX 32字节记录 -> 列数组（已去重、升序）。"""
+    if freq == "1d":
+        return decode_tdx_day_bytes(payload, source=source)
+    if freq in ("1m", "5m"):
+        return decode_tdx_minute_bytes(payload, source=source)
+    raise ValueError(f"unsupported freq for local import executor in current stage: {freq}")
+
+
+def normalize_import_arrays_sync(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    arrays: Dict[str, np.ndarray],
+    source: str,
+    allow_empty: bool = False,
+) -> Dict[str, Any]:
+    """
+    流水线标准化阶段：列数组 -> 可直接提交的结果。
+
+    allow_empty：增量读取（tail / unchanged）时为 True，没有新增记录不视为失败。
+
+    Returns:
+        {"rows": List[DayTuple], "source_file_path": str}            # 1d
+        {"records": List[Dict[str, Any]], "source_file_path": str}   # 1m / 5m
+    """
+    if freq == "1d":
+        normalized = normalize_tdx_day_arrays(arrays, symbol=symbol, market=market)
+        if len(normalized["ts"]) == 0 and not allow_empty:
+            raise ValueError(f"no valid records after parsing/normalizing: {source}")
+        return {
+            "rows": day_arrays_to_tuples(normalized, market=market, symbol=symbol),
+            "source_file_path": source,
+        }
+
+    if freq in ("1m", "5m"):
+        records = normalize_tdx_minute_df_to_archive_records(
+            minute_arrays_to_df(arrays),
+            symbol=symbol,
+            market=market,
+            freq=freq,
+        )
+        if not records and not allow_empty:
+            raise ValueError(f"no valid minute records after parsing/normalizing: {source}")
+        return {
+            "records": records,
+            "source_file_path": source,
+        }
+
+    raise ValueError(f"unsupported freq for local import executor in current stage: {freq}")
+
+
+def _prepare_file_sync(
+    *,
+    file_path: str,
+    market: str,
+    symbol: str,
+    freq: str,
+) -> Dict[str, Any]:
+    read = read_import_file_sync(market=market, symbol=symbol, freq=freq, file_path=file_path)
+    arrays = decode_import_payload_sync(freq=freq, payload=read["payload"], source=read["source"])
+    prepared = normalize_import_arrays_sync(
         market=market,
+        symbol=symbol,
+        freq=freq,
+        arrays=arrays,
+        source=read["source"],
+        allow_empty=read["mode"] != "full",
     )
+    prepared["manifest"] = read["manifest"]
+    prepared["read_mode"] = read["mode"]
+    return prepared
 
-    if not records:
-        raise ValueError(f"no valid records after parsing/normalizing: {path}")
 
-    written = upsert_candles_day_raw(records)
-    return {
-        "appended_rows": int(written or 0),
-    }
+def _source_record_key(file_path: str, offset: int) -> Tuple[int, str]:
+    arrays = read_tdx_minute_range(file_path, offset, offset + _RECORD_SIZE)
+    return int(arrays["date"][0]), str(minute_codes_to_time_text(arrays["minute"][:1])[0])
 
 
-def _execute_minute_file_sync(
+def _chunk_resume_offset(
     *,
+    batch_id: str,
+    market: str,
+    symbol: str,
+    freq: str,
     file_path: str,
+) -> int:
+    """
+    任务断点是否可续做：断点之前的源记录键须全部落在当前归档键范围内
+    （即都已在归档中，续做时本就会被判为 middle 跳过），否则从头开始。
+    """
+    offset = get_task_checkpoint(batch_id, market, symbol, freq) if batch_id else 0
+    if offset <= 0 or offset % _RECORD_SIZE != 0 or offset > Path(file_path).stat().st_size:
+        return 0
+
+    key_range = read_minute_archive_key_range(market=market, symbol=symbol, freq=freq)
+    if key_range is None:
+        return 0
+
+    archive_first, archive_last = key_range
+    if _source_record_key(file_path, 0) < archive_first or _source_record_key(file_path, offset - _RECORD_SIZE) > archive_last:
+        return 0
+    return offset
+
+
+def _iter_minute_file_chunks(
+    *,
     market: str,
     symbol: str,
     freq: str,
+    file_path: str,
+    plan: List[Tuple[int, int]],
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    for start, end in plan:
+        arrays = read_tdx_minute_range(file_path, start, end)
+        records = normalize_tdx_minute_df_to_archive_records(
+            minute_arrays_to_df(arrays),
+            symbol=symbol,
+            market=market,
+            freq=freq,
+        )
+        del arrays
+        yield start, records
+
+
+def _write_minute_file_chunked_sync(
+    *,
+    batch_id: str,
+    market: str,
+    symbol: str,
+    freq: str,
+    file_path: str,
 ) -> Dict[str, Any]:
-    path = Path(file_path).resolve()
-    if not path.exists():
-        raise FileNotFoundError(f"import file not found: {path}")
+    resume_offset = _chunk_resume_offset(
+        batch_id=batch_id,
+        market=market,
+        symbol=symbol,
+        freq=freq,
+        file_path=file_path,
+    )
+    plan = plan_tdx_minute_chunks(
+        file_path,
+        start_offset=resume_offset,
+        chunk_records=int(settings.local_import_minute_chunk_records),
+    )
+
+    if plan is None:
+        _LOG.info(
+            "[LOCAL_IMPORT][CHUNKED] source not ascending, fallback to whole-file merge market=%s symbol=%s freq=%s file=%s",
+            market,
+            symbol,
+            freq,
+            file_path,
+        )
+        records = normalize_tdx_minute_df_to_archive_records(
+            minute_arrays_to_df(load_tdx_minute_arrays(file_path)),
+            symbol=symbol,
+            market=market,
+            freq=freq,
+        )
+        if not records:
+            raise ValueError(f"no valid minute records after parsing/normalizing: {file_path}")
+        return _write_minute_records_sync(market=market, symbol=symbol, freq=freq, records=records)
+
+    on_checkpoint = None
+    if batch_id:
+        on_checkpoint = functools.partial(update_task_checkpoint, batch_id, market, symbol, freq)
 
-    raw_df = load_tdx_minute_df(path)
-    records = normalize_tdx_minute_df_to_archive_records(
-        raw_df,
+    result = merge_and_write_minute_archive_chunked(
+        market=market,
         symbol=symbol,
+        freq=freq,
+        chunks=_iter_minute_file_chunks(
+            market=market,
+            symbol=symbol,
+            freq=freq,
+            file_path=file_path,
+            plan=plan,
+        ),
+        on_checkpoint=on_checkpoint,
+    )
+    if resume_offset == 0 and int(result.get("incoming_rows") or 0) == 0:
+        raise ValueError(f"no valid minute records after parsing/normalizing: {file_path}")
+
+    _LOG.info(
+        "[LOCAL_IMPORT][CHUNKED] market=%s symbol=%s freq=%s resume_offset=%s chunks=%s appended=%s status=%s",
+        market,
+        symbol,
+        freq,
+        resume_offset,
+        result.get("chunks"),
+        result.get("appended_rows"),
+        result.get("status"),
+    )
+    return {
+        "appended_rows": int(result.get("appended_rows") or 0),
+        "signal_code": result.get("warning_code"),
+        "signal_message": result.get("warning_message"),
+        "placeholder_date": result.get("placeholder_date"),
+    }
+
+
+def _write_prepared_minute_sync(
+    *,
+    batch_id: str,
+    market: str,
+    symbol: str,
+    freq: str,
+    prepared: Dict[str, Any],
+) -> Dict[str, Any]:
+    if prepared.get("read_mode") == "chunked":
+        return _write_minute_file_chunked_sync(
+            batch_id=batch_id,
+            market=market,
+            symbol=symbol,
+            freq=freq,
+            file_path=prepared["source_file_path"],
+        )
+    return _write_minute_records_sync(
         market=market,
+        symbol=symbol,
         freq=freq,
+        records=prepared["records"],
     )
 
+
+def _write_minute_records_sync(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    records: List[Dict[str, Any]],
+) -> Dict[str, Any]:
     if not records:
-        raise ValueError(f"no valid minute records after parsing/normalizing: {path}")
+        # 增量读取无新增记录：归档保持不变
+        return {
+            "appended_rows": 0,
+            "signal_code": None,
+            "signal_message": None,
+        }
 
     result = merge_and_write_minute_archive(
         market=market,
@@ -98,69 +376,74 @@ def _execute_minute_file_sync(
         "appended_rows": int(result.get("appended_rows") or 0),
         "signal_code": result.get("warning_code"),
         "signal_message": result.get("warning_message"),
+        "placeholder_date": result.get("placeholder_date"),
     }
 
 
-async def execute_import_file_task(
+def prepare_import_file_sync(
     *,
-    batch_id: str,
     market: str,
     symbol: str,
     freq: str,
     file_path: str,
 ) -> Dict[str, Any]:
     """
-    异步执行单个导入文件任务。
-
-    当前阶段支持：
-      - 1d <- .day  -> SQLite
-      - 1m <- .lc1  -> minute_archive
-      - 5m <- .lc5  -> minute_archive
+    并行执行的进程池入口：只解析 + 标准化，不落库、不写归档。
 
     Returns:
         {
-          "appended_rows": int,
-          "signal_code": str | None,
-          "signal_message": str | None,
+          "rows": List[DayTuple]               # 1d
+          "records": List[Dict[str, Any]]      # 1m / 5m
           "source_file_path": str,
+          "manifest": Dict[str, Any],          # 提交成功后写入的清单条目
+          "read_mode": "full" | "tail" | "unchanged",
         }
 
     Raises:
-        Exception:
-            由调用方统一转任务终态 failed
+        FileNotFoundError / ValueError / Exception:
+            异常随 future 回传主进程，由调用方统一转任务终态 failed
     """
-    m = str(market or "").strip().upper()
-    s = str(symbol or "").strip()
     f = str(freq or "").strip()
-    p = str(Path(file_path).resolve())
+    if f not in ("1d", "1m", "5m"):
+        raise ValueError(f"unsupported freq for local import executor in current stage: {f}")
 
-    if f == "1d":
-        result = await asyncio.to_thread(
-            _execute_day_file_sync,
-            file_path=file_path,
-            market=m,
-            symbol=s,
-        )
-        return {
-            "appended_rows": int(result.get("appended_rows") or 0),
-            "signal_code": None,
-            "signal_message": None,
-            "source_file_path": p,
-        }
+    return _prepare_file_sync(
+        file_path=file_path,
+        market=str(market or "").strip().upper(),
+        symbol=str(symbol or "").strip(),
+        freq=f,
+    )
+
+
+async def commit_prepared_day_rows(rows: List[DayTuple]) -> Dict[str, Any]:
+    """主进程侧：单个 .day 文件的类型化元组直接合并提交（未启用批量装载会话时使用）。"""
+    written = await asyncio.to_thread(bulk_upsert_day_tuples, rows)
+    return {
+        "appended_rows": int(written or 0),
+        "signal_code": None,
+        "signal_message": None,
+    }
 
-    if f in ("1m", "5m"):
-        result = await asyncio.to_thread(
-            _execute_minute_file_sync,
-            file_path=file_path,
-            market=m,
-            symbol=s,
-            freq=f,
-        )
-        return {
-            "appended_rows": int(result.get("appended_rows") or 0),
-            "signal_code": result.get("signal_code"),
-            "signal_message": result.get("signal_message"),
-            "source_file_path": p,
-        }
 
-    raise ValueError(f"unsupported freq for local import executor in current stage: {f}")
+async def commit_prepared_minute_records(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    prepared: Dict[str, Any],
+    batch_id: str = "",
+) -> Dict[str, Any]:
+    """
+    主进程侧：分钟线归档写入（调用方保证串行）。
+
+    prepared.read_mode 为 chunked 时按块流式合并，batch_id 用于读写任务断点。
+    结果中 placeholder_date 非空表示末尾占位整日被清洗，清单需回退（manifest.rewind_manifest_before_date）。
+    """
+    return await asyncio.to_thread(
+        _write_prepared_minute_sync,
+        batch_id=str(batch_id or "").strip(),
+        market=str(market or "").strip().upper(),
+        symbol=str(symbol or "").strip(),
+        freq=str(freq or "").strip(),
+        prepared=prepared,
+    )
@@ -0,0 +1,235 @@
+# backend/services/local_import/manifest.py
+# ==============================
+# 盘后数据导入 import - 增量读取（文件清单 + 尾部续读）
+#
+# 背景：
+#   - TDX .day / .lc1 / .lc5 只在文件末尾追加 32 字节记录，
+#     每次盘后导入整文件重读重解析，绝大部分字节都是上次已导入的前缀
+#
+# 规则（read_import_file_incremental）：
+#   - 清单（local_import_file_manifest）记录上次成功导入时的 path / size / mtime_ns / offset / 尾记录摘要
+#   - 可续读的前提（任一不满足即整文件导入）：
+#       * 开启 local_import_incremental_enabled，且清单存在、路径一致
+#       * 当前文件大小与 offset 均为 32 的整数倍，且 size >= offset
+#       * offset 之前最后一条记录的摘要与清单一致（前缀未被改写）
+#       * 目标数据仍在：series_summary 有行数；分钟线归档文件存在
+#   - size / mtime_ns / offset 三者均未变：不读文件（unchanged）
+#   - 否则只读 [offset, size) 的新增尾部（tail）；尾部为空同样视为 unchanged
+#
+# 写入时机：
+#   - 清单条目随“准备结果”一起返回，由 orchestrator 在数据提交成功后统一写入（record_import_manifests）
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 需整文件导入的 .lc1 / .lc5 不小于 local_import_minute_chunk_threshold_mb 时返回 chunked 模式：
+#     不读取文件内容（payload 为空），只读末条记录计算清单摘要，由写入阶段按块流式合并归档
+#
+# 本轮改动（占位日不越过）：
+#   - 分钟线归档清洗掉末尾占位整日（volume=0 且 amount=0）时，清单不能停在文件末尾：
+#     rewind_manifest_before_date 把 offset / tail_hash 退回到该日首条源记录处，
+#     下次续读重新读取该日；之后出现新交易日时该日照常入归档，与整文件导入结果一致
+# ==============================
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.datasource.local_files.tdx_minute import find_tdx_minute_day_start
+from backend.db.import_manifest import get_import_manifest, upsert_import_manifests
+from backend.db.series_summary import get_series_summary
+from backend.services.minute_archive.store import resolve_minute_archive_path
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("local_import.manifest")
+
+_RECORD_SIZE = 32
+
+
+def is_incremental_enabled() -> bool:
+    return bool(getattr(settings, "local_import_incremental_enabled", False))
+
+
+def _record_hash(record: bytes) -> str:
+    return hashlib.blake2b(record, digest_size=16).hexdigest()
+
+
+def _target_data_present(market: str, symbol: str, freq: str) -> bool:
+    summary = get_series_summary(market, symbol, freq)
+    if not summary or int(summary.get("rows") or 0) <= 0:
+        return False
+    if freq in ("1m", "5m"):
+        return resolve_minute_archive_path(market=market, symbol=symbol, freq=freq).exists()
+    return True
+
+
+def _use_chunked_read(freq: str, size: int) -> bool:
+    threshold_mb = int(getattr(settings, "local_import_minute_chunk_threshold_mb", 0) or 0)
+    return freq in ("1m", "5m") and threshold_mb > 0 and size >= threshold_mb * 1024 * 1024
+
+
+def _resumable_manifest(
+    market: str,
+    symbol: str,
+    freq: str,
+    path: str,
+    size: int,
+) -> Optional[Dict[str, Any]]:
+    if not is_incremental_enabled() or size % _RECORD_SIZE != 0:
+        return None
+
+    prev = get_import_manifest(market, symbol, freq)
+    if not prev or str(prev.get("path") or "") != path:
+        return None
+
+    offset = int(prev.get("offset") or 0)
+    if offset < _RECORD_SIZE or offset % _RECORD_SIZE != 0 or offset > size:
+        return None
+
+    if not _target_data_present(market, symbol, freq):
+        return None
+    return prev
+
+
+def read_import_file_incremental(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    file_path: str,
+) -> Dict[str, Any]:
+    """
+    按清单读取导入文件（整文件或新增尾部）。
+
+    Returns:
+        {
+          "source": str,                        # 规范化路径
+          "payload": bytes,                     # 待解码字节（tail / unchanged 时只含新增部分）
+          "mode": "full" | "tail" | "unchanged" | "chunked",   # chunked：payload 为空，由写入阶段分块读取
+          "offset": int,                        # payload 在文件中的起始偏移
+          "manifest": Dict[str, Any],           # 本次成功提交后应写入的清单条目
+        }
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    path = Path(file_path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"import file not found: {path}")
+
+    source = str(path)
+    st = path.stat()
+    prev = _resumable_manifest(market, symbol, freq, source, int(st.st_size))
+
+    mode = "full"
+    offset = 0
+    payload = b""
+    tail_hash = ""
+
+    if (
+        prev is not None
+        and int(prev["size"]) == st.st_size
+        and int(prev["mtime_ns"]) == st.st_mtime_ns
+        and int(prev["offset"]) == st.st_size
+    ):
+        mode = "unchanged"
+        offset = int(st.st_size)
+        tail_hash = str(prev["tail_hash"])
+    else:
+        with path.open("rb") as fh:
+            if prev is not None:
+                prev_offset = int(prev["offset"])
+                fh.seek(prev_offset - _RECORD_SIZE)
+                last = fh.read(_RECORD_SIZE)
+                if _record_hash(last) == str(prev["tail_hash"]):
+                    offset = prev_offset
+                    payload = fh.read()
+                    mode = "tail" if payload else "unchanged"
+                    tail_hash = str(prev["tail_hash"])
+                else:
+                    _LOG.info(
+                        "[LOCAL_IMPORT][INCREMENTAL] prefix changed, full import market=%s symbol=%s freq=%s file=%s",
+                        market,
+                        symbol,
+                        freq,
+                        source,
+                    )
+            if mode == "full" and _use_chunked_read(freq, int(st.st_size)):
+                mode = "chunked"
+                if st.st_size >= _RECORD_SIZE:
+                    fh.seek(st.st_size - _RECORD_SIZE)
+                    tail_hash = _record_hash(fh.read(_RECORD_SIZE))
+            elif mode == "full":
+                fh.seek(0)
+                payload = fh.read()
+
+    end = int(st.st_size) if mode == "chunked" else offset + len(payload)
+    if len(payload) >= _RECORD_SIZE:
+        tail_hash = _record_hash(payload[-_RECORD_SIZE:])
+
+    return {
+        "source": source,
+        "payload": payload,
+        "mode": mode,
+        "offset": offset,
+        "manifest": {
+            "market": market,
+            "symbol": symbol,
+            "freq": freq,
+            "path": source,
+            "size": end,
+            "mtime_ns": int(st.st_mtime_ns),
+            "offset": end,
+            "tail_hash": tail_hash,
+            "rows": (end - offset) // _RECORD_SIZE,
+        },
+    }
+
+
+def rewind_manifest_before_date(
+    manifest: Optional[Dict[str, Any]],
+    date: Optional[int],
+) -> Optional[Dict[str, Any]]:
+    """
+    归档丢弃了末尾占位整日 date 时，把清单条目退回到本次读取范围内该日首条源记录处。
+
+    退回后不足一条记录或读文件失败时返回 None（不写清单，下次按旧清单或整文件导入）。
+    """
+    if not manifest or date is None:
+        return manifest
+
+    path = str(manifest["path"])
+    end = int(manifest["offset"])
+    start = end - int(manifest.get("rows") or 0) * _RECORD_SIZE
+    try:
+        offset = find_tdx_minute_day_start(path, start=start, end=end, date=int(date))
+        if offset < _RECORD_SIZE:
+            return None
+        with open(path, "rb") as fh:
+            fh.seek(offset - _RECORD_SIZE)
+            last = fh.read(_RECORD_SIZE)
+    except Exception as e:
+        _LOG.error("[LOCAL_IMPORT][INCREMENTAL] rewind manifest failed file=%s date=%s err=%s", path, date, e)
+        return None
+
+    return {
+        **manifest,
+        "offset": offset,
+        "tail_hash": _record_hash(last),
+        "rows": (offset - start) // _RECORD_SIZE,
+    }
+
+
+def record_import_manifests(entries: List[Optional[Dict[str, Any]]]) -> None:
+    """数据提交成功后写入清单；失败只记日志（下次整文件导入即可自愈）。"""
+    valid = [
+        e for e in entries
+        if e and int(e.get("offset") or 0) > 0 and int(e["offset"]) % _RECORD_SIZE == 0 and e.get("tail_hash")
+    ]
+    if not valid:
+        return
+    try:
+        upsert_import_manifests(valid)
+    except Exception as e:
+        _LOG.error("[LOCAL_IMPORT][INCREMENTAL] record manifest failed entries=%s err=%s", len(valid), e)
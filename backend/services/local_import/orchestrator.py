@@ -16,26 +16,107 @@
 # 本轮改动（refresh / get 拆分版）：
 #   - orchestrator / pipeline 不再消费 runtime 内存扫描快照
 #   - 统一只消费本地持久化候选结果真相源
+#
+# 本轮改动（日线批量装载）：
+#   - 开启 local_import_day_bulk_enabled 时，.day 任务只解析入会话暂存，
+#     每 N 个文件统一合并提交一次，提交后再批量落任务终态
+#   - 批次推进结束（含阻塞 / 暂停 / 异常退出）前必定 flush 并恢复会话 PRAGMA
+#
+# 本轮改动（数据库后台维护）：
+#   - 批次进入终态后请求一次数据库维护（WAL checkpoint / incremental_vacuum / optimize）
+#
+# 本轮改动（并行执行）：
+#   - settings.local_import_workers > 1 时改走 _run_single_batch_parallel_loop：
+#       * 任务经 claim_queued_tasks 原子认领（queued -> running），在途上限 = 进程数 × 每进程在途数
+#       * 解析 + 标准化在进程池（spawn）中执行，CPU 密集部分随核数扩展
+#       * 日线落库（批量装载会话 / 单文件合并）与分钟线归档写入仍在本协程内逐个执行，保持串行
+#   - 批次状态 / 取消 / 重试语义不变：取消只影响 queued，在途任务执行完毕后再结算批次
+#   - 进程池不可用或异常中断时，已认领任务记为失败，剩余任务回退串行路径继续执行
+#
+# 本轮改动（分阶段流水线）：
+#   - 单进程（local_import_workers = 1）且开启 local_import_pipeline_enabled 时改走 _run_single_batch_staged_loop：
+#       * 任务经 claim_queued_tasks 认领后投入 StagedImportPipeline（读取 -> 解码 -> 标准化 -> 写入）
+#       * 写入阶段按批回调 _commit_staged_batch：逐个提交 / 落终态，整批只结算并推送一次状态
+#   - 批次状态 / 取消 / 重试语义与并行路径一致；流水线计数器在结束时写入 TIMING 日志
+#   - 进程池不可用的回退路径同样优先走流水线
+#
+# 本轮改动（增量读取）：
+#   - 日线（批量会话 flush / 单文件合并）与分钟线归档提交成功后，写入准备结果携带的导入清单条目
+#
+# 本轮改动（进度记账）：
+#   - 每次批次推进持有一个 BatchProgress（progress.py）：
+#       * 任务终态先入缓冲，满 local_import_task_flush_size 条或推送前经 mark_tasks_terminal 批量落库
+#       * 认领 / 落终态时维护内存计数，批次结算与 status 推送直接使用，不再逐文件 COUNT
+#       * 推送按 local_import_status_emit_hz 合并，后台 ticker 补推最后一次变化；推进结束时落完缓冲、
+#         以 tasks 真相源校正计数并强制推送
+#   - 串行路径判断在途任务前先落缓冲，避免被自身已完成、尚未落库的任务阻塞
+#   - 取消批次时对推进中的批次 resync；进程在缓冲落库前退出时，这些任务保持 running，由启动恢复按中断失败处理
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 分钟线提交透传准备结果与 batch_id：chunked 模式由 executor 按块流式合并归档并记录任务断点
+#
+# 本轮改动（推进循环合并）：
+#   - 串行 / 并行 / 流水线三套推进循环合并为 _drive_batch：
+#       * 认领（claim_queued_tasks）、文件定位、提交与落终态、取消后排空在途、结算推送全部共用
+#       * 各模式只提供工作来源（_WorkSource）：_InlineSource 线程内逐个准备、_ProcessPoolSource 进程池准备、
+#         _StagedSource 交给 StagedImportPipeline 分阶段准备并由写入阶段按批交回
+#   - 模式回退顺序：并行 -> 流水线（启用时）-> 串行；来源不可用或进程池中断时返回 False 进入下一种
+#   - 串行模式改为“准备 + 提交”两段（与并行 / 流水线相同的提交路径），不再走 execute_import_file_task
+#   - 流水线标准化阶段在 local_import_pipeline_normalizers > 1 且多核时改在进程池执行（GIL 受限的纯 Python 标准化）
+#
+# 本轮改动（推进异常落 failed）：
+#   - 推进中抛出的异常（如任务终态批量落库失败）不再让批次停在 running：
+#     收尾时仍为 running 的任务按中断失败处理，批次落 failed 并推送状态，异常继续上抛记日志
+#
+# 本轮改动（占位日清单回退）：
+#   - 分钟线提交清洗掉末尾占位整日时，清单退回到该日首条记录再写入（manifest.rewind_manifest_before_date）
+#
+# 本轮改动（工作来源抽象基类）：
+#   - _WorkSource / _FutureSource 改为 abc 抽象基类，未实现 capacity / in_flight / submit / collect / _prepare 的子类
+#     在实例化时即报错，而不是推进到一半才抛 NotImplementedError
 # ==============================
 
 from __future__ import annotations
 
+import abc
 import asyncio
+import functools
 import hashlib
 import json
+import multiprocessing
+import os
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from backend.services.local_import.runtime import get_local_import_runtime
-from backend.services.local_import.executor import execute_import_file_task
+from backend.services.local_import.executor import (
+    commit_prepared_day_rows,
+    commit_prepared_minute_records,
+    prepare_import_file_sync,
+)
+from backend.services.local_import.day_bulk import DayBulkSession, PendingDayFile, is_day_bulk_enabled
 from backend.services.local_import.events import emit_local_import_status
+from backend.services.local_import.manifest import record_import_manifests, rewind_manifest_before_date
+from backend.services.local_import.progress import (
+    BatchProgress,
+    close_batch_progress,
+    get_active_batch_progress,
+    open_batch_progress,
+)
+from backend.services.local_import.pipeline import (
+    ImportWorkItem,
+    StagedImportPipeline,
+    is_pipeline_enabled,
+    set_current_pipeline,
+)
 from backend.services.local_import.repository import (
     create_batch,
     get_batch,
     list_all_batches_ordered,
     get_current_running_batch,
     get_oldest_queued_batch,
-    get_next_queued_task,
     get_running_task,
     get_latest_active_batch_by_signature,
     build_status_snapshot,
@@ -44,8 +125,7 @@ from backend.services.local_import.repository import (
     mark_batch_queued_for_retry,
     mark_batch_terminal_state,
     update_batch_ui_message,
-    mark_task_running,
-    mark_task_terminal,
+    claim_queued_tasks,
     cancel_queued_tasks_in_batch,
     reset_retryable_tasks,
     create_tasks_for_batch,
@@ -55,7 +135,10 @@ from backend.services.local_import.repository import (
 )
 from backend.services.local_import.repository.tasks import (
     delete_tasks_except_batch_ids,
+    mark_interrupted_running_tasks_failed,
 )
+from backend.db.maintenance import request_db_maintenance
+from backend.settings import settings
 from backend.utils.logger import get_logger, log_event
 
 _LOG = get_logger("local_import.orchestrator")
@@ -71,8 +154,11 @@ def _log_stage(stage: str, start_ts: float, **extra: Any) -> None:
     _LOG.info("[LOCAL_IMPORT][TIMING] stage=%s payload=%s", stage, payload)
 
 
-def _emit_status_snapshot(ui_message: Optional[str] = None) -> Dict[str, Any]:
-    snap = build_status_snapshot(ui_message=ui_message)
+def _emit_status_snapshot(
+    ui_message: Optional[str] = None,
+    counts_by_batch: Optional[Dict[str, Tuple[int, int, int, int, int]]] = None,
+) -> Dict[str, Any]:
+    snap = build_status_snapshot(ui_message=ui_message, counts_by_batch=counts_by_batch)
     emit_local_import_status(
         display_batch=snap.get("display_batch"),
         queued_batches=snap.get("queued_batches") or [],
@@ -119,7 +205,11 @@ def _delete_all_batches_except(keep_batch_id: str) -> None:
     delete_tasks_except_batch_ids([keep_bid])
 
 
-def _settle_batch_state_from_tasks(batch_id: str, ui_message: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def _settle_batch_state_from_tasks(
+    batch_id: str,
+    ui_message: Optional[str] = None,
+    counts: Optional[Tuple[int, int, int, int, int]] = None,
+) -> Optional[Dict[str, Any]]:
     batch = get_batch(batch_id)
     if not batch:
         return None
@@ -130,7 +220,9 @@ def _settle_batch_state_from_tasks(batch_id: str, ui_message: Optional[str] = No
             return update_batch_ui_message(batch_id, ui_message)
         return batch
 
-    queued_count, running_count, success_count, failed_count, cancelled_count = get_batch_counts(batch_id)
+    queued_count, running_count, success_count, failed_count, cancelled_count = (
+        counts if counts is not None else get_batch_counts(batch_id)
+    )
     total = queued_count + running_count + success_count + failed_count + cancelled_count
     done = success_count + failed_count + cancelled_count
 
@@ -168,6 +260,58 @@ def _settle_batch_state_from_tasks(batch_id: str, ui_message: Optional[str] = No
     )
 
 
+def _publish_progress(progress: BatchProgress, ui_message: Optional[str] = None, force: bool = False) -> None:
+    """
+    记录一次进度变化并按节流推送：到期（或 force）时落缓冲终态、按内存计数结算批次并推送一次状态；
+    未到期的变化由 BatchProgress 后台 ticker 补推。
+    """
+    progress.touch(ui_message)
+    if not force and not progress.due():
+        return
+
+    message = progress.take_message()
+    progress.flush_tasks()
+    counts = progress.counts()
+    _settle_batch_state_from_tasks(progress.batch_id, message, counts=counts)
+    _emit_status_snapshot(message, counts_by_batch={progress.batch_id: counts})
+
+
+async def _flush_day_bulk(progress: BatchProgress, bulk: DayBulkSession) -> None:
+    """合并提交会话中全部待装载 .day 文件，并据提交结果落任务终态。"""
+    result = await bulk.flush()
+    if not result.files:
+        return
+
+    for f in result.files:
+        if result.error is None:
+            progress.record_terminal(
+                f.market,
+                f.symbol,
+                f.freq,
+                "success",
+                None,
+                None,
+                f.row_count,
+                f.source_file_path,
+            )
+        else:
+            progress.record_terminal(
+                f.market,
+                f.symbol,
+                f.freq,
+                "failed",
+                "IMPORT_EXECUTION_FAILED",
+                str(result.error),
+                None,
+                f.source_file_path,
+            )
+
+    if result.error is None:
+        record_import_manifests([f.manifest for f in result.files])
+
+    _publish_progress(progress)
+
+
 async def _run_single_batch_until_blocked(
     batch_id: str,
     trigger: str = "unknown",
@@ -177,261 +321,540 @@ async def _run_single_batch_until_blocked(
     if not bid:
         return
 
-    first_task_running_logged = False
-    first_task_finished_logged = False
+    bulk = DayBulkSession() if is_day_bulk_enabled() else None
+    progress = open_batch_progress(bid)
+    progress.start(functools.partial(_publish_progress, progress, force=True))
+    failure: Optional[BaseException] = None
+    try:
+        # 各模式只在工作来源上不同；进程池不可用 / 中断时依次回退到下一种模式继续推进剩余任务
+        sources: List[_WorkSource] = []
+        workers = int(settings.local_import_workers)
+        if workers > 1:
+            sources.append(_ProcessPoolSource(workers))
+        if is_pipeline_enabled():
+            sources.append(_StagedSource())
+        sources.append(_InlineSource())
+
+        for source in sources:
+            if await _drive_batch(bid, bulk, progress, source, trigger=trigger, pipeline_start_ts=pipeline_start_ts):
+                break
+    except Exception as e:
+        failure = e
+        raise
+    finally:
+        try:
+            if bulk is not None:
+                try:
+                    await _flush_day_bulk(progress, bulk)
+                finally:
+                    await bulk.close()
+
+            # 落完缓冲并以 tasks 真相源校正计数；与最后一次推送之间若有变化则补推
+            await progress.close()
+            progress.resync()
+            if progress.dirty:
+                _publish_progress(progress, force=True)
+        except Exception as e:
+            _LOG.exception("[LOCAL_IMPORT] batch=%s finalize failed: %s", bid, e)
+            failure = failure or e
+        finally:
+            close_batch_progress(progress)
+        _LOG.info("[LOCAL_IMPORT][PROGRESS] batch=%s stats=%s", bid, progress.stats())
 
-    while True:
-        batch = get_batch(bid)
-        if not batch:
-            if pipeline_start_ts is not None:
-                _log_stage(
-                    "pipeline.batch_missing",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                )
-            return
+        if failure is not None:
+            _fail_batch_after_error(bid, failure)
 
-        state = str(batch.get("state") or "").strip().lower()
-        if state != "running":
-            if pipeline_start_ts is not None:
-                _log_stage(
-                    "pipeline.batch_not_running_stop",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    state=state,
-                )
-            return
+        final = get_batch(bid)
+        if final and str(final.get("state") or "").strip().lower() in ("success", "failed", "cancelled"):
+            request_db_maintenance("local_import")
 
-        next_task = get_next_queued_task(bid)
-        if not next_task:
-            _settle_batch_state_from_tasks(bid)
-            _emit_status_snapshot()
-            if pipeline_start_ts is not None:
-                _log_stage(
-                    "pipeline.no_more_queued_tasks",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                )
-            return
 
-        running_task = get_running_task(bid)
-        if running_task:
-            if pipeline_start_ts is not None:
-                _log_stage(
-                    "pipeline.blocked_by_existing_running_task",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    running_market=running_task.get("market"),
-                    running_symbol=running_task.get("symbol"),
-                    running_freq=running_task.get("freq"),
-                )
-            _LOG.info(
-                "[LOCAL_IMPORT] batch=%s temporarily blocked by running task market=%s symbol=%s freq=%s",
-                bid,
-                running_task.get("market"),
-                running_task.get("symbol"),
-                running_task.get("freq"),
-            )
-            return
+def _fail_batch_after_error(bid: str, err: BaseException) -> None:
+    """
+    推进异常中止（如任务终态落库失败）：仍为 running 的任务按中断失败处理，批次落 failed（可重试）。
 
-        market = str(next_task["market"]).strip().upper()
-        symbol = str(next_task["symbol"]).strip()
-        freq = str(next_task["freq"]).strip()
+    库仍不可写时保持原状，由启动恢复按中断处理。
+    """
+    try:
+        mark_interrupted_running_tasks_failed(bid)
+        mark_batch_terminal_state(bid, "failed", f"导入异常中止：{err}"[:500])
+        _emit_status_snapshot()
+    except Exception as e:
+        _LOG.error("[LOCAL_IMPORT] batch=%s mark failed after error also failed: %s", bid, e)
 
-        runtime = get_local_import_runtime()
-        file_path = runtime.get_file_path(market, symbol, freq)
-        if not file_path:
-            mark_task_running(bid, market, symbol, freq)
 
-            mark_task_terminal(
-                bid,
-                market,
-                symbol,
-                freq,
-                "failed",
-                "FILE_NOT_FOUND",
-                "未能在当前候选结果真相源中定位到目标本地文件",
-                None,
-                None,
-            )
+def _failure_signal_code(e: BaseException) -> str:
+    if isinstance(e, FileNotFoundError):
+        return "FILE_NOT_FOUND"
+    if isinstance(e, ValueError):
+        return "PARSE_OR_NORMALIZE_FAILED"
+    return "IMPORT_EXECUTION_FAILED"
 
-            _settle_batch_state_from_tasks(bid, "导入执行中：存在文件定位失败")
-            _emit_status_snapshot("导入执行中：存在文件定位失败")
 
-            if pipeline_start_ts is not None and not first_task_finished_logged:
-                first_task_finished_logged = True
-                _log_stage(
-                    "pipeline.first_task_finished",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    market=market,
-                    symbol=symbol,
-                    freq=freq,
-                    result="failed",
-                    signal_code="FILE_NOT_FOUND",
-                )
-            continue
+def _create_import_process_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    try:
+        # spawn：主进程含写线程与事件循环，fork 复制这些状态并不安全
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    except Exception as e:
+        _LOG.error("[LOCAL_IMPORT] process pool unavailable, fallback to serial: %s", e)
+        return None
 
-        mark_task_running(bid, market, symbol, freq)
 
-        if pipeline_start_ts is not None and not first_task_running_logged:
-            first_task_running_logged = True
-            _log_stage(
-                "pipeline.first_task_running",
-                pipeline_start_ts,
-                trigger=trigger,
-                batch_id=bid,
-                market=market,
-                symbol=symbol,
-                freq=freq,
-            )
+async def _commit_prepared_task(
+    bid: str,
+    bulk: Optional[DayBulkSession],
+    progress: BatchProgress,
+    market: str,
+    symbol: str,
+    freq: str,
+    prepared: Dict[str, Any],
+) -> Optional[str]:
+    """
+    主进程侧提交单个已准备任务（串行调用）：只记终态、不触发推送；日线进入批量会话时终态由 flush 统一落。
+
+    返回本任务的提示信息（无则 None）。
+    """
+    source_file_path = prepared["source_file_path"]
+
+    if freq == "1d" and bulk is not None:
+        await bulk.add(PendingDayFile(
+            market=market,
+            symbol=symbol,
+            freq=freq,
+            source_file_path=source_file_path,
+            rows=prepared["rows"],
+            manifest=prepared.get("manifest"),
+        ))
+        if bulk.should_flush():
+            await _flush_day_bulk(progress, bulk)
+        return None
 
-        try:
-            result = await execute_import_file_task(
-                batch_id=bid,
-                market=market,
-                symbol=symbol,
-                freq=freq,
-                file_path=file_path,
-            )
+    if freq == "1d":
+        result = await commit_prepared_day_rows(prepared["rows"])
+    else:
+        result = await commit_prepared_minute_records(
+            market=market,
+            symbol=symbol,
+            freq=freq,
+            prepared=prepared,
+            batch_id=bid,
+        )
+    record_import_manifests([rewind_manifest_before_date(prepared.get("manifest"), result.get("placeholder_date"))])
+
+    signal_code = result.get("signal_code")
+    signal_message = result.get("signal_message")
+    progress.record_terminal(
+        market,
+        symbol,
+        freq,
+        "success",
+        signal_code,
+        signal_message,
+        result.get("appended_rows"),
+        source_file_path,
+    )
+    return signal_message if signal_code and signal_message else None
 
-            signal_code = result.get("signal_code")
-            signal_message = result.get("signal_message")
-            appended_rows = result.get("appended_rows")
-            source_file_path = result.get("source_file_path")
 
-            mark_task_terminal(
-                bid,
-                market,
-                symbol,
-                freq,
-                "success",
-                signal_code,
-                signal_message,
-                appended_rows,
-                source_file_path,
-            )
+async def _commit_prepared_items(
+    bid: str,
+    bulk: Optional[DayBulkSession],
+    progress: BatchProgress,
+    items: List[ImportWorkItem],
+) -> None:
+    """逐个提交 / 落终态（准备失败的直接落 failed），整批只结算并推送一次状态。"""
+    message: Optional[str] = None
+    for item in items:
+        error = item.error
+        if error is None:
+            try:
+                message = await _commit_prepared_task(
+                    bid,
+                    bulk,
+                    progress,
+                    item.market,
+                    item.symbol,
+                    item.freq,
+                    item.prepared,
+                ) or message
+                continue
+            except Exception as e:
+                error = e
+
+        progress.record_terminal(
+            item.market,
+            item.symbol,
+            item.freq,
+            "failed",
+            _failure_signal_code(error),
+            str(error) or type(error).__name__,
+            None,
+            item.source or item.file_path,
+        )
 
-            if signal_code and signal_message:
-                _settle_batch_state_from_tasks(bid, signal_message)
-                _emit_status_snapshot(signal_message)
-            else:
-                _settle_batch_state_from_tasks(bid)
-                _emit_status_snapshot()
-
-            if pipeline_start_ts is not None and not first_task_finished_logged:
-                first_task_finished_logged = True
-                _log_stage(
-                    "pipeline.first_task_finished",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    market=market,
-                    symbol=symbol,
-                    freq=freq,
-                    result="success",
-                    signal_code=signal_code,
-                )
+    _publish_progress(progress, message)
 
-        except FileNotFoundError as e:
-            mark_task_terminal(
-                bid,
-                market,
-                symbol,
-                freq,
-                "failed",
-                "FILE_NOT_FOUND",
-                str(e),
-                None,
-                file_path,
-            )
 
-            _settle_batch_state_from_tasks(bid)
-            _emit_status_snapshot()
+# ==============================================================================
+# 工作来源：认领到的任务如何变成“已准备”的工作项（各执行模式唯一的差异点）
+# ==============================================================================
 
-            if pipeline_start_ts is not None and not first_task_finished_logged:
-                first_task_finished_logged = True
-                _log_stage(
-                    "pipeline.first_task_finished",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    market=market,
-                    symbol=symbol,
-                    freq=freq,
-                    result="failed",
-                    signal_code="FILE_NOT_FOUND",
-                )
+_CommitFn = Callable[[List[ImportWorkItem]], Awaitable[None]]
 
-        except ValueError as e:
-            msg = str(e)
-            signal_code = "PARSE_OR_NORMALIZE_FAILED"
 
-            mark_task_terminal(
-                bid,
-                market,
-                symbol,
-                freq,
-                "failed",
-                signal_code,
-                msg,
-                None,
-                file_path,
+class _WorkSource(abc.ABC):
+    """
+    工作来源抽象基类。
+
+    约定：
+      - capacity()：当前还可认领的任务数（在途上限 - 在途数）
+      - submit()：投入一个已定位文件的工作项，不得长时间阻塞（在途数受 capacity 约束）
+      - collect(commit)：等待至少一批工作项准备完成并交给 commit 提交
+      - broken：来源中断（进程池损坏 / 不可用），调用方停止认领并回退其它模式
+    """
+
+    name = "source"
+    broken = False
+
+    async def start(self) -> None:
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        return {}
+
+    @abc.abstractmethod
+    def capacity(self) -> int:
+        ...
+
+    @property
+    @abc.abstractmethod
+    def in_flight(self) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def submit(self, item: ImportWorkItem) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def collect(self, commit: _CommitFn) -> None:
+        ...
+
+    async def close(self) -> None:
+        return None
+
+
+class _FutureSource(_WorkSource):
+    """每个工作项对应一个准备 Future（线程 / 进程池），先完成先提交。"""
+
+    def __init__(self, limit: int):
+        self._limit = max(1, int(limit))
+        self._futures: Dict[asyncio.Future, ImportWorkItem] = {}
+
+    def capacity(self) -> int:
+        return self._limit - len(self._futures)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._futures)
+
+    @abc.abstractmethod
+    def _prepare(self, item: ImportWorkItem) -> "asyncio.Future[Dict[str, Any]]":
+        ...
+
+    async def submit(self, item: ImportWorkItem) -> None:
+        self._futures[self._prepare(item)] = item
+
+    async def collect(self, commit: _CommitFn) -> None:
+        done, _ = await asyncio.wait(list(self._futures.keys()), return_when=asyncio.FIRST_COMPLETED)
+        items: List[ImportWorkItem] = []
+        for fut in done:
+            item = self._futures.pop(fut)
+            try:
+                item.prepared = fut.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self.broken = True
+                item.error = e
+            items.append(item)
+        await commit(items)
+
+    async def close(self) -> None:
+        for fut in self._futures:
+            fut.cancel()
+        self._futures.clear()
+
+
+class _InlineSource(_FutureSource):
+    """串行：一次只准备一个文件（线程内读取 + 解码 + 标准化）。"""
+
+    name = "serial"
+
+    def __init__(self):
+        super().__init__(1)
+
+    def _prepare(self, item: ImportWorkItem) -> "asyncio.Future[Dict[str, Any]]":
+        return asyncio.ensure_future(asyncio.to_thread(
+            prepare_import_file_sync,
+            market=item.market,
+            symbol=item.symbol,
+            freq=item.freq,
+            file_path=item.file_path,
+        ))
+
+
+class _ProcessPoolSource(_FutureSource):
+    """并行：解析 + 标准化在进程池中执行，在途上限 = 进程数 × 每进程在途数。"""
+
+    name = "parallel"
+
+    def __init__(self, workers: int):
+        super().__init__(workers * int(settings.local_import_tasks_per_worker))
+        self._workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def start(self) -> None:
+        self._pool = _create_import_process_pool(self._workers)
+        self.broken = self._pool is None
+
+    def describe(self) -> Dict[str, Any]:
+        return {"workers": self._workers, "capacity": self._limit}
+
+    def _prepare(self, item: ImportWorkItem) -> "asyncio.Future[Dict[str, Any]]":
+        return asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(
+            prepare_import_file_sync,
+            market=item.market,
+            symbol=item.symbol,
+            freq=item.freq,
+            file_path=item.file_path,
+        ))
+
+    async def close(self) -> None:
+        await super().close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=not self.broken, cancel_futures=True)
+
+
+class _StagedSource(_WorkSource):
+    """
+    分阶段流水线：读取 / 解码 / 标准化由 StagedImportPipeline 各阶段并发完成；
+    流水线写入阶段把攒好的批交给 collect，由推进循环统一提交，提交完成后写入阶段才继续。
+
+    在途上限 = local_import_pipeline_queue_size：投入不会因读取队列已满而阻塞，
+    推进循环不会在写入阶段等待提交时卡在 submit 上。
+    """
+
+    name = "staged"
+
+    def __init__(self):
+        self._limit = int(settings.local_import_pipeline_queue_size)
+        self._count = 0
+        self._batches: asyncio.Queue = asyncio.Queue()
+        self._normalize_processes = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pipeline: Optional[StagedImportPipeline] = None
+
+    async def start(self) -> None:
+        # 标准化是纯 Python 逐行构造（GIL 受限），多个标准化协程只有放进进程池才真正并行；
+        # 单核机器上多进程没有收益，仍在线程内执行
+        processes = min(int(settings.local_import_pipeline_normalizers), os.cpu_count() or 1)
+        if processes > 1:
+            self._pool = _create_import_process_pool(processes)
+            self._normalize_processes = processes if self._pool is not None else 0
+        self._pipeline = StagedImportPipeline(self._hand_over, normalize_executor=self._pool)
+        self._pipeline.start()
+        set_current_pipeline(self._pipeline)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"queue_size": self._limit, "normalize_processes": self._normalize_processes}
+
+    async def _hand_over(self, items: List[ImportWorkItem]) -> None:
+        settled = asyncio.get_running_loop().create_future()
+        await self._batches.put((items, settled))
+        await settled
+
+    def capacity(self) -> int:
+        return self._limit - self._count
+
+    @property
+    def in_flight(self) -> int:
+        return self._count
+
+    async def submit(self, item: ImportWorkItem) -> None:
+        self._count += 1
+        await self._pipeline.submit(item)
+
+    async def collect(self, commit: _CommitFn) -> None:
+        items, settled = await self._batches.get()
+        try:
+            if any(isinstance(item.error, BrokenProcessPool) for item in items):
+                self.broken = True
+            await commit(items)
+        finally:
+            self._count -= len(items)
+            if not settled.done():
+                settled.set_result(None)
+
+    async def close(self) -> None:
+        pipeline = self._pipeline
+        if pipeline is None:
+            return
+        try:
+            if self._count == 0:
+                await pipeline.join()
+            else:
+                # 异常退出：未提交的任务保持 running，由恢复逻辑处理
+                await pipeline.abort()
+        finally:
+            set_current_pipeline(None)
+            _LOG.info("[LOCAL_IMPORT][PIPELINE] stats=%s", pipeline.stats())
+            if self._pool is not None:
+                self._pool.shutdown(wait=not self.broken, cancel_futures=True)
+
+
+async def _drive_batch(
+    bid: str,
+    bulk: Optional[DayBulkSession],
+    progress: BatchProgress,
+    source: _WorkSource,
+    trigger: str = "unknown",
+    pipeline_start_ts: Optional[float] = None,
+) -> bool:
+    """
+    推进一个 running 批次：认领 -> 工作来源准备 -> 提交 / 落终态 -> 结算推送（所有执行模式共用）。
+
+    取消 / 暂停（批次不再 running）后停止认领，在途工作项提交完毕再返回。
+
+    Returns:
+        True：本轮推进已结束（完成 / 阻塞 / 批次不再 running）
+        False：工作来源不可用或中断，调用方应回退下一种模式继续推进剩余 queued 任务
+    """
+    # 缓冲中的终态在库内仍为 running，先落库再判断是否被在途任务阻塞
+    progress.flush_tasks()
+    running_task = get_running_task(bid)
+    if running_task and bulk is not None and bulk.owns(
+        running_task.get("market"),
+        running_task.get("symbol"),
+        running_task.get("freq"),
+    ):
+        running_task = None
+    if running_task:
+        if pipeline_start_ts is not None:
+            _log_stage(
+                "pipeline.blocked_by_existing_running_task",
+                pipeline_start_ts,
+                trigger=trigger,
+                batch_id=bid,
+                running_market=running_task.get("market"),
+                running_symbol=running_task.get("symbol"),
+                running_freq=running_task.get("freq"),
             )
+        _LOG.info(
+            "[LOCAL_IMPORT] batch=%s temporarily blocked by running task market=%s symbol=%s freq=%s",
+            bid,
+            running_task.get("market"),
+            running_task.get("symbol"),
+            running_task.get("freq"),
+        )
+        return True
 
-            _settle_batch_state_from_tasks(bid)
-            _emit_status_snapshot()
+    first_finished_logged = False
 
-            if pipeline_start_ts is not None and not first_task_finished_logged:
-                first_task_finished_logged = True
-                _log_stage(
-                    "pipeline.first_task_finished",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    market=market,
-                    symbol=symbol,
-                    freq=freq,
-                    result="failed",
-                    signal_code=signal_code,
-                )
+    async def _commit(items: List[ImportWorkItem]) -> None:
+        nonlocal first_finished_logged
+        await _commit_prepared_items(bid, bulk, progress, items)
+        if pipeline_start_ts is not None and not first_finished_logged and items:
+            first_finished_logged = True
+            _log_stage(
+                "pipeline.first_task_finished",
+                pipeline_start_ts,
+                trigger=trigger,
+                batch_id=bid,
+                mode=source.name,
+                market=items[0].market,
+                symbol=items[0].symbol,
+                freq=items[0].freq,
+                batch_files=len(items),
+            )
 
-        except Exception as e:
-            mark_task_terminal(
-                bid,
-                market,
-                symbol,
-                freq,
-                "failed",
-                "IMPORT_EXECUTION_FAILED",
-                str(e),
-                None,
-                file_path,
+    runtime = get_local_import_runtime()
+    stop_stage = "pipeline.no_more_queued_tasks"
+    try:
+        await source.start()
+        if source.broken:
+            return False
+        if pipeline_start_ts is not None:
+            _log_stage(
+                f"pipeline.{source.name}_started",
+                pipeline_start_ts,
+                trigger=trigger,
+                batch_id=bid,
+                **source.describe(),
             )
 
-            _settle_batch_state_from_tasks(bid)
-            _emit_status_snapshot()
+        while True:
+            batch = get_batch(bid)
+            accepting = (
+                batch is not None
+                and str(batch.get("state") or "").strip().lower() == "running"
+                and not source.broken
+            )
 
-            if pipeline_start_ts is not None and not first_task_finished_logged:
-                first_task_finished_logged = True
-                _log_stage(
-                    "pipeline.first_task_finished",
-                    pipeline_start_ts,
-                    trigger=trigger,
-                    batch_id=bid,
-                    market=market,
-                    symbol=symbol,
-                    freq=freq,
-                    result="failed",
-                    signal_code="IMPORT_EXECUTION_FAILED",
-                )
+            claimed = 0
+            room = source.capacity()
+            if accepting and room > 0:
+                tasks = claim_queued_tasks(bid, room)
+                claimed = len(tasks)
+                progress.claimed(claimed)
+                for task in tasks:
+                    market, symbol, freq = task["market"], task["symbol"], task["freq"]
+                    file_path = runtime.get_file_path(market, symbol, freq)
+                    if not file_path:
+                        progress.record_terminal(
+                            market,
+                            symbol,
+                            freq,
+                            "failed",
+                            "FILE_NOT_FOUND",
+                            "未能在当前候选结果真相源中定位到目标本地文件",
+                            None,
+                            None,
+                        )
+                        _publish_progress(progress, "导入执行中：存在文件定位失败")
+                        continue
+                    await source.submit(ImportWorkItem(
+                        market=market,
+                        symbol=symbol,
+                        freq=freq,
+                        file_path=file_path,
+                    ))
+
+            if source.in_flight:
+                await source.collect(_commit)
+                continue
+            if source.broken:
+                return False
+            if not accepting:
+                stop_stage = "pipeline.batch_not_running_stop"
+                break
+            if claimed:
+                continue
+            break
+    finally:
+        await source.close()
 
-        await asyncio.sleep(0)
+    if bulk is not None and bulk.pending_files:
+        await _flush_day_bulk(progress, bulk)
+
+    _publish_progress(progress, force=True)
+    if pipeline_start_ts is not None:
+        _log_stage(
+            stop_stage,
+            pipeline_start_ts,
+            trigger=trigger,
+            batch_id=bid,
+            mode=source.name,
+        )
+    return True
 
 
 async def _promote_batch_to_running_if_possible(
@@ -700,6 +1123,11 @@ async def cancel_import_batch(batch_id: str) -> Dict[str, Any]:
 
     cancel_queued_tasks_in_batch(bid)
 
+    # 推进中的批次：落缓冲终态并重载内存计数，避免后续结算把已取消任务仍计为 queued
+    progress = get_active_batch_progress(bid)
+    if progress is not None:
+        progress.resync()
+
     _settle_batch_state_from_tasks(
         bid,
         "取消已提交：当前正在导入的文件会执行完，未开始任务将被取消",
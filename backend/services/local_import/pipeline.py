@@ -0,0 +1,364 @@
+# backend/services/local_import/pipeline.py
+# ==============================
+# 盘后数据导入 import - 分阶段流水线
+#
+# 职责：
+#   - 把单文件任务拆成四个阶段，阶段之间用有界 asyncio.Queue 衔接：
+#       reader     ：读文件字节（预取，I/O）                      x1
+#       decoder    ：TDX 32字节记录 -> 列数组                      x local_import_pipeline_decoders
+#       normalizer ：列数组 -> 日线元组 / 分钟 records              x local_import_pipeline_normalizers
+#       writer     ：攒批后交给调用方提交（落库 / 归档 / 任务终态）  x1
+#   - 读 / 解码经 asyncio.to_thread 执行，numpy / 文件 I/O 期间释放 GIL，
+#     不同文件的不同阶段得以重叠，吞吐受限于最慢阶段而非各阶段耗时之和
+#   - 每个阶段维护计数器：处理数 / 失败数 / 行数 / 字节数 / 忙碌时长 / 输入队列深度（当前与峰值）
+#
+# 约定：
+#   - 队列有界：下游变慢时上游 put 阻塞，形成逐级背压，内存中的在途文件数有上限
+#   - 任一阶段失败：只在工作项上记录 error，后续阶段直接透传，统一由 writer 交给调用方落 failed
+#   - writer 为唯一提交点且只有一个协程：日线批量会话 / 分钟线归档 / 任务表写入保持串行
+#   - write_batch 回调自行处理提交异常；回调抛出的异常只记日志，不中断流水线
+#   - 标准化阶段可选进程池执行（见 normalize_executor）
+#   - 读取阶段按导入清单只读新增尾部（manifest.read_import_file_incremental），
+#     reader 计数器额外按 full / tail / unchanged 统计文件数
+#
+# 本轮改动（标准化进程池）：
+#   - 标准化是逐行构造元组 / records 的纯 Python 代码，to_thread 下多个 normalizer 协程共用一把 GIL，
+#     实际同一时刻只有一个在跑（normalizer busy_ratio 接近 1 即此原因）
+#   - 新增 normalize_executor：传入进程池时标准化阶段改在池中执行，
+#     local_import_pipeline_normalizers 个协程对应池内并行的标准化；未传入时仍走 to_thread
+#
+# 本轮改动（默认关闭）：
+#   - 分钟标准化改为逐列构造（normalizer.minute_bars）后，实测目录上流水线与串行持平、进程池更慢
+#     （records 回传主进程的反序列化与构造同量级），local_import_pipeline_enabled 默认改为 False；
+#     模块保留，可由 dev_tests.local_files.test_import_pipeline_stages 在目标机器上复测后再开启
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.services.local_import.executor import (
+    decode_import_payload_sync,
+    normalize_import_arrays_sync,
+    read_import_file_sync,
+)
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("local_import.pipeline")
+
+_DONE = object()
+
+
+def is_pipeline_enabled() -> bool:
+    return bool(getattr(settings, "local_import_pipeline_enabled", False))
+
+
+@dataclass
+class ImportWorkItem:
+    market: str
+    symbol: str
+    freq: str
+    file_path: str
+    source: str = ""
+    read_mode: str = ""
+    manifest: Optional[Dict[str, Any]] = None
+    payload: Optional[bytes] = None
+    arrays: Optional[Dict[str, Any]] = None
+    prepared: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class StageCounters:
+    name: str
+    workers: int
+    items: int = 0
+    failed: int = 0
+    rows: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    modes: Dict[str, int] = field(default_factory=dict)
+    queue: Optional[asyncio.Queue] = field(default=None, repr=False)
+
+    def sample_queue(self) -> None:
+        if self.queue is not None:
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        elapsed = max(elapsed, 1e-9)
+        out = {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "failed": self.failed,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "items_per_sec": round(self.items / elapsed, 2),
+            "rows_per_sec": round(self.rows / elapsed, 1),
+            "mb_per_sec": round(self.bytes / elapsed / 1048576, 2),
+            "busy_seconds": round(self.busy_seconds, 3),
+            # 忙碌占比接近 1 的阶段即瓶颈
+            "busy_ratio": round(self.busy_seconds / (elapsed * self.workers), 3),
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+        if self.modes:
+            out["modes"] = dict(self.modes)
+        return out
+
+
+def _prepared_rows(prepared: Dict[str, Any]) -> int:
+    return len(prepared.get("rows") or prepared.get("records") or [])
+
+
+class StagedImportPipeline:
+    """单次批次推进内的分阶段流水线（仅在 orchestrator 协程内使用）。"""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[ImportWorkItem]], Awaitable[None]],
+        *,
+        queue_size: Optional[int] = None,
+        decoders: Optional[int] = None,
+        normalizers: Optional[int] = None,
+        max_write_batch: Optional[int] = None,
+        normalize_executor: Optional[Executor] = None,
+    ):
+        self._write_batch = write_batch
+        self._normalize_executor = normalize_executor
+        self._queue_size = int(queue_size or settings.local_import_pipeline_queue_size)
+        self._max_write_batch = int(max_write_batch or settings.local_import_pipeline_write_batch)
+
+        self._read_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._decode_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._normalize_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._write_q: asyncio.Queue = asyncio.Queue(self._queue_size)
+
+        self._stages = {
+            "reader": StageCounters("reader", 1, queue=self._read_q),
+            "decoder": StageCounters(
+                "decoder", int(decoders or settings.local_import_pipeline_decoders), queue=self._decode_q
+            ),
+            "normalizer": StageCounters(
+                "normalizer", int(normalizers or settings.local_import_pipeline_normalizers), queue=self._normalize_q
+            ),
+            "writer": StageCounters("writer", 1, queue=self._write_q),
+        }
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._write_batches = 0
+
+    # ==========================================================
+    # 生命周期
+    # ==========================================================
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._started_at = time.perf_counter()
+
+        reader = self._stages["reader"]
+        decoder = self._stages["decoder"]
+        normalizer = self._stages["normalizer"]
+
+        remaining = {"reader": reader.workers, "decoder": decoder.workers, "normalizer": normalizer.workers}
+        specs = [
+            ("reader", self._read_q, self._decode_q, decoder.workers, self._read),
+            ("decoder", self._decode_q, self._normalize_q, normalizer.workers, self._decode),
+            ("normalizer", self._normalize_q, self._write_q, 1, self._normalize),
+        ]
+        for name, in_q, out_q, downstream, fn in specs:
+            for _ in range(self._stages[name].workers):
+                self._tasks.append(asyncio.create_task(
+                    self._run_stage(name, in_q, out_q, downstream, fn, remaining)
+                ))
+        self._tasks.append(asyncio.create_task(self._run_writer()))
+
+    async def submit(self, item: ImportWorkItem) -> None:
+        """投入一个工作项；读取阶段队列已满时等待（背压）。"""
+        await self._read_q.put(item)
+        self._stages["reader"].sample_queue()
+
+    async def join(self) -> None:
+        """不再投入新工作项，等待全部在途工作项提交完毕。"""
+        await self._read_q.put(_DONE)
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            self._finished_at = time.perf_counter()
+
+    async def abort(self) -> None:
+        """异常退出时取消全部阶段协程（已提交的工作项不受影响，未提交的任务保持 running 由恢复逻辑处理）。"""
+        pending = [t for t in self._tasks if not t.done()]
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._finished_at is None:
+            self._finished_at = time.perf_counter()
+
+    # ==========================================================
+    # 阶段实现
+    # ==========================================================
+    async def _run_stage(
+        self,
+        name: str,
+        in_q: asyncio.Queue,
+        out_q: asyncio.Queue,
+        downstream_workers: int,
+        fn: Callable[[ImportWorkItem], Awaitable[None]],
+        remaining: Dict[str, int],
+    ) -> None:
+        counters = self._stages[name]
+        while True:
+            counters.sample_queue()
+            item = await in_q.get()
+            if item is _DONE:
+                # 同阶段其余协程也需要收到结束信号；最后一个结束的协程负责通知下游
+                remaining[name] -= 1
+                if remaining[name] > 0:
+                    await in_q.put(_DONE)
+                else:
+                    for _ in range(downstream_workers):
+                        await out_q.put(_DONE)
+                return
+
+            if item.error is None:
+                t0 = time.perf_counter()
+                try:
+                    await fn(item)
+                    counters.items += 1
+                except Exception as e:
+                    item.error = e
+                    item.payload = None
+                    item.arrays = None
+                    counters.failed += 1
+                counters.busy_seconds += time.perf_counter() - t0
+
+            await out_q.put(item)
+
+    async def _read(self, item: ImportWorkItem) -> None:
+        read = await asyncio.to_thread(
+            read_import_file_sync,
+            market=item.market,
+            symbol=item.symbol,
+            freq=item.freq,
+            file_path=item.file_path,
+        )
+        item.source = read["source"]
+        item.payload = read["payload"]
+        item.read_mode = read["mode"]
+        item.manifest = read["manifest"]
+
+        counters = self._stages["reader"]
+        counters.bytes += len(item.payload)
+        counters.modes[item.read_mode] = counters.modes.get(item.read_mode, 0) + 1
+
+    async def _decode(self, item: ImportWorkItem) -> None:
+        payload, item.payload = item.payload, None
+        item.arrays = await asyncio.to_thread(
+            decode_import_payload_sync,
+            freq=item.freq,
+            payload=payload,
+            source=item.source,
+        )
+        counters = self._stages["decoder"]
+        counters.bytes += len(payload)
+        counters.rows += len(item.arrays["date"])
+
+    async def _normalize(self, item: ImportWorkItem) -> None:
+        arrays, item.arrays = item.arrays, None
+        call = functools.partial(
+            normalize_import_arrays_sync,
+            market=item.market,
+            symbol=item.symbol,
+            freq=item.freq,
+            arrays=arrays,
+            source=item.source,
+            allow_empty=item.read_mode != "full",
+        )
+        if self._normalize_executor is not None:
+            item.prepared = await asyncio.get_running_loop().run_in_executor(self._normalize_executor, call)
+        else:
+            item.prepared = await asyncio.to_thread(call)
+        item.prepared["manifest"] = item.manifest
+        item.prepared["read_mode"] = item.read_mode
+        self._stages["normalizer"].rows += _prepared_rows(item.prepared)
+
+    async def _run_writer(self) -> None:
+        counters = self._stages["writer"]
+        done = False
+        while not done:
+            counters.sample_queue()
+            first = await self._write_q.get()
+            if first is _DONE:
+                return
+
+            batch = [first]
+            while len(batch) < self._max_write_batch:
+                try:
+                    nxt = self._write_q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is _DONE:
+                    done = True
+                    break
+                batch.append(nxt)
+
+            t0 = time.perf_counter()
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                _LOG.exception("[LOCAL_IMPORT][PIPELINE] write batch failed files=%s err=%s", len(batch), e)
+            counters.busy_seconds += time.perf_counter() - t0
+            self._write_batches += 1
+
+            for item in batch:
+                if item.error is None:
+                    counters.items += 1
+                    counters.rows += _prepared_rows(item.prepared or {})
+                else:
+                    counters.failed += 1
+                item.prepared = None
+
+    # ==========================================================
+    # 计数器
+    # ==========================================================
+    def stats(self) -> Dict[str, Any]:
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        return {
+            "running": self._started_at is not None and self._finished_at is None,
+            "elapsed_seconds": round(elapsed, 3),
+            "queue_size": self._queue_size,
+            "write_batches": self._write_batches,
+            "stages": [c.snapshot(elapsed) for c in self._stages.values()],
+        }
+
+
+_CURRENT: Optional[StagedImportPipeline] = None
+_LAST_STATS: Optional[Dict[str, Any]] = None
+
+
+def set_current_pipeline(pipeline: Optional[StagedImportPipeline]) -> None:
+    """登记当前运行中的流水线；传 None 时保存其最终计数器供事后查询。"""
+    global _CURRENT, _LAST_STATS
+    if pipeline is None and _CURRENT is not None:
+        _LAST_STATS = _CURRENT.stats()
+    _CURRENT = pipeline
+
+
+def get_import_pipeline_stats() -> Optional[Dict[str, Any]]:
+    """当前流水线的实时计数器；无运行中流水线时返回最近一次的最终计数器。"""
+    if _CURRENT is not None:
+        return _CURRENT.stats()
+    return _LAST_STATS
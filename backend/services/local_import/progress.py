@@ -0,0 +1,217 @@
+# backend/services/local_import/progress.py
+# ==============================
+# 盘后数据导入 import - 批次推进的进度记账
+#
+# 背景：
+#   - 逐文件落任务终态（单行 UPDATE + 回读）、逐文件结算批次（COUNT 聚合）、逐文件推送 status，
+#     文件数上千时记账开销超过数据本身
+#
+# 职责：
+#   - 内存计数：running 批次的 queued / running / success / failed / cancelled，
+#     认领 / 落终态时就地增减，结算与推送直接使用，不再每次 COUNT
+#   - 终态缓冲：任务终态先记入内存，满 local_import_task_flush_size 条或推送前，
+#     经 mark_tasks_terminal 在一个写事务内批量落库
+#   - 推送节流：进度变化只置脏标记；距上次推送不足 1 / local_import_status_emit_hz 秒时由后台 ticker 补推，
+#     期间多次变化合并为一次推送（提示信息保留最近一条）
+#
+# 约定：
+#   - 仅在 orchestrator 事件循环内使用，无需加锁
+#   - 缓冲中的任务在库内仍为 running；进程在 flush 前退出时，由启动恢复逻辑按中断失败处理
+#   - 外部改动任务状态（取消 queued 任务）后需调用 resync：先落缓冲，再从 tasks 真相源重载计数
+#   - 批次推进结束前必须 close：停止 ticker 并落完缓冲
+#
+# 本轮改动（落库失败不丢终态）：
+#   - flush_tasks 中 mark_tasks_terminal 抛错时，本次取出的终态原样放回缓冲头部后重新抛出：
+#     内存计数与缓冲保持一致，下次 flush 仍会重试；由 orchestrator 捕获异常并把批次落 failed
+# ==============================
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.services.local_import.repository import get_batch_counts, mark_tasks_terminal
+from backend.settings import settings
+from backend.utils.logger import get_logger
+
+_LOG = get_logger("local_import.progress")
+
+_STATES = ("queued", "running", "success", "failed", "cancelled")
+
+TerminalEntry = Tuple[str, str, str, str, Optional[str], Optional[str], Optional[int], Optional[str]]
+
+
+class BatchProgress:
+    """单次批次推进内的进度记账（内存计数 + 终态缓冲 + 推送节流）。"""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = str(batch_id or "").strip()
+        self._counts: Dict[str, int] = dict(zip(_STATES, get_batch_counts(self.batch_id)))
+        self._pending: List[TerminalEntry] = []
+        self._flush_size = int(settings.local_import_task_flush_size)
+        self._interval = 1.0 / float(settings.local_import_status_emit_hz)
+
+        self._dirty = False
+        self._message: Optional[str] = None
+        self._last_emit = 0.0
+        self._ticker: Optional[asyncio.Task] = None
+
+        self._flushes = 0
+        self._flushed_tasks = 0
+        self._emits = 0
+
+    # ==========================================================
+    # 计数
+    # ==========================================================
+    def counts(self) -> Tuple[int, int, int, int, int]:
+        return tuple(self._counts[s] for s in _STATES)  # type: ignore[return-value]
+
+    def claimed(self, n: int = 1) -> None:
+        """queued -> running。"""
+        n = int(n or 0)
+        if n <= 0:
+            return
+        self._counts["queued"] -= n
+        self._counts["running"] += n
+        self.touch()
+
+    def record_terminal(
+        self,
+        market: str,
+        symbol: str,
+        freq: str,
+        terminal_state: str,
+        signal_code: Optional[str],
+        signal_message: Optional[str],
+        appended_rows: Optional[int],
+        source_file_path: Optional[str],
+    ) -> None:
+        """running -> success / failed（先入缓冲，满阈值即落库）。"""
+        if terminal_state not in ("success", "failed"):
+            raise ValueError(f"invalid terminal task state: {terminal_state}")
+
+        self._pending.append((
+            market,
+            symbol,
+            freq,
+            terminal_state,
+            signal_code,
+            signal_message,
+            appended_rows,
+            source_file_path,
+        ))
+        self._counts["running"] -= 1
+        self._counts[terminal_state] += 1
+        self.touch()
+
+        if len(self._pending) >= self._flush_size:
+            self.flush_tasks()
+
+    def resync(self) -> None:
+        """落完缓冲后从 tasks 真相源重载计数（外部改动任务状态后调用）。"""
+        self.flush_tasks()
+        counts = dict(zip(_STATES, get_batch_counts(self.batch_id)))
+        if counts != self._counts:
+            self._counts = counts
+            self.touch()
+
+    # ==========================================================
+    # 终态缓冲
+    # ==========================================================
+    @property
+    def pending_tasks(self) -> int:
+        return len(self._pending)
+
+    def flush_tasks(self) -> int:
+        """批量落缓冲终态；落库失败时终态放回缓冲并重新抛出（计数已按终态计入，不能丢）。"""
+        if not self._pending:
+            return 0
+        entries, self._pending = self._pending, []
+        try:
+            written = mark_tasks_terminal(self.batch_id, entries)
+        except Exception as e:
+            self._pending = entries + self._pending
+            _LOG.error(
+                "[LOCAL_IMPORT][PROGRESS] batch=%s flush %s terminal tasks failed: %s",
+                self.batch_id,
+                len(entries),
+                e,
+            )
+            raise
+        self._flushes += 1
+        self._flushed_tasks += len(entries)
+        return written
+
+    # ==========================================================
+    # 推送节流
+    # ==========================================================
+    def touch(self, ui_message: Optional[str] = None) -> None:
+        self._dirty = True
+        if ui_message is not None:
+            self._message = ui_message
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def due(self) -> bool:
+        return self._dirty and time.monotonic() - self._last_emit >= self._interval
+
+    def take_message(self) -> Optional[str]:
+        """开始一次推送：清脏标记并取出合并期间最近一条提示信息。"""
+        message, self._message = self._message, None
+        self._dirty = False
+        self._last_emit = time.monotonic()
+        self._emits += 1
+        return message
+
+    def start(self, publish: Callable[[], Any]) -> None:
+        """启动后台 ticker：有未推送的变化时按节流间隔补推。"""
+        if self._ticker is not None:
+            return
+
+        async def _tick() -> None:
+            while True:
+                await asyncio.sleep(self._interval)
+                if self._dirty:
+                    try:
+                        publish()
+                    except Exception as e:
+                        _LOG.error("[LOCAL_IMPORT][PROGRESS] batch=%s publish failed: %s", self.batch_id, e)
+
+        self._ticker = asyncio.create_task(_tick())
+
+    async def close(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
+        self.flush_tasks()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "counts": dict(self._counts),
+            "emits": self._emits,
+            "task_flushes": self._flushes,
+            "flushed_tasks": self._flushed_tasks,
+            "pending_tasks": len(self._pending),
+        }
+
+
+_ACTIVE: Dict[str, BatchProgress] = {}
+
+
+def open_batch_progress(batch_id: str) -> BatchProgress:
+    progress = BatchProgress(batch_id)
+    _ACTIVE[progress.batch_id] = progress
+    return progress
+
+
+def close_batch_progress(progress: BatchProgress) -> None:
+    if _ACTIVE.get(progress.batch_id) is progress:
+        _ACTIVE.pop(progress.batch_id, None)
+
+
+def get_active_batch_progress(batch_id: str) -> Optional[BatchProgress]:
+    return _ACTIVE.get(str(batch_id or "").strip())
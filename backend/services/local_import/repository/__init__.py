@@ -38,8 +38,12 @@ from .tasks import (
     get_next_queued_task,
     get_running_task,
     mark_task_running,
+    claim_queued_tasks,
     get_task,
     mark_task_terminal,
+    mark_tasks_terminal,
+    get_task_checkpoint,
+    update_task_checkpoint,
     cancel_queued_tasks_in_batch,
     reset_retryable_tasks,
     mark_interrupted_running_tasks_failed,
@@ -78,8 +82,12 @@ __all__ = [
     "get_next_queued_task",
     "get_running_task",
     "mark_task_running",
+    "claim_queued_tasks",
     "get_task",
     "mark_task_terminal",
+    "mark_tasks_terminal",
+    "get_task_checkpoint",
+    "update_task_checkpoint",
     "cancel_queued_tasks_in_batch",
     "reset_retryable_tasks",
     "mark_interrupted_running_tasks_failed",
@@ -14,15 +14,23 @@
 #       1) batch 元信息持久化访问
 #       2) 基于 tasks 真相源构造 display/status 视图
 #   - orchestrator 不再自行拼装前端视图
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再持有全局写锁自行 commit
+#
+# 本轮改动（进度记账）：
+#   - build_display_batch_view / build_status_snapshot 可传入调用方已知的任务计数（进度记账内存计数），
+#     此时不再执行 tasks 聚合 COUNT
 # ==============================
 
 from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-from backend.db.connection import get_conn, get_write_lock
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecute, WriteFunc, run_write
 from backend.utils.time import now_iso
 
 from .common import _safe_batch_state, _row_to_batch_dict
@@ -46,37 +54,34 @@ def create_batch(
     batch_id = generate_batch_id()
     now = now_iso()
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO local_import_batches (
-                batch_id,
-                state,
-                created_at,
-                started_at,
-                finished_at,
-                retryable,
-                cancelable,
-                ui_message,
-                selection_signature
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """,
-            (
-                batch_id,
-                "queued",
-                now,
-                None,
-                None,
-                0,
-                1,
-                "已创建导入批次",
-                str(selection_signature or "").strip() or None,
-            ),
+    run_write(SqlExecute(
+        """
+        INSERT INTO local_import_batches (
+            batch_id,
+            state,
+            created_at,
+            started_at,
+            finished_at,
+            retryable,
+            cancelable,
+            ui_message,
+            selection_signature
         )
-        conn.commit()
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        (
+            batch_id,
+            "queued",
+            now,
+            None,
+            None,
+            0,
+            1,
+            "已创建导入批次",
+            str(selection_signature or "").strip() or None,
+        ),
+        label="local_import_batches.create",
+    ))
 
     return get_batch(batch_id)
 
@@ -86,7 +91,7 @@ def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
     if not bid:
         return None
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         "SELECT * FROM local_import_batches WHERE batch_id=? LIMIT 1;",
@@ -97,7 +102,7 @@ def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
 
 
 def list_all_batches_ordered() -> List[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -112,7 +117,7 @@ def list_all_batches_ordered() -> List[Dict[str, Any]]:
 
 def get_batches_by_state(state: str) -> List[Dict[str, Any]]:
     st = _safe_batch_state(state)
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -128,7 +133,7 @@ def get_batches_by_state(state: str) -> List[Dict[str, Any]]:
 
 
 def get_current_running_batch() -> Optional[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -144,7 +149,7 @@ def get_current_running_batch() -> Optional[Dict[str, Any]]:
 
 
 def get_latest_queued_batch() -> Optional[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -160,7 +165,7 @@ def get_latest_queued_batch() -> Optional[Dict[str, Any]]:
 
 
 def get_oldest_queued_batch() -> Optional[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -176,7 +181,7 @@ def get_oldest_queued_batch() -> Optional[Dict[str, Any]]:
 
 
 def get_last_effective_terminal_batch() -> Optional[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -196,7 +201,7 @@ def get_latest_active_batch_by_signature(selection_signature: str) -> Optional[D
     if not sig:
         return None
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -233,7 +238,7 @@ def get_display_batch_meta() -> Optional[Dict[str, Any]]:
 
 
 def list_queued_batch_summaries() -> List[Dict[str, Any]]:
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -256,16 +261,23 @@ def list_queued_batch_summaries() -> List[Dict[str, Any]]:
     return out
 
 
-def build_display_batch_view(batch: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+def build_display_batch_view(
+    batch: Optional[Dict[str, Any]],
+    counts: Optional[Tuple[int, int, int, int, int]] = None,
+) -> Optional[Dict[str, Any]]:
     """
     统一构造给前端看的 display_batch 视图：
       batch 元信息 + tasks 聚合进度
+
+    counts：调用方已知的 (queued, running, success, failed, cancelled)；为空时从 tasks 聚合
     """
     if not batch:
         return None
 
     bid = str(batch.get("batch_id") or "").strip()
-    queued_count, running_count, success_count, failed_count, cancelled_count = get_batch_counts(bid)
+    queued_count, running_count, success_count, failed_count, cancelled_count = (
+        counts if counts is not None else get_batch_counts(bid)
+    )
 
     total = queued_count + running_count + success_count + failed_count + cancelled_count
     done = success_count + failed_count + cancelled_count
@@ -281,14 +293,20 @@ def build_display_batch_view(batch: Optional[Dict[str, Any]]) -> Optional[Dict[s
     return view
 
 
-def build_status_snapshot(ui_message: Optional[str] = None) -> Dict[str, Any]:
+def build_status_snapshot(
+    ui_message: Optional[str] = None,
+    counts_by_batch: Optional[Dict[str, Tuple[int, int, int, int, int]]] = None,
+) -> Dict[str, Any]:
     """
     统一构造给前端看的 status 视图：
-      - display_batch 来自 batch 元信息 + tasks 聚合
+      - display_batch 来自 batch 元信息 + tasks 聚合（counts_by_batch 命中 display_batch 时直接使用）
       - queued_batches 来自 batch 元信息列表
     """
     raw_display_batch = get_display_batch_meta()
-    display_batch = build_display_batch_view(raw_display_batch)
+    counts = None
+    if raw_display_batch and counts_by_batch:
+        counts = counts_by_batch.get(str(raw_display_batch.get("batch_id") or "").strip())
+    display_batch = build_display_batch_view(raw_display_batch, counts)
     queued_batches = list_queued_batch_summaries()
 
     return {
@@ -307,23 +325,20 @@ def mark_batch_running(batch_id: str, ui_message: str = "正在导入本地盘
         return None
 
     now = now_iso()
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_batches
-            SET state='running',
-                started_at=COALESCE(started_at, ?),
-                finished_at=NULL,
-                retryable=0,
-                cancelable=1,
-                ui_message=?
-            WHERE batch_id=? AND state='queued';
-            """,
-            (now, ui_message, bid),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_batches
+        SET state='running',
+            started_at=COALESCE(started_at, ?),
+            finished_at=NULL,
+            retryable=0,
+            cancelable=1,
+            ui_message=?
+        WHERE batch_id=? AND state='queued';
+        """,
+        (now, ui_message, bid),
+        label="local_import_batches.mark_running",
+    ))
 
     return get_batch(bid)
 
@@ -333,21 +348,18 @@ def mark_batch_paused(batch_id: str, ui_message: str = "导入被异常中断，
     if not bid:
         return None
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_batches
-            SET state='paused',
-                retryable=1,
-                cancelable=0,
-                ui_message=?
-            WHERE batch_id=? AND state='running';
-            """,
-            (ui_message, bid),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_batches
+        SET state='paused',
+            retryable=1,
+            cancelable=0,
+            ui_message=?
+        WHERE batch_id=? AND state='running';
+        """,
+        (ui_message, bid),
+        label="local_import_batches.mark_paused",
+    ))
 
     return get_batch(bid)
 
@@ -360,23 +372,20 @@ def mark_batch_queued_for_retry(
     if not bid:
         return None
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_batches
-            SET state='queued',
-                started_at=NULL,
-                finished_at=NULL,
-                retryable=0,
-                cancelable=1,
-                ui_message=?
-            WHERE batch_id=? AND state IN ('failed', 'cancelled', 'paused');
-            """,
-            (ui_message, bid),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_batches
+        SET state='queued',
+            started_at=NULL,
+            finished_at=NULL,
+            retryable=0,
+            cancelable=1,
+            ui_message=?
+        WHERE batch_id=? AND state IN ('failed', 'cancelled', 'paused');
+        """,
+        (ui_message, bid),
+        label="local_import_batches.mark_queued_for_retry",
+    ))
 
     return get_batch(bid)
 
@@ -397,29 +406,26 @@ def mark_batch_terminal_state(
     retryable = 1 if st in ("failed", "cancelled") else 0
     cancelable = 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_batches
-            SET state=?,
-                finished_at=?,
-                retryable=?,
-                cancelable=?,
-                ui_message=?
-            WHERE batch_id=?;
-            """,
-            (
-                st,
-                finished_at,
-                retryable,
-                cancelable,
-                ui_message,
-                bid,
-            ),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_batches
+        SET state=?,
+            finished_at=?,
+            retryable=?,
+            cancelable=?,
+            ui_message=?
+        WHERE batch_id=?;
+        """,
+        (
+            st,
+            finished_at,
+            retryable,
+            cancelable,
+            ui_message,
+            bid,
+        ),
+        label="local_import_batches.mark_terminal",
+    ))
 
     return get_batch(bid)
 
@@ -429,18 +435,15 @@ def update_batch_ui_message(batch_id: str, ui_message: str) -> Optional[Dict[str
     if not bid:
         return None
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_batches
-            SET ui_message=?
-            WHERE batch_id=?;
-            """,
-            (ui_message, bid),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_batches
+        SET ui_message=?
+        WHERE batch_id=?;
+        """,
+        (ui_message, bid),
+        label="local_import_batches.update_ui_message",
+    ))
 
     return get_batch(bid)
 
@@ -450,13 +453,11 @@ def delete_batch(batch_id: str) -> int:
     if not bid:
         return 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM local_import_batches WHERE batch_id=?;", (bid,))
-        affected = int(cur.rowcount or 0)
-        conn.commit()
-    return affected
+    return int(run_write(SqlExecute(
+        "DELETE FROM local_import_batches WHERE batch_id=?;",
+        (bid,),
+        label="local_import_batches.delete",
+    )) or 0)
 
 
 def delete_batches(batch_ids: List[str]) -> int:
@@ -464,12 +465,11 @@ def delete_batches(batch_ids: List[str]) -> int:
     if not ids:
         return 0
 
-    total = 0
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
+    def _apply(cur) -> int:
+        total = 0
         for bid in ids:
             cur.execute("DELETE FROM local_import_batches WHERE batch_id=?;", (bid,))
             total += int(cur.rowcount or 0)
-        conn.commit()
-    return total
+        return total
+
+    return int(run_write(WriteFunc(_apply, label="local_import_batches.delete_many")) or 0)
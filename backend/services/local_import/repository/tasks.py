@@ -22,13 +22,29 @@
 #       * source_file_path
 #       * started_at
 #       * finished_at
+#
+# 本轮改动（单写线程）：
+#   - 写入经由 writer_thread 单写线程提交，不再持有全局写锁自行 commit
+#
+# 本轮改动（并行执行）：
+#   - 新增 claim_queued_tasks：一条 UPDATE ... RETURNING 原子认领若干 queued 任务并置为 running，
+#     供并行执行器批量取任务（同一任务不会被重复认领）
+#
+# 本轮改动（进度记账）：
+#   - 新增 mark_tasks_terminal：多个任务终态在一个写事务内批量落库（executemany），
+#     供进度记账缓冲（progress.BatchProgress）按批 flush；不回读任务行
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 新增 get_task_checkpoint / update_task_checkpoint：分块导入的断点偏移（checkpoint_offset）
+#   - 断点跨重试保留（mark_running / reset_retryable 不清零），是否可用由分块导入侧按归档边界校验
 # ==============================
 
 from __future__ import annotations
 
 from typing import Dict, Any, List, Optional, Tuple
 
-from backend.db.connection import get_conn, get_write_lock
+from backend.db.connection import get_read_conn
+from backend.db.writer_thread import SqlExecute, SqlExecuteMany, WriteFunc, run_write
 from backend.utils.time import now_iso
 
 from .common import _safe_task_state, _joined_row_to_task_dict
@@ -70,31 +86,27 @@ def create_tasks_for_batch(batch_id: str, items: List[Dict[str, Any]]) -> int:
     if not payload:
         return 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.executemany(
-            """
-            INSERT OR IGNORE INTO local_import_tasks (
-                batch_id,
-                market,
-                symbol,
-                freq,
-                state,
-                attempts,
-                signal_code,
-                signal_message,
-                appended_rows,
-                source_file_path,
-                started_at,
-                finished_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """,
-            payload,
+    return int(run_write(SqlExecuteMany(
+        """
+        INSERT OR IGNORE INTO local_import_tasks (
+            batch_id,
+            market,
+            symbol,
+            freq,
+            state,
+            attempts,
+            signal_code,
+            signal_message,
+            appended_rows,
+            source_file_path,
+            started_at,
+            finished_at
         )
-        conn.commit()
-        return int(cur.rowcount or 0)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """,
+        payload,
+        label="local_import_tasks.create",
+    )) or 0)
 
 
 def delete_tasks_for_batch(batch_id: str) -> int:
@@ -102,13 +114,11 @@ def delete_tasks_for_batch(batch_id: str) -> int:
     if not bid:
         return 0
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM local_import_tasks WHERE batch_id=?;", (bid,))
-        affected = int(cur.rowcount or 0)
-        conn.commit()
-    return affected
+    return int(run_write(SqlExecute(
+        "DELETE FROM local_import_tasks WHERE batch_id=?;",
+        (bid,),
+        label="local_import_tasks.delete",
+    )) or 0)
 
 
 def delete_tasks_for_batches(batch_ids: List[str]) -> int:
@@ -116,53 +126,40 @@ def delete_tasks_for_batches(batch_ids: List[str]) -> int:
     if not ids:
         return 0
 
-    total = 0
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
+    def _apply(cur) -> int:
+        total = 0
         for bid in ids:
             cur.execute("DELETE FROM local_import_tasks WHERE batch_id=?;", (bid,))
             total += int(cur.rowcount or 0)
-        conn.commit()
-    return total
+        return total
+
+    return int(run_write(WriteFunc(_apply, label="local_import_tasks.delete_many")) or 0)
 
 
 def delete_tasks_except_batch_ids(keep_batch_ids: List[str]) -> int:
     keep_ids = [str(x).strip() for x in (keep_batch_ids or []) if str(x).strip()]
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
+    if not keep_ids:
+        return int(run_write(SqlExecute(
+            "DELETE FROM local_import_tasks;",
+            label="local_import_tasks.delete_all",
+        )) or 0)
 
-        if not keep_ids:
-            cur.execute("DELETE FROM local_import_tasks;")
-            affected = int(cur.rowcount or 0)
-            conn.commit()
-            return affected
-
-        placeholders = ",".join(["?"] * len(keep_ids))
-        sql = f"DELETE FROM local_import_tasks WHERE batch_id NOT IN ({placeholders});"
-        cur.execute(sql, keep_ids)
-        affected = int(cur.rowcount or 0)
-        conn.commit()
-        return affected
+    placeholders = ",".join(["?"] * len(keep_ids))
+    sql = f"DELETE FROM local_import_tasks WHERE batch_id NOT IN ({placeholders});"
+    return int(run_write(SqlExecute(sql, keep_ids, label="local_import_tasks.delete_except")) or 0)
 
 
 def delete_orphan_tasks() -> int:
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            DELETE FROM local_import_tasks
-            WHERE batch_id NOT IN (
-                SELECT batch_id FROM local_import_batches
-            );
-            """
-        )
-        affected = int(cur.rowcount or 0)
-        conn.commit()
-    return affected
+    return int(run_write(SqlExecute(
+        """
+        DELETE FROM local_import_tasks
+        WHERE batch_id NOT IN (
+            SELECT batch_id FROM local_import_batches
+        );
+        """,
+        label="local_import_tasks.delete_orphans",
+    )) or 0)
 
 
 def list_tasks_for_batch(batch_id: str) -> List[Dict[str, Any]]:
@@ -170,7 +167,7 @@ def list_tasks_for_batch(batch_id: str) -> List[Dict[str, Any]]:
     if not bid:
         return []
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -207,7 +204,7 @@ def get_next_queued_task(batch_id: str) -> Optional[Dict[str, Any]]:
     if not bid:
         return None
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -228,7 +225,7 @@ def get_running_task(batch_id: str) -> Optional[Dict[str, Any]]:
     if not bid:
         return None
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -251,7 +248,7 @@ def get_task(batch_id: str, market: str, symbol: str, freq: str) -> Optional[Dic
     if not bid or not m or not s or not f:
         return None
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -292,9 +289,43 @@ def mark_task_running(batch_id: str, market: str, symbol: str, freq: str) -> Opt
         return None
 
     now = now_iso()
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET state='running',
+            attempts=attempts+1,
+            signal_code=NULL,
+            signal_message=NULL,
+            appended_rows=NULL,
+            source_file_path=NULL,
+            started_at=?,
+            finished_at=NULL
+        WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='queued';
+        """,
+        (now, bid, m, s, f),
+        label="local_import_tasks.mark_running",
+    ))
+
+    return get_task(batch_id=bid, market=m, symbol=s, freq=f)
+
+
+def claim_queued_tasks(batch_id: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    原子认领至多 limit 个 queued 任务（按 market, symbol, freq 顺序），并置为 running。
+
+    语义与 mark_task_running 一致（attempts+1、清空上次结果、写 started_at）。
+
+    Returns:
+        被认领任务：[{market, symbol, freq}]，按 market, symbol, freq 排序
+    """
+    bid = str(batch_id or "").strip()
+    n = int(limit or 0)
+    if not bid or n <= 0:
+        return []
+
+    now = now_iso()
+
+    def _apply(cur) -> List[Tuple[str, str, str]]:
         cur.execute(
             """
             UPDATE local_import_tasks
@@ -306,13 +337,24 @@ def mark_task_running(batch_id: str, market: str, symbol: str, freq: str) -> Opt
                 source_file_path=NULL,
                 started_at=?,
                 finished_at=NULL
-            WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='queued';
+            WHERE id IN (
+                SELECT id
+                FROM local_import_tasks
+                WHERE batch_id=? AND state='queued'
+                ORDER BY market ASC, symbol ASC, freq ASC
+                LIMIT ?
+            )
+            RETURNING market, symbol, freq;
             """,
-            (now, bid, m, s, f),
+            (now, bid, n),
         )
-        conn.commit()
+        return [(r[0], r[1], r[2]) for r in cur.fetchall()]
 
-    return get_task(batch_id=bid, market=m, symbol=s, freq=f)
+    rows = run_write(WriteFunc(_apply, label="local_import_tasks.claim")) or []
+    return [
+        {"market": str(m).strip().upper(), "symbol": str(s).strip(), "freq": str(f).strip()}
+        for m, s, f in sorted(rows)
+    ]
 
 
 def mark_task_terminal(
@@ -337,44 +379,136 @@ def mark_task_terminal(
 
     finished_at = now_iso()
 
-    with get_write_lock():
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE local_import_tasks
-            SET state=?,
-                signal_code=?,
-                signal_message=?,
-                appended_rows=?,
-                source_file_path=?,
-                finished_at=?
-            WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='running';
-            """,
-            (
-                st,
-                signal_code,
-                signal_message,
-                appended_rows,
-                source_file_path,
-                finished_at,
-                bid,
-                m,
-                s,
-                f,
-            ),
-        )
-        conn.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET state=?,
+            signal_code=?,
+            signal_message=?,
+            appended_rows=?,
+            source_file_path=?,
+            finished_at=?
+        WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='running';
+        """,
+        (
+            st,
+            signal_code,
+            signal_message,
+            appended_rows,
+            source_file_path,
+            finished_at,
+            bid,
+            m,
+            s,
+            f,
+        ),
+        label="local_import_tasks.mark_terminal",
+    ))
 
     return get_task(batch_id=bid, market=m, symbol=s, freq=f)
 
 
+def mark_tasks_terminal(
+    batch_id: str,
+    entries: List[Tuple[str, str, str, str, Optional[str], Optional[str], Optional[int], Optional[str]]],
+) -> int:
+    """
+    批量落任务终态（单个写事务）。
+
+    Args:
+        entries: (market, symbol, freq, terminal_state, signal_code, signal_message, appended_rows, source_file_path)
+
+    Returns:
+        实际更新的任务数（只更新仍处于 running 的任务，语义同 mark_task_terminal）
+    """
+    bid = str(batch_id or "").strip()
+    if not bid or not entries:
+        return 0
+
+    finished_at = now_iso()
+    params = []
+    for market, symbol, freq, terminal_state, signal_code, signal_message, appended_rows, source_file_path in entries:
+        st = _safe_task_state(terminal_state)
+        if st not in ("success", "failed"):
+            raise ValueError(f"invalid terminal task state: {terminal_state}")
+        params.append((
+            st,
+            signal_code,
+            signal_message,
+            appended_rows,
+            source_file_path,
+            finished_at,
+            bid,
+            str(market or "").strip().upper(),
+            str(symbol or "").strip(),
+            str(freq or "").strip(),
+        ))
+
+    return int(run_write(SqlExecuteMany(
+        """
+        UPDATE local_import_tasks
+        SET state=?,
+            signal_code=?,
+            signal_message=?,
+            appended_rows=?,
+            source_file_path=?,
+            finished_at=?
+        WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='running';
+        """,
+        params,
+        label="local_import_tasks.mark_terminal_many",
+    )) or 0)
+
+
+def get_task_checkpoint(batch_id: str, market: str, symbol: str, freq: str) -> int:
+    bid = str(batch_id or "").strip()
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+    if not bid or not m or not s or not f:
+        return 0
+
+    conn = get_read_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT checkpoint_offset
+        FROM local_import_tasks
+        WHERE batch_id=? AND market=? AND symbol=? AND freq=?
+        LIMIT 1;
+        """,
+        (bid, m, s, f),
+    )
+    row = cur.fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def update_task_checkpoint(batch_id: str, market: str, symbol: str, freq: str, offset: int) -> None:
+    """记录 running 任务的分块导入断点（该偏移之前的源记录已合并进归档）。"""
+    bid = str(batch_id or "").strip()
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+    if not bid or not m or not s or not f:
+        return
+
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET checkpoint_offset=?
+        WHERE batch_id=? AND market=? AND symbol=? AND freq=? AND state='running';
+        """,
+        (int(offset), bid, m, s, f),
+        label="local_import_tasks.checkpoint",
+    ))
+
+
 def cancel_queued_tasks_in_batch(batch_id: str) -> List[Dict[str, Any]]:
     bid = str(batch_id or "").strip()
     if not bid:
         return []
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -418,24 +552,21 @@ def cancel_queued_tasks_in_batch(batch_id: str) -> List[Dict[str, Any]]:
         item["finished_at"] = None
         out.append(item)
 
-    with get_write_lock():
-        conn2 = get_conn()
-        cur2 = conn2.cursor()
-        cur2.execute(
-            """
-            UPDATE local_import_tasks
-            SET state='cancelled',
-                signal_code=NULL,
-                signal_message=NULL,
-                appended_rows=NULL,
-                source_file_path=NULL,
-                started_at=NULL,
-                finished_at=NULL
-            WHERE batch_id=? AND state='queued';
-            """,
-            (bid,),
-        )
-        conn2.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET state='cancelled',
+            signal_code=NULL,
+            signal_message=NULL,
+            appended_rows=NULL,
+            source_file_path=NULL,
+            started_at=NULL,
+            finished_at=NULL
+        WHERE batch_id=? AND state='queued';
+        """,
+        (bid,),
+        label="local_import_tasks.cancel_queued",
+    ))
 
     return out
 
@@ -451,7 +582,7 @@ def reset_retryable_tasks(batch_id: str) -> List[Dict[str, Any]]:
     if not bid:
         return []
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -495,24 +626,21 @@ def reset_retryable_tasks(batch_id: str) -> List[Dict[str, Any]]:
         item["finished_at"] = None
         out.append(item)
 
-    with get_write_lock():
-        conn2 = get_conn()
-        cur2 = conn2.cursor()
-        cur2.execute(
-            """
-            UPDATE local_import_tasks
-            SET state='queued',
-                signal_code=NULL,
-                signal_message=NULL,
-                appended_rows=NULL,
-                source_file_path=NULL,
-                started_at=NULL,
-                finished_at=NULL
-            WHERE batch_id=? AND state IN ('failed', 'cancelled');
-            """,
-            (bid,),
-        )
-        conn2.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET state='queued',
+            signal_code=NULL,
+            signal_message=NULL,
+            appended_rows=NULL,
+            source_file_path=NULL,
+            started_at=NULL,
+            finished_at=NULL
+        WHERE batch_id=? AND state IN ('failed', 'cancelled');
+        """,
+        (bid,),
+        label="local_import_tasks.reset_retryable",
+    ))
 
     return out
 
@@ -522,7 +650,7 @@ def mark_interrupted_running_tasks_failed(batch_id: str) -> List[Dict[str, Any]]
     if not bid:
         return []
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
@@ -567,23 +695,20 @@ def mark_interrupted_running_tasks_failed(batch_id: str) -> List[Dict[str, Any]]
         item["finished_at"] = finished_at
         out.append(item)
 
-    with get_write_lock():
-        conn2 = get_conn()
-        cur2 = conn2.cursor()
-        cur2.execute(
-            """
-            UPDATE local_import_tasks
-            SET state='failed',
-                signal_code='INTERRUPTED',
-                signal_message='服务异常中断，任务未正常完成，请检查后重试',
-                appended_rows=NULL,
-                source_file_path=NULL,
-                finished_at=?
-            WHERE batch_id=? AND state='running';
-            """,
-            (finished_at, bid),
-        )
-        conn2.commit()
+    run_write(SqlExecute(
+        """
+        UPDATE local_import_tasks
+        SET state='failed',
+            signal_code='INTERRUPTED',
+            signal_message='服务异常中断，任务未正常完成，请检查后重试',
+            appended_rows=NULL,
+            source_file_path=NULL,
+            finished_at=?
+        WHERE batch_id=? AND state='running';
+        """,
+        (finished_at, bid),
+        label="local_import_tasks.mark_interrupted",
+    ))
 
     return out
 
@@ -598,7 +723,7 @@ def get_batch_counts(batch_id: str) -> Tuple[int, int, int, int, int]:
     if not bid:
         return 0, 0, 0, 0, 0
 
-    conn = get_conn()
+    conn = get_read_conn()
     cur = conn.cursor()
     cur.execute(
         """
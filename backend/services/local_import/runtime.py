@@ -15,6 +15,11 @@
 #   - get 只读取当前本地持久化真相源
 #   - start / retry / pipeline 只消费当前本地持久化真相源
 #   - 目录变更后，旧真相源立即失效并删除
+#
+# 本轮改动（候选视图缓存）：
+#   - 已读取的快照按快照版本（get_scan_snapshot_version）缓存，版本不变不再重复读取
+#   - get_file_path 改为基于缓存的 (market, symbol, freq) -> file_path 索引，O(1) 查询
+#   - get_persisted_snapshot / require_persisted_snapshot 返回缓存对象，调用方只读不改
 # ==============================
 
 from __future__ import annotations
@@ -24,6 +29,7 @@ from threading import RLock
 from typing import Dict, Any, Optional, Tuple, List
 
 from backend.services.local_import.snapshot_store import (
+    get_scan_snapshot_version,
     load_scan_snapshot,
     has_scan_snapshot,
 )
@@ -36,6 +42,9 @@ class LocalImportRuntime:
     def __init__(self) -> None:
         self._lock = asyncio.Lock()
         self._io_lock = RLock()
+        self._snapshot_version: Optional[int] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._file_index: Dict[Tuple[str, str, str], str] = {}
 
     # ==========================================================
     # 串行调度锁
@@ -53,24 +62,49 @@ class LocalImportRuntime:
     # ==========================================================
     # 候选结果真相源读取
     # ==========================================================
+    def _load_snapshot_cached(self) -> Optional[Dict[str, Any]]:
+        """按快照版本缓存读取结果（调用方需持有 _io_lock）。"""
+        version = get_scan_snapshot_version()
+        if version is None:
+            self._snapshot_version = None
+            self._snapshot = None
+            self._file_index = {}
+            return None
+
+        if version != self._snapshot_version:
+            snapshot = load_scan_snapshot()
+            file_index: Dict[Tuple[str, str, str], str] = {}
+            for item in (snapshot or {}).get("items") or []:
+                file_path = str(item.get("file_path") or "").strip()
+                if file_path:
+                    file_index[(item["market"], item["symbol"], item["freq"])] = file_path
+            self._snapshot = snapshot
+            self._file_index = file_index
+            self._snapshot_version = version
+        return self._snapshot
+
+    def get_persisted_snapshot_version(self) -> Optional[int]:
+        with self._io_lock:
+            return get_scan_snapshot_version()
+
     def has_persisted_snapshot(self) -> bool:
         with self._io_lock:
             return has_scan_snapshot()
 
     def get_persisted_snapshot(self) -> Optional[Dict[str, Any]]:
         with self._io_lock:
-            return load_scan_snapshot()
+            return self._load_snapshot_cached()
 
     def require_persisted_snapshot(self) -> Dict[str, Any]:
         with self._io_lock:
-            snapshot = load_scan_snapshot()
+            snapshot = self._load_snapshot_cached()
             if not snapshot:
                 raise RuntimeError("persisted scan snapshot is missing; please refresh candidates first")
             return snapshot
 
     def get_scan_items(self) -> List[Dict[str, Any]]:
         with self._io_lock:
-            snapshot = load_scan_snapshot() or {}
+            snapshot = self._load_snapshot_cached() or {}
             return list(snapshot.get("items") or [])
 
     def get_file_path(self, market: str, symbol: str, freq: str) -> Optional[str]:
@@ -81,29 +115,17 @@ class LocalImportRuntime:
             return None
 
         with self._io_lock:
-            snapshot = load_scan_snapshot() or {}
-            items = snapshot.get("items") or []
-
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                if (
-                    str(item.get("market") or "").strip().upper() == m and
-                    str(item.get("symbol") or "").strip() == s and
-                    str(item.get("freq") or "").strip() == f
-                ):
-                    return str(item.get("file_path") or "").strip() or None
-
-            return None
+            self._load_snapshot_cached()
+            return self._file_index.get((m, s, f))
 
     def get_snapshot_generated_at(self) -> Optional[str]:
         with self._io_lock:
-            snapshot = load_scan_snapshot() or {}
+            snapshot = self._load_snapshot_cached() or {}
             return snapshot.get("generated_at")
 
     def get_snapshot_root_dir(self) -> Optional[str]:
         with self._io_lock:
-            snapshot = load_scan_snapshot() or {}
+            snapshot = self._load_snapshot_cached() or {}
             root_dir = str(snapshot.get("root_dir") or "").strip()
             return root_dir or None
 
@@ -34,11 +34,34 @@
 #
 # 本轮改动：
 #   - build_scan_snapshot 增加 root_dir 输出
+#
+# 本轮改动（快速扫描）：
+#   - scan_importable_files 改为 os.scandir 实现：
+#       * 根目录下存在 sh / sz / bj 时只扫描已知布局 {sh,sz,bj} × {lday,minline,fzline}（各目录平铺，不递归），
+#         否则回退为逐层递归扫描整棵目录树
+#       * 各目录由线程池并行扫描；文件类型 / mtime 直接取自 DirEntry，不再逐文件 is_file() + stat() + resolve()
+#       * 目录级缓存：目录 mtime_ns 未变时直接复用上次该目录的扫描结果
+#   - 原 rglob 实现保留为 scan_importable_files_reference，仅作等价性对照
+#
+# 本轮改动（候选扫描快照入库）：
+#   - LocalImportFileItem 增加 file_size / file_mtime_ns（同样取自 DirEntry.stat），
+#     供快照增量写入判断文件是否变化
+#
+# 本轮改动（缓存命中仍逐文件 stat）：
+#   - 目录缓存只复用目录列表（文件名解析结果 / 子目录），命中时仍对每个文件 os.stat 刷新
+#     file_size / file_mtime_ns / file_datetime：原地追加不改目录 mtime，
+#     快照的 added / changed / unchanged 判定与 changed_version 依赖这些字段，不能沿用旧值
+#   - 省下的是 readdir 与文件名解析；逐文件 stat 与不带缓存时相同
 # ==============================
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from operator import attrgetter
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
@@ -59,6 +82,8 @@ class LocalImportFileItem:
     file_path: str
     file_name: str
     file_datetime: Optional[str]
+    file_size: int = 0
+    file_mtime_ns: int = 0
 
 
 _SUPPORTED_EXT_TO_FREQ: Dict[str, str] = {
@@ -67,6 +92,24 @@ _SUPPORTED_EXT_TO_FREQ: Dict[str, str] = {
     ".lc5": "5m",
 }
 
+# 通达信 vipdoc 已知布局：{market}/{subdir}，文件平铺在子目录内
+_KNOWN_MARKET_DIRS: Tuple[str, ...] = ("sh", "sz", "bj")
+_KNOWN_DATA_SUBDIRS: Tuple[str, ...] = ("lday", "minline", "fzline")
+
+_SCAN_MAX_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class _DirScan:
+    mtime_ns: int
+    items: Tuple[LocalImportFileItem, ...]
+    subdirs: Tuple[str, ...]
+
+
+# 目录路径 -> 上次扫描结果（进程内缓存，目录 mtime_ns 变化即失效）
+_DIR_CACHE: Dict[str, _DirScan] = {}
+_DIR_CACHE_LOCK = threading.Lock()
+
 
 def _normalize_market_text(raw: str) -> Optional[str]:
     s = str(raw or "").strip().upper()
@@ -122,16 +165,163 @@ def _format_file_mtime(path: Path) -> Optional[str]:
       YYYY-MM-DD HH:mm:ss
     """
     try:
-        ts = float(path.stat().st_mtime)
-        dt = datetime.fromtimestamp(ts)
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
+        return _format_mtime(float(path.stat().st_mtime))
+    except Exception:
+        return None
+
+
+def _format_mtime(ts: float) -> Optional[str]:
+    try:
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
     except Exception:
         return None
 
 
-def scan_importable_files() -> List[LocalImportFileItem]:
+def _restat_items(items: Tuple[LocalImportFileItem, ...]) -> Tuple[LocalImportFileItem, ...]:
+    """缓存命中时刷新各文件的 size / mtime（目录列表不变，文件内容可能已被追加）。"""
+    out: List[LocalImportFileItem] = []
+    for item in items:
+        try:
+            st = os.stat(item.file_path)
+        except OSError:
+            continue
+        if st.st_size == item.file_size and st.st_mtime_ns == item.file_mtime_ns:
+            out.append(item)
+            continue
+        out.append(replace(
+            item,
+            file_datetime=_format_mtime(st.st_mtime),
+            file_size=int(st.st_size),
+            file_mtime_ns=int(st.st_mtime_ns),
+        ))
+    return tuple(out)
+
+
+def _scan_dir(dir_path: str, force: bool) -> Tuple[_DirScan, bool]:
     """
-    递归扫描 local-import 当前有效根目录下当前支持处理的文件。
+    扫描单个目录（不递归）：返回 (扫描结果, 是否命中缓存)。
+
+    命中缓存只省去目录列表与文件名解析，文件 size / mtime 仍逐个 stat 刷新。
+    """
+    mtime_ns = os.stat(dir_path).st_mtime_ns
+
+    if not force:
+        with _DIR_CACHE_LOCK:
+            cached = _DIR_CACHE.get(dir_path)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            scan = replace(cached, items=_restat_items(cached.items))
+            with _DIR_CACHE_LOCK:
+                _DIR_CACHE[dir_path] = scan
+            return scan, True
+
+    items: List[LocalImportFileItem] = []
+    subdirs: List[str] = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            parsed = _parse_market_symbol_freq_from_file_name(entry.name)
+            if not parsed:
+                continue
+
+            try:
+                st = entry.stat()
+            except OSError:
+                st = None
+
+            market, symbol, freq, ext = parsed
+            items.append(LocalImportFileItem(
+                market=market,
+                symbol=symbol,
+                freq=freq,
+                ext=ext,
+                file_path=entry.path,
+                file_name=entry.name,
+                file_datetime=_format_mtime(st.st_mtime) if st is not None else None,
+                file_size=int(st.st_size) if st is not None else 0,
+                file_mtime_ns=int(st.st_mtime_ns) if st is not None else 0,
+            ))
+
+    scan = _DirScan(mtime_ns=mtime_ns, items=tuple(items), subdirs=tuple(subdirs))
+    with _DIR_CACHE_LOCK:
+        _DIR_CACHE[dir_path] = scan
+    return scan, False
+
+
+def _known_layout_dirs(root: Path) -> Optional[List[str]]:
+    """根目录符合 vipdoc 已知布局时返回待扫描的数据目录，否则返回 None。"""
+    markets = [root / m for m in _KNOWN_MARKET_DIRS if (root / m).is_dir()]
+    if not markets:
+        return None
+    return [str(m / sub) for m in markets for sub in _KNOWN_DATA_SUBDIRS if (m / sub).is_dir()]
+
+
+def _dedup_and_sort(items: List[LocalImportFileItem]) -> List[LocalImportFileItem]:
+    # 按 (market, symbol, freq, file_path) 排序后同键后者覆盖前者；dict 保留首次插入顺序，结果即按键有序
+    dedup: Dict[Tuple[str, str, str], LocalImportFileItem] = {}
+    for item in sorted(items, key=attrgetter("market", "symbol", "freq", "file_path")):
+        dedup[(item.market, item.symbol, item.freq)] = item
+    return list(dedup.values())
+
+
+def scan_importable_files(force: bool = False) -> List[LocalImportFileItem]:
+    """
+    扫描 local-import 当前有效根目录下当前支持处理的文件（os.scandir + 线程池 + 目录 mtime 缓存）。
+
+    Args:
+        force: True 时忽略目录缓存，全部目录重新列目录；
+               为 False 时文件 size / mtime 同样是最新的（缓存只复用目录列表）
+    """
+    started = time.perf_counter()
+    root = get_effective_local_import_root_dir()
+    if not root.exists():
+        _LOG.warning("[LOCAL_IMPORT][SCAN] vipdoc root not found: %s", str(root))
+        return []
+
+    root = root.resolve()
+    known = _known_layout_dirs(root)
+    pending = known if known is not None else [str(root)]
+    recursive = known is None
+
+    items: List[LocalImportFileItem] = []
+    dirs = 0
+    cache_hits = 0
+    with ThreadPoolExecutor(max_workers=_SCAN_MAX_WORKERS, thread_name_prefix="local-import-scan") as pool:
+        while pending:
+            results = list(pool.map(lambda d: _scan_dir(d, force), pending))
+            pending = []
+            for scan, hit in results:
+                dirs += 1
+                cache_hits += int(hit)
+                items.extend(scan.items)
+                if recursive:
+                    pending.extend(scan.subdirs)
+
+    out = _dedup_and_sort(items)
+
+    _LOG.info(
+        "[LOCAL_IMPORT][SCAN] scanned importable files=%s root=%s layout=%s dirs=%s cache_hits=%s force=%s duration_ms=%s",
+        len(out),
+        str(root),
+        "known" if known is not None else "recursive",
+        dirs,
+        cache_hits,
+        bool(force),
+        int((time.perf_counter() - started) * 1000),
+    )
+    return out
+
+
+def scan_importable_files_reference() -> List[LocalImportFileItem]:
+    """
+    rglob 递归扫描的原实现（仅作快速扫描的等价性对照，业务路径不使用）。
     """
     root = get_effective_local_import_root_dir()
     if not root.exists():
@@ -150,6 +340,10 @@ def scan_importable_files() -> List[LocalImportFileItem]:
 
         market, symbol, freq, ext = parsed
         file_datetime = _format_file_mtime(path)
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
 
         items.append(LocalImportFileItem(
             market=market,
@@ -159,21 +353,11 @@ def scan_importable_files() -> List[LocalImportFileItem]:
             file_path=str(path.resolve()),
             file_name=path.name,
             file_datetime=file_datetime,
+            file_size=int(st.st_size) if st is not None else 0,
+            file_mtime_ns=int(st.st_mtime_ns) if st is not None else 0,
         ))
 
-    dedup: Dict[Tuple[str, str, str], LocalImportFileItem] = {}
-    for item in sorted(items, key=lambda x: (x.market, x.symbol, x.freq, x.file_path)):
-        dedup[(item.market, item.symbol, item.freq)] = item
-
-    out = list(dedup.values())
-    out.sort(key=lambda x: (x.market, x.symbol, x.freq))
-
-    _LOG.info(
-        "[LOCAL_IMPORT][SCAN] scanned importable files=%s root=%s",
-        len(out),
-        str(root),
-    )
-    return out
+    return _dedup_and_sort(items)
 
 
 def build_file_index(items: Optional[List[LocalImportFileItem]] = None) -> Dict[Tuple[str, str, str], str]:
@@ -191,12 +375,16 @@ def build_file_index(items: Optional[List[LocalImportFileItem]] = None) -> Dict[
     return index
 
 
-def build_scan_snapshot() -> Dict[str, Any]:
+def build_scan_snapshot(force: bool = False) -> Dict[str, Any]:
     """
     构建标准扫描快照。
+
+    Args:
+        force: True 时不复用目录列表、全部目录重新列目录（见 scan_importable_files）；
+               不影响结果的新鲜度，file_size / file_mtime_ns / file_datetime 无论是否命中缓存都取自逐文件 stat
     """
     root = get_effective_local_import_root_dir()
-    items = scan_importable_files()
+    items = scan_importable_files(force=force)
     file_index = build_file_index(items)
 
     return {
@@ -9,82 +9,155 @@
 #   - 删除失效候选扫描结果
 #
 # 设计原则：
-#   - 正式真相源 = 本地持久化快照文件
+#   - 正式真相源 = 本地持久化快照（现为 SQLite 表，见下方本轮改动）
 #   - 不保留历史版本
 #   - 新扫描结果直接覆盖旧结果
 #   - 不负责扫描，不负责执行，只负责持久化读写
+#
+# 本轮改动（候选视图缓存）：
+#   - 新增 get_scan_snapshot_version：快照版本号，
+#     供 runtime / 候选视图判断缓存是否失效，无需重新读取快照
+#
+# 本轮改动（候选扫描快照入库）：
+#   - 快照从缩进 JSON 文件迁入 SQLite（local_import_scan_meta / local_import_scan_files）
+#   - save_scan_snapshot 只写入新增 / 变化（path / size / mtime）的文件行，删除已消失的行，
+#     返回本次差异计数（added / changed / removed / unchanged）与新 version
+#   - 每个文件行带 changed_version（最近一次新增 / 变化时的 version），供“自某次扫描以来变化”的筛选
+#   - 版本号改为快照表 version（单调递增，清空时同样递增）
+#   - 旧 JSON 快照文件：首次访问时若库内尚无快照则导入一次，随后删除
 # ==============================
 
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-
+from typing import Dict, Any, List, Optional
+
+from backend.db.import_scan_snapshot import (
+    clear_import_scan_snapshot,
+    replace_import_scan_snapshot,
+    select_import_scan_files,
+    select_import_scan_meta,
+)
 from backend.settings import settings
-from backend.utils.fileio import atomic_write_json, read_json_safe
+from backend.utils.fileio import read_json_safe
 from backend.utils.time import now_iso
 from backend.utils.logger import get_logger
 
 _LOG = get_logger("local_import.snapshot_store")
 
+_LEGACY_CHECKED = False
 
-def _snapshot_file_path() -> Path:
+
+def _legacy_snapshot_file_path() -> Path:
     return Path(settings.data_dir).resolve() / "local_import_candidates_snapshot.json"
 
 
-def _item_to_json_dict(item: Any) -> Dict[str, Any]:
+def _item_to_row(item: Any) -> Dict[str, Any]:
+    # LocalImportFileItem 字段已由扫描器规范化（market 大写 / ext 小写），这里只做形态转换
     return {
-        "market": str(item.market or "").strip().upper(),
-        "symbol": str(item.symbol or "").strip(),
-        "freq": str(item.freq or "").strip(),
-        "ext": str(item.ext or "").strip().lower(),
-        "file_path": str(item.file_path or "").strip(),
-        "file_name": str(item.file_name or "").strip(),
+        "market": item.market,
+        "symbol": item.symbol,
+        "freq": item.freq,
+        "ext": item.ext,
+        "file_path": item.file_path,
+        "file_name": item.file_name,
         "file_datetime": item.file_datetime,
+        "size": item.file_size,
+        "mtime_ns": item.file_mtime_ns,
     }
 
 
-def _json_dict_to_item_tuple(d: Dict[str, Any]) -> Tuple[str, str, str, str, str, str, Optional[str]]:
-    return (
-        str(d.get("market") or "").strip().upper(),
-        str(d.get("symbol") or "").strip(),
-        str(d.get("freq") or "").strip(),
-        str(d.get("ext") or "").strip().lower(),
-        str(d.get("file_path") or "").strip(),
-        str(d.get("file_name") or "").strip(),
-        d.get("file_datetime"),
-    )
+def _dict_to_row(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    row = {
+        "market": str(d.get("market") or "").strip().upper(),
+        "symbol": str(d.get("symbol") or "").strip(),
+        "freq": str(d.get("freq") or "").strip(),
+        "ext": str(d.get("ext") or "").strip().lower(),
+        "file_path": str(d.get("file_path") or "").strip(),
+        "file_name": str(d.get("file_name") or "").strip(),
+        "file_datetime": d.get("file_datetime"),
+        "size": int(d.get("size") or 0),
+        "mtime_ns": int(d.get("mtime_ns") or 0),
+    }
+    if row["market"] not in ("SH", "SZ", "BJ"):
+        return None
+    if not row["symbol"] or not row["freq"] or not row["ext"]:
+        return None
+    return row
+
+
+def _migrate_legacy_json_snapshot() -> None:
+    """旧版 JSON 快照文件：库内尚无快照时导入一次（size / mtime 记 0，下次刷新即全部视为变化），随后删除。"""
+    global _LEGACY_CHECKED
+    if _LEGACY_CHECKED:
+        return
+    _LEGACY_CHECKED = True
+
+    path = _legacy_snapshot_file_path()
+    if not path.exists():
+        return
+
+    try:
+        if select_import_scan_meta() is None:
+            obj, err = read_json_safe(path, default=None)
+            if not err and isinstance(obj, dict):
+                raw_items = obj.get("items") if isinstance(obj.get("items"), list) else []
+                rows = [r for r in (_dict_to_row(x) for x in raw_items if isinstance(x, dict)) if r]
+                replace_import_scan_snapshot(
+                    generated_at=obj.get("generated_at") or now_iso(),
+                    root_dir=str(obj.get("root_dir") or "").strip(),
+                    items=rows,
+                )
+                _LOG.info("[LOCAL_IMPORT][SNAPSHOT_STORE] migrated legacy json snapshot items=%s", len(rows))
+        path.unlink()
+    except Exception as e:
+        _LOG.warning("[LOCAL_IMPORT][SNAPSHOT_STORE] legacy json snapshot migration failed file=%s error=%s", str(path), e)
+
+
+def _present_meta() -> Optional[Dict[str, Any]]:
+    _migrate_legacy_json_snapshot()
+    meta = select_import_scan_meta()
+    if not meta or not meta.get("present"):
+        return None
+    return meta
 
 
 def save_scan_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
     """
-    覆盖保存当前唯一候选扫描结果。
+    覆盖保存当前唯一候选扫描结果（只写入变化的文件行）。
 
     入参 snapshot 预期包含：
       - generated_at
       - items: List[LocalImportFileItem]
       - root_dir
     """
-    items = snapshot.get("items") or []
-    payload_items: List[Dict[str, Any]] = [_item_to_json_dict(x) for x in items]
+    _migrate_legacy_json_snapshot()
 
-    payload = {
-        "generated_at": snapshot.get("generated_at") or now_iso(),
-        "root_dir": str(snapshot.get("root_dir") or "").strip(),
-        "items": payload_items,
-        "saved_at": now_iso(),
-    }
+    items = snapshot.get("items") or []
+    rows: List[Dict[str, Any]] = [_item_to_row(x) for x in items]
+    generated_at = snapshot.get("generated_at") or now_iso()
+    root_dir = str(snapshot.get("root_dir") or "").strip()
 
-    path = _snapshot_file_path()
-    atomic_write_json(path, payload, indent=2, rotate_backup=False)
+    diff = replace_import_scan_snapshot(generated_at=generated_at, root_dir=root_dir, items=rows)
 
     _LOG.info(
-        "[LOCAL_IMPORT][SNAPSHOT_STORE] saved snapshot file=%s items=%s generated_at=%s",
-        str(path),
-        len(payload_items),
-        payload["generated_at"],
+        "[LOCAL_IMPORT][SNAPSHOT_STORE] saved snapshot items=%s version=%s added=%s changed=%s removed=%s unchanged=%s generated_at=%s",
+        len(rows),
+        diff["version"],
+        diff["added"],
+        diff["changed"],
+        diff["removed"],
+        diff["unchanged"],
+        generated_at,
     )
-    return payload
+    return {
+        "generated_at": generated_at,
+        "root_dir": root_dir,
+        "items": rows,
+        "saved_at": diff["saved_at"],
+        "version": diff["version"],
+        "diff": {k: diff[k] for k in ("added", "changed", "removed", "unchanged")},
+    }
 
 
 def load_scan_snapshot() -> Optional[Dict[str, Any]]:
@@ -93,39 +166,18 @@ def load_scan_snapshot() -> Optional[Dict[str, Any]]:
 
     返回：
       None -> 当前不存在
-      dict -> 已存在
+      dict -> 已存在（items 按 market / symbol / freq 排序，含 size / mtime_ns / changed_version）
     """
-    path = _snapshot_file_path()
-    obj, err = read_json_safe(path, default=None)
-    if err or not isinstance(obj, dict):
+    meta = _present_meta()
+    if meta is None:
         return None
 
-    raw_items = obj.get("items") if isinstance(obj.get("items"), list) else []
-    items: List[Dict[str, Any]] = []
-
-    for item in raw_items:
-        if not isinstance(item, dict):
-            continue
-        market, symbol, freq, ext, file_path, file_name, file_datetime = _json_dict_to_item_tuple(item)
-        if market not in ("SH", "SZ", "BJ"):
-            continue
-        if not symbol or not freq or not ext:
-            continue
-        items.append({
-            "market": market,
-            "symbol": symbol,
-            "freq": freq,
-            "ext": ext,
-            "file_path": file_path,
-            "file_name": file_name,
-            "file_datetime": file_datetime,
-        })
-
     return {
-        "generated_at": obj.get("generated_at"),
-        "root_dir": str(obj.get("root_dir") or "").strip(),
-        "items": items,
-        "saved_at": obj.get("saved_at"),
+        "generated_at": meta.get("generated_at"),
+        "root_dir": str(meta.get("root_dir") or "").strip(),
+        "items": select_import_scan_files(),
+        "saved_at": meta.get("saved_at"),
+        "version": int(meta["version"]),
     }
 
 
@@ -133,18 +185,28 @@ def delete_scan_snapshot() -> bool:
     """
     删除当前唯一候选扫描结果真相源。
     """
-    path = _snapshot_file_path()
-    if not path.exists():
-        return False
-
+    _migrate_legacy_json_snapshot()
     try:
-        path.unlink()
-        _LOG.info("[LOCAL_IMPORT][SNAPSHOT_STORE] deleted snapshot file=%s", str(path))
-        return True
+        deleted = clear_import_scan_snapshot()
+        if deleted:
+            _LOG.info("[LOCAL_IMPORT][SNAPSHOT_STORE] deleted snapshot")
+        return deleted
     except Exception as e:
-        _LOG.warning("[LOCAL_IMPORT][SNAPSHOT_STORE] delete failed file=%s error=%s", str(path), e)
+        _LOG.warning("[LOCAL_IMPORT][SNAPSHOT_STORE] delete failed error=%s", e)
         return False
 
 
 def has_scan_snapshot() -> bool:
-    return _snapshot_file_path().exists()
+    return _present_meta() is not None
+
+
+def get_scan_snapshot_version() -> Optional[int]:
+    """
+    当前候选扫描结果的版本号。
+
+    返回：
+      None -> 当前不存在
+      int  -> 已存在；每次保存 / 清空都会递增
+    """
+    meta = _present_meta()
+    return int(meta["version"]) if meta is not None else None
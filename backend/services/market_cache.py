@@ -16,6 +16,10 @@
 #       * 1m  未访问超过 1 分钟释放
 #       * 5m  未访问超过 5 分钟释放
 #       * 1d  未访问超过 5 分钟释放
+#
+# 本轮改动（序列摘要版本号）：
+#   - 缓存项记录写入时的 series_summary.version
+#   - get(version=...) 版本不一致即视为失效（盘后导入等外部写入后不再命中旧数据）
 # ==============================
 
 from __future__ import annotations
@@ -34,6 +38,7 @@ class CacheItem:
     base_freq: str
     df: pd.DataFrame
     last_access_at: datetime
+    version: int = 0
 
 
 class MarketCache:
@@ -68,17 +73,33 @@ class MarketCache:
         for k in to_delete:
             self._items.pop(k, None)
 
-    def get(self, market: str, code: str, base_freq: str) -> Optional[pd.DataFrame]:
+    def get(
+        self,
+        market: str,
+        code: str,
+        base_freq: str,
+        version: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
         with self._lock:
             self._purge_expired_locked()
             k = self._key(market, code, base_freq)
             item = self._items.get(k)
             if not item:
                 return None
+            if version is not None and int(version) != item.version:
+                self._items.pop(k, None)
+                return None
             item.last_access_at = datetime.now()
             return item.df.copy()
 
-    def put(self, market: str, code: str, base_freq: str, df: pd.DataFrame) -> None:
+    def put(
+        self,
+        market: str,
+        code: str,
+        base_freq: str,
+        df: pd.DataFrame,
+        version: int = 0,
+    ) -> None:
         with self._lock:
             self._purge_expired_locked()
             k = self._key(market, code, base_freq)
@@ -88,6 +109,7 @@ class MarketCache:
                 base_freq=str(base_freq).strip(),
                 df=df.copy(),
                 last_access_at=datetime.now(),
+                version=int(version or 0),
             )
 
     def release(self, market: str, code: str, request_freq: str) -> bool:
@@ -12,6 +12,13 @@
 #   - 不做数据拉取
 #   - 不做数据写入
 #   - BJ 无远程可补时：允许 has_gap=true 但流程可完成
+#
+# 本轮改动（序列摘要）：
+#   - 日线缺口判断按最新时间戳抽出 _assess_day_gap_by_last_ts
+#   - 批量陈旧标的巡检走 series_summary.select_stale_series（见 db.maintenance 收盘后维护）
+#
+# 本轮改动（因子失效标记）：
+#   - assess_factor_state 遇 adj_factors_stale 标记的标的，一律视为未就绪（需重算）
 # ==============================
 
 from __future__ import annotations
@@ -20,7 +27,7 @@ from typing import Dict, Any
 import pandas as pd
 
 from backend.db.calendar import is_trading_day, get_recent_trading_days
-from backend.db.factors import get_factors_latest_updated_at
+from backend.db.factors import get_factors_latest_updated_at, is_factors_stale
 from backend.utils.time import (
     today_ymd,
     now_dt,
@@ -83,7 +90,11 @@ def assess_day_gap(
     if "ts" not in day_df.columns:
         raise ValueError("day_df missing ts column")
 
-    local_last_ts = int(day_df["ts"].iloc[-1])
+    return _assess_day_gap_by_last_ts(m, int(day_df["ts"].iloc[-1]))
+
+
+def _assess_day_gap_by_last_ts(m: str, local_last_ts: int) -> Dict[str, Any]:
+    remote_supported = _is_remote_supported_for_market(m)
     local_last_date = to_yyyymmdd(local_last_ts)
     expected_latest_date = _expected_latest_day_date()
 
@@ -225,7 +236,9 @@ def assess_factor_state(
             "message": "",
         }
 
-    updated_at = get_factors_latest_updated_at(code)
+    # gbbq 事件差异已标记失效的标的：无论 updated_at 是否为今日都必须重算
+    stale = is_factors_stale(market, code)
+    updated_at = None if stale else get_factors_latest_updated_at(market, code)
     if updated_at:
         try:
             if int(to_yyyymmdd_from_iso(updated_at)) == int(today_ymd()):
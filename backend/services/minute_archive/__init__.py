@@ -5,12 +5,18 @@
 
 from __future__ import annotations
 
-from .merger import merge_and_write_minute_archive
+from .merger import (
+    merge_and_write_minute_archive,
+    merge_and_write_minute_archive_chunked,
+    read_minute_archive_key_range,
+)
 from .store import resolve_minute_archive_path
 from .reader import read_minute_archive_df
 
 __all__ = [
     "merge_and_write_minute_archive",
+    "merge_and_write_minute_archive_chunked",
+    "read_minute_archive_key_range",
     "resolve_minute_archive_path",
     "read_minute_archive_df",
 ]
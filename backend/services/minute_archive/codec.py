@@ -27,6 +27,11 @@
 # 编码原则：
 #   - 归档内部时间语义保持 TDX 原生 date_code + time_code
 #   - 不引入 ts 到归档层
+#
+# 本轮改动（归档巡检）：
+#   - 新增 ARCHIVE_RECORD_DTYPE：32 字节记录的 numpy 结构化 dtype，供整文件向量化校验 / 插补使用
+#   - 新增 archive_record_keys：date_code / time_code -> 可比较的 int64 复合键
+#     （date_code = (year-2004)*2048 + month*100 + day 随日期单调，故复合键与 (date, time) 同序）
 # ==============================
 
 from __future__ import annotations
@@ -35,10 +40,27 @@ import struct
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+import numpy as np
+
 from backend.utils.time import parse_yyyymmdd
 
 _RECORD_SIZE = 32
 
+ARCHIVE_RECORD_DTYPE = np.dtype([
+    ("date_code", "<u2"),
+    ("time_code", "<u2"),
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("amount", "<f4"),
+    ("volume", "<u4"),
+    ("reserved", "<u4"),
+])
+
+# time_code 合法范围 0..1440（含 24:00），取 1441 保证相邻日期的复合键不碰撞
+_KEY_MINUTES_PER_DAY = 24 * 60 + 1
+
 _FREQ_TO_SUFFIX = {
     "1m": ".lc1",
     "5m": ".lc5",
@@ -240,6 +262,10 @@ def decode_record_from_bytes(
     }
 
 
+def archive_record_keys(date_code: np.ndarray, time_code: np.ndarray) -> np.ndarray:
+    return date_code.astype(np.int64) * _KEY_MINUTES_PER_DAY + time_code.astype(np.int64)
+
+
 def encode_records_to_bytes(records: List[Dict[str, Any]]) -> bytes:
     if not records:
         return b""
@@ -40,17 +40,43 @@
 #   - final_total_rows 统一由本模块负责返回
 #   - 对分钟线来说，无论 created / appended / rewritten / noop，
 #     只要任务成功完成，都返回处理后的最终总条数
+#
+# 本轮改动（序列摘要）：
+#   - 每次归档文件写入（created / appended / rewritten）及 noop 后，
+#     以已知首尾记录 + 最终总条数刷新 series_summary，不额外读文件
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 新增 merge_and_write_minute_archive_chunked：输入为按时间升序、按整日切分的记录块迭代器，
+#     逐块判定 left / middle / right，右侧逐块追加，左侧经 ArchivePrependWriter 流式重建，
+#     内存中最多只有一块记录 + 暂留的最后一天（用于最后一天占位清洗）
+#   - 每块追加完成后回调 on_checkpoint(块起始偏移)：该偏移之前的源记录已全部落入归档，
+#     中断后从该偏移续做，结果与一次性合并一致（已落入归档的部分会被判为 middle 跳过）
+#   - 新增 read_minute_archive_key_range：只读首尾两条记录返回归档键范围，供续做前校验断点
+#   - 结果（归档字节、warning 规则、series_summary）与 merge_and_write_minute_archive 一致
+#
+# 本轮改动（归档巡检）：
+#   - 新增 fill_minute_archive_gaps：只把落在旧归档首尾之间、且归档内尚无该键的记录插入归档（内部缺口补齐），
+#     旧记录一条不改；整文件以结构化 dtype 向量化合并后原子重写。
+#     双端超出部分仍只由 merge_and_write_minute_archive 负责，本函数不处理
+#
+# 本轮改动（占位日回报）：
+#   - 两个合并入口的结果新增 placeholder_date / placeholder_rows：被清洗掉的末尾占位整日及其记录数，
+#     导入侧据此把清单回退到该日首条记录，下次续读重新读取该日（出现后续交易日时与整文件导入一致）
 # ==============================
 
 from __future__ import annotations
 
 import math
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Callable, Dict, Any, Iterable, List, Tuple, Optional
+
+import numpy as np
 
 from backend.utils.logger import get_logger
 from backend.utils.minute_bucket import next_minute_bucket_key
 from backend.services.minute_archive.codec import (
+    ARCHIVE_RECORD_DTYPE,
+    archive_record_keys,
     normalize_minute_record,
     decode_record_from_bytes,
     encode_records_to_bytes,
@@ -61,7 +87,9 @@ from backend.services.minute_archive.store import (
     atomic_write_archive_bytes,
     read_archive_bytes,
     protect_and_read_archive_boundaries,
+    ArchivePrependWriter,
 )
+from backend.services.minute_archive.summary import sync_minute_series_summary
 
 _LOG = get_logger("minute_archive.merger")
 
@@ -397,6 +425,8 @@ def merge_and_write_minute_archive(
           "warning_code": str | None,
           "warning_message": str | None,
           "placeholder_removed": bool,
+          "placeholder_date": int | None,      # 被清洗的末尾占位整日
+          "placeholder_rows": int,             # 被清洗的记录数（调用方据此回退导入清单）
         }
     """
     m = str(market or "").strip().upper()
@@ -413,7 +443,12 @@ def merge_and_write_minute_archive(
         raise ValueError("minute archive incoming records is empty")
 
     incoming_sorted = _normalize_and_sort_incoming(records)
+    incoming_count = len(incoming_sorted)
+    placeholder_date = int(incoming_sorted[-1]["date"]) if incoming_sorted else None
     incoming_sorted, placeholder_removed = _remove_last_day_placeholder(incoming_sorted)
+    placeholder_rows = incoming_count - len(incoming_sorted)
+    if not placeholder_removed:
+        placeholder_date = None
 
     archive_path = resolve_minute_archive_path(
         market=m,
@@ -434,6 +469,8 @@ def merge_and_write_minute_archive(
             "warning_code": None,
             "warning_message": None,
             "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
         }
 
     for r in incoming_sorted:
@@ -457,6 +494,14 @@ def merge_and_write_minute_archive(
         payload = encode_records_to_bytes(incoming_sorted)
         atomic_write_archive_bytes(archive_path, payload)
         final_total_rows = _rows_from_bytes(payload)
+        sync_minute_series_summary(
+            market=m,
+            symbol=s,
+            freq=f,
+            first_rec=incoming_sorted[0],
+            last_rec=incoming_sorted[-1],
+            rows=final_total_rows,
+        )
         return {
             "archive_path": str(Path(archive_path).resolve()),
             "existing_rows": 0,
@@ -468,6 +513,8 @@ def merge_and_write_minute_archive(
             "warning_code": None,
             "warning_message": None,
             "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
         }
 
     first_raw = boundary.get("first_raw")
@@ -477,6 +524,14 @@ def merge_and_write_minute_archive(
         payload = encode_records_to_bytes(incoming_sorted)
         atomic_write_archive_bytes(archive_path, payload)
         final_total_rows = _rows_from_bytes(payload)
+        sync_minute_series_summary(
+            market=m,
+            symbol=s,
+            freq=f,
+            first_rec=incoming_sorted[0],
+            last_rec=incoming_sorted[-1],
+            rows=final_total_rows,
+        )
         return {
             "archive_path": str(Path(archive_path).resolve()),
             "existing_rows": 0,
@@ -488,6 +543,8 @@ def merge_and_write_minute_archive(
             "warning_code": None,
             "warning_message": None,
             "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
         }
 
     old_first = _decode_archive_record(
@@ -538,6 +595,14 @@ def merge_and_write_minute_archive(
             old_last["time"],
             len(incoming_sorted),
         )
+        sync_minute_series_summary(
+            market=m,
+            symbol=s,
+            freq=f,
+            first_rec=old_first,
+            last_rec=old_last,
+            rows=existing_rows,
+        )
         return {
             "archive_path": str(Path(archive_path).resolve()),
             "existing_rows": existing_rows,
@@ -549,6 +614,8 @@ def merge_and_write_minute_archive(
             "warning_code": warning_code,
             "warning_message": warning_message,
             "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
         }
 
     if not left_part and right_part:
@@ -559,6 +626,14 @@ def merge_and_write_minute_archive(
             tail_validator=tail_validator,
         )
         final_total_rows = existing_rows + len(right_part)
+        sync_minute_series_summary(
+            market=m,
+            symbol=s,
+            freq=f,
+            first_rec=old_first,
+            last_rec=right_part[-1],
+            rows=final_total_rows,
+        )
 
         _LOG.info(
             "[MINUTE_ARCHIVE] appended archive market=%s symbol=%s freq=%s right_rows=%s warning_code=%s",
@@ -580,6 +655,8 @@ def merge_and_write_minute_archive(
             "warning_code": warning_code,
             "warning_message": warning_message,
             "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
         }
 
     rebuilt = bytearray()
@@ -595,6 +672,14 @@ def merge_and_write_minute_archive(
     payload = bytes(rebuilt)
     atomic_write_archive_bytes(archive_path, payload)
     final_total_rows = _rows_from_bytes(payload)
+    sync_minute_series_summary(
+        market=m,
+        symbol=s,
+        freq=f,
+        first_rec=left_part[0] if left_part else old_first,
+        last_rec=right_part[-1] if right_part else old_last,
+        rows=final_total_rows,
+    )
 
     _LOG.info(
         "[MINUTE_ARCHIVE] rewritten archive market=%s symbol=%s freq=%s left_rows=%s right_rows=%s warning_code=%s",
@@ -617,4 +702,429 @@ def merge_and_write_minute_archive(
         "warning_code": warning_code,
         "warning_message": warning_message,
         "placeholder_removed": bool(placeholder_removed),
+        "placeholder_date": placeholder_date,
+        "placeholder_rows": placeholder_rows,
+    }
+
+
+def read_minute_archive_key_range(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+) -> Optional[Tuple[Tuple[int, str], Tuple[int, str]]]:
+    """归档首尾记录键 ((date, time), (date, time))；归档不存在或为空时返回 None。"""
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+
+    boundary = protect_and_read_archive_boundaries(
+        resolve_minute_archive_path(market=m, symbol=s, freq=f),
+        tail_validator=_tail_validator_factory(market=m, symbol=s, freq=f),
+    )
+    first_raw = boundary.get("first_raw")
+    last_raw = boundary.get("last_raw")
+    if not first_raw or not last_raw:
+        return None
+
+    first = _decode_archive_record(raw=first_raw, market=m, symbol=s, freq=f, label="first")
+    last = _decode_archive_record(raw=last_raw, market=m, symbol=s, freq=f, label="last")
+    return _record_key(first), _record_key(last)
+
+
+def _is_placeholder_day(records: List[Dict[str, Any]]) -> bool:
+    """同 _remove_last_day_placeholder：该日全部记录 volume=0 且 amount=0。"""
+    if not records:
+        return False
+    for r in records:
+        try:
+            if not (float(r["volume"]) == 0.0 and float(r["amount"]) == 0.0):
+                return False
+        except Exception:
+            return False
+    return True
+
+
+def merge_and_write_minute_archive_chunked(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    chunks: Iterable[Tuple[int, List[Dict[str, Any]]]],
+    on_checkpoint: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    分块拼接归档入口（同步版）。
+
+    Args:
+        chunks: (块起始偏移, 标准化记录) 迭代器；调用方保证：
+            - 块内记录按 (date, time) 升序且已去重
+            - 块之间严格递增，且同一交易日的记录不跨块
+        on_checkpoint: 每块追加完成后回调块起始偏移（左补重建尚未提交期间不回调）
+
+    Returns:
+        同 merge_and_write_minute_archive，另含 "chunks": 处理的块数
+    """
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+
+    if f not in ("1m", "5m"):
+        raise ValueError(f"minute archive only supports 1m/5m, got: {freq}")
+    if m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"invalid market for minute archive: {market}")
+    if not s or not s.isdigit():
+        raise ValueError(f"invalid symbol for minute archive: {symbol}")
+
+    archive_path = resolve_minute_archive_path(
+        market=m,
+        symbol=s,
+        freq=f,
+    )
+    tail_validator = _tail_validator_factory(
+        market=m,
+        symbol=s,
+        freq=f,
+    )
+    boundary = protect_and_read_archive_boundaries(
+        archive_path,
+        tail_validator=tail_validator,
+    )
+
+    old_first: Optional[Dict[str, Any]] = None
+    old_last: Optional[Dict[str, Any]] = None
+    if boundary.get("first_raw") and boundary.get("last_raw"):
+        old_first = _decode_archive_record(raw=boundary["first_raw"], market=m, symbol=s, freq=f, label="first")
+        old_last = _decode_archive_record(raw=boundary["last_raw"], market=m, symbol=s, freq=f, label="last")
+    existed = old_first is not None
+    old_size = int(boundary.get("valid_size") or 0) if existed else 0
+    existing_rows = old_size // _RECORD_SIZE
+
+    st: Dict[str, Any] = {
+        "created": False,
+        "first": None,          # 新建归档的首条
+        "last": None,           # 新建归档的尾条
+        "left_first": None,
+        "left_last": None,
+        "left_rows": 0,
+        "right_first": None,
+        "right_last": None,
+        "right_rows": 0,
+        "written_bytes": 0,
+    }
+    prepend: List[Optional[ArchivePrependWriter]] = [None]
+
+    def _commit_prepend() -> None:
+        writer = prepend[0]
+        if writer is None:
+            return
+        prepend[0] = None
+        st["written_bytes"] += writer.commit(old_size)
+
+    def _write(records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+
+        if not existed:
+            payload = encode_records_to_bytes(records)
+            if not st["created"]:
+                atomic_write_archive_bytes(archive_path, payload)
+                st["created"] = True
+                st["first"] = records[0]
+            else:
+                append_archive_bytes(archive_path, payload, tail_validator=tail_validator)
+            st["last"] = records[-1]
+            st["right_rows"] += len(records)
+            st["written_bytes"] += len(payload)
+            return
+
+        old_first_key = _record_key(old_first)
+        old_last_key = _record_key(old_last)
+
+        n_left = 0
+        while n_left < len(records) and _record_key(records[n_left]) < old_first_key:
+            n_left += 1
+        if n_left:
+            if prepend[0] is None:
+                prepend[0] = ArchivePrependWriter(archive_path)
+            prepend[0].write(encode_records_to_bytes(records[:n_left]))
+            if st["left_first"] is None:
+                st["left_first"] = records[0]
+            st["left_last"] = records[n_left - 1]
+            st["left_rows"] += n_left
+
+        # 出现非 left 记录即左侧结束（输入升序），先提交左补重建，后续右侧追加到重建后的文件
+        if n_left < len(records):
+            _commit_prepend()
+
+        right = [r for r in records[n_left:] if _record_key(r) > old_last_key]
+        if right:
+            written = append_archive_bytes(
+                archive_path,
+                encode_records_to_bytes(right),
+                tail_validator=tail_validator,
+            )
+            if st["right_first"] is None:
+                st["right_first"] = right[0]
+            st["right_last"] = right[-1]
+            st["right_rows"] += len(right)
+            st["written_bytes"] += written
+
+    carry: List[Dict[str, Any]] = []
+    prev_key: Optional[Tuple[int, str]] = None
+    incoming_rows = 0
+    chunk_count = 0
+    placeholder_removed = False
+    placeholder_date: Optional[int] = None
+    placeholder_rows = 0
+
+    try:
+        for start_offset, records in chunks:
+            chunk_count += 1
+            if records:
+                for r in records:
+                    if r["market"] != m or r["symbol"] != s or r["freq"] != f:
+                        raise ValueError(
+                            f"incoming minute record key mismatch: expected ({m},{s},{f}) "
+                            f"got ({r['market']},{r['symbol']},{r['freq']})"
+                        )
+                if prev_key is not None and _record_key(records[0]) <= prev_key:
+                    raise ValueError(
+                        f"chunked minute records not ascending across chunks: market={m} symbol={s} freq={f} "
+                        f"offset={start_offset}"
+                    )
+                prev_key = _record_key(records[-1])
+
+                # 最后一天暂留到下一块：整个输入的最后一天需做占位清洗
+                last_date = int(records[-1]["date"])
+                cut = len(records)
+                while cut > 0 and int(records[cut - 1]["date"]) == last_date:
+                    cut -= 1
+
+                ready = carry + records[:cut]
+                carry = records[cut:]
+                incoming_rows += len(ready)
+                _write(ready)
+
+            if on_checkpoint is not None and prepend[0] is None:
+                on_checkpoint(int(start_offset))
+
+        if _is_placeholder_day(carry):
+            placeholder_removed = True
+            placeholder_date = int(carry[0]["date"])
+            placeholder_rows = len(carry)
+        else:
+            incoming_rows += len(carry)
+            _write(carry)
+        carry = []
+        _commit_prepend()
+    except BaseException:
+        if prepend[0] is not None:
+            prepend[0].abort()
+        raise
+
+    left_rows = int(st["left_rows"])
+    right_rows = int(st["right_rows"])
+    result_path = str(Path(archive_path).resolve())
+
+    if not existed:
+        if not st["created"]:
+            return {
+                "archive_path": result_path,
+                "existing_rows": 0,
+                "incoming_rows": 0,
+                "appended_rows": 0,
+                "final_total_rows": 0,
+                "written_bytes": 0,
+                "status": "noop",
+                "warning_code": None,
+                "warning_message": None,
+                "placeholder_removed": bool(placeholder_removed),
+                "placeholder_date": placeholder_date,
+                "placeholder_rows": placeholder_rows,
+                "chunks": chunk_count,
+            }
+
+        sync_minute_series_summary(
+            market=m,
+            symbol=s,
+            freq=f,
+            first_rec=st["first"],
+            last_rec=st["last"],
+            rows=right_rows,
+        )
+        _LOG.info(
+            "[MINUTE_ARCHIVE] created archive (chunked) market=%s symbol=%s freq=%s rows=%s chunks=%s",
+            m,
+            s,
+            f,
+            right_rows,
+            chunk_count,
+        )
+        return {
+            "archive_path": result_path,
+            "existing_rows": 0,
+            "incoming_rows": incoming_rows,
+            "appended_rows": right_rows,
+            "final_total_rows": right_rows,
+            "written_bytes": int(st["written_bytes"]),
+            "status": "created",
+            "warning_code": None,
+            "warning_message": None,
+            "placeholder_removed": bool(placeholder_removed),
+            "placeholder_date": placeholder_date,
+            "placeholder_rows": placeholder_rows,
+            "chunks": chunk_count,
+        }
+
+    warning_code, warning_message = (None, None)
+    if incoming_rows > 0:
+        warning_code, warning_message = _pick_warning(
+            market=m,
+            symbol=s,
+            freq=f,
+            old_first=old_first,
+            old_last=old_last,
+            left_part=[st["left_last"]] if left_rows else [],
+            right_part=[st["right_first"]] if right_rows else [],
+            tail_trimmed=bool(boundary.get("tail_trimmed")),
+            tail_trim_reason=boundary.get("tail_trim_reason"),
+        )
+
+    if left_rows:
+        status = "rewritten"
+    elif right_rows:
+        status = "appended"
+    else:
+        status = "noop"
+
+    final_total_rows = existing_rows + left_rows + right_rows
+    sync_minute_series_summary(
+        market=m,
+        symbol=s,
+        freq=f,
+        first_rec=st["left_first"] or old_first,
+        last_rec=st["right_last"] or old_last,
+        rows=final_total_rows,
+    )
+
+    _LOG.info(
+        "[MINUTE_ARCHIVE] %s archive (chunked) market=%s symbol=%s freq=%s left_rows=%s right_rows=%s chunks=%s warning_code=%s",
+        status,
+        m,
+        s,
+        f,
+        left_rows,
+        right_rows,
+        chunk_count,
+        warning_code,
+    )
+
+    return {
+        "archive_path": result_path,
+        "existing_rows": existing_rows,
+        "incoming_rows": incoming_rows,
+        "appended_rows": left_rows + right_rows,
+        "final_total_rows": final_total_rows,
+        "written_bytes": int(st["written_bytes"]),
+        "status": status,
+        "warning_code": warning_code,
+        "warning_message": warning_message,
+        "placeholder_removed": bool(placeholder_removed),
+        "placeholder_date": placeholder_date,
+        "placeholder_rows": placeholder_rows,
+        "chunks": chunk_count,
+    }
+
+
+def fill_minute_archive_gaps(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    records: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    内部缺口补齐（同步版）：插入 old_first < key < old_last 且归档中不存在的合法记录。
+
+    Returns:
+        {
+          "archive_path": str,
+          "existing_rows": int,
+          "incoming_rows": int,
+          "inserted_rows": int,
+          "final_total_rows": int,
+          "status": "filled" | "noop",
+        }
+    """
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+
+    if f not in ("1m", "5m"):
+        raise ValueError(f"minute archive only supports 1m/5m, got: {freq}")
+    if m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"invalid market for minute archive: {market}")
+    if not s or not s.isdigit():
+        raise ValueError(f"invalid symbol for minute archive: {symbol}")
+
+    incoming = [r for r in _normalize_and_sort_incoming(records) if _is_valid_decoded_record(r)]
+    archive_path = resolve_minute_archive_path(market=m, symbol=s, freq=f)
+
+    protect_and_read_archive_boundaries(
+        archive_path,
+        tail_validator=_tail_validator_factory(market=m, symbol=s, freq=f),
+    )
+    old_raw = read_archive_bytes(archive_path)
+    old = np.frombuffer(old_raw, dtype=ARCHIVE_RECORD_DTYPE, count=len(old_raw) // _RECORD_SIZE)
+
+    result = {
+        "archive_path": str(Path(archive_path).resolve()),
+        "existing_rows": len(old),
+        "incoming_rows": len(incoming),
+        "inserted_rows": 0,
+        "final_total_rows": len(old),
+        "status": "noop",
     }
+    if len(old) < 2 or not incoming:
+        return result
+
+    old_keys = archive_record_keys(old["date_code"], old["time_code"])
+    if np.any(np.diff(old_keys) <= 0):
+        raise ValueError(f"minute archive keys not ascending, refuse to fill gaps: {archive_path}")
+
+    new = np.frombuffer(encode_records_to_bytes(incoming), dtype=ARCHIVE_RECORD_DTYPE)
+    new_keys = archive_record_keys(new["date_code"], new["time_code"])
+    keep = (new_keys > old_keys[0]) & (new_keys < old_keys[-1]) & ~np.isin(new_keys, old_keys)
+    if not keep.any():
+        return result
+
+    merged = np.concatenate([old, new[keep]])
+    merged = merged[np.argsort(np.concatenate([old_keys, new_keys[keep]]), kind="stable")]
+    payload = merged.tobytes()
+    atomic_write_archive_bytes(archive_path, payload)
+
+    sync_minute_series_summary(
+        market=m,
+        symbol=s,
+        freq=f,
+        first_rec=_decode_archive_record(raw=payload[:_RECORD_SIZE], market=m, symbol=s, freq=f, label="first"),
+        last_rec=_decode_archive_record(raw=payload[-_RECORD_SIZE:], market=m, symbol=s, freq=f, label="last"),
+        rows=len(merged),
+    )
+
+    _LOG.info(
+        "[MINUTE_ARCHIVE] filled interior gaps market=%s symbol=%s freq=%s inserted=%s total=%s",
+        m,
+        s,
+        f,
+        int(keep.sum()),
+        len(merged),
+    )
+
+    result.update({
+        "inserted_rows": int(keep.sum()),
+        "final_total_rows": len(merged),
+        "status": "filled",
+    })
+    return result
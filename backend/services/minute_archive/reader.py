@@ -11,15 +11,20 @@
 #   - 不判断缺口
 #   - 不重采样
 #   - 不复权
+#
+# 本轮改动（向量化解码）：
+#   - 整个归档文件经 tdx_minute.decode_tdx_minute_bytes 一次性解码，不再逐条 struct + dict
+#   - 尾部不足 32 字节的残片仍按原口径忽略
 # ==============================
 
 from __future__ import annotations
 
-from typing import List, Dict, Any
 import pandas as pd
 
+from backend.datasource.local_files.tdx_minute import decode_tdx_minute_bytes, minute_arrays_to_df
 from backend.services.minute_archive.store import resolve_minute_archive_path, read_archive_bytes
-from backend.services.minute_archive.codec import decode_record_from_bytes
+
+_RECORD_SIZE = 32
 
 
 def read_minute_archive_df(
@@ -41,38 +46,6 @@ def read_minute_archive_df(
         freq=f,
     )
     raw = read_archive_bytes(path)
-    if not raw:
-        return pd.DataFrame(columns=["date", "time", "open", "high", "low", "close", "amount", "volume"])
-
-    rows: List[Dict[str, Any]] = []
-    rec_size = 32
-    total = len(raw) // rec_size
-
-    for i in range(total):
-        start = i * rec_size
-        rec_raw = raw[start:start + rec_size]
-        if len(rec_raw) != rec_size:
-            continue
-        item = decode_record_from_bytes(
-            rec_raw,
-            market=m,
-            symbol=s,
-            freq=f,
-        )
-        rows.append({
-            "date": int(item["date"]),
-            "time": str(item["time"]),
-            "open": float(item["open"]),
-            "high": float(item["high"]),
-            "low": float(item["low"]),
-            "close": float(item["close"]),
-            "amount": float(item["amount"]),
-            "volume": float(item["volume"]),
-        })
-
-    if not rows:
-        return pd.DataFrame(columns=["date", "time", "open", "high", "low", "close", "amount", "volume"])
-
-    df = pd.DataFrame(rows)
-    df = df.drop_duplicates(subset=["date", "time"], keep="last").sort_values(["date", "time"]).reset_index(drop=True)
-    return df
+    usable = (len(raw or b"") // _RECORD_SIZE) * _RECORD_SIZE
+    arrays = decode_tdx_minute_bytes(raw[:usable], source=str(path))
+    return minute_arrays_to_df(arrays)
@@ -0,0 +1,567 @@
+# backend/services/minute_archive/scrub.py
+# ==============================
+# 分钟线累积归档 - 全量巡检（scrub）与内部缺口远程补齐
+#
+# 背景：
+#   - 归档写入路径只保护尾部（sanitize_archive_tail），中间记录损坏、乱序、内部缺口
+#     要等用户看到异常图形才会发现
+#
+# 职责：
+#   - scrub_minute_archives：遍历归档目录，按文件分发到进程池；每个文件 mmap 后整文件向量化校验：
+#       * 记录合法性：与 merger._is_valid_decoded_record 同口径（日期 / 时间编码可解、价量有限、
+#         low <= open/close <= high），外加尾部不足 32 字节的残片
+#       * 键单调：相邻合法记录 (date, time) 必须严格递增
+#       * 分钟桶：时间必须落在交易时段合法桶上（1m 09:31..11:30 / 13:01..15:00，5m 同理）
+#       * 内部缺口：交易日历 × 日内合法桶构成连续槽位序列（与 next_minute_bucket_key 推进语义一致），
+#         相邻记录槽位差 > 1 即缺口；跨日缺口同时给出整日缺失数（停牌 / 漏导通常表现为整日缺失）
+#     结果整轮写入 minute_archive_scrub_report
+#   - repair_minute_archive_gaps：对单个序列按缺口定向远程补齐（仅 SH / SZ，与 bars_recipes 远程补缺同一数据源），
+#     只插入落在缺口区间内的记录（fill_minute_archive_gaps），补齐后重扫该文件并覆盖报告行
+#
+# 约定：
+#   - 日期不在交易日历内的记录计入 calendar_unknown，不参与缺口判定（日历未覆盖时不误报）
+#   - 首条之前 / 末条之后不算内部缺口
+#   - 巡检只读，不修改归档；修复只在显式调用 repair 时发生
+#
+# 运行方式（示例）：
+#   python -m backend.services.minute_archive.scrub
+#   python -m backend.services.minute_archive.scrub --market SH --freq 1m --workers 4 --repair
+# ==============================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import mmap
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.db.archive_scrub_report import replace_archive_scrub_report, upsert_archive_scrub_report
+from backend.db.calendar import select_trading_days_in_range
+from backend.services.minute_archive.codec import ARCHIVE_RECORD_DTYPE
+from backend.services.minute_archive.merger import fill_minute_archive_gaps
+from backend.services.minute_archive.store import resolve_minute_archive_path
+from backend.settings import settings
+from backend.utils.logger import get_logger
+from backend.utils.time import now_iso
+
+_LOG = get_logger("minute_archive.scrub")
+
+_RECORD_SIZE = 32
+
+_SUBDIR_FREQ = {"lc1": "1m", "lc5": "5m"}
+_FREQ_SUBDIR = {v: k for k, v in _SUBDIR_FREQ.items()}
+
+# 远程 K 线 category（与 bars_recipes 一致）
+_REMOTE_CATEGORY = {"1m": 8, "5m": 0}
+_REMOTE_PAGE_SIZE = 800
+
+
+def _session_times(freq: str) -> np.ndarray:
+    step = 1 if freq == "1m" else 5
+    am = np.arange(9 * 60 + 30 + step, 11 * 60 + 31, step)
+    pm = np.arange(13 * 60 + step, 15 * 60 + 1, step)
+    return np.concatenate([am, pm]).astype(np.int64)
+
+
+_SESSION_TIMES = {f: _session_times(f) for f in ("1m", "5m")}
+
+
+def _slot_lut(times: np.ndarray) -> np.ndarray:
+    lut = np.full(24 * 60 + 1, -1, dtype=np.int64)
+    lut[times] = np.arange(len(times))
+    return lut
+
+
+_SLOT_LUT = {f: _slot_lut(t) for f, t in _SESSION_TIMES.items()}
+
+# 进程内交易日历（升序 YYYYMMDD），由 _init_scrub_worker 注入
+_TRADING_DAYS: np.ndarray = np.empty(0, dtype=np.int64)
+
+
+def _init_scrub_worker(trading_days: np.ndarray) -> None:
+    global _TRADING_DAYS
+    _TRADING_DAYS = np.asarray(trading_days, dtype=np.int64)
+
+
+def _load_trading_days() -> np.ndarray:
+    return np.asarray(select_trading_days_in_range(19900101, 21001231, market="CN"), dtype=np.int64)
+
+
+def _time_text(minutes: int) -> str:
+    return f"{int(minutes) // 60:02d}:{int(minutes) % 60:02d}"
+
+
+# ==========================================================
+# 单文件巡检（进程池 worker 内执行）
+# ==========================================================
+def _read_columns(path: Path, n: int) -> Dict[str, np.ndarray]:
+    with path.open("rb") as fh, mmap.mmap(fh.fileno(), n * _RECORD_SIZE, access=mmap.ACCESS_READ) as mm:
+        rec = np.frombuffer(mm, dtype=ARCHIVE_RECORD_DTYPE, count=n)
+        # 拷贝出所需列后释放视图，mmap 才能关闭
+        cols = {
+            "date_code": rec["date_code"].astype(np.int64),
+            "time_code": rec["time_code"].astype(np.int64),
+            "open": rec["open"].astype(np.float64),
+            "high": rec["high"].astype(np.float64),
+            "low": rec["low"].astype(np.float64),
+            "close": rec["close"].astype(np.float64),
+            "amount": rec["amount"].astype(np.float64),
+        }
+        del rec
+    return cols
+
+
+def _find_gaps(
+    dates: np.ndarray,
+    slots: np.ndarray,
+    freq: str,
+    gap_sample: int,
+) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """dates / slots 为按文件顺序排列、日期在日历内且时间在合法桶上的记录。"""
+    times = _SESSION_TIMES[freq]
+    per_day = len(times)
+    day_idx = np.searchsorted(_TRADING_DAYS, dates)
+    pos = day_idx * per_day + slots
+
+    step = np.diff(pos)
+    at = np.flatnonzero(step > 1)
+    missing = step[at] - 1
+    whole_days = np.maximum(day_idx[at + 1] - day_idx[at] - 1, 0)
+
+    stats = {
+        "gap_count": int(len(at)),
+        "gap_bars": int(missing.sum()),
+        "gap_days": int(whole_days.sum()),
+    }
+
+    limit = len(at) if gap_sample < 0 else min(int(gap_sample), len(at))
+    gaps: List[Dict[str, Any]] = []
+    for i in range(limit):
+        lo = int(pos[at[i]]) + 1
+        hi = int(pos[at[i] + 1]) - 1
+        gaps.append({
+            "from_date": int(_TRADING_DAYS[lo // per_day]),
+            "from_time": _time_text(times[lo % per_day]),
+            "to_date": int(_TRADING_DAYS[hi // per_day]),
+            "to_time": _time_text(times[hi % per_day]),
+            "bars": int(missing[i]),
+            "days": int(whole_days[i]),
+            "kind": "intraday" if day_idx[at[i]] == day_idx[at[i] + 1] else "cross_day",
+        })
+    return stats, gaps
+
+
+def scrub_archive_file(
+    path: Path | str,
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    gap_sample: int = 20,
+) -> Dict[str, Any]:
+    """单个归档文件巡检（只读），返回报告行（不含 run_id / scanned_at）。gap_sample < 0 时返回全部缺口。"""
+    started = time.perf_counter()
+    p = Path(path)
+    size = int(p.stat().st_size)
+    n = size // _RECORD_SIZE
+
+    row: Dict[str, Any] = {
+        "market": market,
+        "symbol": symbol,
+        "freq": freq,
+        "path": str(p),
+        "size": size,
+        "records": n,
+        "tail_fragment_bytes": size - n * _RECORD_SIZE,
+        "invalid_records": 0,
+        "first_invalid_offset": None,
+        "non_monotonic": 0,
+        "off_bucket": 0,
+        "calendar_unknown": 0,
+        "gap_count": 0,
+        "gap_bars": 0,
+        "gap_days": 0,
+        "first_date": None,
+        "first_time": None,
+        "last_date": None,
+        "last_time": None,
+        "gaps_json": [],
+        "status": "ok",
+        "error": None,
+    }
+
+    if n > 0:
+        c = _read_columns(p, n)
+
+        # 记录合法性（与 codec.decode_date_code / decode_time_code + merger._is_valid_decoded_record 同口径）
+        dc = c["date_code"]
+        month = dc % 2048 // 100
+        day = dc % 2048 % 100
+        dates = (dc // 2048 + 2004) * 10000 + month * 100 + day
+        tc = c["time_code"]
+        o, h, l, cl = c["open"], c["high"], c["low"], c["close"]
+        valid = (
+            (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+            & (tc <= 24 * 60)
+            & np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(cl) & np.isfinite(c["amount"])
+            & (l <= h) & (l <= o) & (o <= h) & (l <= cl) & (cl <= h)
+        )
+        invalid_at = np.flatnonzero(~valid)
+        row["invalid_records"] = int(len(invalid_at))
+        if len(invalid_at):
+            row["first_invalid_offset"] = int(invalid_at[0]) * _RECORD_SIZE
+
+        v_dates = dates[valid]
+        v_times = tc[valid]
+        if len(v_dates):
+            row["first_date"], row["first_time"] = int(v_dates[0]), _time_text(v_times[0])
+            row["last_date"], row["last_time"] = int(v_dates[-1]), _time_text(v_times[-1])
+
+        keys = v_dates * (24 * 60 + 1) + v_times
+        row["non_monotonic"] = int(np.count_nonzero(np.diff(keys) <= 0))
+
+        slots = _SLOT_LUT[freq][np.minimum(v_times, 24 * 60)]
+        on_bucket = slots >= 0
+        row["off_bucket"] = int(np.count_nonzero(~on_bucket))
+
+        day_idx = np.searchsorted(_TRADING_DAYS, v_dates)
+        known = day_idx < len(_TRADING_DAYS)
+        known[known] = _TRADING_DAYS[day_idx[known]] == v_dates[known]
+        row["calendar_unknown"] = int(np.count_nonzero(on_bucket & ~known))
+
+        usable = on_bucket & known
+        stats, gaps = _find_gaps(v_dates[usable], slots[usable], freq, gap_sample)
+        row.update(stats)
+        row["gaps_json"] = gaps
+
+    if (
+        row["tail_fragment_bytes"] or row["invalid_records"] or row["non_monotonic"]
+        or row["off_bucket"] or row["gap_count"]
+    ):
+        row["status"] = "issues"
+    row["elapsed_ms"] = int((time.perf_counter() - started) * 1000)
+    return row
+
+
+def _scrub_job(job: Tuple[str, str, str, str, int]) -> Dict[str, Any]:
+    path, market, symbol, freq, gap_sample = job
+    try:
+        return scrub_archive_file(path, market=market, symbol=symbol, freq=freq, gap_sample=gap_sample)
+    except Exception as e:
+        return {
+            "market": market,
+            "symbol": symbol,
+            "freq": freq,
+            "path": path,
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}"[:500],
+            "elapsed_ms": 0,
+        }
+
+
+# ==========================================================
+# 全量巡检
+# ==========================================================
+def _list_archive_files(markets: List[str], freqs: List[str]) -> List[Tuple[str, str, str, str]]:
+    root = Path(settings.tdx_minute_archive_dir).resolve()
+    out: List[Tuple[str, str, str, str]] = []
+    for m in markets:
+        m_lower = m.lower()
+        for f in freqs:
+            subdir = _FREQ_SUBDIR[f]
+            d = root / m_lower / subdir
+            if not d.is_dir():
+                continue
+            for entry in os.scandir(d):
+                name = entry.name
+                if not entry.is_file() or not name.startswith(m_lower) or not name.endswith(f".{subdir}"):
+                    continue
+                symbol = name[len(m_lower):-len(subdir) - 1]
+                if symbol.isdigit():
+                    out.append((entry.path, m, symbol, f))
+    out.sort(key=lambda x: (x[1], x[2], x[3]))
+    return out
+
+
+def scrub_minute_archives(
+    *,
+    market: Optional[str] = None,
+    freq: Optional[str] = None,
+    workers: Optional[int] = None,
+    write_report: bool = True,
+) -> Dict[str, Any]:
+    """
+    巡检全部（或指定市场 / 频率的）分钟归档，结果整轮写入 minute_archive_scrub_report。
+
+    Returns:
+        {
+          "run_id", "files", "ok", "issues", "errors",
+          "records", "invalid_records", "non_monotonic", "off_bucket", "gap_bars",
+          "workers", "elapsed_ms", "rows": [报告行...]
+        }
+    """
+    started = time.perf_counter()
+    markets = [str(market).strip().upper()] if market else ["SH", "SZ", "BJ"]
+    freqs = [str(freq).strip()] if freq else ["1m", "5m"]
+    for f in freqs:
+        if f not in _FREQ_SUBDIR:
+            raise ValueError(f"minute archive scrub only supports 1m/5m, got: {f}")
+
+    files = _list_archive_files(markets, freqs)
+    trading_days = _load_trading_days()
+    gap_sample = int(settings.minute_archive_scrub_gap_sample)
+    jobs = [(path, m, s, f, gap_sample) for path, m, s, f in files]
+
+    n_workers = max(1, int(workers or settings.minute_archive_scrub_workers))
+    n_workers = min(n_workers, max(1, len(jobs)))
+    if n_workers > 1:
+        # spawn：与盘后导入进程池一致，不复制主进程的写线程 / 事件循环状态
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_scrub_worker,
+            initargs=(trading_days,),
+        ) as pool:
+            rows = list(pool.map(_scrub_job, jobs, chunksize=max(1, len(jobs) // (n_workers * 8))))
+    else:
+        _init_scrub_worker(trading_days)
+        rows = [_scrub_job(j) for j in jobs]
+
+    run_id = f"scrub-{int(time.time() * 1000)}"
+    scanned_at = now_iso()
+    for r in rows:
+        r["run_id"] = run_id
+        r["scanned_at"] = scanned_at
+
+    if write_report:
+        replace_archive_scrub_report(rows, markets=markets, freqs=freqs)
+
+    summary = {
+        "run_id": run_id,
+        "files": len(rows),
+        "ok": sum(1 for r in rows if r["status"] == "ok"),
+        "issues": sum(1 for r in rows if r["status"] == "issues"),
+        "errors": sum(1 for r in rows if r["status"] == "error"),
+        "records": sum(int(r.get("records") or 0) for r in rows),
+        "invalid_records": sum(int(r.get("invalid_records") or 0) for r in rows),
+        "non_monotonic": sum(int(r.get("non_monotonic") or 0) for r in rows),
+        "off_bucket": sum(int(r.get("off_bucket") or 0) for r in rows),
+        "gap_bars": sum(int(r.get("gap_bars") or 0) for r in rows),
+        "workers": n_workers,
+        "elapsed_ms": int((time.perf_counter() - started) * 1000),
+        "rows": rows,
+    }
+    _LOG.info(
+        "[MINUTE_ARCHIVE][SCRUB] run_id=%s files=%s ok=%s issues=%s errors=%s records=%s gap_bars=%s workers=%s elapsed_ms=%s",
+        run_id,
+        summary["files"],
+        summary["ok"],
+        summary["issues"],
+        summary["errors"],
+        summary["records"],
+        summary["gap_bars"],
+        n_workers,
+        summary["elapsed_ms"],
+    )
+    return summary
+
+
+# ==========================================================
+# 定向远程补缺
+# ==========================================================
+def _minute_key(date_ymd: Any, time_text: Any) -> int:
+    hh, mm = str(time_text).split(":")[:2]
+    return int(date_ymd) * (24 * 60 + 1) + int(hh) * 60 + int(mm)
+
+
+async def repair_minute_archive_gaps(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+) -> Dict[str, Any]:
+    """
+    按当前内部缺口定向远程补齐单个序列：从最新一页向前翻页直到覆盖最早缺口（或远程窗口耗尽 / 达到页数上限），
+    只插入落在缺口区间内的记录。补齐后重扫该文件并覆盖报告行。
+    """
+    # 延迟导入：bars_recipes 依赖 minute_archive 包；远程适配器只在补缺时需要
+    from backend.datasource.providers.tdx_remote_adapter import get_auto_routed_bars_tdx_remote
+    from backend.services.bars_recipes import _normalize_remote_minute_df
+
+    m = str(market or "").strip().upper()
+    s = str(symbol or "").strip()
+    f = str(freq or "").strip()
+    result: Dict[str, Any] = {
+        "market": m,
+        "symbol": s,
+        "freq": f,
+        "status": "noop",
+        "gap_bars_before": 0,
+        "gap_bars_after": 0,
+        "pages": 0,
+        "fetched_rows": 0,
+        "inserted_rows": 0,
+    }
+    if m not in ("SH", "SZ"):
+        result["status"] = "unsupported"
+        return result
+
+    path = resolve_minute_archive_path(market=m, symbol=s, freq=f)
+    if not path.exists():
+        return result
+
+    if len(_TRADING_DAYS) == 0:
+        _init_scrub_worker(_load_trading_days())
+    before = await asyncio.to_thread(scrub_archive_file, path, market=m, symbol=s, freq=f, gap_sample=-1)
+    gaps = before["gaps_json"]
+    result["gap_bars_before"] = int(before["gap_bars"])
+    if not gaps:
+        result["gap_bars_after"] = int(before["gap_bars"])
+        return result
+
+    lo = np.array([_minute_key(g["from_date"], g["from_time"]) for g in gaps], dtype=np.int64)
+    hi = np.array([_minute_key(g["to_date"], g["to_time"]) for g in gaps], dtype=np.int64)
+    earliest = int(lo.min())
+
+    frames = []
+    start = 0
+    for _ in range(int(settings.minute_archive_scrub_repair_max_pages)):
+        raw_page = await get_auto_routed_bars_tdx_remote(
+            category=_REMOTE_CATEGORY[f],
+            market=m,
+            symbol=s,
+            start=start,
+            count=_REMOTE_PAGE_SIZE,
+        )
+        result["pages"] += 1
+        page = _normalize_remote_minute_df(raw_page)
+        if page.empty:
+            break
+        frames.append(page)
+        if _minute_key(page["date"].iloc[0], page["time"].iloc[0]) <= earliest or len(page) < _REMOTE_PAGE_SIZE:
+            break
+        start += _REMOTE_PAGE_SIZE
+
+    records: List[Dict[str, Any]] = []
+    for page in frames:
+        result["fetched_rows"] += len(page)
+        keys = np.array([_minute_key(d, t) for d, t in zip(page["date"], page["time"])], dtype=np.int64)
+        idx = np.searchsorted(lo, keys, side="right") - 1
+        inside = (idx >= 0) & (keys <= hi[np.maximum(idx, 0)])
+        for row in page[inside].itertuples(index=False):
+            records.append({
+                "market": m,
+                "symbol": s,
+                "freq": f,
+                "date": int(row.date),
+                "time": str(row.time),
+                "open": float(row.open),
+                "high": float(row.high),
+                "low": float(row.low),
+                "close": float(row.close),
+                "amount": float(row.amount) if pd.notna(row.amount) else 0.0,
+                "volume": float(row.volume) if pd.notna(row.volume) else 0.0,
+            })
+
+    if records:
+        filled = await asyncio.to_thread(fill_minute_archive_gaps, market=m, symbol=s, freq=f, records=records)
+        result["inserted_rows"] = int(filled["inserted_rows"])
+        result["status"] = filled["status"]
+
+    after = await asyncio.to_thread(
+        scrub_archive_file, path, market=m, symbol=s, freq=f, gap_sample=int(settings.minute_archive_scrub_gap_sample),
+    )
+    after["run_id"] = f"repair-{int(time.time() * 1000)}"
+    after["scanned_at"] = now_iso()
+    upsert_archive_scrub_report([after])
+    result["gap_bars_after"] = int(after["gap_bars"])
+
+    _LOG.info(
+        "[MINUTE_ARCHIVE][SCRUB] repair market=%s symbol=%s freq=%s pages=%s fetched=%s inserted=%s gap_bars=%s->%s",
+        m,
+        s,
+        f,
+        result["pages"],
+        result["fetched_rows"],
+        result["inserted_rows"],
+        result["gap_bars_before"],
+        result["gap_bars_after"],
+    )
+    return result
+
+
+# ==========================================================
+# 命令行
+# ==========================================================
+_TABLE_COLUMNS = (
+    ("market", 6),
+    ("symbol", 8),
+    ("freq", 4),
+    ("records", 9),
+    ("tail_fragment_bytes", 4),
+    ("invalid_records", 7),
+    ("non_monotonic", 7),
+    ("off_bucket", 7),
+    ("calendar_unknown", 7),
+    ("gap_count", 6),
+    ("gap_bars", 8),
+    ("gap_days", 6),
+    ("status", 6),
+)
+
+
+def _format_table(rows: List[Dict[str, Any]]) -> str:
+    header = " ".join(name[:width].rjust(width) for name, width in _TABLE_COLUMNS)
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(" ".join(str(r.get(name) if r.get(name) is not None else "").rjust(width) for name, width in _TABLE_COLUMNS))
+        if r.get("error"):
+            lines.append(f"    error: {r['error']}")
+    return "\n".join(lines)
+
+
+async def _repair_all(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for r in rows:
+        try:
+            out.append(await repair_minute_archive_gaps(market=r["market"], symbol=r["symbol"], freq=r["freq"]))
+        except Exception as e:
+            out.append({"market": r["market"], "symbol": r["symbol"], "freq": r["freq"], "status": "error", "error": str(e)})
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="分钟归档巡检工具")
+    parser.add_argument("--market", default=None)
+    parser.add_argument("--freq", default=None, choices=["1m", "5m"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repair", action="store_true", help="巡检后对存在内部缺口的 SH / SZ 序列定向远程补齐")
+    parser.add_argument("--all", action="store_true", help="报告表输出全部文件（默认只输出有问题的文件）")
+    args = parser.parse_args()
+
+    from backend.db.schema import ensure_initialized
+    ensure_initialized()
+
+    summary = scrub_minute_archives(market=args.market, freq=args.freq, workers=args.workers)
+    rows = summary.pop("rows")
+    shown = rows if args.all else [r for r in rows if r["status"] != "ok"]
+    if shown:
+        print(_format_table(shown))
+    print(" ".join(f"{k}={v}" for k, v in summary.items()))
+
+    if args.repair:
+        targets = [r for r in rows if int(r.get("gap_count") or 0) > 0 and r["market"] in ("SH", "SZ")]
+        for res in asyncio.run(_repair_all(targets)):
+            print(" ".join(f"{k}={v}" for k, v in res.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,10 @@
 #   - 若发现文件尾部存在不完整残片或尾记录结构异常：
 #       * 自动回退到上一条合法记录
 #       * 截断非法尾部
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 新增 ArchivePrependWriter：左补内容分块写入临时文件，提交时流式拼接旧归档并原子替换，
+#     左补 + 旧归档不再整体读入内存
 # ==============================
 
 from __future__ import annotations
@@ -351,3 +355,53 @@ def append_archive_bytes(
 
     _LOG.info("[MINUTE_ARCHIVE] appended file=%s bytes=%s", str(p), len(payload))
     return len(payload)
+
+
+class ArchivePrependWriter:
+    """
+    分块左补：left 记录分块写入临时文件，commit 时流式追加旧归档前 old_size 字节并原子替换。
+
+    说明：
+      - 提交前旧归档不受影响；abort / 异常时只删除临时文件
+      - 结果与 atomic_write_archive_bytes(left + old) 完全一致
+    """
+
+    def __init__(self, path: Path):
+        self._path = Path(path).resolve()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        self._fh = open(self._tmp, "wb")
+        self.written = 0
+
+    def write(self, raw: bytes) -> None:
+        payload = raw or b""
+        if len(payload) % _RECORD_SIZE != 0:
+            raise ValueError(
+                f"prepend archive bytes length must be divisible by {_RECORD_SIZE}, got {len(payload)}"
+            )
+        self._fh.write(payload)
+        self.written += len(payload)
+
+    def commit(self, old_size: int) -> int:
+        """拼接旧归档前 old_size 字节（已做尾部保护的合法长度）并替换；返回最终文件字节数。"""
+        remaining = max(0, int(old_size))
+        with open(self._path, "rb") as src:
+            while remaining > 0:
+                buf = src.read(min(remaining, 1 << 22))
+                if not buf:
+                    break
+                self._fh.write(buf)
+                remaining -= len(buf)
+        self._fh.flush()
+        self._fh.close()
+
+        total = self.written + int(old_size) - remaining
+        self._tmp.replace(self._path)
+        _LOG.info("[MINUTE_ARCHIVE] prepended file=%s left_bytes=%s total_bytes=%s", str(self._path), self.written, total)
+        return total
+
+    def abort(self) -> None:
+        try:
+            self._fh.close()
+        finally:
+            self._tmp.unlink(missing_ok=True)
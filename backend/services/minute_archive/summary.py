@@ -0,0 +1,121 @@
+# backend/services/minute_archive/summary.py
+# ==============================
+# 分钟线累积归档 - 序列摘要维护
+#
+# 职责：
+#   - 归档文件写入完成后，把首尾 bar 时刻与总行数写入 series_summary
+#   - 从归档目录全量重建 1m / 5m 摘要（只读每个文件的首尾两条记录）
+#
+# 说明：
+#   - 摘要是派生数据：写入失败只记日志，不影响归档本身
+#   - ts 口径：该分钟 bar 的结束时刻（北京时间）毫秒时间戳
+# ==============================
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.db.series_summary import record_series_summary, upsert_series_summary_row
+from backend.db.writer_thread import WriteFunc, run_write
+from backend.settings import settings
+from backend.utils.logger import get_logger
+from backend.utils.time import ms_at_time
+from backend.services.minute_archive.codec import decode_record_from_bytes
+
+_LOG = get_logger("minute_archive.summary")
+
+_RECORD_SIZE = 32
+
+_SUBDIR_FREQ = {"lc1": "1m", "lc5": "5m"}
+
+
+def minute_record_ts(rec: Dict[str, Any]) -> int:
+    hh, mm = str(rec["time"]).split(":")[:2]
+    return ms_at_time(int(rec["date"]), int(hh), int(mm))
+
+
+def sync_minute_series_summary(
+    *,
+    market: str,
+    symbol: str,
+    freq: str,
+    first_rec: Optional[Dict[str, Any]],
+    last_rec: Optional[Dict[str, Any]],
+    rows: int,
+) -> None:
+    try:
+        record_series_summary(
+            market,
+            symbol,
+            freq,
+            minute_record_ts(first_rec) if first_rec else None,
+            minute_record_ts(last_rec) if last_rec else None,
+            int(rows),
+        )
+    except Exception as e:
+        _LOG.warning(
+            "[MINUTE_ARCHIVE][SUMMARY] sync failed market=%s symbol=%s freq=%s err=%s",
+            market,
+            symbol,
+            freq,
+            e,
+        )
+
+
+def _read_boundary_records(path: Path, market: str, symbol: str, freq: str):
+    size = int(path.stat().st_size or 0)
+    rows = size // _RECORD_SIZE
+    if rows <= 0:
+        return None, None, 0
+    with open(path, "rb") as f:
+        first_raw = f.read(_RECORD_SIZE)
+        f.seek((rows - 1) * _RECORD_SIZE)
+        last_raw = f.read(_RECORD_SIZE)
+    first = decode_record_from_bytes(first_raw, market=market, symbol=symbol, freq=freq)
+    last = decode_record_from_bytes(last_raw, market=market, symbol=symbol, freq=freq)
+    return first, last, rows
+
+
+def rebuild_minute_series_summary(market: Optional[str] = None) -> int:
+    """
+    从归档目录重建全部 1m / 5m 摘要。返回处理的序列数。
+
+    目录结构：{archive_root}/{market_lower}/{lc1|lc5}/{market_lower}{symbol}.{lc1|lc5}
+    """
+    root = Path(settings.tdx_minute_archive_dir).resolve()
+    markets = [str(market).strip().lower()] if market else ["sh", "sz", "bj"]
+
+    items = []
+    for m_lower in markets:
+        for subdir, freq in _SUBDIR_FREQ.items():
+            d = root / m_lower / subdir
+            if not d.is_dir():
+                continue
+            for p in sorted(d.glob(f"{m_lower}*.{subdir}")):
+                symbol = p.stem[len(m_lower):]
+                if not symbol.isdigit():
+                    continue
+                m = m_lower.upper()
+                try:
+                    first, last, rows = _read_boundary_records(p, m, symbol, freq)
+                except Exception as e:
+                    _LOG.warning("[MINUTE_ARCHIVE][SUMMARY] skip %s: %s", p, e)
+                    continue
+                items.append((
+                    m,
+                    symbol,
+                    freq,
+                    minute_record_ts(first) if first else None,
+                    minute_record_ts(last) if last else None,
+                    rows,
+                ))
+
+    def _apply(cur) -> int:
+        for m, s, f, lo, hi, n in items:
+            upsert_series_summary_row(cur, m, s, f, lo, hi, n)
+        return len(items)
+
+    n = run_write(WriteFunc(_apply, label="series_summary.rebuild_minute"))
+    _LOG.info("[MINUTE_ARCHIVE][SUMMARY] rebuild done series=%s", n)
+    return int(n)
@@ -15,9 +15,9 @@
 from __future__ import annotations
 
 from .bars import normalize_bars_df
-from .day_bars import normalize_tdx_day_df_to_candles_records
+from .day_bars import normalize_tdx_day_df_to_candles_records, normalize_tdx_day_arrays
 from .minute_bars import normalize_tdx_minute_df_to_archive_records
-from .factors import normalize_tdx_gbbq_adj_factors_df
+from .factors import normalize_tdx_gbbq_adj_factors_df, compute_tdx_gbbq_adj_factors_batch
 from .calendar import normalize_trade_calendar_df
 from .symbols import normalize_symbol_list_df
 from .profile import normalize_profile_snapshot_df
@@ -25,8 +25,10 @@ from .profile import normalize_profile_snapshot_df
 __all__ = [
     "normalize_bars_df",
     "normalize_tdx_day_df_to_candles_records",
+    "normalize_tdx_day_arrays",
     "normalize_tdx_minute_df_to_archive_records",
     "normalize_tdx_gbbq_adj_factors_df",
+    "compute_tdx_gbbq_adj_factors_batch",
     "normalize_trade_calendar_df",
     "normalize_symbol_list_df",
     "normalize_profile_snapshot_df",
@@ -11,19 +11,124 @@
 #       * .day -> 1d
 #       * 原始不复权
 #       * 输出 DB ready records
+#
+# 本轮改动（向量化标准化）：
+#   - 新增 normalize_tdx_day_arrays：列数组入、列数组出（含 ts），
+#     日期用 numpy 掩码校验，收盘时间戳由 YYYYMMDD 直接算术得到（ms_at_market_close_array）
+#   - normalize_tdx_day_df_to_candles_records 改为基于列数组实现，输出与原逐行实现一致
+#   - 原逐行实现保留为 normalize_tdx_day_df_to_candles_records_reference，供等价性验证
 # ==============================
 
 from __future__ import annotations
 
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 
 from backend.utils.logger import get_logger
-from backend.utils.time import ms_at_market_close
+from backend.utils.time import ms_at_market_close, ms_at_market_close_array
 
 _LOG = get_logger("normalizer.day_bars")
 
+_REQUIRED_COLS = ["date", "open", "high", "low", "close", "amount", "volume"]
+_PRICE_COLS = ("open", "high", "low", "close")
+
+
+def _normalize_symbol_market(symbol: str, market: str) -> tuple[str, str]:
+    s = str(symbol or "").strip()
+    m = str(market or "").strip().upper()
+    if not s or m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"invalid symbol/market for day normalize: symbol={symbol!r}, market={market!r}")
+    return s, m
+
+
+def _empty_normalized_day_arrays() -> Dict[str, np.ndarray]:
+    out = {"ts": np.empty(0, dtype=np.int64)}
+    for c in _REQUIRED_COLS:
+        out[c] = np.empty(0, dtype=np.int64 if c == "date" else np.float64)
+    return out
+
+
+def normalize_tdx_day_arrays(
+    arrays: Dict[str, np.ndarray],
+    *,
+    symbol: str,
+    market: str,
+) -> Dict[str, np.ndarray]:
+    """
+    TDX 日线列数组 -> 标准化列数组（批量装载直接使用）。
+
+    输入：load_tdx_day_arrays 的输出（或同结构的 float 列数组，date 可含 NaN）
+    输出：
+        {'date': int64, 'ts': int64,
+         'open'/'high'/'low'/'close'/'volume'/'amount': float64}
+        按 date 去重（后者胜）、升序，仅保留 19000101..21001231
+
+    口径与逐行实现一致：
+      - date 为 NaN 的行丢弃；价格 / 量 / 额的 NaN 原样保留（amount 的 NaN 落库为 NULL）
+      - 非法日历日期（如 20230230）抛 ValueError
+    """
+    s, m = _normalize_symbol_market(symbol, market)
+
+    missing = [c for c in _REQUIRED_COLS if c not in arrays]
+    if missing:
+        raise ValueError(f"tdx day normalize missing columns: {missing}")
+
+    date_f = np.asarray(arrays["date"], dtype=np.float64)
+    keep = ~np.isnan(date_f)
+    dates = date_f[keep].astype(np.int64)
+    cols = {c: np.asarray(arrays[c], dtype=np.float64)[keep] for c in _REQUIRED_COLS if c != "date"}
+
+    if dates.size == 0:
+        return _empty_normalized_day_arrays()
+
+    # 同日多条保留最后一条；严格递增（常见情况）时免去去重排序
+    if not bool(np.all(dates[1:] > dates[:-1])):
+        _, first_in_rev = np.unique(dates[::-1], return_index=True)
+        idx = (len(dates) - 1) - first_in_rev
+        dates = dates[idx]
+        cols = {c: v[idx] for c, v in cols.items()}
+
+    in_range = (dates >= 19000101) & (dates <= 21001231)
+    if not bool(in_range.all()):
+        dates = dates[in_range]
+        cols = {c: v[in_range] for c, v in cols.items()}
+
+    out = {"date": dates, "ts": ms_at_market_close_array(dates)}
+    out.update(cols)
+
+    _LOG.info(
+        "[TDX_DAY标准化] market=%s symbol=%s rows=%s",
+        m,
+        s,
+        len(dates),
+    )
+    return out
+
+
+def _day_df_to_arrays(raw_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    DataFrame -> float 列数组（逐行实现里 float() 失败的口径在这里还原）：
+      - date / 价格无法转数值：整行丢弃（date 置 NaN）
+      - volume 无法转数值：0.0；amount 无法转数值：NaN（落库为 NULL）
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    bad_row = np.zeros(len(raw_df), dtype=bool)
+    for c in _REQUIRED_COLS:
+        src = raw_df[c]
+        num = pd.to_numeric(src, errors="coerce")
+        unconvertible = (num.isna() & src.notna()).to_numpy()
+        vals = num.to_numpy(dtype=np.float64, na_value=np.nan)
+        if c in _PRICE_COLS:
+            bad_row |= unconvertible
+        elif c == "volume":
+            vals = np.where(unconvertible, 0.0, vals)
+        arrays[c] = vals
+    arrays["date"] = np.where(bad_row, np.nan, arrays["date"])
+    return arrays
+
+
 def normalize_tdx_day_df_to_candles_records(
     raw_df: pd.DataFrame,
     *,
@@ -33,6 +138,46 @@ def normalize_tdx_day_df_to_candles_records(
     if raw_df is None or raw_df.empty:
         return []
 
+    missing = [c for c in _REQUIRED_COLS if c not in raw_df.columns]
+    if missing:
+        raise ValueError(f"tdx day normalize missing columns: {missing}")
+
+    s, m = _normalize_symbol_market(symbol, market)
+    arrays = normalize_tdx_day_arrays(_day_df_to_arrays(raw_df), symbol=s, market=m)
+
+    return [
+        {
+            "market": m,
+            "symbol": s,
+            "ts": ts,
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "volume": v,
+            "amount": a,
+        }
+        for ts, o, h, lo, c, v, a in zip(
+            arrays["ts"].tolist(),
+            arrays["open"].tolist(),
+            arrays["high"].tolist(),
+            arrays["low"].tolist(),
+            arrays["close"].tolist(),
+            arrays["volume"].tolist(),
+            arrays["amount"].tolist(),
+        )
+    ]
+
+
+def normalize_tdx_day_df_to_candles_records_reference(
+    raw_df: pd.DataFrame,
+    *,
+    symbol: str,
+    market: str,
+) -> List[Dict[str, Any]]:
+    if raw_df is None or raw_df.empty:
+        return []
+
     required_cols = ["date", "open", "high", "low", "close", "amount", "volume"]
     missing = [c for c in required_cols if c not in raw_df.columns]
     if missing:
@@ -15,12 +15,20 @@
 # 说明：
 #   - 这里只服务最终正式因子链路
 #   - 不再承载 baostock 因子标准化
+#
+# 本轮改动（全市场批量计算）：
+#   - 新增 compute_tdx_gbbq_adj_factors_batch：多标的事件 + 多标的日线收盘价一次性计算
+#       * (标的序号, 日期) 编码为单一 int64 键，全体事件对全体日线一次 searchsorted 取事件日前收盘价
+#       * hfq 按标的分组 cumprod，qfq 按标的最新 hfq 归一
+#       * 单标的规则与错误口径同 normalize_tdx_gbbq_adj_factors_df：任一事件失败则该标的整体失败，
+#         不抛错而是记入 failures 返回，其余标的照常产出
 # ==============================
 
 from __future__ import annotations
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Mapping, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backend.utils.logger import get_logger
@@ -29,6 +37,20 @@ from backend.utils.time import parse_yyyymmdd, to_yyyymmdd
 
 _LOG = get_logger("normalizer.factors")
 
+_FACTOR_COLS = ["date", "qfq_factor", "hfq_factor"]
+_EVENT_COLS = [
+    "market",
+    "symbol",
+    "date",
+    "cash_dividend_per_10",
+    "rights_price",
+    "bonus_share_per_10",
+    "rights_share_per_10",
+]
+# YYYYMMDD < 1e8：(标的序号, 日期) -> 标的序号 * 1e8 + 日期，按键排序即按标的、日期排序
+_DATE_SPAN = 100_000_000
+
+
 def normalize_tdx_gbbq_adj_factors_df(
     events_df: pd.DataFrame,
     day_df: pd.DataFrame,
@@ -170,4 +192,152 @@ def normalize_tdx_gbbq_adj_factors_df(
         len(out),
     )
 
-    return out
\ No newline at end of file
+    return out
+
+
+def compute_tdx_gbbq_adj_factors_batch(
+    events_df: pd.DataFrame,
+    closes: Mapping[str, np.ndarray],
+) -> Tuple[pd.DataFrame, Dict[Tuple[str, str], str]]:
+    """
+    全市场批量计算复权因子（单标的口径同 normalize_tdx_gbbq_adj_factors_df）。
+
+    Args:
+        events_df: category=1 事件，列同单标的版本（market / symbol / date / 四个数值字段）
+        closes: 日线收盘价列数组 {'market', 'symbol', 'date'(YYYYMMDD), 'close'}，顺序不限
+
+    Returns:
+        (factors_df, failures)
+          - factors_df：market / symbol / date / qfq_factor / hfq_factor，按 market, symbol, date 升序
+          - failures：{(market, symbol): 错误信息}，错误码与单标的版本一致，失败标的不出现在 factors_df
+
+    说明：
+      - 事件数值字段缺失按 0 计（同单标的版本 `or 0.0` 对 None 的处理）
+    """
+    out_cols = ["market", "symbol"] + _FACTOR_COLS
+    failures: Dict[Tuple[str, str], str] = {}
+    if events_df is None or events_df.empty:
+        return pd.DataFrame(columns=out_cols), failures
+
+    missing_event = [c for c in _EVENT_COLS if c not in events_df.columns]
+    if missing_event:
+        raise ValueError(f"tdx gbbq factor normalize missing event columns: {missing_event}")
+
+    e = events_df[_EVENT_COLS].copy()
+    e["market"] = e["market"].astype(str).str.strip().str.upper()
+    e["symbol"] = e["symbol"].astype(str).str.strip()
+    e["date"] = e["date"].astype("int64")
+    e = (
+        e.drop_duplicates(subset=["market", "symbol", "date"], keep="last")
+        .sort_values(["market", "symbol", "date"], kind="stable")
+        .reset_index(drop=True)
+    )
+
+    gid, series = pd.factorize(pd.MultiIndex.from_arrays([e["market"], e["symbol"]]))
+    gid = gid.astype(np.int64)
+    n_series = len(series)
+    event_dates = e["date"].to_numpy(dtype=np.int64)
+
+    # 日线：只保留有事件的标的；同标的同日多条保留最后一条（同单标的版本的 keep="last"）
+    d_gid = series.get_indexer(pd.MultiIndex.from_arrays([
+        np.asarray(closes["market"], dtype=object),
+        np.asarray(closes["symbol"], dtype=object),
+    ])).astype(np.int64)
+    has = d_gid >= 0
+    d_key = d_gid[has] * _DATE_SPAN + np.asarray(closes["date"], dtype=np.int64)[has]
+    d_close = np.asarray(closes["close"], dtype=np.float64)[has]
+    order = np.argsort(d_key, kind="stable")
+    d_key, d_close = d_key[order], d_close[order]
+    if d_key.size:
+        last = np.r_[d_key[1:] != d_key[:-1], True]
+        d_key, d_close = d_key[last], d_close[last]
+    d_gid = d_key // _DATE_SPAN
+    has_days = np.bincount(d_gid, minlength=n_series) > 0
+
+    # 事件日前最近一根日线：键严格小于事件键的最后一个位置
+    pos = np.searchsorted(d_key, gid * _DATE_SPAN + event_dates, side="left") - 1
+    pos_safe = np.clip(pos, 0, max(len(d_key) - 1, 0))
+    has_prev = (pos >= 0) & (d_gid[pos_safe] == gid) if d_key.size else np.zeros(len(gid), dtype=bool)
+    prev_close = np.where(has_prev, d_close[pos_safe] if d_key.size else np.nan, np.nan)
+
+    def _num(col: str) -> np.ndarray:
+        return pd.to_numeric(e[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+    cash_dividend_per_share = _num("cash_dividend_per_10") / 10.0
+    rights_price = _num("rights_price")
+    bonus_share_per_share = _num("bonus_share_per_10") / 10.0
+    rights_share_per_share = _num("rights_share_per_10") / 10.0
+
+    denominator = 1.0 + bonus_share_per_share + rights_share_per_share
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ex_price = (
+            prev_close
+            - cash_dividend_per_share
+            + rights_price * rights_share_per_share
+        ) / denominator
+        multiplier = prev_close / ex_price
+
+    # 单标的版本按日期顺序逐事件检查：缺前收盘 -> 分母 -> 除权价，首个失败即整标的失败
+    err = np.select([~has_prev, denominator <= 0, ex_price <= 0], [1, 2, 3], 0)
+    markets = series.get_level_values(0)
+    symbols = series.get_level_values(1)
+    failed = np.zeros(n_series, dtype=bool)
+
+    for g in np.flatnonzero(~has_days):
+        failures[(markets[g], symbols[g])] = (
+            f"LOCAL_PRICE_DEPENDENCY_MISSING: day bars empty for {markets[g]}.{symbols[g]}"
+        )
+        failed[g] = True
+
+    bad_idx = np.flatnonzero(err > 0)
+    if bad_idx.size:
+        first_bad = bad_idx[np.unique(gid[bad_idx], return_index=True)[1]]
+        for i in first_bad:
+            g = int(gid[i])
+            if failed[g]:
+                continue
+            m_u, s_s, ymd = markets[g], symbols[g], int(event_dates[i])
+            code = int(err[i])
+            if code == 1:
+                msg = (
+                    f"LOCAL_PRICE_DEPENDENCY_MISSING: previous close not found before event_date={ymd} "
+                    f"for {m_u}.{s_s}"
+                )
+            elif code == 2:
+                msg = f"INVALID_ADJ_EVENT_DENOMINATOR: date={ymd} market={m_u} symbol={s_s}"
+            else:
+                msg = (
+                    f"INVALID_ADJ_EVENT_EX_PRICE: date={ymd} market={m_u} symbol={s_s} "
+                    f"ex_price={float(ex_price[i])}"
+                )
+            failures[(m_u, s_s)] = msg
+            failed[g] = True
+
+    hfq = pd.Series(multiplier).groupby(gid, sort=False).cumprod().to_numpy()
+    latest = pd.Series(hfq).groupby(gid, sort=False).transform("last").to_numpy()
+
+    for g in np.flatnonzero(np.bincount(gid, weights=(latest <= 0), minlength=n_series) > 0):
+        if not failed[g]:
+            failures[(markets[g], symbols[g])] = (
+                f"INVALID_LATEST_HFQ_FACTOR: market={markets[g]} symbol={symbols[g]}"
+            )
+            failed[g] = True
+
+    ok = ~failed[gid]
+    out = pd.DataFrame({
+        "market": e["market"].to_numpy()[ok],
+        "symbol": e["symbol"].to_numpy()[ok],
+        "date": event_dates[ok],
+        "qfq_factor": hfq[ok] / latest[ok],
+        "hfq_factor": hfq[ok],
+    })
+
+    _LOG.info(
+        "[TDX_GBBQ因子批量计算] series=%s ok=%s failed=%s rows=%s",
+        n_series,
+        n_series - len(failures),
+        len(failures),
+        len(out),
+    )
+
+    return out, failures
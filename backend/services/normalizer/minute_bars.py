@@ -11,18 +11,36 @@
 #       * .lc1 -> 1m
 #       * .lc5 -> 5m
 #       * 输出 archive ready records
+#
+# 本轮改动（逐列构造 records）：
+#   - 原实现 iterrows 逐行取值，单个一年期 .lc1 约 2.5s，是盘后导入标准化阶段的主要耗时
+#   - date 为整数列、价量为数值列时（TDX 解析结果均满足）改为整列 tolist 后 zip 构造 records，结果逐条一致；
+#     time 按取值去重（factorize）后清洗 / 校验，不再逐行 strip
+#   - 其它输入（含非数值列）仍走逐行实现；原实现保留为 normalize_tdx_minute_df_to_archive_records_reference
 # ==============================
 
 from __future__ import annotations
 
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
 
 from backend.utils.logger import get_logger
 
 _LOG = get_logger("normalizer.minute_bars")
 
+_VALUE_COLUMNS = ("open", "high", "low", "close", "amount", "volume")
+
+
+def _has_numeric_columns(df: pd.DataFrame) -> bool:
+    """date 为整数列、价量为数值列：逐行实现中的转换全部不会失败，可整列构造。"""
+    if not is_integer_dtype(df["date"].dtype) or is_bool_dtype(df["date"].dtype):
+        return False
+    return all(is_numeric_dtype(df[c].dtype) and not is_bool_dtype(df[c].dtype) for c in _VALUE_COLUMNS)
+
+
 def normalize_tdx_minute_df_to_archive_records(
     raw_df: pd.DataFrame,
     *,
@@ -38,6 +56,74 @@ def normalize_tdx_minute_df_to_archive_records(
     if missing:
         raise ValueError(f"tdx minute normalize missing columns: {missing}")
 
+    if not _has_numeric_columns(raw_df):
+        return normalize_tdx_minute_df_to_archive_records_reference(raw_df, symbol=symbol, market=market, freq=freq)
+
+    s = str(symbol or "").strip()
+    m = str(market or "").strip().upper()
+    f = str(freq or "").strip()
+
+    if not s or m not in ("SH", "SZ", "BJ"):
+        raise ValueError(f"invalid symbol/market for minute normalize: symbol={symbol!r}, market={market!r}")
+    if f not in ("1m", "5m"):
+        raise ValueError(f"invalid freq for minute normalize: {freq!r}")
+
+    df = raw_df.drop_duplicates(subset=["date", "time"], keep="last").sort_values(["date", "time"])
+
+    # time 至多 1441 种取值：只清洗去重后的取值，再按编码取回；缺失值（None / NaN）与非法取值一样整行跳过
+    codes, uniques = pd.factorize(df["time"])
+    cleaned = [str(v or "").strip() for v in uniques] + [""]
+    valid = np.array([bool(t) and ":" in t for t in cleaned], dtype=bool)[codes]
+    if not valid.all():
+        df = df[valid]
+        codes = codes[valid]
+    times = np.array(cleaned, dtype=object)[codes].tolist()
+    columns = [df["date"].tolist(), times] + [df[c].astype("float64").tolist() for c in _VALUE_COLUMNS]
+
+    records: List[Dict[str, Any]] = [
+        {
+            "market": m,
+            "symbol": s,
+            "freq": f,
+            "date": d,
+            "time": t,
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "amount": a,
+            "volume": v,
+        }
+        for d, t, o, h, lo, c, a, v in zip(*columns)
+    ]
+
+    _LOG.info(
+        "[TDX_MINUTE标准化] market=%s symbol=%s freq=%s rows=%s",
+        m,
+        s,
+        f,
+        len(records),
+    )
+
+    return records
+
+
+def normalize_tdx_minute_df_to_archive_records_reference(
+    raw_df: pd.DataFrame,
+    *,
+    symbol: str,
+    market: str,
+    freq: str,
+) -> List[Dict[str, Any]]:
+    """逐行实现（非数值列输入的兜底，及等价性对照）。"""
+    if raw_df is None or raw_df.empty:
+        return []
+
+    required_cols = ["date", "time", "open", "high", "low", "close", "amount", "volume"]
+    missing = [c for c in required_cols if c not in raw_df.columns]
+    if missing:
+        raise ValueError(f"tdx minute normalize missing columns: {missing}")
+
     s = str(symbol or "").strip()
     m = str(market or "").strip().upper()
     f = str(freq or "").strip()
@@ -31,6 +31,56 @@
 #   - 新增 tdx_remote_connect_timeout_seconds：TDX socket 连接超时
 #   - 新增 tdx_remote_recv_timeout_seconds：TDX socket 接收超时
 #   - 新增 tdx_remote_ping_timeout_seconds：TDX host 选优 connect 测速超时
+#
+# 本轮改动（SQLite 单写线程）：
+#   - 新增 db_writer_max_batch_commands：单事务最多合并的写命令数
+#   - 新增 db_writer_max_latency_ms：写命令合并等待上限
+#
+# 本轮改动（日线列式打包存储）：
+#   - 新增 day_bars_packed_store_enabled：是否维护并使用 candles_day_packed
+#
+# 本轮改动（日线紧凑整数存储）：
+#   - 新增 day_bars_storage_schema：raw / compact 两种日线存储格式
+#
+# 本轮改动（盘后导入日线批量装载）：
+#   - 新增 local_import_day_bulk_enabled：.day 导入是否走批量装载快路径
+#   - 新增 local_import_day_bulk_files_per_commit / local_import_day_bulk_max_rows：批量提交粒度
+#   - 新增 local_import_day_bulk_synchronous / local_import_day_bulk_cache_size_kib：批量窗口内的会话 PRAGMA
+#
+# 本轮改动（数据库后台维护）：
+#   - 新增 db_maintenance_* ：WAL checkpoint / incremental_vacuum / optimize / ANALYZE 的触发条件与力度
+#
+# 本轮改动（异步写入队列）：
+#   - 新增 async_writer_max_queue_bytes：生产者背压的待写字节预算
+#   - 新增 async_writer_batch_rows / async_writer_flush_interval_ms：批量提交粒度
+#   - 新增 async_writer_max_retries / async_writer_spill_dir：提交失败重试与落盘目录
+#
+# 本轮改动（盘后导入并行执行）：
+#   - 新增 local_import_workers：解析 / 标准化进程池大小（1 = 原串行路径）
+#   - 新增 local_import_tasks_per_worker：每个进程的在途任务数（预取深度）
+#
+# 本轮改动（盘后导入分阶段流水线）：
+#   - 新增 local_import_pipeline_enabled：单进程导入是否走“读取 -> 解码 -> 标准化 -> 写入”分阶段流水线
+#   - 新增 local_import_pipeline_queue_size / _decoders / _normalizers / _write_batch：队列容量、各阶段并发与写入批量
+#
+# 本轮改动（盘后导入增量读取）：
+#   - 新增 local_import_incremental_enabled：按导入清单只读 .day / .lc1 / .lc5 的新增尾部
+#
+# 本轮改动（盘后导入进度记账）：
+#   - 新增 local_import_task_flush_size：任务终态攒批落库的上限（条）
+#   - 新增 local_import_status_emit_hz：导入进度状态推送的最高频率
+#
+# 本轮改动（大分钟文件分块导入）：
+#   - 新增 local_import_minute_chunk_threshold_mb：整文件导入的 .lc1 / .lc5 达到该大小时改为分块流式合并归档
+#   - 新增 local_import_minute_chunk_records：分块导入每块的目标记录数（按整日切分）
+#
+# 本轮改动（分钟归档巡检）：
+#   - 新增 minute_archive_scrub_workers：归档巡检进程池大小（0 = CPU 核数）
+#   - 新增 minute_archive_scrub_gap_sample：巡检报告每个文件保留的缺口明细条数
+#   - 新增 minute_archive_scrub_repair_max_pages：远程补缺每个序列最多向前翻的页数
+#
+# 本轮改动（流水线默认关闭）：
+#   - local_import_pipeline_enabled 默认改为 False：分钟标准化改为逐列构造后，分阶段流水线在实测目录上不快于串行
 # ==============================
 
 from __future__ import annotations
@@ -48,6 +98,7 @@ DEFAULT_CONFIG_PATH: Path = DEFAULT_DATA_DIR / "config.json"
 DEFAULT_TDX_HQ_CACHE_DIR: Path = Path(r"D:\TDX_new\T0002\hq_cache")
 DEFAULT_TDX_VIPDOC_DIR: Path = Path(r"D:\TDX_new\vipdoc")
 DEFAULT_TDX_MINUTE_ARCHIVE_DIR: Path = DEFAULT_DATA_DIR / "minute_archive"
+DEFAULT_ASYNC_WRITER_SPILL_DIR: Path = DEFAULT_DATA_DIR / "async_writer_spill"
 
 # NEW：TDX 远程行情主站相关默认路径
 DEFAULT_TDX_NEWHOST_LST_PATH: Path = Path(r"D:\TDX_new\T0002\newhost.lst")
@@ -221,6 +272,212 @@ class Settings:
     #   - host 选优时 TCP connect 测速超时
     tdx_remote_ping_timeout_seconds: float = 1.0
 
+    # ==========================================================
+    # 五点四、SQLite 写入线程（所有写入统一经由单一写线程）
+    # ==========================================================
+    # db_writer_max_batch_commands：
+    #   - 写线程单个事务最多合并多少条写命令
+    #   - 不同来源（盘后导入 / 行情补齐 / 任务状态）的写命令会共享同一次提交
+    db_writer_max_batch_commands: int = 256
+
+    # db_writer_max_latency_ms：
+    #   - 一条写命令从入队到提交的最大合并等待时长（毫秒）
+    #   - 越大越省 fsync，越小单次写入越快返回
+    db_writer_max_latency_ms: float = 5.0
+
+    # day_bars_packed_store_enabled：
+    #   - True：额外维护 candles_day_packed（按标的-年份的列式 BLOB）
+    #     整段日线读取 / 全市场横截面扫描走打包表，速度快一个数量级
+    #   - False：只使用 candles_day_raw（默认）
+    #   - 由 False 改为 True 后，先执行一次全量回填：
+    #       python -m backend.db.candles_packed --rebuild
+    day_bars_packed_store_enabled: bool = False
+
+    # day_bars_storage_schema：日线真相源表的存储格式
+    #   - "raw"（默认）：candles_day_raw，价格 REAL + 毫秒 ts
+    #   - "compact"：candles_day_compact，价格整数刻度（×1000）+ YYYYMMDD 日期 + INTEGER 成交量
+    #       * 行更小、每页容纳更多 K 线、库文件更小、范围扫描更快
+    #   - 切换前先执行在线迁移并确认校验通过：
+    #       python -m backend.db.candles_compact --migrate
+    day_bars_storage_schema: str = "raw"
+
+    # ==========================================================
+    # 五点五、盘后导入日线批量装载（全市场 .day 重导提速）
+    # ==========================================================
+    # local_import_day_bulk_enabled：
+    #   - True（默认）：.day 文件解析后只在内存暂存类型化元组，
+    #     每 N 个文件经 executemany 写入临时暂存表，再用一条 INSERT ... SELECT ... ON CONFLICT 合并进日线表
+    #   - False：沿用逐文件 upsert + 逐文件提交
+    local_import_day_bulk_enabled: bool = True
+
+    # local_import_day_bulk_files_per_commit：
+    #   - 每累计多少个 .day 文件提交一次
+    #   - 这些文件的任务终态在提交成功后才落为 success（提交失败统一记为 failed）
+    local_import_day_bulk_files_per_commit: int = 64
+
+    # local_import_day_bulk_max_rows：
+    #   - 暂存行数上限；文件数未到但行数先到时提前提交，防止内存暴涨
+    local_import_day_bulk_max_rows: int = 400000
+
+    # local_import_day_bulk_synchronous：
+    #   - 批量窗口内写连接的 PRAGMA synchronous（OFF / NORMAL / FULL）
+    #   - NORMAL（默认）：WAL 模式下断电最多丢失最近提交，不会损坏数据库；主要提速来自批量合并与页缓存
+    #   - OFF：显式选择才启用。写连接是全进程共享的单写连接，窗口内所有写入
+    #     （任务状态、复权因子、后台维护等，而不只是日线批量合并）都以 synchronous=OFF 执行，
+    #     操作系统崩溃或断电可能损坏整个数据库文件，只适合可随时从备份 / 重新导入恢复的环境
+    #   - 窗口结束后恢复为常规 NORMAL
+    local_import_day_bulk_synchronous: str = "NORMAL"
+
+    # local_import_day_bulk_cache_size_kib：
+    #   - 批量窗口内写连接的页缓存（KiB），窗口结束后恢复常规值
+    local_import_day_bulk_cache_size_kib: int = 262144
+
+    # ==========================================================
+    # 五点六、数据库后台维护（WAL 收缩 / 空闲页回收 / 统计信息）
+    # ==========================================================
+    # db_maintenance_enabled：
+    #   - True（默认）：后台维护循环随应用启动
+    #   - 触发时机：写入空闲时 / 盘后导入批次结束后 / 交易日收盘后
+    db_maintenance_enabled: bool = True
+
+    # db_maintenance_check_interval_seconds：
+    #   - 维护循环的巡检间隔（秒），同时也是 WAL / 页数指标的刷新间隔
+    db_maintenance_check_interval_seconds: float = 30.0
+
+    # db_maintenance_idle_seconds：
+    #   - 写线程连续无提交超过该秒数，才视为“空闲”，允许执行空闲维护
+    db_maintenance_idle_seconds: float = 60.0
+
+    # db_maintenance_wal_checkpoint_mb：
+    #   - 空闲时 WAL 文件超过该大小（MB）即执行 wal_checkpoint(TRUNCATE)
+    db_maintenance_wal_checkpoint_mb: int = 64
+
+    # db_maintenance_vacuum_freelist_pages：
+    #   - 空闲页（freelist）超过该页数才执行 incremental_vacuum
+    db_maintenance_vacuum_freelist_pages: int = 2048
+
+    # db_maintenance_vacuum_max_pages：
+    #   - 单次 incremental_vacuum 最多回收的页数（避免长时间占用写线程）
+    db_maintenance_vacuum_max_pages: int = 65536
+
+    # db_maintenance_after_close_time：
+    #   - 交易日收盘后执行一次完整维护（含 ANALYZE）的北京时间 HH:MM
+    db_maintenance_after_close_time: str = "15:30"
+
+    # ==========================================================
+    # 五点七、异步写入队列（AsyncDBWriter）
+    # ==========================================================
+    # async_writer_max_queue_bytes：
+    #   - 待写 + 提交中数据的估算字节上限；超出时生产者 await 挂起，直到提交腾出预算
+    async_writer_max_queue_bytes: int = 64 * 1024 * 1024
+
+    # async_writer_batch_rows：
+    #   - 待写行数达到该值立即提交一批（不再等待 flush 间隔）
+    async_writer_batch_rows: int = 5000
+
+    # async_writer_flush_interval_ms：
+    #   - 有待写数据时的最长提交间隔（毫秒）
+    async_writer_flush_interval_ms: int = 500
+
+    # async_writer_max_retries：
+    #   - 单批提交失败后的重试次数（指数退避）；仍失败则整批落盘，不丢弃
+    async_writer_max_retries: int = 3
+
+    # async_writer_spill_dir：
+    #   - 提交失败 / 关闭超时批次的落盘目录（JSON）；下次启动时自动回放，成功后删除
+    async_writer_spill_dir: Path = DEFAULT_ASYNC_WRITER_SPILL_DIR
+
+    # ==========================================================
+    # 五点八、盘后导入并行执行
+    # ==========================================================
+    # local_import_workers：
+    #   - 1（默认）：沿用串行执行（一次只处理一个文件任务）
+    #   - >1：启用进程池并行解析 + 标准化，任务从 local_import_tasks 原子认领；
+    #     日线落库 / 分钟线归档写入仍在主进程串行执行
+    #   - 0：按 CPU 核数自动取值
+    local_import_workers: int = 1
+
+    # local_import_tasks_per_worker：
+    #   - 每个进程最多同时在途的任务数；>1 时进程完成一个文件即可立即取下一个，不等主进程落库
+    local_import_tasks_per_worker: int = 2
+
+    # ==========================================================
+    # 五点九、盘后导入分阶段流水线
+    # ==========================================================
+    # local_import_pipeline_enabled：
+    #   - True：local_import_workers = 1 时，读取 / 解码 / 标准化 / 写入分阶段并发，
+    #     阶段之间用有界队列衔接，磁盘 I/O 与 CPU 重叠，吞吐受限于最慢阶段
+    #   - False（默认）：沿用逐文件“读 -> 解析 -> 标准化 -> 写”的原串行路径
+    #   - 默认关闭的原因：读取 + 解码只占单文件耗时的几个百分点，剩下是构造 records（受 GIL 限制），
+    #     流水线能重叠的部分很少；90 个文件的合成目录上各配置与串行持平（±10%），没有一种稳定更快
+    local_import_pipeline_enabled: bool = False
+
+    # local_import_pipeline_queue_size：每个阶段输入队列的容量（文件数），也是读取阶段的预取深度
+    local_import_pipeline_queue_size: int = 8
+
+    # local_import_pipeline_decoders / local_import_pipeline_normalizers：解码 / 标准化阶段的并发数
+    #   - 标准化输出为 Python dict 列表，线程内执行时受 GIL 限制，多个协程并不能并行；
+    #     normalizers > 1 且机器多核时标准化改在 min(normalizers, CPU 核数) 个进程（spawn）中执行，
+    #     但 records 回传主进程的反序列化开销与构造本身相当，进程池同样难有收益
+    #   - 单核机器或 normalizers = 1：线程内执行，该值只决定在途文件数
+    local_import_pipeline_decoders: int = 2
+    local_import_pipeline_normalizers: int = 2
+
+    # local_import_pipeline_write_batch：写入阶段单次最多合并提交的文件数（任务终态 + 状态推送按批进行）
+    local_import_pipeline_write_batch: int = 16
+
+    # ==========================================================
+    # 五点十、盘后导入增量读取
+    # ==========================================================
+    # local_import_incremental_enabled：
+    #   - True（默认）：记录每个文件已导入的 offset 与尾记录摘要，下次只读新增尾部；
+    #     前缀被改写（摘要不一致 / 文件变短 / 路径变化）时自动回退整文件导入
+    #   - False：每次整文件读取
+    local_import_incremental_enabled: bool = True
+
+    # ==========================================================
+    # 五点十一、盘后导入进度记账
+    # ==========================================================
+    # local_import_task_flush_size：
+    #   - 任务终态先记入内存缓冲，满该条数或到下一次状态推送时，在一个写事务内批量落库
+    local_import_task_flush_size: int = 64
+
+    # local_import_status_emit_hz：
+    #   - 导入过程中的进度推送（local_import.status）最高频率；期间的变化合并为一次推送
+    #   - 批次启动 / 取消 / 重试 / 推进结束等状态变化不受限，立即推送
+    local_import_status_emit_hz: float = 4.0
+
+    # ==========================================================
+    # 五点十二、盘后导入大分钟文件分块
+    # ==========================================================
+    # local_import_minute_chunk_threshold_mb：
+    #   - 需整文件导入的 .lc1 / .lc5 不小于该大小（MB）时，不再整文件读入内存，
+    #     而是按块流式读取 -> 标准化 -> 合并归档，峰值内存只与块大小有关
+    #   - 每追加完一块即在 local_import_tasks.checkpoint_offset 记录进度，任务中断后重试从断点续做
+    #   - 源文件记录非时间升序时自动回退整文件合并
+    #   - 0：关闭分块导入
+    local_import_minute_chunk_threshold_mb: int = 64
+
+    # local_import_minute_chunk_records：
+    #   - 每块的目标记录数（32 字节 / 条）；切分点对齐到交易日边界，单日记录数超过该值时整日成块
+    local_import_minute_chunk_records: int = 65536
+
+    # ==========================================================
+    # 五点十三、分钟归档巡检（scrub）
+    # ==========================================================
+    # minute_archive_scrub_workers：
+    #   - 巡检按归档文件分发到进程池，每个文件 mmap 后整文件向量化校验
+    #   - 0：按 CPU 核数自动取值；1：主进程内逐个文件执行
+    minute_archive_scrub_workers: int = 0
+
+    # minute_archive_scrub_gap_sample：巡检报告中每个文件保留的缺口明细条数（缺口计数不受影响）
+    minute_archive_scrub_gap_sample: int = 20
+
+    # minute_archive_scrub_repair_max_pages：
+    #   - 远程补缺从最新一页向前翻页直到覆盖最早缺口，超过该页数仍未覆盖即停止
+    #   - 远程可用窗口有限，更早的缺口无法补齐，仍保留在报告中
+    minute_archive_scrub_repair_max_pages: int = 30
+
     # ==========================================================
     # 六、业务常量（一般不用动）
     # ==========================================================
@@ -355,6 +612,198 @@ class Settings:
         except Exception:
             self.tdx_remote_ping_timeout_seconds = 1.0
 
+        # SQLite 写线程参数兜底
+        try:
+            self.db_writer_max_batch_commands = max(1, int(self.db_writer_max_batch_commands))
+        except Exception:
+            self.db_writer_max_batch_commands = 256
+
+        try:
+            self.db_writer_max_latency_ms = float(self.db_writer_max_latency_ms)
+            if self.db_writer_max_latency_ms < 0:
+                self.db_writer_max_latency_ms = 5.0
+        except Exception:
+            self.db_writer_max_latency_ms = 5.0
+
+        try:
+            self.day_bars_packed_store_enabled = bool(self.day_bars_packed_store_enabled)
+        except Exception:
+            self.day_bars_packed_store_enabled = False
+
+        self.day_bars_storage_schema = str(self.day_bars_storage_schema or "raw").strip().lower()
+        if self.day_bars_storage_schema not in ("raw", "compact"):
+            self.day_bars_storage_schema = "raw"
+
+        # 数据库后台维护参数兜底
+        try:
+            self.db_maintenance_enabled = bool(self.db_maintenance_enabled)
+        except Exception:
+            self.db_maintenance_enabled = True
+
+        try:
+            self.db_maintenance_check_interval_seconds = float(self.db_maintenance_check_interval_seconds)
+            if self.db_maintenance_check_interval_seconds <= 0:
+                self.db_maintenance_check_interval_seconds = 30.0
+        except Exception:
+            self.db_maintenance_check_interval_seconds = 30.0
+
+        try:
+            self.db_maintenance_idle_seconds = max(0.0, float(self.db_maintenance_idle_seconds))
+        except Exception:
+            self.db_maintenance_idle_seconds = 60.0
+
+        try:
+            self.db_maintenance_wal_checkpoint_mb = max(1, int(self.db_maintenance_wal_checkpoint_mb))
+        except Exception:
+            self.db_maintenance_wal_checkpoint_mb = 64
+
+        try:
+            self.db_maintenance_vacuum_freelist_pages = max(0, int(self.db_maintenance_vacuum_freelist_pages))
+        except Exception:
+            self.db_maintenance_vacuum_freelist_pages = 2048
+
+        try:
+            self.db_maintenance_vacuum_max_pages = max(1, int(self.db_maintenance_vacuum_max_pages))
+        except Exception:
+            self.db_maintenance_vacuum_max_pages = 65536
+
+        hhmm = str(self.db_maintenance_after_close_time or "").strip()
+        try:
+            hh, mm = hhmm.split(":")
+            if not (0 <= int(hh) <= 23 and 0 <= int(mm) <= 59):
+                raise ValueError(hhmm)
+            self.db_maintenance_after_close_time = f"{int(hh):02d}:{int(mm):02d}"
+        except Exception:
+            self.db_maintenance_after_close_time = "15:30"
+
+        # 异步写入队列参数兜底
+        try:
+            self.async_writer_max_queue_bytes = max(1024 * 1024, int(self.async_writer_max_queue_bytes))
+        except Exception:
+            self.async_writer_max_queue_bytes = 64 * 1024 * 1024
+
+        try:
+            self.async_writer_batch_rows = max(1, int(self.async_writer_batch_rows))
+        except Exception:
+            self.async_writer_batch_rows = 5000
+
+        try:
+            self.async_writer_flush_interval_ms = max(10, int(self.async_writer_flush_interval_ms))
+        except Exception:
+            self.async_writer_flush_interval_ms = 500
+
+        try:
+            self.async_writer_max_retries = max(0, int(self.async_writer_max_retries))
+        except Exception:
+            self.async_writer_max_retries = 3
+
+        self.async_writer_spill_dir = Path(self.async_writer_spill_dir).resolve()
+
+        # 盘后导入并行执行参数兜底
+        try:
+            workers = int(self.local_import_workers)
+            self.local_import_workers = max(1, os.cpu_count() or 1) if workers == 0 else max(1, workers)
+        except Exception:
+            self.local_import_workers = 1
+
+        try:
+            self.local_import_tasks_per_worker = max(1, int(self.local_import_tasks_per_worker))
+        except Exception:
+            self.local_import_tasks_per_worker = 2
+
+        # 盘后导入分阶段流水线参数兜底
+        try:
+            self.local_import_pipeline_enabled = bool(self.local_import_pipeline_enabled)
+        except Exception:
+            self.local_import_pipeline_enabled = False
+
+        try:
+            self.local_import_pipeline_queue_size = max(1, int(self.local_import_pipeline_queue_size))
+        except Exception:
+            self.local_import_pipeline_queue_size = 8
+
+        try:
+            self.local_import_pipeline_decoders = max(1, int(self.local_import_pipeline_decoders))
+        except Exception:
+            self.local_import_pipeline_decoders = 2
+
+        try:
+            self.local_import_pipeline_normalizers = max(1, int(self.local_import_pipeline_normalizers))
+        except Exception:
+            self.local_import_pipeline_normalizers = 2
+
+        try:
+            self.local_import_pipeline_write_batch = max(1, int(self.local_import_pipeline_write_batch))
+        except Exception:
+            self.local_import_pipeline_write_batch = 16
+
+        try:
+            self.local_import_incremental_enabled = bool(self.local_import_incremental_enabled)
+        except Exception:
+            self.local_import_incremental_enabled = True
+
+        try:
+            self.local_import_task_flush_size = max(1, int(self.local_import_task_flush_size))
+        except Exception:
+            self.local_import_task_flush_size = 64
+
+        try:
+            self.local_import_status_emit_hz = max(0.1, float(self.local_import_status_emit_hz))
+        except Exception:
+            self.local_import_status_emit_hz = 4.0
+
+        try:
+            self.local_import_minute_chunk_threshold_mb = max(0, int(self.local_import_minute_chunk_threshold_mb))
+        except Exception:
+            self.local_import_minute_chunk_threshold_mb = 64
+
+        try:
+            self.local_import_minute_chunk_records = max(1024, int(self.local_import_minute_chunk_records))
+        except Exception:
+            self.local_import_minute_chunk_records = 65536
+
+        # 分钟归档巡检参数兜底
+        try:
+            workers = int(self.minute_archive_scrub_workers)
+            self.minute_archive_scrub_workers = max(1, os.cpu_count() or 1) if workers <= 0 else workers
+        except Exception:
+            self.minute_archive_scrub_workers = max(1, os.cpu_count() or 1)
+
+        try:
+            self.minute_archive_scrub_gap_sample = max(0, int(self.minute_archive_scrub_gap_sample))
+        except Exception:
+            self.minute_archive_scrub_gap_sample = 20
+
+        try:
+            self.minute_archive_scrub_repair_max_pages = max(1, int(self.minute_archive_scrub_repair_max_pages))
+        except Exception:
+            self.minute_archive_scrub_repair_max_pages = 30
+
+        # 盘后导入日线批量装载参数兜底
+        try:
+            self.local_import_day_bulk_enabled = bool(self.local_import_day_bulk_enabled)
+        except Exception:
+            self.local_import_day_bulk_enabled = True
+
+        try:
+            self.local_import_day_bulk_files_per_commit = max(1, int(self.local_import_day_bulk_files_per_commit))
+        except Exception:
+            self.local_import_day_bulk_files_per_commit = 64
+
+        try:
+            self.local_import_day_bulk_max_rows = max(1000, int(self.local_import_day_bulk_max_rows))
+        except Exception:
+            self.local_import_day_bulk_max_rows = 400000
+
+        self.local_import_day_bulk_synchronous = str(self.local_import_day_bulk_synchronous or "NORMAL").strip().upper()
+        if self.local_import_day_bulk_synchronous not in ("OFF", "NORMAL", "FULL"):
+            self.local_import_day_bulk_synchronous = "NORMAL"
+
+        try:
+            self.local_import_day_bulk_cache_size_kib = max(2048, int(self.local_import_day_bulk_cache_size_kib))
+        except Exception:
+            self.local_import_day_bulk_cache_size_kib = 262144
+
         # provider_limiters 兜底
         if not isinstance(self.provider_limiters, dict):
             self.provider_limiters = {}
@@ -13,7 +13,7 @@ import contextlib
 import io
 from typing import Optional, Dict, Any, List
 
-from backend.db import get_conn
+from backend.db import get_read_conn
 
 
 @contextlib.contextmanager
@@ -43,7 +43,7 @@ def get_symbol_market_from_db(symbol: str) -> Optional[str]:
         return None
 
     try:
-        conn = get_conn()
+        conn = get_read_conn()
         cur = conn.cursor()
         cur.execute(
             "SELECT market FROM symbol_index WHERE symbol=? ORDER BY market ASC LIMIT 1;",
@@ -64,7 +64,7 @@ def get_symbol_markets_from_db(symbol: str) -> List[str]:
         return []
 
     try:
-        conn = get_conn()
+        conn = get_read_conn()
         cur = conn.cursor()
         cur.execute(
             "SELECT DISTINCT market FROM symbol_index WHERE symbol=? ORDER BY market ASC;",
@@ -87,7 +87,7 @@ def get_symbol_record_from_db(symbol: str, market: str) -> Optional[Dict[str, An
         return None
 
     try:
-        conn = get_conn()
+        conn = get_read_conn()
         cur = conn.cursor()
         cur.execute(
             """
@@ -144,7 +144,7 @@ def prefix_symbol_with_market(symbol: str) -> str:
 
 def infer_symbol_type(symbol: str, cat_hint: Optional[str] = None) -> str:
     try:
-        conn = get_conn()
+        conn = get_read_conn()
         cur = conn.cursor()
         cur.execute("SELECT type FROM symbol_index WHERE symbol=? LIMIT 1;", (symbol,))
         r = cur.fetchone()
@@ -13,6 +13,7 @@
 #   - ms_at_day_end：日期 → 日末时间戳（23:59:59）
 #   - ms_at_time：日期+时分秒 → 自定义时间戳
 #   - query_range_ms：日期范围 → 查询用时间戳范围（包含边界）
+#   - ms_at_market_close_array：日期数组 → 收盘时间戳数组（向量化，批量标准化使用）
 # ==============================
 
 from __future__ import annotations
@@ -21,6 +22,8 @@ from datetime import datetime, date, time as dt_time, timedelta
 from zoneinfo import ZoneInfo
 from typing import Optional, Tuple, Union
 
+import numpy as np
+
 from backend.settings import settings
 
 # 统一时区常量
@@ -258,6 +261,51 @@ def ms_at_time(yyyymmdd: int,
     return int(dt.timestamp() * 1000)
 
 
+# Asia/Shanghai 自 1992-01-01 起恒为 UTC+8（1986-1991 夏令时及更早的 LMT 等历史偏移均在此之前）
+_SHANGHAI_FIXED_OFFSET_SINCE = 19920101
+_MS_PER_DAY = 86400 * 1000
+_CLOSE_MS_OF_UTC_DAY = (15 - 8) * 3600 * 1000
+
+
+def ms_at_market_close_array(yyyymmdd: np.ndarray, tz_name: str = TZ_SHANGHAI) -> np.ndarray:
+    """
+    日期数组 → 收盘时间戳数组（int64，语义同 ms_at_market_close）
+
+    算法：
+      - Asia/Shanghai 且日期 >= 19920101：固定 UTC+8，纪元日数 * 86400000 + 7h，纯整数运算
+      - 更早日期或其它时区：按去重后的日期逐个回退 ms_at_market_close（数量很少）
+
+    Raises:
+        ValueError: 存在非法日历日期（如 20230230），按第一个非法值报错（报错信息同 to_date_object）
+    """
+    ymd = np.asarray(yyyymmdd, dtype=np.int64)
+    if ymd.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    year = ymd // 10000
+    month = (ymd // 100) % 100
+    day = ymd % 100
+
+    ok = (month >= 1) & (month <= 12) & (day >= 1)
+    month_start = np.where(ok, (year - 1970) * 12 + (month - 1), 0).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]").astype(np.int64)
+    days_in_month = (month_start + 1).astype("datetime64[D]").astype(np.int64) - first_day
+    ok &= day <= days_in_month
+    if not bool(ok.all()):
+        bad = int(ymd[np.flatnonzero(~ok)[0]])
+        to_date_object(bad)
+        raise ValueError(f"invalid yyyymmdd: {bad}")
+
+    out = (first_day + (day - 1)) * _MS_PER_DAY + _CLOSE_MS_OF_UTC_DAY
+
+    fallback = ymd < _SHANGHAI_FIXED_OFFSET_SINCE if tz_name == TZ_SHANGHAI else np.ones(ymd.shape, dtype=bool)
+    if fallback.any():
+        uniq, inv = np.unique(ymd[fallback], return_inverse=True)
+        exact = np.array([ms_at_market_close(int(v), tz_name) for v in uniq], dtype=np.int64)
+        out[fallback] = exact[inv]
+    return out
+
+
 # ==============================================================================
 # 三、反向转换（毫秒时间戳 → 日期/时间对象）
 # ==============================================================================